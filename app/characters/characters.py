@@ -4,6 +4,7 @@ import app.config.game_config as game_config
 
 from app.mechanics.inventory import Inventory
 from app.mechanics.perk_inventory import PerkInventory
+from app.tags.tags import TagRegistry
 
 
 class Character(ABC):
@@ -26,6 +27,8 @@ class Character(ABC):
         """
         self._name = name
         self._tags = tags
+        self._tag_set = TagRegistry.get_tag_set(tags)
+        self._tag_mask = TagRegistry.get_tag_mask(tags)
         self._strength = strength
         self._endurance = endurance
         self._agility = agility
@@ -37,6 +40,8 @@ class Character(ABC):
         self._action_points = 0
         self._inventory = Inventory()
         self._perks = PerkInventory()
+        self._stats_version = 0
+        self._hooks = list()
 
     @property
     def name(self):
@@ -54,6 +59,22 @@ class Character(ABC):
         """
         return self._tags
 
+    @property
+    def tag_set(self):
+        """Gets character's tags as frozen set of interned tags.
+
+        :return: character's tag set
+        """
+        return self._tag_set
+
+    @property
+    def tag_mask(self):
+        """Gets character's tags as bit mask of interned tags.
+
+        :return: character's tag mask
+        """
+        return self._tag_mask
+
     @property
     def level(self):
         """Gets character's level.
@@ -117,6 +138,7 @@ class Character(ABC):
         :param value: value to set character's current health to
         """
         self._health = value
+        self.notify_hooks()
 
     @property
     def health_bonus(self):
@@ -141,6 +163,7 @@ class Character(ABC):
         :param value: value to set character's current action points to
         """
         self._action_points = value
+        self.notify_hooks()
 
     @property
     def inventory(self):
@@ -158,6 +181,41 @@ class Character(ABC):
         """
         return self._perks
 
+    @property
+    def version(self):
+        """Gets character's version, which changes whenever character's stats change or items and perks are added,
+        removed, equipped or unequipped.
+
+        Version can be used to check whether results cached for the character (for example, combat parameters) are
+        still valid. Changes of current health and action points don't change the version.
+
+        :return: character's version
+        """
+        return self._stats_version + self._inventory.version + self._perks.version
+
+    def add_hook(self, hook):
+        """Adds hook called whenever character's current health, action points or skills change.
+
+        :param hook: callable taking Character derived object as its only argument
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Removes specified hook.
+
+        :param hook: previously added callable
+        :raises ValueError: when specified hook wasn't added
+        """
+        try:
+            self._hooks.remove(hook)
+        except ValueError:
+            raise ValueError("no such hook in character")
+
+    def notify_hooks(self):
+        """Calls all hooks added to character, after character was changed."""
+        for hook in self._hooks:
+            hook(self)
+
 
 class Human(Character):
     """This class derives from Character abstract base class. It represents human characters existing in the game and
@@ -210,6 +268,8 @@ class Human(Character):
         :param value: value to set character's guns skill to
         """
         self._guns = value
+        self._stats_version += 1
+        self.notify_hooks()
 
     @property
     def energy(self):
@@ -226,6 +286,8 @@ class Human(Character):
         :param value: value to set character's energy weapons skill to
         """
         self._energy = value
+        self._stats_version += 1
+        self.notify_hooks()
 
     @property
     def melee(self):
@@ -242,6 +304,8 @@ class Human(Character):
         :param value: value to set character's melee weapons skill to
         """
         self._melee = value
+        self._stats_version += 1
+        self.notify_hooks()
 
     @property
     def sneak(self):
@@ -258,6 +322,8 @@ class Human(Character):
         :param value: value to set character's sneak skill to
         """
         self._sneak = value
+        self._stats_version += 1
+        self.notify_hooks()
 
     @property
     def security(self):
@@ -274,6 +340,8 @@ class Human(Character):
         :param value: value to set character's security skill to
         """
         self._security = value
+        self._stats_version += 1
+        self.notify_hooks()
 
     @property
     def mechanics(self):
@@ -290,6 +358,8 @@ class Human(Character):
         :param value: value to set character's mechanics skill to
         """
         self._mechanics = value
+        self._stats_version += 1
+        self.notify_hooks()
 
     @property
     def survival(self):
@@ -306,6 +376,8 @@ class Human(Character):
         :param value: value to set character's survival skill to
         """
         self._survival = value
+        self._stats_version += 1
+        self.notify_hooks()
 
     @property
     def medicine(self):
@@ -322,6 +394,8 @@ class Human(Character):
         :param value: value to set character's medicine skill to
         """
         self._medicine = value
+        self._stats_version += 1
+        self.notify_hooks()
 
 
 class Player(Human):
@@ -1,4 +1,5 @@
 from app.files.file_handler import FileHandler
+from app.files.file_watcher import DataFileWatcher
 from app.characters.characters import Critter
 from app.items.factory import ItemFactory
 from app.perks.factory import PerkFactory
@@ -29,7 +30,8 @@ class CritterFactory:
         Data is obtained as a list of lines by FileHandler class. Data tracking parameters are used throughout critter
         creation process to track positions of extracted critter's ID and its parameters.
 
-        Stores names of item and perk data files, which are used when creating items and perks for critters.
+        Stores names of item and perk data files, which are used when creating items and perks for critters. Item and
+        perk factories obtaining data from these files are created once, when the first critter is created.
 
         :param data_file: name of the file to obtain data from (defaults to critters.txt)
         :param item_data_file: name of the file containing item data (defaults to items.txt)
@@ -41,11 +43,46 @@ class CritterFactory:
         except FileNotFoundError:
             raise CritterFactory.CritterBuildError("critter data is unavailable")
         else:
+            self._id_index = self._create_id_index()
+            self._watcher = DataFileWatcher(data_file=data_file, data=self._data)
             self._line_number_containing_critter_id = None
             self._line_number_containing_last_data = None
             self._critter_id_to_find = None
             self._item_data_file = item_data_file
             self._perk_data_file = perk_data_file
+            self._item_factory = None
+            self._perk_factory = None
+
+    def update_data(self):
+        """Checks whether data file was modified since data was obtained and, if so, obtains data again, updating index
+        of critter IDs. Data of already created item and perk factories is updated as well.
+
+        :raises CritterBuildError: when data file, or item or perk data file is no longer available
+        :return: set of IDs of critters which were added, changed or removed (empty set when data file wasn't modified)
+        """
+        try:
+            update = self._watcher.poll()
+        except FileNotFoundError:
+            raise CritterFactory.CritterBuildError("critter data is unavailable")
+        try:
+            if self._item_factory is not None:
+                self._item_factory.update_data()
+            if self._perk_factory is not None:
+                self._perk_factory.update_data()
+        except (ItemFactory.ItemBuildError, PerkFactory.PerkBuildError) as error:
+            raise CritterFactory.CritterBuildError(str(error))
+        if update is None:
+            return set()
+        self._data, changed_ids = update
+        self._id_index = self._create_id_index()
+        return changed_ids
+
+    def get_critter_ids(self):
+        """Gets IDs of all critters existing in obtained data.
+
+        :return: list of critter IDs, in order of appearance in obtained data
+        """
+        return list(self._id_index.keys())
 
     def create_critter(self, critter_id):
         """Searches for specified critter based on its ID and returns instance of Critter class with parameters
@@ -55,21 +92,45 @@ class CritterFactory:
         :raises CritterBuildError: when specified critter ID is not found
         :return: Critter object
         """
-        for idx, line in enumerate(self._data):
-            if "id:" in line and line.split()[-1] == critter_id:
-                self._line_number_containing_critter_id = idx
-                self._line_number_containing_last_data = self._line_number_containing_critter_id + 1
-                self._critter_id_to_find = critter_id
-                return self._create_critter()
-        else:
+        critter_data = self.get_critter_data(critter_id=critter_id)
+        return self._create_critter(critter_data=critter_data)
+
+    def get_critter_data(self, critter_id):
+        """Searches for specified critter based on its ID and returns its parameters extracted from previously obtained
+        data, without creating critter's items and perks.
+
+        :param critter_id: ID of the critter to find
+        :raises CritterBuildError: when specified critter ID is not found or extracted data can't be converted due to
+                                   incorrect parameter value in obtained data
+        :return: tuple of tuple of Critter object parameters, armor ID, weapon ID and list of perk IDs
+        """
+        try:
+            self._line_number_containing_critter_id = self._id_index[critter_id]
+        except KeyError:
             raise CritterFactory.CritterBuildError("incorrect critter ID")
+        else:
+            self._line_number_containing_last_data = self._line_number_containing_critter_id + 1
+            self._critter_id_to_find = critter_id
+            return self._get_critter_data()
 
-    def _create_critter(self):
-        """Extracts parameter values and creates instance of Critter class with those parameters, items and perks.
+    def _create_id_index(self):
+        """Creates index of critter IDs and numbers of lines containing them, so that critters can be found without
+        searching whole obtained data. When ID is repeated, its first occurrence is indexed.
+
+        :return: dictionary of critter IDs and line numbers
+        """
+        id_index = dict()
+        for idx, line in enumerate(self._data):
+            if line.startswith("id:"):
+                id_index.setdefault(line.split()[-1], idx)
+        return id_index
+
+    def _get_critter_data(self):
+        """Extracts previously found critter's parameter values, including IDs of its armor, weapon and perks.
 
         :raises CritterBuildError: when extracted data can't be converted due to incorrect parameter value in obtained
                                    data
-        :return: Critter object
+        :return: tuple of tuple of Critter object parameters, armor ID, weapon ID and list of perk IDs
         """
         try:
             tags = self._get_parameter_value_from_data(parameter_name="tags")
@@ -86,59 +147,94 @@ class CritterFactory:
             raise CritterFactory.CritterBuildError("incorrect parameter data for critter: {}"
                                                    .format(self._critter_id_to_find))
         else:
-            critter = Critter(name, tags, level, strength, endurance, agility, perception, intelligence, health_bonus,
-                              exp_award)
-            self._create_critter_armor(critter)
-            self._create_critter_weapon(critter)
-            self._create_critter_perks(critter)
-            return critter
-
-    def _create_critter_armor(self, critter):
+            parameters = (name, tags, level, strength, endurance, agility, perception, intelligence, health_bonus,
+                          exp_award)
+            armor_id = self._get_parameter_value_from_data(parameter_name="armor")
+            weapon_id = self._get_parameter_value_from_data(parameter_name="weapon")
+            perks = self._get_parameter_value_from_data(parameter_name="perks")
+            perk_ids = list()
+            if perks != "none":
+                perk_ids = perks.split(", ")
+            return parameters, armor_id, weapon_id, perk_ids
+
+    def _create_critter(self, critter_data):
+        """Creates instance of Critter class with extracted parameters, items and perks.
+
+        :param critter_data: tuple of tuple of Critter object parameters, armor ID, weapon ID and list of perk IDs
+        :raises CritterBuildError: when critter's items or perks can't be created
+        :return: Critter object
+        """
+        parameters, armor_id, weapon_id, perk_ids = critter_data
+        critter = Critter(*parameters)
+        self._create_critter_armor(critter=critter, armor_id=armor_id)
+        self._create_critter_weapon(critter=critter, weapon_id=weapon_id)
+        self._create_critter_perks(critter=critter, perk_ids=perk_ids)
+        return critter
+
+    def _create_critter_armor(self, critter, armor_id):
         """Creates and equips critter armor based on extracted armor ID.
 
         :param critter: Critter object to add and equip armor
+        :param armor_id: ID of the armor to create
         :raises CritterBuildError: when armor can't be created or equipped
         """
-        armor_id = self._get_parameter_value_from_data(parameter_name="armor")
         try:
-            armor = ItemFactory(data_file=self._item_data_file).create_item(item_id=armor_id)
+            armor = self._get_item_factory().create_item(item_id=armor_id)
             InventoryItemAdder.add_item(inv=critter.inventory, item_to_add=armor)
             InventoryItemEquipper.equip_item(inv=critter.inventory, item_to_equip=critter.inventory.items[0])
         except (ItemFactory.ItemBuildError, Inventory.InventoryError):
             raise CritterFactory.CritterBuildError("can't create armor: {} for critter: {}"
                                                    .format(armor_id, critter.name))
 
-    def _create_critter_weapon(self, critter):
+    def _create_critter_weapon(self, critter, weapon_id):
         """Creates and equips critter weapon based on extracted weapon ID.
 
         :param critter: Critter object to add and equip weapon
+        :param weapon_id: ID of the weapon to create
         :raises CritterBuildError: when weapon can't be created or equipped
         """
-        weapon_id = self._get_parameter_value_from_data(parameter_name="weapon")
         try:
-            weapon = ItemFactory(data_file=self._item_data_file).create_item(item_id=weapon_id)
+            weapon = self._get_item_factory().create_item(item_id=weapon_id)
             InventoryItemAdder.add_item(inv=critter.inventory, item_to_add=weapon)
             InventoryItemEquipper.equip_item(inv=critter.inventory, item_to_equip=critter.inventory.items[0])
         except (ItemFactory.ItemBuildError, Inventory.InventoryError):
             raise CritterFactory.CritterBuildError("can't create weapon: {} for critter: {}"
                                                    .format(weapon_id, critter.name))
 
-    def _create_critter_perks(self, critter):
+    def _create_critter_perks(self, critter, perk_ids):
         """Creates and adds critter perks based on extracted perk IDs.
 
         :param critter: Critter object to add perks for
+        :param perk_ids: list of IDs of the perks to create
         :raises CritterBuildError: when perks can't be created or added
         """
-        perks = self._get_parameter_value_from_data(parameter_name="perks")
-        if perks != "none":
-            perks = perks.split(", ")
-            for perk_id in perks:
-                try:
-                    perk = PerkFactory(data_file=self._perk_data_file).create_perk(perk_id=perk_id)
-                    PerkInventoryPerkAdder.add_perk(perk_inv=critter.perks, perk_to_add=perk)
-                except (PerkFactory.PerkBuildError, PerkInventory.PerkInventoryError):
-                    raise CritterFactory.CritterBuildError("can't create perk: {} for critter: {}"
-                                                           .format(perk_id, critter.name))
+        for perk_id in perk_ids:
+            try:
+                perk = self._get_perk_factory().create_perk(perk_id=perk_id)
+                PerkInventoryPerkAdder.add_perk(perk_inv=critter.perks, perk_to_add=perk)
+            except (PerkFactory.PerkBuildError, PerkInventory.PerkInventoryError):
+                raise CritterFactory.CritterBuildError("can't create perk: {} for critter: {}"
+                                                       .format(perk_id, critter.name))
+
+    def _get_item_factory(self):
+        """Gets item factory creating critters' items, creating it when it's used for the first time.
+
+        :raises ItemBuildError: when item data is unavailable
+        :return: ItemFactory object
+        """
+        if self._item_factory is None:
+            self._item_factory = ItemFactory(data_file=self._item_data_file)
+        return self._item_factory
+
+    def _get_perk_factory(self):
+        """Gets perk factory creating critters' perks, creating it when it's used for the first time.
+
+        :raises PerkBuildError: when perk data is unavailable
+        :return: PerkFactory object
+        """
+        if self._perk_factory is None:
+            self._perk_factory = PerkFactory(data_file=self._perk_data_file)
+        return self._perk_factory
 
     def _get_parameter_value_from_data(self, parameter_name):
         """Extracts specified parameter value from obtained data.
@@ -1,72 +1,289 @@
-_default_armor = "clothes"
-_default_weapon = "unarmed"
+import os
+from collections import namedtuple
 
+from app.files.file_handler import FileHandler
 
-def get_default_armor():
-    return _default_armor
 
+class GameConfigError(Exception):
+    """This exception class exist to unify all errors and exceptions occurring during game configuration changes."""
+    pass
 
-def get_default_weapon():
-    return _default_weapon
 
+GameConfig = namedtuple("GameConfig", ["default_armor", "default_weapon",
+                                       "health_bonus_human", "health_bonus_player",
+                                       "carry_weight_base", "carry_weight_strength_mult",
+                                       "health_endurance_mult", "health_level_mult",
+                                       "rad_res_endurance_mult",
+                                       "action_points_base",
+                                       "exp_gain_mult_base", "exp_gain_mult_intelligence_bonus",
+                                       "lookup_table_attribute_max", "lookup_table_level_max"])
 
-_health_bonus_human = 10
-_health_bonus_player = 20
+_default_config = GameConfig(default_armor="clothes", default_weapon="unarmed",
+                             health_bonus_human=10, health_bonus_player=20,
+                             carry_weight_base=10, carry_weight_strength_mult=3,
+                             health_endurance_mult=4, health_level_mult=2,
+                             rad_res_endurance_mult=5,
+                             action_points_base=10,
+                             exp_gain_mult_base=75, exp_gain_mult_intelligence_bonus=5,
+                             lookup_table_attribute_max=20, lookup_table_level_max=50)
 
+_config = _default_config
+_config_version = 0
+_config_file = None
+_config_file_mtime = None
 
-def get_health_bonus_human():
-    return _health_bonus_human
+_lookup_tables = dict()
+_rebuild_hooks = list()
 
 
-def get_health_bonus_player():
-    return _health_bonus_player
+def get_config():
+    return _config
 
 
-_carry_weight_base = 10
-_carry_weight_strength_mult = 3
+def get_config_version():
+    """Gets configuration version, incremented whenever configuration is loaded or changed."""
+    return _config_version
 
 
-def get_carry_weight_base():
-    return _carry_weight_base
+def get_default_armor():
+    return _config.default_armor
 
 
-def get_carry_weight_strength_mult():
-    return _carry_weight_strength_mult
+def get_default_weapon():
+    return _config.default_weapon
 
 
-_health_endurance_mult = 4
-_health_level_mult = 2
+def get_health_bonus_human():
+    return _config.health_bonus_human
 
 
-def get_health_endurance_mult():
-    return _health_endurance_mult
+def get_health_bonus_player():
+    return _config.health_bonus_player
 
 
-def get_health_level_mult():
-    return _health_level_mult
+def get_carry_weight_base():
+    return _config.carry_weight_base
 
 
-_rad_res_endurance_mult = 5
+def get_carry_weight_strength_mult():
+    return _config.carry_weight_strength_mult
 
 
-def get_rad_res_endurance_mult():
-    return _rad_res_endurance_mult
+def get_health_endurance_mult():
+    return _config.health_endurance_mult
 
 
-_action_points_base = 10
+def get_health_level_mult():
+    return _config.health_level_mult
 
 
-def get_action_points_base():
-    return _action_points_base
+def get_rad_res_endurance_mult():
+    return _config.rad_res_endurance_mult
 
 
-_exp_gain_mult_base = 75
-_exp_gain_mult_intelligence_bonus = 5
+def get_action_points_base():
+    return _config.action_points_base
 
 
 def get_exp_gain_mult_base():
-    return _exp_gain_mult_base
+    return _config.exp_gain_mult_base
 
 
 def get_exp_gain_mult_intelligence_bonus():
-    return _exp_gain_mult_intelligence_bonus
+    return _config.exp_gain_mult_intelligence_bonus
+
+
+def load_config(config_file="config.txt"):
+    """Loads configuration from specified file, formatted as data files ("name: value" lines, "#" comments). Values
+    missing from the file are set to their defaults. Configuration is validated as a whole, so on error current
+    configuration is kept.
+    """
+    global _config_file, _config_file_mtime
+    try:
+        data = FileHandler.get_file_contents_as_list(config_file)
+        mtime = os.path.getmtime(config_file)
+    except FileNotFoundError:
+        raise GameConfigError("config data is unavailable")
+    _set_config(_default_config._replace(**_parse_config_data(data)))
+    _config_file = config_file
+    _config_file_mtime = mtime
+
+
+def reload_config():
+    """Reloads configuration from previously loaded file, if the file was modified since it was loaded.
+
+    :return: True if configuration was reloaded, False otherwise
+    """
+    if _config_file is None:
+        return False
+    try:
+        mtime = os.path.getmtime(_config_file)
+    except FileNotFoundError:
+        raise GameConfigError("config data is unavailable")
+    if mtime == _config_file_mtime:
+        return False
+    load_config(_config_file)
+    return True
+
+
+def reset_config():
+    """Restores default configuration, forgetting previously loaded file."""
+    global _config_file, _config_file_mtime
+    _config_file = None
+    _config_file_mtime = None
+    _set_config(_default_config)
+
+
+def update_config(**values):
+    """Sets provided configuration values (named as GameConfig fields) and rebuilds lookup tables."""
+    for name, value in values.items():
+        if name not in GameConfig._fields:
+            raise GameConfigError("incorrect configuration value name: {}".format(name))
+        if not _is_correct_config_value(name=name, value=value):
+            raise GameConfigError("incorrect configuration value for: {}".format(name))
+    _set_config(_config._replace(**values))
+
+
+def _set_config(config):
+    global _config, _config_version
+    _config = config
+    _config_version += 1
+    rebuild_lookup_tables()
+
+
+def _parse_config_data(data):
+    values = dict()
+    for line_number, line in enumerate(data, start=1):
+        line = line.strip()
+        if line == "" or line.startswith("#"):
+            continue
+        name, separator, value = line.partition(":")
+        name = name.strip()
+        if separator == "" or name not in GameConfig._fields:
+            raise GameConfigError("incorrect configuration line: {}".format(line_number))
+        if name in values:
+            raise GameConfigError("duplicate configuration value: {} in line: {}".format(name, line_number))
+        values[name] = _convert_config_value(name=name, value=value.strip(), line_number=line_number)
+    return values
+
+
+def _convert_config_value(name, value, line_number):
+    value_type = type(getattr(_default_config, name))
+    try:
+        converted_value = value_type(value)
+    except ValueError:
+        raise GameConfigError("incorrect configuration value for: {} in line: {}".format(name, line_number))
+    if not _is_correct_config_value(name=name, value=converted_value):
+        raise GameConfigError("incorrect configuration value for: {} in line: {}".format(name, line_number))
+    return converted_value
+
+
+def _is_correct_config_value(name, value):
+    value_type = type(getattr(_default_config, name))
+    if isinstance(value, bool) or not isinstance(value, value_type):
+        return False
+    if value_type is str:
+        return value != ""
+    return not (name.startswith("lookup_table") and value < 0)
+
+
+def _calculate_carry_weight(strength):
+    return _config.carry_weight_base + _config.carry_weight_strength_mult * strength
+
+
+def _calculate_melee_bonus(strength):
+    return max(strength - 5, 0)
+
+
+def _calculate_max_health(endurance, level):
+    return _config.health_endurance_mult * endurance + _config.health_level_mult * (level - 1)
+
+
+def _calculate_rad_res(endurance):
+    return _config.rad_res_endurance_mult * max(endurance - 5, 0)
+
+
+def _calculate_evasion(agility):
+    return max(agility - 5, 0)
+
+
+def _calculate_max_ap(agility):
+    return _config.action_points_base + agility
+
+
+def _calculate_exp_mult(intelligence):
+    return _config.exp_gain_mult_base + _config.exp_gain_mult_intelligence_bonus * intelligence
+
+
+def rebuild_lookup_tables():
+    """Builds lookup tables of derived stats (indexed by attribute value and level) from current configuration and
+    calls all rebuild hooks.
+    """
+    global _lookup_tables
+    attribute_values = range(_config.lookup_table_attribute_max + 1)
+    levels = range(_config.lookup_table_level_max + 1)
+    _lookup_tables = {
+        "carry_weight": tuple(_calculate_carry_weight(strength) for strength in attribute_values),
+        "melee_bonus": tuple(_calculate_melee_bonus(strength) for strength in attribute_values),
+        "max_health": tuple(tuple(_calculate_max_health(endurance, level) for level in levels)
+                            for endurance in attribute_values),
+        "rad_res": tuple(_calculate_rad_res(endurance) for endurance in attribute_values),
+        "evasion": tuple(_calculate_evasion(agility) for agility in attribute_values),
+        "max_ap": tuple(_calculate_max_ap(agility) for agility in attribute_values),
+        "exp_mult": tuple(_calculate_exp_mult(intelligence) for intelligence in attribute_values)
+    }
+    for hook in list(_rebuild_hooks):
+        hook()
+
+
+def add_rebuild_hook(hook):
+    """Adds callable (taking no arguments) called whenever lookup tables are rebuilt."""
+    _rebuild_hooks.append(hook)
+
+
+def remove_rebuild_hook(hook):
+    try:
+        _rebuild_hooks.remove(hook)
+    except ValueError:
+        raise GameConfigError("no such rebuild hook")
+
+
+def _lookup(table_name, value, calculate):
+    table = _lookup_tables[table_name]
+    if 0 <= value < len(table):
+        return table[value]
+    return calculate(value)
+
+
+def lookup_carry_weight(strength):
+    return _lookup("carry_weight", strength, _calculate_carry_weight)
+
+
+def lookup_melee_bonus(strength):
+    return _lookup("melee_bonus", strength, _calculate_melee_bonus)
+
+
+def lookup_max_health(endurance, level):
+    table = _lookup_tables["max_health"]
+    if 0 <= endurance < len(table) and 0 <= level < len(table[endurance]):
+        return table[endurance][level]
+    return _calculate_max_health(endurance, level)
+
+
+def lookup_rad_res(endurance):
+    return _lookup("rad_res", endurance, _calculate_rad_res)
+
+
+def lookup_evasion(agility):
+    return _lookup("evasion", agility, _calculate_evasion)
+
+
+def lookup_max_ap(agility):
+    return _lookup("max_ap", agility, _calculate_max_ap)
+
+
+def lookup_exp_mult(intelligence):
+    return _lookup("exp_mult", intelligence, _calculate_exp_mult)
+
+
+rebuild_lookup_tables()
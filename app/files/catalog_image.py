@@ -0,0 +1,415 @@
+import copy
+import mmap
+import os
+import struct
+
+from app.files.data_catalog import CritterDefinition, DataCatalog
+from app.items.items import Armor
+from app.items.stackables import Ammo, Consumable
+from app.items.weapons import MeleeWeapon, RangedWeapon
+from app.perks.perks import CharacterPerk, PlayerTrait, StatusEffect
+
+
+_IMAGE_MAGIC = b"PACATIMG"
+_IMAGE_VERSION = 1
+
+_column_formats = {"s": "<I", "i": "<i", "d": "<d"}
+
+_item_tables = (
+    (Armor, (("item_id", "s"), ("tags", "s"), ("name", "s"), ("desc", "s"), ("dmg_res", "i"), ("rad_res", "i"),
+             ("evasion", "i"), ("value", "i"), ("weight", "d"))),
+    (MeleeWeapon, (("item_id", "s"), ("tags", "s"), ("name", "s"), ("desc", "s"), ("damage", "s"), ("effect", "s"),
+                   ("eff_chance", "s"), ("armor_pen", "i"), ("accuracy", "i"), ("ap_cost", "i"),
+                   ("st_requirement", "i"), ("value", "i"), ("weight", "d"))),
+    (RangedWeapon, (("item_id", "s"), ("tags", "s"), ("name", "s"), ("desc", "s"), ("damage", "s"), ("ammo_type", "s"),
+                    ("clip_size", "i"), ("armor_pen", "i"), ("accuracy", "i"), ("ap_cost", "i"),
+                    ("st_requirement", "i"), ("value", "i"), ("weight", "d"))),
+    (Ammo, (("item_id", "s"), ("tags", "s"), ("name", "s"), ("desc", "s"), ("max_stack", "i"), ("current_amount", "i"),
+            ("value", "i"), ("weight", "d"))),
+    (Consumable, (("item_id", "s"), ("tags", "s"), ("name", "s"), ("desc", "s"), ("effect", "s"), ("max_stack", "i"),
+                  ("current_amount", "i"), ("value", "i"), ("weight", "d")))
+)
+
+_perk_tables = (
+    (CharacterPerk, (("perk_id", "s"), ("tags", "s"), ("name", "s"), ("desc", "s"), ("effects", "s"),
+                     ("requirements", "s"))),
+    (PlayerTrait, (("perk_id", "s"), ("tags", "s"), ("name", "s"), ("desc", "s"), ("effects", "s"),
+                   ("conflicts", "s"))),
+    (StatusEffect, (("perk_id", "s"), ("tags", "s"), ("name", "s"), ("desc", "s"), ("effects", "s"),
+                    ("duration", "i")))
+)
+
+_critter_table = (("critter_id", "s"), ("name", "s"), ("tags", "s"), ("level", "i"), ("strength", "i"),
+                  ("endurance", "i"), ("agility", "i"), ("perception", "i"), ("intelligence", "i"),
+                  ("health_bonus", "i"), ("exp_award", "i"), ("armor", "s"), ("weapon", "s"), ("perks", "s"))
+
+_CRITTER_TABLE_IDX = len(_item_tables) + len(_perk_tables)
+
+_header_struct = struct.Struct("<8sHH")
+_section_struct = struct.Struct("<II")
+_offset_struct = struct.Struct("<I")
+_index_entry_struct = struct.Struct("<IBI")
+
+
+class CatalogImage:
+    """This class represents read-only image of data catalog, exported once to a file and memory mapped by any number of
+    processes (for example, simulation or session workers), so that workers don't parse data files or build their own
+    data catalogs.
+
+    The image has columnar layout: every record type (armor, melee weapons, ..., status effects, critters) has a table,
+    whose columns (parameters) are stored as contiguous arrays of fixed size values. Strings are interned in a string
+    pool and referenced by index. Record IDs are kept in sorted indexes, searched with binary search. The file is mapped
+    read-only, so its pages are shared by all processes mapping it, and only records that are actually used are read
+    from it, when their prototypes are first requested. Prototypes are cached, and items, perks and critters are created
+    by copying them, the same way as with DataCatalog.
+
+    The class provides CatalogImageError exception, which is raised when image file is incorrect or when requesting
+    nonexistent records.
+    """
+
+    class CatalogImageError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during catalog image export and
+        usage.
+        """
+        pass
+
+    def __init__(self, image_file):
+        """Initializes instance of the class, memory mapping specified image file.
+
+        :param image_file: name of the image file
+        :raises CatalogImageError: when image file is unavailable or incorrect
+        """
+        try:
+            with open(image_file, "rb") as file:
+                self._image = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            raise CatalogImage.CatalogImageError("catalog image is unavailable")
+        self._sections = list()
+        try:
+            self._read_sections()
+        except CatalogImage.CatalogImageError:
+            self.close()
+            raise
+        self._string_pool = self._sections[0]
+        self._indexes = self._sections[1:4]
+        self._tables = self._sections[4:]
+        self._items = dict()
+        self._perks = dict()
+        self._critters = dict()
+
+    @property
+    def item_ids(self):
+        """Gets IDs of all items in the image.
+
+        :return: list of item IDs, in alphabetical order
+        """
+        return self._get_ids(index=self._indexes[0])
+
+    @property
+    def perk_ids(self):
+        """Gets IDs of all perks in the image.
+
+        :return: list of perk IDs, in alphabetical order
+        """
+        return self._get_ids(index=self._indexes[1])
+
+    @property
+    def critter_ids(self):
+        """Gets IDs of all critters in the image.
+
+        :return: list of critter IDs, in alphabetical order
+        """
+        return self._get_ids(index=self._indexes[2])
+
+    def close(self):
+        """Unmaps the image file. Already created prototypes remain usable."""
+        for section in self._sections:
+            section.release()
+        self._sections.clear()
+        self._image.close()
+
+    def get_item_prototype(self, item_id):
+        """Gets item definition object (prototype) with specified ID, reading it from the image when it's first
+        requested. Prototype must not be modified.
+
+        :param item_id: ID of the item
+        :raises CatalogImageError: when specified item ID is incorrect
+        :return: Item derived object
+        """
+        item = self._items.get(item_id)
+        if item is None:
+            table_idx, row = self._find(index=self._indexes[0], record_id=item_id, record_type="item")
+            item_type, columns = _item_tables[table_idx]
+            item = item_type(*self._read_row(table_idx=table_idx, columns=columns, row=row))
+            self._items[item_id] = item
+            if isinstance(item, RangedWeapon):
+                item.ammo_prototype = self.get_item_prototype(item_id=item.ammo_type)
+        return item
+
+    def get_perk_prototype(self, perk_id):
+        """Gets perk definition object (prototype) with specified ID, reading it from the image when it's first
+        requested. Prototype must not be modified.
+
+        :param perk_id: ID of the perk
+        :raises CatalogImageError: when specified perk ID is incorrect
+        :return: Perk derived object
+        """
+        perk = self._perks.get(perk_id)
+        if perk is None:
+            table_idx, row = self._find(index=self._indexes[1], record_id=perk_id, record_type="perk")
+            perk_type, columns = _perk_tables[table_idx - len(_item_tables)]
+            perk = perk_type(*self._read_row(table_idx=table_idx, columns=columns, row=row))
+            self._perks[perk_id] = perk
+        return perk
+
+    def get_critter_definition(self, critter_id):
+        """Gets critter definition with specified ID, reading it from the image and linking its armor, weapon and perks
+        when it's first requested.
+
+        :param critter_id: ID of the critter
+        :raises CatalogImageError: when specified critter ID is incorrect
+        :return: CritterDefinition named tuple of critter ID, Critter object parameters and linked armor, weapon and
+                 perk prototypes
+        """
+        definition = self._critters.get(critter_id)
+        if definition is None:
+            table_idx, row = self._find(index=self._indexes[2], record_id=critter_id, record_type="critter")
+            values = self._read_row(table_idx=table_idx, columns=_critter_table, row=row)
+            perk_ids = values[13].split(", ") if values[13] != "" else list()
+            definition = CritterDefinition(critter_id=critter_id, parameters=tuple(values[1:11]),
+                                           armor=self.get_item_prototype(item_id=values[11]),
+                                           weapon=self.get_item_prototype(item_id=values[12]),
+                                           perks=tuple(self.get_perk_prototype(perk_id=perk_id)
+                                                       for perk_id in perk_ids))
+            self._critters[critter_id] = definition
+        return definition
+
+    def create_item(self, item_id):
+        """Creates new item with specified ID by copying its prototype.
+
+        :param item_id: ID of the item to create
+        :raises CatalogImageError: when specified item ID is incorrect
+        :return: Item derived object
+        """
+        return copy.copy(self.get_item_prototype(item_id=item_id))
+
+    def create_perk(self, perk_id):
+        """Creates new perk with specified ID by copying its prototype.
+
+        :param perk_id: ID of the perk to create
+        :raises CatalogImageError: when specified perk ID is incorrect
+        :return: Perk derived object
+        """
+        return copy.copy(self.get_perk_prototype(perk_id=perk_id))
+
+    def create_critter(self, critter_id):
+        """Spawns new critter with specified ID, with copies of its linked armor (equipped), weapon (equipped) and
+        perks.
+
+        :param critter_id: ID of the critter to create
+        :raises CatalogImageError: when specified critter ID is incorrect
+        :return: Critter object
+        """
+        return DataCatalog.spawn_critter(definition=self.get_critter_definition(critter_id=critter_id))
+
+    @staticmethod
+    def export(catalog, image_file):
+        """Exports all records of specified data catalog to image file.
+
+        The image is written to temporary file first and then replaces specified file, so processes which already
+        mapped previous image keep using it.
+
+        :param catalog: DataCatalog object to export
+        :param image_file: name of the image file
+        """
+        strings = dict()
+        tables = [list() for _ in range(_CRITTER_TABLE_IDX + 1)]
+        indexes = [list(), list(), list()]
+        for item_id in catalog.item_ids:
+            item = catalog.get_item_prototype(item_id=item_id)
+            table_idx = CatalogImage._get_table_idx(tables=_item_tables, record=item)
+            CatalogImage._add_row(tables=tables, indexes=indexes[0], strings=strings, record_id=item_id,
+                                  table_idx=table_idx,
+                                  values=[getattr(item, name) for name, _ in _item_tables[table_idx][1]])
+        for perk_id in catalog.perk_ids:
+            perk = catalog.get_perk_prototype(perk_id=perk_id)
+            table_idx = CatalogImage._get_table_idx(tables=_perk_tables, record=perk)
+            CatalogImage._add_row(tables=tables, indexes=indexes[1], strings=strings, record_id=perk_id,
+                                  table_idx=table_idx + len(_item_tables),
+                                  values=[getattr(perk, name) for name, _ in _perk_tables[table_idx][1]])
+        for critter_id in catalog.critter_ids:
+            definition = catalog.get_critter_definition(critter_id=critter_id)
+            values = [critter_id] + list(definition.parameters) + [
+                definition.armor.item_id, definition.weapon.item_id,
+                ", ".join(perk.perk_id for perk in definition.perks)]
+            CatalogImage._add_row(tables=tables, indexes=indexes[2], strings=strings, record_id=critter_id,
+                                  table_idx=_CRITTER_TABLE_IDX, values=values)
+        sections = [CatalogImage._pack_string_pool(strings=strings)]
+        for index in indexes:
+            index.sort()
+            sections.append(b"".join(_index_entry_struct.pack(strings[record_id], table_idx, row)
+                                     for record_id, table_idx, row in index))
+        for (_, columns), rows in zip(_item_tables + _perk_tables + ((None, _critter_table),), tables):
+            sections.append(CatalogImage._pack_table(columns=columns, rows=rows, strings=strings))
+        temporary_file = image_file + ".tmp"
+        with open(temporary_file, "wb") as file:
+            file.write(_header_struct.pack(_IMAGE_MAGIC, _IMAGE_VERSION, len(tables)))
+            for section in sections:
+                file.write(_section_struct.pack(len(section), 0))
+                file.write(section)
+        os.replace(temporary_file, image_file)
+
+    @staticmethod
+    def _get_table_idx(tables, record):
+        """Gets index of the table for specified record's type.
+
+        :param tables: tuple of tuples of record types and their columns
+        :param record: Item or Perk derived object
+        :raises CatalogImageError: when record's type can't be exported
+        :return: index of the table
+        """
+        for table_idx, (record_type, _) in enumerate(tables):
+            if type(record) is record_type:
+                return table_idx
+        raise CatalogImage.CatalogImageError("incorrect record type to export: {}".format(type(record).__name__))
+
+    @staticmethod
+    def _add_row(tables, indexes, strings, record_id, table_idx, values):
+        """Adds row of values to specified table, interning its strings and adding its ID to specified index.
+
+        :param tables: list of lists of rows
+        :param indexes: list of tuples of record ID, table index and row number
+        :param strings: dictionary of interned strings and their indexes
+        :param record_id: ID of the record
+        :param table_idx: index of the table
+        :param values: list of record's values, in order of table's columns
+        """
+        for value in values:
+            if isinstance(value, str):
+                strings.setdefault(value, len(strings))
+        strings.setdefault(record_id, len(strings))
+        indexes.append((record_id, table_idx, len(tables[table_idx])))
+        tables[table_idx].append(values)
+
+    @staticmethod
+    def _pack_string_pool(strings):
+        """Packs interned strings as array of offsets followed by UTF-8 encoded strings.
+
+        :param strings: dictionary of interned strings and their indexes
+        :return: bytes of the string pool
+        """
+        encoded_strings = [string.encode("utf-8") for string in sorted(strings, key=strings.get)]
+        offsets = [0]
+        for encoded_string in encoded_strings:
+            offsets.append(offsets[-1] + len(encoded_string))
+        return struct.pack("<I{}I".format(len(offsets)), len(encoded_strings), *offsets) + b"".join(encoded_strings)
+
+    @staticmethod
+    def _pack_table(columns, rows, strings):
+        """Packs rows of values as contiguous column arrays.
+
+        :param columns: tuple of tuples of column names and types
+        :param rows: list of lists of values
+        :param strings: dictionary of interned strings and their indexes
+        :return: bytes of the table
+        """
+        data = bytearray(_offset_struct.pack(len(rows)))
+        for column_idx, (_, column_type) in enumerate(columns):
+            column_format = "<{}{}".format(len(rows), _column_formats[column_type][1])
+            if column_type == "s":
+                data += struct.pack(column_format, *(strings[row[column_idx]] for row in rows))
+            else:
+                data += struct.pack(column_format, *(row[column_idx] for row in rows))
+        return bytes(data)
+
+    def _read_sections(self):
+        """Reads header and section headers of the image, storing memory views of sections' data, without copying it.
+
+        :raises CatalogImageError: when image is incorrect or its version is unsupported
+        """
+        if len(self._image) < _header_struct.size:
+            raise CatalogImage.CatalogImageError("incorrect catalog image")
+        magic, version, number_of_tables = _header_struct.unpack_from(self._image, 0)
+        if magic != _IMAGE_MAGIC or number_of_tables != _CRITTER_TABLE_IDX + 1:
+            raise CatalogImage.CatalogImageError("incorrect catalog image")
+        if version != _IMAGE_VERSION:
+            raise CatalogImage.CatalogImageError("unsupported catalog image version: {}".format(version))
+        offset = _header_struct.size
+        # string pool, item, perk and critter indexes and all tables
+        for _ in range(4 + number_of_tables):
+            if offset + _section_struct.size > len(self._image):
+                raise CatalogImage.CatalogImageError("incorrect catalog image")
+            length, _ = _section_struct.unpack_from(self._image, offset)
+            offset += _section_struct.size
+            if offset + length > len(self._image):
+                raise CatalogImage.CatalogImageError("incorrect catalog image")
+            with memoryview(self._image) as image_view:
+                self._sections.append(image_view[offset:offset + length])
+            offset += length
+
+    def _get_string(self, idx):
+        """Gets interned string with specified index from the string pool.
+
+        :param idx: index of the string
+        :return: string
+        """
+        number_of_strings = _offset_struct.unpack_from(self._string_pool, 0)[0]
+        start, end = struct.unpack_from("<2I", self._string_pool, _offset_struct.size * (idx + 1))
+        data_offset = _offset_struct.size * (number_of_strings + 2)
+        return bytes(self._string_pool[data_offset + start:data_offset + end]).decode("utf-8")
+
+    def _get_ids(self, index):
+        """Gets all record IDs in specified index.
+
+        :param index: memory view of the index
+        :return: list of record IDs
+        """
+        return [self._get_string(_index_entry_struct.unpack_from(index, entry_offset)[0])
+                for entry_offset in range(0, len(index), _index_entry_struct.size)]
+
+    def _find(self, index, record_id, record_type):
+        """Finds record with specified ID in specified index, using binary search.
+
+        :param index: memory view of the index
+        :param record_id: ID of the record
+        :param record_type: type of the record, used in error message
+        :raises CatalogImageError: when record with specified ID doesn't exist
+        :return: tuple of table index and row number of the record
+        """
+        low = 0
+        high = len(index) // _index_entry_struct.size
+        while low < high:
+            middle = (low + high) // 2
+            string_idx, table_idx, row = _index_entry_struct.unpack_from(index, middle * _index_entry_struct.size)
+            middle_id = self._get_string(string_idx)
+            if middle_id == record_id:
+                return table_idx, row
+            if middle_id < record_id:
+                low = middle + 1
+            else:
+                high = middle
+        raise CatalogImage.CatalogImageError("incorrect {} ID: {}".format(record_type, record_id))
+
+    def _read_row(self, table_idx, columns, row):
+        """Reads values of specified row from column arrays of specified table.
+
+        :param table_idx: index of the table
+        :param columns: tuple of tuples of column names and types
+        :param row: row number
+        :return: list of values, in order of table's columns
+        """
+        table = self._tables[table_idx]
+        number_of_rows = _offset_struct.unpack_from(table, 0)[0]
+        column_offset = _offset_struct.size
+        values = list()
+        for _, column_type in columns:
+            column_struct = _column_structs[column_type]
+            value = column_struct.unpack_from(table, column_offset + row * column_struct.size)[0]
+            if column_type == "s":
+                value = self._get_string(value)
+            values.append(value)
+            column_offset += number_of_rows * column_struct.size
+        return values
+
+
+_column_structs = {column_type: struct.Struct(column_format) for column_type, column_format in _column_formats.items()}
@@ -0,0 +1,384 @@
+import itertools
+import random
+from collections import namedtuple
+
+from app.characters.characters import Human
+from app.items.items import Armor
+from app.items.weapons import Weapon
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder
+from app.perks.perks import CharacterPerk
+
+
+GeneratedContent = namedtuple("GeneratedContent", ["armors", "melee_weapons", "ranged_weapons", "ammo", "consumables",
+                                                   "perks", "traits", "status_effects", "critters"])
+
+_armor_record = ("id:                    %s\n"
+                 "tags:                  armor%s\n"
+                 "name:                  %s\n"
+                 "description:           Generated armor.\n"
+                 "damage_resistance:     %d\n"
+                 "radiation_resistance:  %d\n"
+                 "evasion:               %d\n"
+                 "value:                 %d\n"
+                 "weight:                %.1f\n\n")
+
+_melee_weapon_record = ("id:                    %s\n"
+                        "tags:                  weapon, melee, %s\n"
+                        "name:                  %s\n"
+                        "description:           Generated melee weapon.\n"
+                        "damage:                %d + %dd%d\n"
+                        "effect:                %s\n"
+                        "effect_chance:         %d + d10\n"
+                        "armor_penetration:     %d\n"
+                        "accuracy:              %d\n"
+                        "action_points_cost:    %d\n"
+                        "strength_requirement:  %d\n"
+                        "value:                 %d\n"
+                        "weight:                %.1f\n\n")
+
+_ranged_weapon_record = ("id:                    %s\n"
+                         "tags:                  weapon, %s, %s\n"
+                         "name:                  %s\n"
+                         "description:           Generated ranged weapon.\n"
+                         "damage:                %d + %dd%d\n"
+                         "ammo_type:             %s\n"
+                         "clip_size:             %d\n"
+                         "armor_penetration:     %d\n"
+                         "accuracy:              %d\n"
+                         "action_points_cost:    %d\n"
+                         "strength_requirement:  %d\n"
+                         "value:                 %d\n"
+                         "weight:                %.1f\n\n")
+
+_ammo_record = ("id:                    %s\n"
+                "tags:                  ammo, stackable\n"
+                "name:                  %s\n"
+                "description:           Generated ammo.\n"
+                "max_stack:             %d\n"
+                "value:                 %d\n"
+                "weight:                %.2f\n\n")
+
+_consumable_record = ("id:                    %s\n"
+                      "tags:                  consumable, stackable\n"
+                      "name:                  %s\n"
+                      "description:           Generated consumable.\n"
+                      "effect:                %s\n"
+                      "max_stack:             %d\n"
+                      "value:                 %d\n"
+                      "weight:                %.1f\n\n")
+
+_perk_record = ("id:           %s\n"
+                "tags:         perk, %s\n"
+                "name:         %s\n"
+                "description:  Generated perk.\n"
+                "effects:      %s\n"
+                "requirements: attribute, %s, %d\n\n")
+
+_trait_record = ("id:           %s\n"
+                 "tags:         trait, attribute\n"
+                 "name:         %s\n"
+                 "description:  Generated trait.\n"
+                 "effects:      attribute, %s, %d; attribute, %s, %d\n"
+                 "conflicts:    %s\n\n")
+
+_status_effect_record = ("id:           %s\n"
+                         "tags:         status effect, %s\n"
+                         "name:         %s\n"
+                         "description:  Generated status effect.\n"
+                         "effects:      %s\n"
+                         "duration:     %d\n\n")
+
+_critter_record = ("id:           %s\n"
+                   "tags:         critter, %s\n"
+                   "name:         %s\n"
+                   "level:        %d\n"
+                   "strength:     %d\n"
+                   "endurance:    %d\n"
+                   "agility:      %d\n"
+                   "perception:   %d\n"
+                   "intelligence: %d\n"
+                   "health_bonus: %d\n"
+                   "exp_award:    %d\n"
+                   "armor:        %s\n"
+                   "weapon:       %s\n"
+                   "perks:        %s\n\n")
+
+_attributes = ("strength", "endurance", "agility", "perception", "intelligence")
+_critter_types = ("dog", "rat", "mutant", "robot", "insect")
+_dice = (4, 6, 8, 10, 12)
+
+# tags and effect templates (formatted with effect value) of generated perks, so that every perk is found by its stat
+_perk_effects = (("damage", "weapon, {}, damage, %d"), ("accuracy", "weapon, {}, accuracy, %d"),
+                 ("dmg_res", "{}, dmg_res, %d"), ("ap_cost", "weapon, {}, ap_cost, -%d"),
+                 ("skill", "skill, {}, %d"), ("evasion", "evasion, %d"), ("carry_wg", "carry_wg, %d"))
+_perk_effect_tags = {"damage": ("melee", "gun", "energy", "short", "long"),
+                     "accuracy": ("melee", "gun", "energy", "short", "long"),
+                     "dmg_res": _critter_types + ("human",), "ap_cost": ("melee", "gun", "energy"),
+                     "skill": ("guns", "energy", "melee", "sneak", "security", "mechanics", "survival", "medicine")}
+_status_effect_effects = ("evasion, -%d", "max_ap, -%d", "rad_res, -%d", "melee_bonus, %d")
+
+_WRITE_BATCH = 10000
+
+
+class ContentGenerator:
+    """This class generates content for load testing: data files containing any number of items, perks and critters,
+    formatted exactly as parsed by ItemFactory, PerkFactory and CritterFactory, and worlds of characters created in
+    memory.
+
+    Generated records are consistent: ranged weapons use generated ammo, traits conflict with other generated traits,
+    and critters are equipped with generated armors and weapons and have generated perks. Parameter values are drawn
+    from seeded random generator, so the same seed and counts give the same files. Every record is formatted with
+    a single string formatting operation and records are written in batches, so millions of records can be generated.
+
+    The class provides ContentGeneratorError exception, which is raised when requested content can't be generated
+    consistently (for example, ranged weapons without any ammo).
+    """
+
+    class ContentGeneratorError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during content generation."""
+        pass
+
+    def __init__(self, seed=0):
+        """Initializes instance of the class.
+
+        :param seed: seed of the random generator (defaults to 0)
+        """
+        self._random = random.Random(seed)
+
+    def write_item_data(self, data_file, armors=0, melee_weapons=0, ranged_weapons=0, ammo=0, consumables=0):
+        """Writes item data file with specified numbers of items of every type.
+
+        :param data_file: name of the file to write
+        :param armors: number of armors (defaults to 0)
+        :param melee_weapons: number of melee weapons (defaults to 0)
+        :param ranged_weapons: number of ranged weapons (guns and energy weapons) (defaults to 0)
+        :param ammo: number of ammo types (defaults to 0)
+        :param consumables: number of consumables (defaults to 0)
+        :raises ContentGeneratorError: when ranged weapons are requested without ammo
+        :return: GeneratedContent named tuple of lists of generated item IDs (other lists are empty)
+        """
+        if ranged_weapons > 0 and ammo == 0:
+            raise ContentGenerator.ContentGeneratorError("can't generate ranged weapons without ammo")
+        rnd = self._random.randrange
+        ammo_ids = ContentGenerator._get_ids(prefix="ammo", count=ammo)
+        armor_ids = ContentGenerator._get_ids(prefix="armor", count=armors)
+        melee_weapon_ids = ContentGenerator._get_ids(prefix="melee", count=melee_weapons)
+        ranged_weapon_ids = ContentGenerator._get_ids(prefix="ranged", count=ranged_weapons)
+        consumable_ids = ContentGenerator._get_ids(prefix="consumable", count=consumables)
+        records = itertools.chain(
+            (_ammo_record % (ammo_id, "Ammo {}".format(idx), 20 + rnd(80), 1 + rnd(5), 0.01 * (1 + rnd(9)))
+             for idx, ammo_id in enumerate(ammo_ids)),
+            (_armor_record % (armor_id, ", heavy" if rnd(4) == 0 else "", "Armor {}".format(idx), rnd(15), rnd(40),
+                              rnd(6), 10 + rnd(500), 1 + 0.5 * rnd(30))
+             for idx, armor_id in enumerate(armor_ids)),
+            (_melee_weapon_record % (weapon_id, ("sharp", "blunt")[rnd(2)], "Melee Weapon {}".format(idx), rnd(6),
+                                     1 + rnd(4), _dice[rnd(5)], ("bleed_minor", "stun", "none")[rnd(3)], -rnd(9),
+                                     rnd(4), rnd(11) - 5, 2 + rnd(5), 1 + rnd(8), 5 + rnd(300), 0.5 * (1 + rnd(12)))
+             for idx, weapon_id in enumerate(melee_weapon_ids)),
+            (_ranged_weapon_record % (weapon_id, ("gun", "energy")[rnd(2)], ("short", "long")[rnd(2)],
+                                      "Ranged Weapon {}".format(idx), rnd(6), 1 + rnd(4), _dice[rnd(5)],
+                                      ammo_ids[rnd(ammo)], 5 * (1 + rnd(8)), rnd(6), rnd(21) - 10, 3 + rnd(5),
+                                      1 + rnd(8), 20 + rnd(800), 0.5 * (1 + rnd(20)))
+             for idx, weapon_id in enumerate(ranged_weapon_ids)),
+            (_consumable_record % (consumable_id, "Consumable {}".format(idx), ("heal", "rad_heal", "none")[rnd(3)],
+                                   1 + rnd(10), 5 + rnd(100), 0.1 * (1 + rnd(10)))
+             for idx, consumable_id in enumerate(consumable_ids)))
+        ContentGenerator._write_records(data_file=data_file, records=records)
+        return GeneratedContent(armors=armor_ids, melee_weapons=melee_weapon_ids, ranged_weapons=ranged_weapon_ids,
+                                ammo=ammo_ids, consumables=consumable_ids, perks=[], traits=[], status_effects=[],
+                                critters=[])
+
+    def write_perk_data(self, data_file, perks=0, traits=0, status_effects=0):
+        """Writes perk data file with specified numbers of perks of every type. Traits are paired, every trait
+        conflicting with the other trait of its pair (or with nothing, for the last unpaired trait).
+
+        :param data_file: name of the file to write
+        :param perks: number of character perks (defaults to 0)
+        :param traits: number of traits (defaults to 0)
+        :param status_effects: number of status effects (defaults to 0)
+        :return: GeneratedContent named tuple of lists of generated perk IDs (other lists are empty)
+        """
+        perk_ids = ContentGenerator._get_ids(prefix="perk", count=perks)
+        trait_ids = ContentGenerator._get_ids(prefix="trait", count=traits)
+        status_effect_ids = ContentGenerator._get_ids(prefix="status_effect", count=status_effects)
+        records = itertools.chain(
+            (self._format_perk(idx=idx, perk_id=perk_id) for idx, perk_id in enumerate(perk_ids)),
+            (self._format_trait(idx=idx, trait_ids=trait_ids) for idx in range(traits)),
+            (self._format_status_effect(idx=idx, status_effect_id=status_effect_id)
+             for idx, status_effect_id in enumerate(status_effect_ids)))
+        ContentGenerator._write_records(data_file=data_file, records=records)
+        return GeneratedContent(armors=[], melee_weapons=[], ranged_weapons=[], ammo=[], consumables=[],
+                                perks=perk_ids, traits=trait_ids, status_effects=status_effect_ids, critters=[])
+
+    def write_critter_data(self, data_file, critters, item_content, perk_content, max_perks=3):
+        """Writes critter data file with specified number of critters, equipped with generated armors and weapons and
+        having generated perks.
+
+        :param data_file: name of the file to write
+        :param critters: number of critters
+        :param item_content: GeneratedContent named tuple returned by write_item_data
+        :param perk_content: GeneratedContent named tuple returned by write_perk_data
+        :param max_perks: maximum number of perks of every critter (defaults to 3)
+        :raises ContentGeneratorError: when critters are requested without generated armors or weapons
+        :return: GeneratedContent named tuple of list of generated critter IDs (other lists are empty)
+        """
+        weapon_ids = item_content.melee_weapons + item_content.ranged_weapons
+        if critters > 0 and (len(item_content.armors) == 0 or len(weapon_ids) == 0):
+            raise ContentGenerator.ContentGeneratorError("can't generate critters without armors and weapons")
+        # critters don't get traits, so that they never have conflicting traits
+        perk_ids = perk_content.perks + perk_content.status_effects
+        critter_ids = ContentGenerator._get_ids(prefix="critter", count=critters)
+        records = (self._format_critter(idx=idx, critter_id=critter_id, armor_ids=item_content.armors,
+                                        weapon_ids=weapon_ids, perk_ids=perk_ids, max_perks=max_perks)
+                   for idx, critter_id in enumerate(critter_ids))
+        ContentGenerator._write_records(data_file=data_file, records=records)
+        return GeneratedContent(armors=[], melee_weapons=[], ranged_weapons=[], ammo=[], consumables=[], perks=[],
+                                traits=[], status_effects=[], critters=critter_ids)
+
+    def write_data_files(self, item_data_file, perk_data_file, critter_data_file, records_per_type):
+        """Writes item, perk and critter data files with the same number of records of every type.
+
+        :param item_data_file: name of the item data file to write
+        :param perk_data_file: name of the perk data file to write
+        :param critter_data_file: name of the critter data file to write
+        :param records_per_type: number of records of every type
+        :return: GeneratedContent named tuple of lists of all generated record IDs
+        """
+        items = self.write_item_data(data_file=item_data_file, armors=records_per_type,
+                                     melee_weapons=records_per_type, ranged_weapons=records_per_type,
+                                     ammo=records_per_type, consumables=records_per_type)
+        perks = self.write_perk_data(data_file=perk_data_file, perks=records_per_type, traits=records_per_type,
+                                     status_effects=records_per_type)
+        critters = self.write_critter_data(data_file=critter_data_file, critters=records_per_type,
+                                           item_content=items, perk_content=perks)
+        return items._replace(perks=perks.perks, traits=perks.traits, status_effects=perks.status_effects,
+                              critters=critters.critters)
+
+    def create_world(self, catalog, humans=0, critters=0, items_per_human=10, perks_per_human=2):
+        """Creates characters populating a world: humans with equipped armor and weapon, other carried items and
+        character perks copied from catalog prototypes, and critters spawned from catalog.
+
+        :param catalog: DataCatalog object (or CatalogImage object) to create items, perks and critters with
+        :param humans: number of humans (defaults to 0)
+        :param critters: number of critters (defaults to 0)
+        :param items_per_human: number of carried items (besides equipped armor and weapon) of every human (defaults
+                                to 10)
+        :param perks_per_human: number of character perks of every human (defaults to 2)
+        :raises ContentGeneratorError: when catalog doesn't contain records required to create requested characters
+        :return: list of Character derived objects, humans followed by critters
+        """
+        item_ids = catalog.item_ids
+        armor_ids = [item_id for item_id in item_ids if isinstance(catalog.get_item_prototype(item_id), Armor)]
+        weapon_ids = [item_id for item_id in item_ids if isinstance(catalog.get_item_prototype(item_id), Weapon)]
+        perk_ids = [perk_id for perk_id in catalog.perk_ids
+                    if isinstance(catalog.get_perk_prototype(perk_id), CharacterPerk)]
+        if humans > 0 and (len(armor_ids) == 0 or len(weapon_ids) == 0):
+            raise ContentGenerator.ContentGeneratorError("can't create humans without armors and weapons")
+        if humans > 0 and perks_per_human > len(perk_ids):
+            raise ContentGenerator.ContentGeneratorError("not enough character perks for humans")
+        critter_ids = catalog.critter_ids
+        if critters > 0 and len(critter_ids) == 0:
+            raise ContentGenerator.ContentGeneratorError("can't create critters without critter definitions")
+        rnd = self._random.randrange
+        characters = list()
+        for idx in range(humans):
+            human = Human("Human {}".format(idx), "human", 1 + rnd(20), 1 + rnd(10), 1 + rnd(10), 1 + rnd(10),
+                          1 + rnd(10), 1 + rnd(10))
+            inv = human.inventory
+            for item_id in (armor_ids[rnd(len(armor_ids))], weapon_ids[rnd(len(weapon_ids))]):
+                item = catalog.create_item(item_id=item_id)
+                InventoryItemAdder.add_item(inv=inv, item_to_add=item)
+                InventoryItemEquipper.equip_item(inv=inv, item_to_equip=item)
+            for _ in range(items_per_human):
+                InventoryItemAdder.add_item(inv=inv, item_to_add=catalog.create_item(item_ids[rnd(len(item_ids))]))
+            for perk_id in self._random.sample(perk_ids, perks_per_human):
+                PerkInventoryPerkAdder.add_perk(perk_inv=human.perks, perk_to_add=catalog.create_perk(perk_id))
+            characters.append(human)
+        for _ in range(critters):
+            characters.append(catalog.create_critter(critter_id=critter_ids[rnd(len(critter_ids))]))
+        return characters
+
+    def _format_perk(self, idx, perk_id):
+        """Formats record of generated character perk, with a single effect matching its stat tag.
+
+        :param idx: index of the perk
+        :param perk_id: ID of the perk
+        :return: formatted record
+        """
+        rnd = self._random.randrange
+        stat, effect = _perk_effects[rnd(len(_perk_effects))]
+        if stat in _perk_effect_tags:
+            effect_tags = _perk_effect_tags[stat]
+            effect = effect.format(effect_tags[rnd(len(effect_tags))])
+        return _perk_record % (perk_id, stat, "Perk {}".format(idx), effect % (1 + rnd(3)), _attributes[rnd(5)],
+                               3 + rnd(5))
+
+    def _format_trait(self, idx, trait_ids):
+        """Formats record of generated trait, conflicting with the other trait of its pair.
+
+        :param idx: index of the trait
+        :param trait_ids: IDs of all generated traits
+        :return: formatted record
+        """
+        rnd = self._random.randrange
+        conflict_idx = idx + 1 if idx % 2 == 0 else idx - 1
+        conflicts = trait_ids[conflict_idx] if conflict_idx < len(trait_ids) else "none"
+        return _trait_record % (trait_ids[idx], "Trait {}".format(idx), _attributes[rnd(5)], 1 + rnd(2),
+                                _attributes[rnd(5)], -1 - rnd(2), conflicts)
+
+    def _format_status_effect(self, idx, status_effect_id):
+        """Formats record of generated status effect.
+
+        :param idx: index of the status effect
+        :param status_effect_id: ID of the status effect
+        :return: formatted record
+        """
+        rnd = self._random.randrange
+        effect = _status_effect_effects[rnd(len(_status_effect_effects))]
+        return _status_effect_record % (status_effect_id, effect.split(",")[0], "Status Effect {}".format(idx),
+                                        effect % (1 + rnd(3)), 1 + rnd(10))
+
+    def _format_critter(self, idx, critter_id, armor_ids, weapon_ids, perk_ids, max_perks):
+        """Formats record of generated critter.
+
+        :param idx: index of the critter
+        :param critter_id: ID of the critter
+        :param armor_ids: IDs of generated armors to choose from
+        :param weapon_ids: IDs of generated weapons to choose from
+        :param perk_ids: IDs of generated perks to choose from
+        :param max_perks: maximum number of critter's perks
+        :return: formatted record
+        """
+        rnd = self._random.randrange
+        number_of_perks = min(rnd(max_perks + 1), len(perk_ids))
+        perks = ", ".join(self._random.sample(perk_ids, number_of_perks)) if number_of_perks > 0 else "none"
+        level = 1 + rnd(20)
+        return _critter_record % (critter_id, _critter_types[rnd(5)], "Critter {}".format(idx), level, 1 + rnd(10),
+                                  1 + rnd(10), 1 + rnd(10), 1 + rnd(10), 1 + rnd(10), 5 * (1 + rnd(10)), 10 * level,
+                                  armor_ids[rnd(len(armor_ids))], weapon_ids[rnd(len(weapon_ids))], perks)
+
+    @staticmethod
+    def _get_ids(prefix, count):
+        """Gets IDs of generated records.
+
+        :param prefix: prefix of the IDs
+        :param count: number of IDs
+        :return: list of IDs
+        """
+        return ["{}_{}".format(prefix, idx) for idx in range(count)]
+
+    @staticmethod
+    def _write_records(data_file, records):
+        """Writes formatted records to specified file in batches, so that all records are never held in memory.
+
+        :param data_file: name of the file to write
+        :param records: iterable of formatted records
+        """
+        records = iter(records)
+        with open(data_file, "w") as file:
+            while True:
+                batch = "".join(itertools.islice(records, _WRITE_BATCH))
+                if batch == "":
+                    break
+                file.write(batch)
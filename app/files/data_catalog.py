@@ -0,0 +1,325 @@
+import copy
+from collections import namedtuple
+
+from app.characters.characters import Critter
+from app.characters.factory import CritterFactory
+from app.items.factory import ItemFactory
+from app.items.items import Armor
+from app.items.stackables import Ammo
+from app.items.weapons import Weapon, RangedWeapon
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder
+from app.perks.factory import PerkFactory
+
+
+CritterDefinition = namedtuple("CritterDefinition", ["critter_id", "parameters", "armor", "weapon", "perks"])
+
+
+class DataCatalog:
+    """This class represents catalog of all items, perks and critters existing in data files, loaded and linked once.
+
+    On instantiation every record in data files is parsed by respective factory into a definition object (prototype),
+    and every reference between records is resolved to the referenced definition object: ranged weapons' ammunition
+    types are linked to ammunition prototypes, and critters' armor, weapons and perks are linked to their prototypes.
+    Items and perks are then created by copying prototypes, and critters are spawned by following linked definitions,
+    without searching data by IDs. Items created from the catalog keep links to their ammunition prototypes, so
+    weapons are unloaded without searching data as well.
+
+    The class provides DataCatalogError exception, which is raised when data can't be loaded or linked, or when
+    requesting nonexistent records.
+    """
+
+    class DataCatalogError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during data catalog loading and
+        usage.
+        """
+        pass
+
+    def __init__(self, item_data_file="items.txt", perk_data_file="perks.txt", critter_data_file="critters.txt"):
+        """Initializes instance of the class, loading all records from specified data files and linking references
+        between them.
+
+        :param item_data_file: name of the file containing item data (defaults to items.txt)
+        :param perk_data_file: name of the file containing perk data (defaults to perks.txt)
+        :param critter_data_file: name of the file containing critter data (defaults to critters.txt)
+        :raises DataCatalogError: when any record can't be loaded or any reference can't be resolved
+        """
+        try:
+            self._item_factory = ItemFactory(data_file=item_data_file)
+            self._perk_factory = PerkFactory(data_file=perk_data_file)
+            self._critter_factory = CritterFactory(data_file=critter_data_file, item_data_file=item_data_file,
+                                                   perk_data_file=perk_data_file)
+        except (ItemFactory.ItemBuildError, PerkFactory.PerkBuildError, CritterFactory.CritterBuildError) as error:
+            raise DataCatalog.DataCatalogError("can't load data: {}".format(error))
+        self._items = self._load_items(item_ids=self._item_factory.get_item_ids())
+        self._perks = self._load_perks(perk_ids=self._perk_factory.get_perk_ids())
+        self._link_ammo(items=self._items, item_ids=self._items.keys())
+        self._critters = self._load_critters(critter_ids=self._critter_factory.get_critter_ids(), items=self._items,
+                                             perks=self._perks)
+        self._pending_item_ids, self._pending_perk_ids, self._pending_critter_ids = set(), set(), set()
+
+    @property
+    def item_ids(self):
+        """Gets IDs of all items in the catalog.
+
+        :return: list of item IDs
+        """
+        return list(self._items.keys())
+
+    @property
+    def perk_ids(self):
+        """Gets IDs of all perks in the catalog.
+
+        :return: list of perk IDs
+        """
+        return list(self._perks.keys())
+
+    @property
+    def critter_ids(self):
+        """Gets IDs of all critters in the catalog.
+
+        :return: list of critter IDs
+        """
+        return list(self._critters.keys())
+
+    def get_item_prototype(self, item_id):
+        """Gets item definition object (prototype) with specified ID. Prototype must not be modified.
+
+        :param item_id: ID of the item
+        :raises DataCatalogError: when specified item ID is incorrect
+        :return: Item derived object
+        """
+        try:
+            return self._items[item_id]
+        except KeyError:
+            raise DataCatalog.DataCatalogError("incorrect item ID: {}".format(item_id))
+
+    def get_perk_prototype(self, perk_id):
+        """Gets perk definition object (prototype) with specified ID. Prototype must not be modified.
+
+        :param perk_id: ID of the perk
+        :raises DataCatalogError: when specified perk ID is incorrect
+        :return: Perk derived object
+        """
+        try:
+            return self._perks[perk_id]
+        except KeyError:
+            raise DataCatalog.DataCatalogError("incorrect perk ID: {}".format(perk_id))
+
+    def get_critter_definition(self, critter_id):
+        """Gets critter definition with specified ID.
+
+        :param critter_id: ID of the critter
+        :raises DataCatalogError: when specified critter ID is incorrect
+        :return: CritterDefinition named tuple of critter ID, Critter object parameters and linked armor, weapon and
+                 perk prototypes
+        """
+        try:
+            return self._critters[critter_id]
+        except KeyError:
+            raise DataCatalog.DataCatalogError("incorrect critter ID: {}".format(critter_id))
+
+    def create_item(self, item_id):
+        """Creates new item with specified ID by copying its prototype.
+
+        :param item_id: ID of the item to create
+        :raises DataCatalogError: when specified item ID is incorrect
+        :return: Item derived object
+        """
+        return copy.copy(self.get_item_prototype(item_id=item_id))
+
+    def create_perk(self, perk_id):
+        """Creates new perk with specified ID by copying its prototype.
+
+        :param perk_id: ID of the perk to create
+        :raises DataCatalogError: when specified perk ID is incorrect
+        :return: Perk derived object
+        """
+        return copy.copy(self.get_perk_prototype(perk_id=perk_id))
+
+    def create_critter(self, critter_id):
+        """Spawns new critter with specified ID, with copies of its linked armor (equipped), weapon (equipped) and
+        perks.
+
+        :param critter_id: ID of the critter to create
+        :raises DataCatalogError: when specified critter ID is incorrect
+        :return: Critter object
+        """
+        return DataCatalog.spawn_critter(definition=self.get_critter_definition(critter_id=critter_id))
+
+    @staticmethod
+    def spawn_critter(definition):
+        """Spawns new critter following specified linked definition, with copies of its armor (equipped), weapon
+        (equipped) and perks.
+
+        :param definition: CritterDefinition named tuple
+        :return: Critter object
+        """
+        critter = Critter(*definition.parameters)
+        for item_prototype in (definition.armor, definition.weapon):
+            item = copy.copy(item_prototype)
+            InventoryItemAdder.add_item(inv=critter.inventory, item_to_add=item)
+            InventoryItemEquipper.equip_item(inv=critter.inventory, item_to_equip=item)
+        for perk_prototype in definition.perks:
+            PerkInventoryPerkAdder.add_perk(perk_inv=critter.perks, perk_to_add=copy.copy(perk_prototype))
+        return critter
+
+    def refresh(self):
+        """Checks whether data files were modified and, if so, parses again only added or changed records and relinks
+        only references to them, removing definitions of removed records.
+
+        Changed records are loaded and linked into new definitions, which replace current ones only when the whole
+        refresh succeeds. When any changed record can't be loaded or linked, the catalog is left unchanged and changed
+        records are kept pending, so that they are loaded again by the next refresh.
+
+        :raises DataCatalogError: when data files are no longer available, or changed records can't be loaded or linked
+        :return: set of IDs of added, changed or removed items, perks and critters
+        """
+        try:
+            self._pending_item_ids |= self._item_factory.update_data()
+            self._pending_perk_ids |= self._perk_factory.update_data()
+            self._pending_critter_ids |= self._critter_factory.update_data()
+        except (ItemFactory.ItemBuildError, PerkFactory.PerkBuildError, CritterFactory.CritterBuildError) as error:
+            raise DataCatalog.DataCatalogError("can't load data: {}".format(error))
+        changed_item_ids = set(self._pending_item_ids)
+        changed_perk_ids = set(self._pending_perk_ids)
+        changed_critter_ids = set(self._pending_critter_ids)
+        items = DataCatalog._update_definitions(definitions=self._items, changed_ids=changed_item_ids,
+                                                existing_ids=self._item_factory.get_item_ids(),
+                                                load=self._load_items)
+        perks = DataCatalog._update_definitions(definitions=self._perks, changed_ids=changed_perk_ids,
+                                                existing_ids=self._perk_factory.get_perk_ids(),
+                                                load=self._load_perks)
+        relinked_item_ids = {item_id for item_id, item in items.items() if item_id not in changed_item_ids and
+                             isinstance(item, RangedWeapon) and item.ammo_type in changed_item_ids}
+        items = {item_id: copy.copy(item) if item_id in relinked_item_ids else item for item_id, item in items.items()}
+        self._link_ammo(items=items, item_ids=[item_id for item_id in items
+                                               if item_id in changed_item_ids or item_id in relinked_item_ids])
+        critter_ids_to_link = set(changed_critter_ids)
+        for critter_id, definition in self._critters.items():
+            references = {definition.armor.item_id, definition.weapon.item_id}
+            if not references.isdisjoint(changed_item_ids | relinked_item_ids) or \
+                    not {perk.perk_id for perk in definition.perks}.isdisjoint(changed_perk_ids):
+                critter_ids_to_link.add(critter_id)
+        critters = DataCatalog._update_definitions(
+            definitions=self._critters, changed_ids=critter_ids_to_link,
+            existing_ids=self._critter_factory.get_critter_ids(),
+            load=lambda critter_ids: self._load_critters(critter_ids=critter_ids, items=items, perks=perks))
+        self._items, self._perks, self._critters = items, perks, critters
+        self._pending_item_ids, self._pending_perk_ids, self._pending_critter_ids = set(), set(), set()
+        return changed_item_ids | changed_perk_ids | changed_critter_ids
+
+    @staticmethod
+    def _update_definitions(definitions, changed_ids, existing_ids, load):
+        """Creates updated copy of definitions, loading again definitions with changed IDs which still exist.
+
+        :param definitions: dictionary of IDs and current definitions
+        :param changed_ids: set of IDs of changed definitions
+        :param existing_ids: list of IDs existing in data, in order of appearance
+        :param load: callable loading definitions with specified IDs
+        :return: dictionary of IDs and definitions, in order of appearance in data
+        """
+        if len(changed_ids) == 0:
+            return definitions
+        loaded = load([definition_id for definition_id in existing_ids if definition_id in changed_ids])
+        return {definition_id: loaded[definition_id] if definition_id in loaded else definitions[definition_id]
+                for definition_id in existing_ids}
+
+    def _load_items(self, item_ids):
+        """Creates prototypes of specified items.
+
+        :param item_ids: IDs of the items to create
+        :raises DataCatalogError: when any item can't be created
+        :return: dictionary of item IDs and Item derived objects
+        """
+        try:
+            return {item_id: self._item_factory.create_item(item_id=item_id) for item_id in item_ids}
+        except ItemFactory.ItemBuildError as error:
+            raise DataCatalog.DataCatalogError("can't load items: {}".format(error))
+
+    def _load_perks(self, perk_ids):
+        """Creates prototypes of specified perks.
+
+        :param perk_ids: IDs of the perks to create
+        :raises DataCatalogError: when any perk can't be created
+        :return: dictionary of perk IDs and Perk derived objects
+        """
+        try:
+            return {perk_id: self._perk_factory.create_perk(perk_id=perk_id) for perk_id in perk_ids}
+        except PerkFactory.PerkBuildError as error:
+            raise DataCatalog.DataCatalogError("can't load perks: {}".format(error))
+
+    def _load_critters(self, critter_ids, items, perks):
+        """Creates definitions of specified critters, linking their armor, weapons and perks.
+
+        :param critter_ids: IDs of the critters to create
+        :param items: dictionary of item IDs and prototypes to link
+        :param perks: dictionary of perk IDs and prototypes to link
+        :raises DataCatalogError: when any critter can't be created or linked
+        :return: dictionary of critter IDs and CritterDefinition named tuples
+        """
+        try:
+            critters = dict()
+            for critter_id in critter_ids:
+                parameters, armor_id, weapon_id, perk_ids = self._critter_factory.get_critter_data(
+                    critter_id=critter_id)
+                critters[critter_id] = CritterDefinition(
+                    critter_id=critter_id, parameters=parameters,
+                    armor=DataCatalog._link_item(items=items, item_id=armor_id, item_type=Armor,
+                                                 critter_id=critter_id),
+                    weapon=DataCatalog._link_item(items=items, item_id=weapon_id, item_type=Weapon,
+                                                  critter_id=critter_id),
+                    perks=tuple(DataCatalog._link_perk(perks=perks, perk_id=perk_id, critter_id=critter_id)
+                                for perk_id in perk_ids))
+            return critters
+        except CritterFactory.CritterBuildError as error:
+            raise DataCatalog.DataCatalogError("can't load critters: {}".format(error))
+
+    @staticmethod
+    def _link_ammo(items, item_ids):
+        """Links ammunition types of specified ranged weapon prototypes to ammunition prototypes. Specified prototypes
+        are modified, so they must not be definitions used by the catalog yet.
+
+        :param items: dictionary of item IDs and prototypes
+        :param item_ids: IDs of the items to link (items other than ranged weapons are skipped)
+        :raises DataCatalogError: when ammunition type doesn't refer to ammunition
+        """
+        for item_id in item_ids:
+            item = items[item_id]
+            if isinstance(item, RangedWeapon):
+                ammo = items.get(item.ammo_type)
+                if not isinstance(ammo, Ammo):
+                    raise DataCatalog.DataCatalogError("incorrect ammo type: {} for item: {}"
+                                                       .format(item.ammo_type, item.item_id))
+                item.ammo_prototype = ammo
+
+    @staticmethod
+    def _link_item(items, item_id, item_type, critter_id):
+        """Resolves reference to item prototype of specified type.
+
+        :param items: dictionary of item IDs and prototypes
+        :param item_id: ID of the referenced item
+        :param item_type: class the referenced item must be instance of
+        :param critter_id: ID of the critter referencing the item
+        :raises DataCatalogError: when referenced item doesn't exist or is of incorrect type
+        :return: Item derived object
+        """
+        item = items.get(item_id)
+        if not isinstance(item, item_type):
+            raise DataCatalog.DataCatalogError("incorrect item: {} for critter: {}".format(item_id, critter_id))
+        return item
+
+    @staticmethod
+    def _link_perk(perks, perk_id, critter_id):
+        """Resolves reference to perk prototype.
+
+        :param perks: dictionary of perk IDs and prototypes
+        :param perk_id: ID of the referenced perk
+        :param critter_id: ID of the critter referencing the perk
+        :raises DataCatalogError: when referenced perk doesn't exist
+        :return: Perk derived object
+        """
+        try:
+            return perks[perk_id]
+        except KeyError:
+            raise DataCatalog.DataCatalogError("incorrect perk: {} for critter: {}".format(perk_id, critter_id))
@@ -0,0 +1,242 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from app.files.file_handler import FileHandler
+
+
+DataError = namedtuple("DataError", ["data_file", "line_number", "record_id", "message"])
+
+
+_item_parameters = {
+    "armor": (("damage_resistance", int), ("radiation_resistance", int), ("evasion", int), ("value", int),
+              ("weight", float)),
+    "melee": (("damage", str), ("effect", str), ("effect_chance", str), ("armor_penetration", int),
+              ("accuracy", int), ("action_points_cost", int), ("strength_requirement", int), ("value", int),
+              ("weight", float)),
+    "ranged": (("damage", str), ("ammo_type", str), ("clip_size", int), ("armor_penetration", int),
+               ("accuracy", int), ("action_points_cost", int), ("strength_requirement", int), ("value", int),
+               ("weight", float)),
+    "ammo": (("max_stack", int), ("value", int), ("weight", float)),
+    "consumable": (("effect", str), ("max_stack", int), ("value", int), ("weight", float))
+}
+
+_perk_parameters = {
+    "perk": (("effects", str), ("requirements", str)),
+    "trait": (("effects", str), ("conflicts", str)),
+    "status effect": (("effects", str), ("duration", int))
+}
+
+_critter_parameters = (("level", int), ("strength", int), ("endurance", int), ("agility", int), ("perception", int),
+                       ("intelligence", int), ("health_bonus", int), ("exp_award", int), ("armor", str),
+                       ("weapon", str), ("perks", str))
+
+
+class DataValidator:
+    """This class validates all records (items, perks, critters) in data files at once, instead of finding errors only
+    when specific records are created by factories.
+
+    Every data file is parsed in a separate process. Every malformed record (unknown type, missing or misplaced
+    parameters, parameter values of incorrect type, duplicated IDs) is reported with number of the line containing the
+    error. After all files are parsed, references between records are checked: critters' armor, weapons and perks,
+    ranged weapons' ammo types and traits' conflicts.
+
+    Records are expected in the same format and parameter order as required by ItemFactory, PerkFactory and
+    CritterFactory. Errors are reported as DataError named tuples of data file name, line number, record ID and error
+    message.
+    """
+
+    def __init__(self, item_data_file="items.txt", perk_data_file="perks.txt", critter_data_file="critters.txt"):
+        """Initializes instance of the class with names of data files to validate.
+
+        :param item_data_file: name of the file containing item data (defaults to items.txt)
+        :param perk_data_file: name of the file containing perk data (defaults to perks.txt)
+        :param critter_data_file: name of the file containing critter data (defaults to critters.txt)
+        """
+        self._item_data_file = item_data_file
+        self._perk_data_file = perk_data_file
+        self._critter_data_file = critter_data_file
+
+    def validate(self, parallel=True, max_workers=None):
+        """Validates all records in data files and references between them.
+
+        :param parallel: whether to parse data files in separate processes (defaults to True)
+        :param max_workers: maximum number of processes (defaults to None, which means number of processors)
+        :return: list of DataError named tuples, ordered by data file and line number (empty list if data is valid)
+        """
+        jobs = [("item", self._item_data_file), ("perk", self._perk_data_file),
+                ("critter", self._critter_data_file)]
+        if parallel:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(validate_data_file, *zip(*jobs)))
+        else:
+            results = [validate_data_file(data_type, data_file) for data_type, data_file in jobs]
+        errors = list()
+        for file_errors, _ in results:
+            errors.extend(file_errors)
+        item_records, perk_records, critter_records = [records for _, records in results]
+        errors.extend(self._check_item_references(item_records=item_records))
+        errors.extend(self._check_perk_references(perk_records=perk_records))
+        errors.extend(self._check_critter_references(critter_records=critter_records, item_records=item_records,
+                                                     perk_records=perk_records))
+        errors.sort(key=lambda error: (error.data_file, error.line_number))
+        return errors
+
+    def _check_item_references(self, item_records):
+        """Checks whether ranged weapons' ammo types refer to existing ammo.
+
+        :param item_records: dictionary of item IDs and parsed item records
+        :return: list of DataError named tuples
+        """
+        errors = list()
+        for item_id, (item_type, _, parameters) in item_records.items():
+            if item_type == "ranged" and "ammo_type" in parameters:
+                ammo_type, line_number = parameters["ammo_type"]
+                if item_records.get(ammo_type, (None,))[0] != "ammo":
+                    errors.append(DataError(self._item_data_file, line_number, item_id,
+                                            "incorrect ammo type: {}".format(ammo_type)))
+        return errors
+
+    def _check_perk_references(self, perk_records):
+        """Checks whether traits' conflicts refer to existing traits.
+
+        :param perk_records: dictionary of perk IDs and parsed perk records
+        :return: list of DataError named tuples
+        """
+        errors = list()
+        for perk_id, (perk_type, _, parameters) in perk_records.items():
+            if perk_type == "trait" and "conflicts" in parameters:
+                conflicts, line_number = parameters["conflicts"]
+                for conflict in DataValidator._split_references(conflicts):
+                    if perk_records.get(conflict, (None,))[0] != "trait":
+                        errors.append(DataError(self._perk_data_file, line_number, perk_id,
+                                                "incorrect conflicting trait: {}".format(conflict)))
+        return errors
+
+    def _check_critter_references(self, critter_records, item_records, perk_records):
+        """Checks whether critters' armor, weapons and perks refer to existing items and perks of correct types.
+
+        :param critter_records: dictionary of critter IDs and parsed critter records
+        :param item_records: dictionary of item IDs and parsed item records
+        :param perk_records: dictionary of perk IDs and parsed perk records
+        :return: list of DataError named tuples
+        """
+        errors = list()
+        for critter_id, (_, _, parameters) in critter_records.items():
+            if "armor" in parameters:
+                armor_id, line_number = parameters["armor"]
+                if item_records.get(armor_id, (None,))[0] != "armor":
+                    errors.append(DataError(self._critter_data_file, line_number, critter_id,
+                                            "incorrect armor: {}".format(armor_id)))
+            if "weapon" in parameters:
+                weapon_id, line_number = parameters["weapon"]
+                if item_records.get(weapon_id, (None,))[0] not in ("melee", "ranged"):
+                    errors.append(DataError(self._critter_data_file, line_number, critter_id,
+                                            "incorrect weapon: {}".format(weapon_id)))
+            if "perks" in parameters:
+                perks, line_number = parameters["perks"]
+                for perk_id in DataValidator._split_references(perks):
+                    if perk_records.get(perk_id, (None,))[0] is None:
+                        errors.append(DataError(self._critter_data_file, line_number, critter_id,
+                                                "incorrect perk: {}".format(perk_id)))
+        return errors
+
+    @staticmethod
+    def _split_references(references):
+        """Splits comma separated references to other records, where "none" means no references.
+
+        :param references: comma separated string of record IDs
+        :return: list of record IDs
+        """
+        if references == "none":
+            return list()
+        return [reference for reference in references.split(", ") if reference != ""]
+
+
+def validate_data_file(data_type, data_file):
+    """Parses and validates all records in specified data file. The function is run in separate processes by
+    DataValidator.
+
+    :param data_type: type of records in the file ("item", "perk" or "critter")
+    :param data_file: name of the file to validate
+    :return: tuple of list of DataError named tuples and dictionary of record IDs and tuples of record type, number of
+             the line containing record ID and dictionary of parameter names and tuples of values and line numbers
+    """
+    try:
+        data = FileHandler.get_file_contents_as_list(data_file)
+    except FileNotFoundError:
+        return [DataError(data_file, 0, None, "{} data is unavailable".format(data_type))], dict()
+    errors = list()
+    records = dict()
+    for idx, line in enumerate(data):
+        if not line.startswith("id:"):
+            continue
+        record_id = line.split()[-1]
+        if record_id in records:
+            errors.append(DataError(data_file, idx + 1, record_id, "duplicated {} ID".format(data_type)))
+            continue
+        record_errors, record = _parse_record(data_type=data_type, data=data, idx=idx)
+        errors.extend(DataError(data_file, line_number, record_id, message) for line_number, message in record_errors)
+        records[record_id] = record
+    return errors, records
+
+
+def _parse_record(data_type, data, idx):
+    """Parses record starting in specified line, checking its type, parameter names and parameter values.
+
+    :param data_type: type of the record ("item", "perk" or "critter")
+    :param data: list of lines of the data file
+    :param idx: index of the line containing record ID
+    :return: tuple of list of tuples of line numbers and error messages and parsed record
+    """
+    tags = " ".join(data[idx + 1].split()[1:]) if idx + 1 < len(data) else ""
+    record_type, type_parameters = _get_record_type(data_type=data_type, tags=tags)
+    parameters = dict()
+    if record_type is None:
+        return [(idx + 2, "incorrect {} type".format(data_type))], (None, idx + 1, parameters)
+    if data_type == "critter":
+        common_parameters = (("tags", str), ("name", str))
+    else:
+        common_parameters = (("tags", str), ("name", str), ("description", str))
+    errors = list()
+    for offset, (parameter_name, parameter_type) in enumerate(common_parameters + type_parameters, start=1):
+        line_idx = idx + offset
+        if line_idx >= len(data) or data[line_idx].strip() == "":
+            errors.append((line_idx + 1, "missing parameter: {}".format(parameter_name)))
+            break
+        if (parameter_name + ":") not in data[line_idx]:
+            errors.append((line_idx + 1, "incorrect parameter name, expected: {}".format(parameter_name)))
+            break
+        value = " ".join(data[line_idx].split()[1:])
+        try:
+            parameter_type(value)
+        except ValueError:
+            errors.append((line_idx + 1, "incorrect value for parameter: {}".format(parameter_name)))
+        parameters[parameter_name] = (value, line_idx + 1)
+    return errors, (record_type, idx + 1, parameters)
+
+
+def _get_record_type(data_type, tags):
+    """Determines record type based on its tags, the same way as factories do.
+
+    :param data_type: type of the record ("item", "perk" or "critter")
+    :param tags: record's tags
+    :return: tuple of record type and its specific parameters, or tuple of None values when type is incorrect
+    """
+    if data_type == "item":
+        if "armor" in tags:
+            return "armor", _item_parameters["armor"]
+        elif "melee" in tags:
+            return "melee", _item_parameters["melee"]
+        elif "gun" in tags or "energy" in tags:
+            return "ranged", _item_parameters["ranged"]
+        elif "ammo" in tags:
+            return "ammo", _item_parameters["ammo"]
+        elif "consumable" in tags:
+            return "consumable", _item_parameters["consumable"]
+    elif data_type == "perk":
+        for perk_type in ("perk", "trait", "status effect"):
+            if perk_type in tags:
+                return perk_type, _perk_parameters[perk_type]
+    elif data_type == "critter":
+        return "critter", _critter_parameters
+    return None, None
@@ -0,0 +1,84 @@
+import os
+
+from app.files.file_handler import FileHandler
+
+
+class DataFileWatcher:
+    """This class watches data file for modifications, by polling its modification time, and finds records (blocks of
+    lines starting with line containing record's ID) which were added, changed or removed since the file was last read.
+
+    Watching doesn't require any external services, so data files can be edited while the game is running, and only
+    changed records have to be parsed again.
+    """
+
+    def __init__(self, data_file, data):
+        """Initializes instance of the class for specified data file, with its already obtained data. Records are split
+        only when the file is modified for the first time.
+
+        :param data_file: name of the file to watch
+        :param data: list of lines already obtained from the file
+        """
+        self._data_file = data_file
+        self._mtime = self._get_mtime()
+        self._data = data
+        self._records = None
+
+    @property
+    def data_file(self):
+        """Gets name of the watched file.
+
+        :return: name of the file
+        """
+        return self._data_file
+
+    def poll(self):
+        """Checks whether watched file was modified since it was last read and, if so, obtains its data again.
+
+        :raises FileNotFoundError: when watched file is no longer available
+        :return: tuple of list of lines obtained from the file and set of IDs of added, changed or removed records, or
+                 None when the file wasn't modified
+        """
+        mtime = self._get_mtime()
+        if mtime == self._mtime:
+            return None
+        if self._records is None:
+            self._records = DataFileWatcher._split_records(self._data)
+        data = FileHandler.get_file_contents_as_list(self._data_file)
+        records = DataFileWatcher._split_records(data)
+        changed_ids = {record_id for record_id in records.keys() | self._records.keys()
+                       if records.get(record_id) != self._records.get(record_id)}
+        self._mtime = mtime
+        self._data = data
+        self._records = records
+        return data, changed_ids
+
+    def _get_mtime(self):
+        """Gets modification time of watched file.
+
+        :raises FileNotFoundError: when watched file is not available
+        :return: modification time in nanoseconds
+        """
+        return os.stat(self._data_file).st_mtime_ns
+
+    @staticmethod
+    def _split_records(data):
+        """Splits data into records. Record consists of line containing record's ID and all following lines up to the
+        first empty line, comment or line containing another ID. When ID is repeated, its first occurrence is used.
+
+        :param data: list of lines of the data file
+        :return: dictionary of record IDs and tuples of record's lines
+        """
+        records = dict()
+        record_id = None
+        record_lines = list()
+        for line in data + [""]:
+            if line.startswith("id:") or line.strip() == "" or line.lstrip().startswith("#"):
+                if record_id is not None:
+                    records.setdefault(record_id, tuple(record_lines))
+                record_id = None
+                if line.startswith("id:"):
+                    record_id = line.split()[-1]
+                    record_lines = [line]
+            elif record_id is not None:
+                record_lines.append(line)
+        return records
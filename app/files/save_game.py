@@ -0,0 +1,403 @@
+import struct
+
+from app.characters.characters import Human, Player, Critter
+from app.files.data_catalog import DataCatalog
+from app.items.stackables import Stackable
+from app.items.weapons import RangedWeapon
+from app.perks.perks import StatusEffect
+
+
+class SaveGameError(Exception):
+    """This exception class exist to unify all errors and exceptions occurring during saving and loading game state."""
+    pass
+
+
+_SAVE_MAGIC = b"PASAVE"
+_SAVE_VERSION = 1
+
+_END_RECORD = 0
+_CHARACTER_RECORD = 1
+
+_character_kinds = {Human: 0, Player: 1, Critter: 2}
+
+_ARMOR_EQUIPPED = 1
+_WEAPON_EQUIPPED = 2
+
+_AMOUNT_DELTA = 1
+_AMMO_DELTA = 2
+_DURATION_DELTA = 1
+
+_header_struct = struct.Struct("<6sH")
+_byte_struct = struct.Struct("<B")
+_string_ref_struct = struct.Struct("<I")
+_string_length_struct = struct.Struct("<H")
+_count_struct = struct.Struct("<I")
+_delta_struct = struct.Struct("<i")
+_character_struct = struct.Struct("<6h2i")
+_human_skills_struct = struct.Struct("<8h")
+_player_struct = struct.Struct("<i")
+_critter_struct = struct.Struct("<2i")
+
+
+class SaveGameWriter:
+    """This class writes characters, with their inventories and perk inventories, to binary stream in compact save
+    format.
+
+    Items and perks are not stored as a whole, but as references to their definitions in data catalog, followed only by
+    parameters which differ from their prototypes (current amount of stackables, current ammo of ranged weapons,
+    remaining duration of status effects). All strings (IDs, names, tags) are interned: each string is written once, the
+    first time it's used, and later referenced by its index. Characters are written one by one as they're provided, so
+    any number of characters can be saved without building whole save in memory.
+
+    The class uses SaveGameError exception, which is raised when saving incorrect characters or items and perks missing
+    from data catalog.
+    """
+
+    def __init__(self, stream, catalog):
+        """Initializes instance of the class, writing save header to specified stream.
+
+        :param stream: binary stream (file object opened for writing in binary mode) to write to
+        :param catalog: DataCatalog object containing definitions of saved items and perks
+        """
+        self._stream = stream
+        self._catalog = catalog
+        self._strings = dict()
+        self._stream.write(_header_struct.pack(_SAVE_MAGIC, _SAVE_VERSION))
+
+    def write_character(self, character):
+        """Writes specified character, with its inventory and perk inventory, to the stream. When the character can't be
+        written, strings interned for it are discarded, so that later characters don't reference unwritten strings.
+
+        :param character: Human, Player or Critter object to write
+        :raises SaveGameError: when specified character is incorrect or its items or perks are missing from data catalog
+        """
+        strings_count = len(self._strings)
+        try:
+            self._stream.write(self._pack_character(character))
+        except Exception:
+            for string in list(self._strings)[strings_count:]:
+                del self._strings[string]
+            raise
+
+    def _pack_character(self, character):
+        """Packs specified character, with its inventory and perk inventory, interning its strings.
+
+        :param character: Human, Player or Critter object to pack
+        :raises SaveGameError: when specified character is incorrect or its items or perks are missing from data catalog
+        :return: bytearray of character's record
+        """
+        kind = _character_kinds.get(type(character))
+        if kind is None:
+            raise SaveGameError("incorrect object type for character")
+        data = bytearray(_byte_struct.pack(_CHARACTER_RECORD))
+        data += _byte_struct.pack(kind)
+        self._pack_string(data, character.name)
+        self._pack_string(data, character.tags)
+        data += _character_struct.pack(character.level, character.strength, character.endurance, character.agility,
+                                       character.perception, character.intelligence, character.health,
+                                       character.action_points)
+        if isinstance(character, Human):
+            data += _human_skills_struct.pack(character.guns, character.energy, character.melee, character.sneak,
+                                              character.security, character.mechanics, character.survival,
+                                              character.medicine)
+        if isinstance(character, Player):
+            data += _player_struct.pack(character.experience)
+        elif isinstance(character, Critter):
+            data += _critter_struct.pack(character.health_bonus, character.experience_award)
+        self._pack_inventory(data, character.inventory)
+        self._pack_perks(data, character.perks)
+        return data
+
+    def write_characters(self, characters):
+        """Writes all specified characters to the stream.
+
+        :param characters: iterable of Human, Player or Critter objects to write
+        :raises SaveGameError: when any character is incorrect or its items or perks are missing from data catalog
+        """
+        for character in characters:
+            self.write_character(character=character)
+
+    def finish(self):
+        """Writes end of save marker to the stream. No characters can be written afterwards."""
+        self._stream.write(_byte_struct.pack(_END_RECORD))
+
+    def _pack_string(self, data, string):
+        """Appends reference to interned string to data, along with the string itself when it's used the first time.
+
+        :param data: bytearray to append to
+        :param string: string to append
+        """
+        idx = self._strings.get(string)
+        if idx is not None:
+            data += _string_ref_struct.pack(idx)
+            return
+        idx = len(self._strings)
+        self._strings[string] = idx
+        encoded_string = string.encode("utf-8")
+        data += _string_ref_struct.pack(idx)
+        data += _string_length_struct.pack(len(encoded_string))
+        data += encoded_string
+
+    def _pack_inventory(self, data, inv):
+        """Appends equipped and carried items of specified inventory to data.
+
+        :param data: bytearray to append to
+        :param inv: Inventory object to append
+        :raises SaveGameError: when any item is missing from data catalog
+        """
+        equipped = 0
+        if inv.equipped_armor is not None:
+            equipped |= _ARMOR_EQUIPPED
+        if inv.equipped_weapon is not None:
+            equipped |= _WEAPON_EQUIPPED
+        data += _byte_struct.pack(equipped)
+        for item in (inv.equipped_armor, inv.equipped_weapon):
+            if item is not None:
+                self._pack_item(data, item)
+        data += _count_struct.pack(len(inv.items))
+        for item in inv.items:
+            self._pack_item(data, item)
+
+    def _pack_item(self, data, item):
+        """Appends reference to item definition, followed by item's parameters differing from its prototype, to data.
+
+        :param data: bytearray to append to
+        :param item: Item derived object to append
+        :raises SaveGameError: when item is missing from data catalog
+        """
+        try:
+            prototype = self._catalog.get_item_prototype(item_id=item.item_id)
+        except DataCatalog.DataCatalogError:
+            raise SaveGameError("can't save item missing from data catalog: {}".format(item.item_id))
+        self._pack_string(data, item.item_id)
+        if isinstance(item, Stackable) and item.current_amount != prototype.current_amount:
+            data += _byte_struct.pack(_AMOUNT_DELTA)
+            data += _delta_struct.pack(item.current_amount)
+        elif isinstance(item, RangedWeapon) and item.current_ammo != prototype.current_ammo:
+            data += _byte_struct.pack(_AMMO_DELTA)
+            data += _delta_struct.pack(item.current_ammo)
+        else:
+            data += _byte_struct.pack(0)
+
+    def _pack_perks(self, data, perk_inv):
+        """Appends active perks of specified perk inventory, with remaining duration of status effects differing from
+        their prototypes, to data.
+
+        :param data: bytearray to append to
+        :param perk_inv: PerkInventory object to append
+        :raises SaveGameError: when any perk is missing from data catalog
+        """
+        data += _count_struct.pack(len(perk_inv.perks))
+        for perk in perk_inv.perks:
+            try:
+                prototype = self._catalog.get_perk_prototype(perk_id=perk.perk_id)
+            except DataCatalog.DataCatalogError:
+                raise SaveGameError("can't save perk missing from data catalog: {}".format(perk.perk_id))
+            self._pack_string(data, perk.perk_id)
+            if isinstance(perk, StatusEffect) and perk.duration != prototype.duration:
+                data += _byte_struct.pack(_DURATION_DELTA)
+                data += _delta_struct.pack(perk.duration)
+            else:
+                data += _byte_struct.pack(0)
+
+
+class SaveGameReader:
+    """This class reads characters, with their inventories and perk inventories, from binary stream in save format
+    written by SaveGameWriter.
+
+    Items and perks are created by copying prototypes from data catalog, so data files are not parsed again, and then
+    parameters stored in the save are applied. Characters are read one by one, when iterating over the reader, so any
+    number of characters can be loaded without reading whole save into memory.
+
+    The class uses SaveGameError exception, which is raised when save is corrupted or refers to items or perks missing
+    from data catalog.
+    """
+
+    def __init__(self, stream, catalog):
+        """Initializes instance of the class, reading and checking save header from specified stream.
+
+        :param stream: binary stream (file object opened for reading in binary mode) to read from
+        :param catalog: DataCatalog object containing definitions of loaded items and perks
+        :raises SaveGameError: when stream doesn't contain save in supported format
+        """
+        self._stream = stream
+        self._catalog = catalog
+        self._strings = list()
+        magic, version = self._read(_header_struct)
+        if magic != _SAVE_MAGIC:
+            raise SaveGameError("incorrect save data")
+        if version != _SAVE_VERSION:
+            raise SaveGameError("unsupported save version: {}".format(version))
+
+    def __iter__(self):
+        return self.read_characters()
+
+    def read_characters(self):
+        """Reads characters from the stream, up to end of save marker.
+
+        :raises SaveGameError: when save is corrupted or refers to items or perks missing from data catalog
+        :return: generator of Human, Player or Critter objects
+        """
+        while True:
+            character = self.read_character()
+            if character is None:
+                return
+            yield character
+
+    def read_character(self):
+        """Reads next character from the stream.
+
+        :raises SaveGameError: when save is corrupted or refers to items or perks missing from data catalog
+        :return: Human, Player or Critter object, or None when end of save marker is reached
+        """
+        record_type = self._read(_byte_struct)[0]
+        if record_type == _END_RECORD:
+            return None
+        if record_type != _CHARACTER_RECORD:
+            raise SaveGameError("incorrect save record type: {}".format(record_type))
+        return self._read_character()
+
+    def _read(self, struct_to_read):
+        """Reads and unpacks data of specified structure from the stream.
+
+        :param struct_to_read: struct.Struct object describing data to read
+        :raises SaveGameError: when the stream ends before all data is read
+        :return: tuple of unpacked values
+        """
+        data = self._stream.read(struct_to_read.size)
+        if len(data) != struct_to_read.size:
+            raise SaveGameError("save data is truncated")
+        return struct_to_read.unpack(data)
+
+    def _read_string(self):
+        """Reads reference to interned string, along with the string itself when it's used the first time.
+
+        :raises SaveGameError: when string reference is incorrect or the stream ends
+        :return: referenced string
+        """
+        idx = self._read(_string_ref_struct)[0]
+        if idx < len(self._strings):
+            return self._strings[idx]
+        if idx != len(self._strings):
+            raise SaveGameError("incorrect string reference: {}".format(idx))
+        length = self._read(_string_length_struct)[0]
+        data = self._stream.read(length)
+        if len(data) != length:
+            raise SaveGameError("save data is truncated")
+        string = data.decode("utf-8")
+        self._strings.append(string)
+        return string
+
+    def _read_character(self):
+        """Reads character, with its inventory and perk inventory.
+
+        :raises SaveGameError: when save is corrupted or refers to items or perks missing from data catalog
+        :return: Human, Player or Critter object
+        """
+        kind = self._read(_byte_struct)[0]
+        name = self._read_string()
+        tags = self._read_string()
+        level, strength, endurance, agility, perception, intelligence, health, action_points = \
+            self._read(_character_struct)
+        attributes = (name, tags, level, strength, endurance, agility, perception, intelligence)
+        if kind == _character_kinds[Human] or kind == _character_kinds[Player]:
+            skills = self._read(_human_skills_struct)
+            if kind == _character_kinds[Player]:
+                character = Player(*attributes, experience=self._read(_player_struct)[0])
+            else:
+                character = Human(*attributes)
+            character.guns, character.energy, character.melee, character.sneak, character.security, \
+                character.mechanics, character.survival, character.medicine = skills
+        elif kind == _character_kinds[Critter]:
+            health_bonus, exp_award = self._read(_critter_struct)
+            character = Critter(*attributes, health_bonus=health_bonus, exp_award=exp_award)
+        else:
+            raise SaveGameError("incorrect character type: {}".format(kind))
+        character.health = health
+        character.action_points = action_points
+        self._read_inventory(character.inventory)
+        self._read_perks(character.perks)
+        return character
+
+    def _read_inventory(self, inv):
+        """Reads equipped and carried items into specified inventory.
+
+        :param inv: Inventory object to read items into
+        :raises SaveGameError: when save is corrupted or refers to items missing from data catalog
+        """
+        equipped = self._read(_byte_struct)[0]
+        if equipped & _ARMOR_EQUIPPED:
+            inv.equipped_armor = self._read_item()
+        if equipped & _WEAPON_EQUIPPED:
+            inv.equipped_weapon = self._read_item()
+        for _ in range(self._read(_count_struct)[0]):
+            inv.items.append(self._read_item())
+
+    def _read_item(self):
+        """Reads item, creating it from its prototype and applying parameters stored in the save.
+
+        :raises SaveGameError: when save is corrupted or refers to item missing from data catalog
+        :return: Item derived object
+        """
+        item_id = self._read_string()
+        try:
+            item = self._catalog.create_item(item_id=item_id)
+        except DataCatalog.DataCatalogError:
+            raise SaveGameError("can't load item missing from data catalog: {}".format(item_id))
+        delta = self._read(_byte_struct)[0]
+        if delta == _AMOUNT_DELTA and isinstance(item, Stackable):
+            item.current_amount = self._read(_delta_struct)[0]
+        elif delta == _AMMO_DELTA and isinstance(item, RangedWeapon):
+            item.current_ammo = self._read(_delta_struct)[0]
+        elif delta != 0:
+            raise SaveGameError("incorrect saved parameters for item: {}".format(item_id))
+        return item
+
+    def _read_perks(self, perk_inv):
+        """Reads active perks into specified perk inventory, applying remaining duration of status effects.
+
+        :param perk_inv: PerkInventory object to read perks into
+        :raises SaveGameError: when save is corrupted or refers to perks missing from data catalog
+        """
+        for _ in range(self._read(_count_struct)[0]):
+            perk_id = self._read_string()
+            try:
+                perk = self._catalog.create_perk(perk_id=perk_id)
+            except DataCatalog.DataCatalogError:
+                raise SaveGameError("can't load perk missing from data catalog: {}".format(perk_id))
+            delta = self._read(_byte_struct)[0]
+            if delta == _DURATION_DELTA and isinstance(perk, StatusEffect):
+                perk.duration = self._read(_delta_struct)[0]
+            elif delta != 0:
+                raise SaveGameError("incorrect saved parameters for perk: {}".format(perk_id))
+            perk_inv.perks.append(perk)
+
+
+def save_characters(save_file, characters, catalog):
+    """Saves all specified characters to specified file.
+
+    :param save_file: name of the file to save to
+    :param characters: iterable of Human, Player or Critter objects to save
+    :param catalog: DataCatalog object containing definitions of saved items and perks
+    :raises SaveGameError: when any character is incorrect or its items or perks are missing from data catalog
+    """
+    with open(save_file, "wb") as file:
+        writer = SaveGameWriter(stream=file, catalog=catalog)
+        writer.write_characters(characters=characters)
+        writer.finish()
+
+
+def load_characters(save_file, catalog):
+    """Loads all characters saved in specified file.
+
+    :param save_file: name of the file to load from
+    :param catalog: DataCatalog object containing definitions of loaded items and perks
+    :raises SaveGameError: when save file is unavailable, corrupted or refers to items or perks missing from data
+                           catalog
+    :return: list of Human, Player or Critter objects
+    """
+    try:
+        with open(save_file, "rb") as file:
+            return list(SaveGameReader(stream=file, catalog=catalog))
+    except FileNotFoundError:
+        raise SaveGameError("save data is unavailable")
@@ -0,0 +1,321 @@
+import io
+import os
+import struct
+
+from app.characters.characters import Character
+from app.files.save_game import SaveGameError, SaveGameReader, SaveGameWriter
+from app.mechanics.perk_inventory import PerkInventoryExpiredStatusEffectRemover
+from app.mechanics.world_clock import WorldClock
+
+
+_END_ENTRY = 0
+_PUT_ENTRY = 1
+_REMOVE_ENTRY = 2
+_TURN_ENTRY = 3
+
+_segment_length_struct = struct.Struct("<I")
+_entry_struct = struct.Struct("<BI")
+
+
+class WorldJournal:
+    """This class represents append-only journal of world state, which saves only characters changed since the last
+    save, instead of rewriting the whole world.
+
+    Registered characters are observed through hooks of characters (current health, action points and skills changes),
+    their inventories and perk inventories (called by inventory and perk inventory operators). Every change marks the
+    character as changed, and flushing the journal appends one segment, containing only changed and removed characters
+    (in save format written by SaveGameWriter), to the journal file. Segments are length prefixed, so a segment torn by
+    interrupted write is discarded on replay. Compacting the journal rewrites it as a single segment (snapshot)
+    containing all registered characters.
+
+    Every segment starts with turn of the world clock the journal is bound to. Advancing the clock only changes its
+    turn, so characters whose status effects were lowered (but didn't expire) are not saved again. Instead, when
+    replaying, durations of status effects of every character are lowered by number of turns which passed since the
+    character was saved.
+
+    When journal file already exists, it's replayed on instantiation, so registered characters are restored to their
+    state from the last flush, and the world clock is advanced to the last flushed turn.
+
+    The class provides WorldJournalError exception, which is raised when registering incorrect characters or when
+    journal can't be saved or replayed.
+    """
+
+    class WorldJournalError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during world journal manipulation.
+        """
+        pass
+
+    def __init__(self, journal_file, catalog, compact_after=None, clock=None):
+        """Initializes instance of the class, replaying specified journal file when it exists. Torn segment at the end
+        of the journal file is truncated, so that segments appended later are replayed.
+
+        :param journal_file: name of the journal file
+        :param catalog: DataCatalog object containing definitions of saved items and perks
+        :param compact_after: number of entries appended after which journal is compacted when flushed (defaults to
+                              None, which means journal is compacted only on request)
+        :param clock: WorldClock object which registered characters are registered to (defaults to None, which means
+                      turn doesn't change)
+        :raises WorldJournalError: when specified world clock is incorrect or ahead of the journal, or existing journal
+                                   file can't be replayed
+        """
+        if clock is not None and not isinstance(clock, WorldClock):
+            raise WorldJournal.WorldJournalError("incorrect object type for world clock")
+        self._journal_file = journal_file
+        self._catalog = catalog
+        self._compact_after = compact_after
+        self._clock = clock
+        self._flushed_turn = 0
+        self._characters = dict()
+        self._keys = dict()
+        self._changed_keys = set()
+        self._removed_keys = set()
+        self._appended_entries = 0
+        self._next_key = 0
+        if os.path.exists(journal_file):
+            characters, turn, length = self._replay()
+            if clock is not None:
+                if clock.turn > turn:
+                    raise WorldJournal.WorldJournalError("world clock is ahead of journal: {}".format(clock.turn))
+                clock.advance(turns=turn - clock.turn)
+            if length < os.path.getsize(journal_file):
+                os.truncate(journal_file, length)
+            for key, character in characters.items():
+                self._register_character(key=key, character=character)
+            self._next_key = max(self._characters.keys(), default=-1) + 1
+            self._flushed_turn = turn
+
+    def __len__(self):
+        return len(self._characters)
+
+    @property
+    def characters(self):
+        """Gets dictionary of registered characters.
+
+        :return: dictionary of keys and Character derived objects
+        """
+        return dict(self._characters)
+
+    @property
+    def turn(self):
+        """Gets current turn of the world clock the journal is bound to.
+
+        :return: current turn
+        """
+        return self._clock.turn if self._clock is not None else self._flushed_turn
+
+    @property
+    def pending_changes(self):
+        """Gets number of changed and removed characters which weren't flushed yet, including the turn when it changed.
+
+        :return: number of pending changes
+        """
+        turn_changes = 1 if self.turn != self._flushed_turn else 0
+        return len(self._changed_keys) + len(self._removed_keys) + turn_changes
+
+    def get_key(self, character):
+        """Gets key identifying specified registered character in the journal.
+
+        :param character: Character derived object
+        :raises WorldJournalError: when specified character is not registered
+        :return: character's key
+        """
+        key = self._keys.get(id(character))
+        if key is None or self._characters[key] is not character:
+            raise WorldJournal.WorldJournalError("character is not registered")
+        return key
+
+    def add_character(self, character):
+        """Registers specified character, so that it's saved on the next flush and whenever it changes.
+
+        :param character: Character derived object to register
+        :raises WorldJournalError: when specified character is incorrect or already registered
+        :return: key identifying the character in the journal
+        """
+        if not isinstance(character, Character):
+            raise WorldJournal.WorldJournalError("incorrect object type for character")
+        if id(character) in self._keys:
+            raise WorldJournal.WorldJournalError("character: {} is already registered".format(character.name))
+        key = self._next_key
+        self._next_key += 1
+        self._register_character(key=key, character=character)
+        self._changed_keys.add(key)
+        return key
+
+    def remove_character(self, character):
+        """Unregisters specified character, so that it's removed from the journal on the next flush.
+
+        :param character: Character derived object to unregister
+        :raises WorldJournalError: when specified character is not registered
+        """
+        key = self.get_key(character=character)
+        character.remove_hook(self._object_changed)
+        character.inventory.remove_hook(self._object_changed)
+        character.perks.remove_hook(self._object_changed)
+        for obj in (character, character.inventory, character.perks):
+            del self._keys[id(obj)]
+        del self._characters[key]
+        self._changed_keys.discard(key)
+        self._removed_keys.add(key)
+
+    def mark_changed(self, character):
+        """Marks specified character as changed, for changes not made by operators nor observed by hooks.
+
+        :param character: registered Character derived object
+        :raises WorldJournalError: when specified character is not registered
+        """
+        self._changed_keys.add(self.get_key(character=character))
+
+    def flush(self):
+        """Appends segment containing all changed and removed characters to the journal file, compacting the journal
+        when number of appended entries reaches the limit.
+
+        :raises WorldJournalError: when any changed character can't be saved
+        :return: number of appended entries
+        """
+        if self.pending_changes == 0:
+            return 0
+        turn = self.turn
+        stream = io.BytesIO()
+        writer = SaveGameWriter(stream=stream, catalog=self._catalog)
+        stream.write(_entry_struct.pack(_TURN_ENTRY, turn))
+        for key in sorted(self._removed_keys):
+            stream.write(_entry_struct.pack(_REMOVE_ENTRY, key))
+        for key in sorted(self._changed_keys):
+            stream.write(_entry_struct.pack(_PUT_ENTRY, key))
+            self._write_character(writer=writer, character=self._characters[key])
+        stream.write(_entry_struct.pack(_END_ENTRY, 0))
+        with open(self._journal_file, "ab") as file:
+            WorldJournal._write_segment(file=file, segment=stream.getvalue())
+        entries = self.pending_changes
+        self._changed_keys.clear()
+        self._removed_keys.clear()
+        self._flushed_turn = turn
+        self._appended_entries += entries
+        if self._compact_after is not None and self._appended_entries >= self._compact_after:
+            self.compact()
+        return entries
+
+    def compact(self):
+        """Rewrites the journal file as a single segment (snapshot) containing all registered characters, discarding
+        pending changes as they're included in the snapshot.
+
+        :raises WorldJournalError: when any character can't be saved
+        """
+        turn = self.turn
+        stream = io.BytesIO()
+        writer = SaveGameWriter(stream=stream, catalog=self._catalog)
+        stream.write(_entry_struct.pack(_TURN_ENTRY, turn))
+        for key, character in sorted(self._characters.items()):
+            stream.write(_entry_struct.pack(_PUT_ENTRY, key))
+            self._write_character(writer=writer, character=character)
+        stream.write(_entry_struct.pack(_END_ENTRY, 0))
+        temporary_file = self._journal_file + ".tmp"
+        with open(temporary_file, "wb") as file:
+            WorldJournal._write_segment(file=file, segment=stream.getvalue())
+        os.replace(temporary_file, self._journal_file)
+        self._changed_keys.clear()
+        self._removed_keys.clear()
+        self._flushed_turn = turn
+        self._appended_entries = 0
+
+    def _register_character(self, key, character):
+        """Registers specified character under specified key, adding hooks to the character, its inventory and perk
+        inventory.
+
+        :param key: key identifying the character
+        :param character: Character derived object to register
+        """
+        self._characters[key] = character
+        for obj in (character, character.inventory, character.perks):
+            self._keys[id(obj)] = key
+            obj.add_hook(self._object_changed)
+
+    def _object_changed(self, obj):
+        """Marks character owning specified object as changed. Called by hooks.
+
+        :param obj: changed Character derived, Inventory or PerkInventory object
+        """
+        self._changed_keys.add(self._keys[id(obj)])
+
+    @staticmethod
+    def _write_character(writer, character):
+        """Writes specified character using specified writer.
+
+        :param writer: SaveGameWriter object
+        :param character: Character derived object to write
+        :raises WorldJournalError: when the character can't be saved
+        """
+        try:
+            writer.write_character(character=character)
+        except SaveGameError as error:
+            raise WorldJournal.WorldJournalError("can't save character: {}, {}".format(character.name, error))
+
+    @staticmethod
+    def _write_segment(file, segment):
+        """Writes length prefixed segment to specified file.
+
+        :param file: file object opened for writing in binary mode
+        :param segment: bytes of the segment
+        """
+        file.write(_segment_length_struct.pack(len(segment)) + segment)
+
+    def _replay(self):
+        """Replays all complete segments of the journal file, discarding torn segment at its end. Durations of status
+        effects of replayed characters are lowered by number of turns which passed since they were saved.
+
+        :raises WorldJournalError: when any complete segment is corrupted
+        :return: tuple of dictionary of keys and Character derived objects (in order of keys), the last flushed turn
+                 and length of complete segments in bytes
+        """
+        characters = dict()
+        turn = 0
+        complete_length = 0
+        with open(self._journal_file, "rb") as file:
+            while True:
+                length_data = file.read(_segment_length_struct.size)
+                if len(length_data) != _segment_length_struct.size:
+                    break
+                length = _segment_length_struct.unpack(length_data)[0]
+                segment = file.read(length)
+                if len(segment) != length:
+                    break
+                try:
+                    turn = self._replay_segment(segment=segment, characters=characters, turn=turn)
+                except SaveGameError as error:
+                    raise WorldJournal.WorldJournalError("can't replay journal: {}".format(error))
+                complete_length += _segment_length_struct.size + length
+        for character, saved_turn in characters.values():
+            if turn > saved_turn:
+                character.perks.timeline.advance(turns=turn - saved_turn)
+                PerkInventoryExpiredStatusEffectRemover.remove_expired_status_effects(perk_inv=character.perks)
+        return dict(sorted((key, character) for key, (character, _) in characters.items())), turn, complete_length
+
+    def _replay_segment(self, segment, characters, turn):
+        """Applies entries of specified segment to characters restored so far.
+
+        :param segment: bytes of the segment
+        :param characters: dictionary of keys and tuples of Character derived object and turn it was saved in, to update
+        :param turn: turn the last segment was flushed in
+        :raises SaveGameError: when the segment is corrupted
+        :return: turn the segment was flushed in
+        """
+        stream = io.BytesIO(segment)
+        reader = SaveGameReader(stream=stream, catalog=self._catalog)
+        while True:
+            entry_data = stream.read(_entry_struct.size)
+            if len(entry_data) != _entry_struct.size:
+                raise SaveGameError("save data is truncated")
+            entry_type, value = _entry_struct.unpack(entry_data)
+            if entry_type == _END_ENTRY:
+                return turn
+            elif entry_type == _TURN_ENTRY:
+                turn = value
+            elif entry_type == _REMOVE_ENTRY:
+                characters.pop(value, None)
+            elif entry_type == _PUT_ENTRY:
+                character = reader.read_character()
+                if character is None:
+                    raise SaveGameError("missing character for key: {}".format(value))
+                characters[value] = (character, turn)
+            else:
+                raise SaveGameError("incorrect journal entry type: {}".format(entry_type))
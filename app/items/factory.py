@@ -1,4 +1,5 @@
 from app.files.file_handler import FileHandler
+from app.files.file_watcher import DataFileWatcher
 from app.items.items import Armor
 from app.items.stackables import Ammo, Consumable
 from app.items.weapons import MeleeWeapon, RangedWeapon
@@ -34,10 +35,36 @@ class ItemFactory:
         except FileNotFoundError:
             raise ItemFactory.ItemBuildError("item data is unavailable")
         else:
+            self._id_index = self._create_id_index()
+            self._watcher = DataFileWatcher(data_file=data_file, data=self._data)
             self._line_number_containing_item_id = None
             self._line_number_containing_last_data = None
             self._item_id_to_find = None
 
+    def update_data(self):
+        """Checks whether data file was modified since data was obtained and, if so, obtains data again, updating index
+        of item IDs.
+
+        :raises ItemBuildError: when data file is no longer available
+        :return: set of IDs of items which were added, changed or removed (empty set when data file wasn't modified)
+        """
+        try:
+            update = self._watcher.poll()
+        except FileNotFoundError:
+            raise ItemFactory.ItemBuildError("item data is unavailable")
+        if update is None:
+            return set()
+        self._data, changed_ids = update
+        self._id_index = self._create_id_index()
+        return changed_ids
+
+    def get_item_ids(self):
+        """Gets IDs of all items existing in obtained data.
+
+        :return: list of item IDs, in order of appearance in obtained data
+        """
+        return list(self._id_index.keys())
+
     def create_item(self, item_id):
         """Searches for specified item based on its ID and returns instance of Item derived class with parameters
         extracted from previously obtained data.
@@ -46,13 +73,25 @@ class ItemFactory:
         :raises ItemBuildError: when specified item ID is not found
         :return: Item derived object
         """
-        for idx, line in enumerate(self._data):
-            if "id:" in line and line.split()[-1] == item_id:
-                self._line_number_containing_item_id = idx
-                self._item_id_to_find = item_id
-                return self._create_found_item()
-        else:
+        try:
+            self._line_number_containing_item_id = self._id_index[item_id]
+        except KeyError:
             raise ItemFactory.ItemBuildError("incorrect item ID")
+        else:
+            self._item_id_to_find = item_id
+            return self._create_found_item()
+
+    def _create_id_index(self):
+        """Creates index of item IDs and numbers of lines containing them, so that items can be found without searching
+        whole obtained data. When ID is repeated, its first occurrence is indexed.
+
+        :return: dictionary of item IDs and line numbers
+        """
+        id_index = dict()
+        for idx, line in enumerate(self._data):
+            if line.startswith("id:"):
+                id_index.setdefault(line.split()[-1], idx)
+        return id_index
 
     def _create_found_item(self):
         """Extracts previously found item's tags in order to call appropriate method to create instance of respective
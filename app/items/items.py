@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+from app.tags.tags import TagRegistry
+
 
 class Item(ABC):
     """This is abstract base class representing items existing in the game and contains necessary and common parameters
@@ -19,6 +21,8 @@ class Item(ABC):
         """
         self._item_id = item_id
         self._tags = tags
+        self._tag_set = TagRegistry.get_tag_set(tags)
+        self._tag_mask = TagRegistry.get_tag_mask(tags)
         self._name = name
         self._desc = desc
         self._value = value
@@ -40,6 +44,22 @@ class Item(ABC):
         """
         return self._tags
 
+    @property
+    def tag_set(self):
+        """Gets item's tags as frozen set of interned tags.
+
+        :return: item's tag set
+        """
+        return self._tag_set
+
+    @property
+    def tag_mask(self):
+        """Gets item's tags as bit mask of interned tags.
+
+        :return: item's tag mask
+        """
+        return self._tag_mask
+
     @property
     def name(self):
         """Gets item's name.
@@ -187,6 +187,7 @@ class RangedWeapon(Item, Weapon):
         Weapon.__init__(self, damage, armor_pen, accuracy, ap_cost, st_requirement)
         self._ammo_type = ammo_type
         self._clip_size = clip_size
+        self._ammo_prototype = None
         self.current_ammo = 0
 
     def __str__(self):
@@ -205,6 +206,26 @@ class RangedWeapon(Item, Weapon):
         """
         return self._ammo_type
 
+    @property
+    def ammo_prototype(self):
+        """Gets Ammo object (prototype) the weapon's ammunition type is linked to.
+
+        :return: Ammo object, or None when ammunition type is not linked
+        """
+        return self._ammo_prototype
+
+    @ammo_prototype.setter
+    def ammo_prototype(self, ammo):
+        """Links weapon's ammunition type to specified Ammo object (prototype), so that ammunition can be created
+        without searching data by ammunition type.
+
+        :param ammo: Ammo object with ID equal to weapon's ammunition type, or None to unlink
+        :raises ValueError: when ID of specified ammunition doesn't match weapon's ammunition type
+        """
+        if ammo is not None and ammo.item_id != self._ammo_type:
+            raise ValueError("ammunition: {} doesn't match ammunition type: {}".format(ammo.item_id, self._ammo_type))
+        self._ammo_prototype = ammo
+
     @property
     def clip_size(self):
         """Gets size of weapon's clip (magazine).
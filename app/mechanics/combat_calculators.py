@@ -1,7 +1,12 @@
+import weakref
+
 from app.characters.characters import Character, Critter
+from app.items.items import Armor
 from app.mechanics.stat_calculators import CharacterDerivedStatCalculator
-from app.items.weapons import MeleeWeapon, RangedWeapon
+from app.items.weapons import Weapon, MeleeWeapon, RangedWeapon
+from app.mechanics.perk_inventory import PerkInventory
 from app.perks.perks import Perk
+from app.tags.tags import TagRegistry
 
 
 class CombatCalculatorError(Exception):
@@ -9,14 +14,119 @@ class CombatCalculatorError(Exception):
     pass
 
 
+def _get_weapon(character, weapon=None):
+    """Gets weapon to calculate combat parameters for: specified weapon, or character's equipped weapon when no
+    weapon is specified.
+
+    :param character: Character derived object attacking with the weapon
+    :param weapon: Weapon derived object (defaults to None, which means character's equipped weapon)
+    :raises CombatCalculatorError: when specified weapon is incorrect, or no weapon is specified nor equipped
+    :return: Weapon derived object
+    """
+    if weapon is None:
+        weapon = character.inventory.equipped_weapon
+        if weapon is None:
+            raise CombatCalculatorError("no weapon equipped on character: {}".format(character.name))
+    elif not isinstance(weapon, Weapon):
+        raise CombatCalculatorError("incorrect object type for weapon for character: {}".format(character.name))
+    return weapon
+
+
+class PerkBonusMatcher:
+    """This class calculates bonuses (maluses) to combat stats (damage, accuracy, damage resistance, action points cost)
+    given by perks, whose effects apply only when their tags match specified tags (for example, weapon or opponent
+    tags).
+
+    Effects of all perks in perk inventory are compiled once per stat into a table mapping bit mask of required tags to
+    total value of effects requiring those tags. Bonus for given tags is the sum of values, whose required tag mask is
+    a subset of given tag mask, and is memoized per tag mask. Compiled tables are stored per perk inventory and rebuilt
+    only when perk inventory's version changes (perks are added or removed).
+
+    The class uses CombatCalculatorError exception, which is raised when specified perk inventory or its perks are
+    incorrect.
+    """
+
+    _compiled_perk_inventories = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def get_bonus(perk_inv, stat, tag_mask):
+        """Gets total bonus (malus) to specified stat given by perks in specified perk inventory for specified tags.
+
+        Only perks tagged with name of the stat are taken into account.
+
+        :param perk_inv: PerkInventory object to get bonuses (maluses) from
+        :param stat: name of the stat to get bonus (malus) for
+        :param tag_mask: bit mask of tags to match perk effects against
+        :raises CombatCalculatorError: when specified perk inventory or its perks are incorrect
+        :return: total bonus (malus) to stat
+        """
+        compiled_stat = PerkBonusMatcher._get_compiled_stat(perk_inv=perk_inv, stat=stat)
+        effects, bonuses = compiled_stat
+        try:
+            return bonuses[tag_mask]
+        except KeyError:
+            bonus = 0
+            for effect_tag_mask, effect_value in effects:
+                if effect_tag_mask & tag_mask == effect_tag_mask:
+                    bonus += effect_value
+            bonuses[tag_mask] = bonus
+            return bonus
+
+    @staticmethod
+    def _get_compiled_stat(perk_inv, stat):
+        """Gets compiled effects of perks in specified perk inventory for specified stat, compiling them if necessary.
+
+        :param perk_inv: PerkInventory object to get compiled effects for
+        :param stat: name of the stat to get compiled effects for
+        :raises CombatCalculatorError: when specified perk inventory is incorrect
+        :return: tuple of list of effects (as tuples of required tag mask and total value) and memoized bonuses
+        """
+        if not isinstance(perk_inv, PerkInventory):
+            raise CombatCalculatorError("incorrect object type for perk inventory")
+        version, compiled_stats = PerkBonusMatcher._compiled_perk_inventories.get(perk_inv, (None, None))
+        if version != perk_inv.version:
+            compiled_stats = dict()
+            PerkBonusMatcher._compiled_perk_inventories[perk_inv] = (perk_inv.version, compiled_stats)
+        try:
+            return compiled_stats[stat]
+        except KeyError:
+            compiled_stat = (PerkBonusMatcher._compile_stat(perk_inv=perk_inv, stat=stat), dict())
+            compiled_stats[stat] = compiled_stat
+            return compiled_stat
+
+    @staticmethod
+    def _compile_stat(perk_inv, stat):
+        """Compiles effects of perks in specified perk inventory for specified stat, merging effects requiring the same
+        tags.
+
+        :param perk_inv: PerkInventory object to compile effects for
+        :param stat: name of the stat to compile effects for
+        :raises CombatCalculatorError: when perks in specified perk inventory are incorrect
+        :return: list of tuples of required tag mask and total value
+        """
+        effect_values = dict()
+        for perk in perk_inv.perks:
+            if not isinstance(perk, Perk):
+                raise CombatCalculatorError("incorrect object type for perk")
+            if stat in perk.tag_set:
+                for effect_tag_mask, effect_value in perk.get_tagged_effects(stat=stat):
+                    effect_values[effect_tag_mask] = effect_values.get(effect_tag_mask, 0) + effect_value
+        return list(effect_values.items())
+
+
 class DamageFormulaConverter:
     """This class gets standard damage formulas (damage string formatted as A + XdY, with A + being optional if zero)
     and returns them as tuples (A, X, Y) or calculates minimum and maximum potential damage and returns it as tuple
     (min, max).
 
+    Expected damage of damage formulas is calculated analytically, from distributions of sums of rolls, which are cached
+    per number of rolls and die.
+
     The class uses CombatCalculatorError exception, which is raised when provided damage formula strings are incorrect.
     """
 
+    _roll_distributions = dict()
+
     @staticmethod
     def get_damage_tuple(damage_formula):
         """Converts standard damage formula string into tuple.
@@ -38,6 +148,30 @@ class DamageFormulaConverter:
         damage_range = DamageFormulaConverter._get_damage_range(damage_tuple=damage_tuple)
         return damage_range
 
+    @staticmethod
+    def get_expected_damage(damage_tuple, dmg_res=0):
+        """Calculates expected (mean) damage of standard damage formula against specified damage resistance, without
+        rolling.
+
+        Damage lowered by damage resistance is never negative, so expected damage is calculated exactly from
+        distribution of sums of damage rolls, as mean of max(0, A + roll - damage resistance). When even the lowest
+        possible damage isn't lowered below zero, it's simply A + X * (Y + 1) / 2 - damage resistance.
+
+        :param damage_tuple: tuple of damage formula numbers (A, X, Y)
+        :param dmg_res: damage resistance lowering the damage (defaults to 0)
+        :return: expected damage
+        """
+        base_damage, number_of_rolls, roll = damage_tuple
+        offset = base_damage - dmg_res
+        if offset + number_of_rolls >= 0:
+            return offset + number_of_rolls * (roll + 1) / 2
+        expected_damage = 0.0
+        roll_distribution = DamageFormulaConverter._get_roll_distribution(number_of_rolls=number_of_rolls, roll=roll)
+        for roll_sum, probability in roll_distribution:
+            if offset + roll_sum > 0:
+                expected_damage += (offset + roll_sum) * probability
+        return expected_damage
+
     @staticmethod
     def _convert_damage_formula(damage_formula):
         """Converts standard damage formula string into tuple.
@@ -100,6 +234,30 @@ class DamageFormulaConverter:
         damage_tuple = (base_damage,) + damage_roll
         return damage_tuple
 
+    @staticmethod
+    def _get_roll_distribution(number_of_rolls, roll):
+        """Gets distribution of sums of specified number of rolls of specified die, calculating it by convolution when
+        it's first requested.
+
+        :param number_of_rolls: number of rolls
+        :param roll: number of die sides
+        :return: list of tuples of sums of rolls and their probabilities
+        """
+        try:
+            return DamageFormulaConverter._roll_distributions[(number_of_rolls, roll)]
+        except KeyError:
+            counts = [1]
+            for _ in range(number_of_rolls):
+                new_counts = [0] * (len(counts) + roll - 1)
+                for roll_sum, count in enumerate(counts):
+                    for side in range(roll):
+                        new_counts[roll_sum + side] += count
+                counts = new_counts
+            total = roll ** number_of_rolls
+            distribution = [(number_of_rolls + roll_sum, count / total) for roll_sum, count in enumerate(counts)]
+            DamageFormulaConverter._roll_distributions[(number_of_rolls, roll)] = distribution
+            return distribution
+
     @staticmethod
     def _get_damage_range(damage_tuple):
         """Calculates minimum and maximum potential damage based on tuple of damage formula numbers.
@@ -122,13 +280,15 @@ class DamageCalculator:
     """
 
     @staticmethod
-    def get_weapon_damage(character, opponent=None):
+    def get_weapon_damage(character, opponent=None, weapon=None):
         """Calculates effective potential damage based on equipped weapon and active perks.
 
         When no opponent character is specified, perks giving bonuses against specific character types will be ignored.
 
         :param character: Character derived object to calculate damage for
         :param opponent: Character derived object to calculate damage against (defaults to None)
+        :param weapon: Weapon derived object to calculate damage for instead of equipped weapon, without equipping it
+                       (defaults to None)
         :raises CombatCalculatorError: when specified characters, or their equipped weapons are incorrect
         :return: effective potential damage
         """
@@ -138,24 +298,22 @@ class DamageCalculator:
             raise CombatCalculatorError("incorrect object type for opponent")
         if character is opponent:
             raise CombatCalculatorError("character and opponent are the same object")
-        if character.inventory.equipped_weapon is None:
-            raise CombatCalculatorError("no weapon equipped on character: {}".format(character.name))
-        base_damage = DamageCalculator._get_base_weapon_damage(character=character)
-        base_damage += DamageCalculator._get_weapon_type_perk_damage_bonus(character=character)
+        weapon = _get_weapon(character=character, weapon=weapon)
+        base_damage = DamageCalculator._get_base_weapon_damage(weapon=weapon)
+        base_damage += DamageCalculator._get_weapon_type_perk_damage_bonus(character=character, weapon=weapon)
         if opponent is not None:
             base_damage += DamageCalculator._get_opponent_type_perk_damage_bonus(character=character, opponent=opponent)
-        effective_damage = DamageCalculator._get_effective_damage(character=character,
-                                                                  effective_base_damage=base_damage)
+        effective_damage = DamageCalculator._get_effective_damage(weapon=weapon, effective_base_damage=base_damage)
         return effective_damage
 
     @staticmethod
-    def _get_base_weapon_damage(character):
-        """Gets equipped weapon's base damage (without roll), unmodified by any perks.
+    def _get_base_weapon_damage(weapon):
+        """Gets weapon's base damage (without roll), unmodified by any perks.
 
-        :param character: Character derived object to get weapon's base damage from
-        :return: equipped weapon's base damage
+        :param weapon: Weapon derived object to get base damage from
+        :return: weapon's base damage
         """
-        damage = character.inventory.equipped_weapon.damage
+        damage = weapon.damage
         if "+" in damage:
             base_damage = int(damage.split(" + ")[0])
         else:
@@ -163,19 +321,14 @@ class DamageCalculator:
         return base_damage
 
     @staticmethod
-    def _get_weapon_type_perk_damage_bonus(character):
-        """Calculates bonus damage provided by perks based on type of equipped weapon.
+    def _get_weapon_type_perk_damage_bonus(character, weapon):
+        """Calculates bonus damage provided by perks based on type of weapon.
 
         :param character: Character derived object to calculate bonus damage for
+        :param weapon: Weapon derived object to calculate bonus damage for
         :return: bonus damage based on weapon type
         """
-        bonus_damage = 0
-        weapon_tags = character.inventory.equipped_weapon.tags
-        for perk in character.perks.perks:
-            if not isinstance(perk, Perk):
-                raise CombatCalculatorError("incorrect object type for perk")
-            if "damage" in perk.tags:
-                bonus_damage += DamageCalculator._get_perk_damage_bonus(perk=perk, tags=weapon_tags)
+        bonus_damage = PerkBonusMatcher.get_bonus(perk_inv=character.perks, stat="damage", tag_mask=weapon.tag_mask)
         return bonus_damage
 
     @staticmethod
@@ -186,48 +339,18 @@ class DamageCalculator:
         :param opponent: Character derived object to calculate bonus damage against
         :return: bonus damage based on opponent type
         """
-        bonus_damage = 0
-        opponent_tags = opponent.tags
-        for perk in character.perks.perks:
-            if not isinstance(perk, Perk):
-                raise CombatCalculatorError("incorrect object type for perk")
-            if "damage" in perk.tags:
-                bonus_damage += DamageCalculator._get_perk_damage_bonus(perk=perk, tags=opponent_tags)
-        return bonus_damage
-
-    @staticmethod
-    def _get_perk_damage_bonus(perk, tags):
-        """Gets bonus damage gained by provided perk based on matching tags.
-
-        Bonus is provided when set of tags from perk's effects are a subset of provided tags (for example, weapon tags).
-
-        :param perk: Perk derived object to get bonus damage from
-        :param tags: tags to compare set of tags from perk effects to
-        :return: bonus damage based on perks with qualifying effects
-        """
-        bonus_damage = 0
-        tags = tags.split(", ")
-        effects = perk.get_effects_list()
-        for effect in effects:
-            if "damage" not in effect:
-                continue
-            effect = effect.split(", ")
-            effect.remove("damage")
-            effect_value = int(effect[-1])
-            effect.pop(-1)
-            if len(effect) > 0 and set(effect) <= set(tags):
-                bonus_damage += effect_value
+        bonus_damage = PerkBonusMatcher.get_bonus(perk_inv=character.perks, stat="damage", tag_mask=opponent.tag_mask)
         return bonus_damage
 
     @staticmethod
-    def _get_effective_damage(character, effective_base_damage):
+    def _get_effective_damage(weapon, effective_base_damage):
         """Gets effective damage and returns it as standard damage formula.
 
-        :param character: Character derived object to get damage for
+        :param weapon: Weapon derived object to get damage roll from
         :param effective_base_damage: effective base damage, modified by perks
         :return: effective damage as standard damage formula
         """
-        damage_roll = character.inventory.equipped_weapon.damage.split(" + ")[-1]
+        damage_roll = weapon.damage.split(" + ")[-1]
         effective_damage = str(effective_base_damage) + " + " + damage_roll
         return effective_damage
 
@@ -242,13 +365,15 @@ class AccuracyCalculator:
     """
 
     @staticmethod
-    def get_weapon_accuracy(character, opponent=None):
+    def get_weapon_accuracy(character, opponent=None, weapon=None):
         """Calculates effective accuracy based on equipped weapon and active perks.
 
         When no opponent character is specified, perks giving bonuses against specific character types will be ignored.
 
         :param character: Character derived object to calculate accuracy for
         :param opponent: Character derived object to calculate accuracy against
+        :param weapon: Weapon derived object to calculate accuracy for instead of equipped weapon, without equipping it
+                       (defaults to None)
         :raises CombatCalculatorError: when specified characters, or their equipped weapons are incorrect
         :return: effective accuracy
         """
@@ -258,35 +383,35 @@ class AccuracyCalculator:
             raise CombatCalculatorError("incorrect object type for opponent")
         if character is opponent:
             raise CombatCalculatorError("character and opponent are the same object")
-        if character.inventory.equipped_weapon is None:
-            raise CombatCalculatorError("no weapon equipped on character: {}".format(character.name))
-        effective_accuracy = AccuracyCalculator._get_weapon_accuracy(character=character)
-        effective_accuracy += AccuracyCalculator._get_character_stat_accuracy(character=character)
-        effective_accuracy += AccuracyCalculator._get_weapon_type_perk_accuracy_bonus(character=character)
+        weapon = _get_weapon(character=character, weapon=weapon)
+        effective_accuracy = AccuracyCalculator._get_weapon_accuracy(weapon=weapon)
+        effective_accuracy += AccuracyCalculator._get_character_stat_accuracy(character=character, weapon=weapon)
+        effective_accuracy += AccuracyCalculator._get_weapon_type_perk_accuracy_bonus(character=character,
+                                                                                      weapon=weapon)
         if opponent is not None:
             effective_accuracy += AccuracyCalculator._get_opponent_type_perk_accuracy_bonus(character=character,
                                                                                             opponent=opponent)
         return effective_accuracy
 
     @staticmethod
-    def _get_weapon_accuracy(character):
+    def _get_weapon_accuracy(weapon):
         """Gets weapon's inherent accuracy.
 
-        :param character: Character derived object to get equipped weapon's accuracy from
-        :return: equipped weapon's accuracy
+        :param weapon: Weapon derived object to get accuracy from
+        :return: weapon's accuracy
         """
-        accuracy = character.inventory.equipped_weapon.accuracy
+        accuracy = weapon.accuracy
         return accuracy
 
     @staticmethod
-    def _get_character_stat_accuracy(character):
-        """Gets accuracy from character's stats (attribute and respective skill).
+    def _get_character_stat_accuracy(character, weapon):
+        """Gets accuracy from character's stats (attribute and skill respective to weapon's type).
 
         :param character: Character derived object to get stats for
-        :raises CombatCalculatorError: when equipped weapon is incorrect
+        :param weapon: Weapon derived object to get respective skill for
+        :raises CombatCalculatorError: when weapon is incorrect
         :return: accuracy based on character's stats
         """
-        weapon = character.inventory.equipped_weapon
         if isinstance(character, Critter):
             return AccuracyCalculator._get_critter_accuracy(critter=character)
         if isinstance(weapon, MeleeWeapon):
@@ -345,19 +470,14 @@ class AccuracyCalculator:
         return accuracy
 
     @staticmethod
-    def _get_weapon_type_perk_accuracy_bonus(character):
-        """Calculates bonus accuracy provided by perks based on type of equipped weapon.
+    def _get_weapon_type_perk_accuracy_bonus(character, weapon):
+        """Calculates bonus accuracy provided by perks based on type of weapon.
 
         :param character: Character derived object to calculate bonus accuracy for
+        :param weapon: Weapon derived object to calculate bonus accuracy for
         :return: bonus accuracy based on weapon type
         """
-        bonus_accuracy = 0
-        weapon_tags = character.inventory.equipped_weapon.tags
-        for perk in character.perks.perks:
-            if not isinstance(perk, Perk):
-                raise CombatCalculatorError("incorrect object type for perk")
-            if "accuracy" in perk.tags:
-                bonus_accuracy += AccuracyCalculator._get_perk_accuracy_bonus(perk=perk, tags=weapon_tags)
+        bonus_accuracy = PerkBonusMatcher.get_bonus(perk_inv=character.perks, stat="accuracy", tag_mask=weapon.tag_mask)
         return bonus_accuracy
 
     @staticmethod
@@ -368,37 +488,8 @@ class AccuracyCalculator:
         :param opponent: Character derived object to calculate bonus accuracy against
         :return: bonus accuracy based on opponent type
         """
-        bonus_accuracy = 0
-        opponent_tags = opponent.tags
-        for perk in character.perks.perks:
-            if not isinstance(perk, Perk):
-                raise CombatCalculatorError("incorrect object type for perk")
-            if "accuracy" in perk.tags:
-                bonus_accuracy += AccuracyCalculator._get_perk_accuracy_bonus(perk=perk, tags=opponent_tags)
-        return bonus_accuracy
-
-    @staticmethod
-    def _get_perk_accuracy_bonus(perk, tags):
-        """Gets bonus accuracy gained by provided perk based on matching tags.
-
-        Bonus is provided when set of tags from perk's effects are a subset of provided tags (for example, weapon tags).
-
-        :param perk: Perk derived object to get bonus accuracy from
-        :param tags: tags to compare set of tags from perk effects to
-        :return: bonus accuracy based on perks with qualifying effects
-        """
-        bonus_accuracy = 0
-        tags = tags.split(", ")
-        effects = perk.get_effects_list()
-        for effect in effects:
-            if "accuracy" not in effect:
-                continue
-            effect = effect.split(", ")
-            effect.remove("accuracy")
-            effect_value = int(effect[-1])
-            effect.pop(-1)
-            if len(effect) > 0 and set(effect) <= set(tags):
-                bonus_accuracy += effect_value
+        bonus_accuracy = PerkBonusMatcher.get_bonus(perk_inv=character.perks, stat="accuracy",
+                                                    tag_mask=opponent.tag_mask)
         return bonus_accuracy
 
 
@@ -406,16 +497,49 @@ class EffectiveAccuracyCalculator:
     """This class calculates effective accuracy a character has against a specific opponents (by taking into account all
     bonuses / maluses provided by equipment and perks for both parties).
 
+    Effective accuracy also determines chance to hit the opponent: hit is rolled with a die of hit_roll_sides sides
+    (d20), and attack hits when the roll is not greater than effective accuracy. Every point of effective accuracy is
+    worth 5% chance to hit, effective accuracy of 20 or more always hits, and, as effective accuracy is never lower than
+    1, there's always at least 5% chance to hit.
+
     The class uses CombatCalculatorError exception, which is raised when specified characters are incorrect.
     """
 
+    hit_roll_sides = 20
+
     @staticmethod
-    def get_effective_accuracy(character, opponent):
+    def get_hit_chance(character, opponent, weapon=None):
+        """Calculates chance that provided character's attack hits specified opponent, based on character's effective
+        accuracy against the opponent.
+
+        :param character: Character derived object to calculate chance to hit for
+        :param opponent: Character derived object to calculate chance to be hit for
+        :param weapon: Weapon derived object to attack with instead of equipped weapon (defaults to None)
+        :raises CombatCalculatorError: when specified characters are incorrect
+        :return: chance to hit, between 0 and 1
+        """
+        effective_accuracy = EffectiveAccuracyCalculator.get_effective_accuracy(character=character, opponent=opponent,
+                                                                                weapon=weapon)
+        return EffectiveAccuracyCalculator.get_hit_chance_for_accuracy(effective_accuracy=effective_accuracy)
+
+    @staticmethod
+    def get_hit_chance_for_accuracy(effective_accuracy):
+        """Calculates chance to hit for specified effective accuracy.
+
+        :param effective_accuracy: effective accuracy against the opponent
+        :return: chance to hit, between 0 and 1
+        """
+        sides = EffectiveAccuracyCalculator.hit_roll_sides
+        return max(1, min(effective_accuracy, sides)) / sides
+
+    @staticmethod
+    def get_effective_accuracy(character, opponent, weapon=None):
         """Calculates effective accuracy provided character has against specified opponent by calculating character's
         accuracy against opponent's evasion"
 
         :param character: Character derived object to calculate effective accuracy for
         :param opponent: Character derived object to calculate effective evasion for
+        :param weapon: Weapon derived object to attack with instead of equipped weapon (defaults to None)
         :raises CombatCalculatorError: when specified characters are incorrect
         :return: character's effective accuracy against specified opponent
         """
@@ -425,7 +549,8 @@ class EffectiveAccuracyCalculator:
             raise CombatCalculatorError("incorrect object type for opponent")
         if character is opponent:
             raise CombatCalculatorError("character and opponent are the same object")
-        character_accuracy = AccuracyCalculator.get_weapon_accuracy(character=character, opponent=opponent)
+        character_accuracy = AccuracyCalculator.get_weapon_accuracy(character=character, opponent=opponent,
+                                                                    weapon=weapon)
         opponent_evasion = CharacterDerivedStatCalculator.get_evasion(character=opponent)
         effective_accuracy = character_accuracy - opponent_evasion
         if effective_accuracy < 1:
@@ -442,13 +567,15 @@ class DamageResistanceCalculator:
     """
 
     @staticmethod
-    def get_damage_resistance(character, opponent=None):
+    def get_damage_resistance(character, opponent=None, armor=None):
         """Calculates effective damage resistance based on equipped armor and active perks.
 
         When no opponent character is specified, perks giving bonuses against specific character types will be ignored.
 
         :param character: Character derived object to calculate damage resistance for
         :param opponent: Character derived object to calculate damage resistance against (defaults to None)
+        :param armor: Armor object to calculate damage resistance for instead of equipped armor, without equipping it
+                      (defaults to None)
         :raises CombatCalculatorError: when specified characters, or equipped armor are incorrect
         :return: effective damage resistance
         """
@@ -458,9 +585,13 @@ class DamageResistanceCalculator:
             raise CombatCalculatorError("incorrect object type for opponent")
         if character is opponent:
             raise CombatCalculatorError("character and opponent are the same object")
-        if character.inventory.equipped_armor is None:
-            raise CombatCalculatorError("no armor equipped on character: {}".format(character.name))
-        effective_dmg_res = DamageResistanceCalculator._get_armor_dmg_res(character=character)
+        if armor is None:
+            armor = character.inventory.equipped_armor
+            if armor is None:
+                raise CombatCalculatorError("no armor equipped on character: {}".format(character.name))
+        elif not isinstance(armor, Armor):
+            raise CombatCalculatorError("incorrect object type for armor for character: {}".format(character.name))
+        effective_dmg_res = DamageResistanceCalculator._get_armor_dmg_res(armor=armor)
         effective_dmg_res += DamageResistanceCalculator._get_generic_perk_dmg_res_bonus(character=character)
         if opponent is not None:
             effective_dmg_res += DamageResistanceCalculator._get_opponent_type_perk_dmg_res_bonus(character=character,
@@ -468,13 +599,13 @@ class DamageResistanceCalculator:
         return effective_dmg_res
 
     @staticmethod
-    def _get_armor_dmg_res(character):
+    def _get_armor_dmg_res(armor):
         """Gets armor's inherent damage resistance.
 
-        :param character: Character derived object to get equipped armor's damage resistance from
-        :return: equipped armor's damage resistance
+        :param armor: Armor object to get damage resistance from
+        :return: armor's damage resistance
         """
-        dmg_res = character.inventory.equipped_armor.dmg_res
+        dmg_res = armor.dmg_res
         return dmg_res
 
     @staticmethod
@@ -484,12 +615,8 @@ class DamageResistanceCalculator:
         :param character: Character derived object to calculate bonus damage resistance for
         :return: bonus damage resistance
         """
-        bonus_dmg_res = 0
-        for perk in character.perks.perks:
-            if not isinstance(perk, Perk):
-                raise CombatCalculatorError("incorrect object type for perk")
-            if "dmg_res" in perk.tags:
-                bonus_dmg_res += DamageResistanceCalculator._get_perk_dmg_res_bonus(perk=perk, tags="armor")
+        bonus_dmg_res = PerkBonusMatcher.get_bonus(perk_inv=character.perks, stat="dmg_res",
+                                                   tag_mask=TagRegistry.get_tag_mask("armor"))
         return bonus_dmg_res
 
     @staticmethod
@@ -500,38 +627,7 @@ class DamageResistanceCalculator:
         :param opponent: Character derived object to calculate bonus damage resistance against
         :return: bonus damage resistance based on opponent type
         """
-        bonus_dmg_res = 0
-        opponent_tags = opponent.tags
-        for perk in character.perks.perks:
-            if not isinstance(perk, Perk):
-                raise CombatCalculatorError("incorrect object type for perk")
-            if "dmg_res" in perk.tags:
-                bonus_dmg_res += DamageResistanceCalculator._get_perk_dmg_res_bonus(perk=perk, tags=opponent_tags)
-        return bonus_dmg_res
-
-    @staticmethod
-    def _get_perk_dmg_res_bonus(perk, tags):
-        """Gets bonus damage resistance gained by provided perk (based on matching tags).
-
-        Bonus is provided when set of tags from perk's effects are a subset of provided tags (for example, opponent
-        tags).
-
-        :param perk: Perk derived object to get bonus damage resistance from
-        :param tags: tags to compare set of tags from perk effects to
-        :return: bonus damage resistance based on perks with qualifying effects
-        """
-        bonus_dmg_res = 0
-        tags = tags.split(", ")
-        effects = perk.get_effects_list()
-        for effect in effects:
-            if "dmg_res" not in effect:
-                continue
-            effect = effect.split(", ")
-            effect.remove("dmg_res")
-            effect_value = int(effect[-1])
-            effect.pop(-1)
-            if len(effect) > 0 and set(effect) <= set(tags):
-                bonus_dmg_res += effect_value
+        bonus_dmg_res = PerkBonusMatcher.get_bonus(perk_inv=character.perks, stat="dmg_res", tag_mask=opponent.tag_mask)
         return bonus_dmg_res
 
 
@@ -543,13 +639,14 @@ class EffectiveDamageCalculator:
     """
 
     @staticmethod
-    def get_effective_damage(character, opponent, damage_roll):
+    def get_effective_damage(character, opponent, damage_roll, weapon=None):
         """Calculates effective damage provided character does against specified opponent by calculating character's
         damage against opponent's damage resistance modified by weapon's penetration potential."
 
         :param character: Character derived object to calculate effective damage for
         :param opponent: Character derived object to calculate effective damage resistance for
         :param damage_roll: roll part of character's weapon damage formula
+        :param weapon: Weapon derived object to attack with instead of equipped weapon (defaults to None)
         :raises CombatCalculatorError: when specified characters are incorrect
         :return: character's effective damage against specified opponent
         """
@@ -559,18 +656,59 @@ class EffectiveDamageCalculator:
             raise CombatCalculatorError("incorrect object type for opponent")
         if character is opponent:
             raise CombatCalculatorError("character and opponent are the same object")
-        weapon_damage_formula = DamageCalculator.get_weapon_damage(character=character, opponent=opponent)
+        weapon = _get_weapon(character=character, weapon=weapon)
+        weapon_damage_formula = DamageCalculator.get_weapon_damage(character=character, opponent=opponent,
+                                                                   weapon=weapon)
         effective_weapon_damage = DamageFormulaConverter.get_damage_tuple(weapon_damage_formula)
         effective_weapon_damage = effective_weapon_damage[0] + damage_roll
-        effective_dmg_res = DamageResistanceCalculator.get_damage_resistance(character=opponent, opponent=character)
-        effective_dmg_res -= character.inventory.equipped_weapon.armor_pen
-        if effective_dmg_res < 0:
-            effective_dmg_res = 0
+        effective_dmg_res = EffectiveDamageCalculator._get_effective_dmg_res(character=character, opponent=opponent,
+                                                                             weapon=weapon)
         effective_damage = effective_weapon_damage - effective_dmg_res
         if effective_damage < 0:
             effective_damage = 0
         return effective_damage
 
+    @staticmethod
+    def get_expected_damage(character, opponent, weapon=None):
+        """Calculates expected effective damage of provided character's hit against specified opponent, without rolling
+        damage (mean of effective damage over all possible damage rolls).
+
+        :param character: Character derived object to calculate expected damage for
+        :param opponent: Character derived object to calculate effective damage resistance for
+        :param weapon: Weapon derived object to attack with instead of equipped weapon (defaults to None)
+        :raises CombatCalculatorError: when specified characters are incorrect
+        :return: character's expected effective damage against specified opponent
+        """
+        if not isinstance(character, Character):
+            raise CombatCalculatorError("incorrect object type for character")
+        if not isinstance(opponent, Character):
+            raise CombatCalculatorError("incorrect object type for opponent")
+        if character is opponent:
+            raise CombatCalculatorError("character and opponent are the same object")
+        weapon = _get_weapon(character=character, weapon=weapon)
+        weapon_damage_formula = DamageCalculator.get_weapon_damage(character=character, opponent=opponent,
+                                                                   weapon=weapon)
+        damage_tuple = DamageFormulaConverter.get_damage_tuple(weapon_damage_formula)
+        effective_dmg_res = EffectiveDamageCalculator._get_effective_dmg_res(character=character, opponent=opponent,
+                                                                             weapon=weapon)
+        return DamageFormulaConverter.get_expected_damage(damage_tuple=damage_tuple, dmg_res=effective_dmg_res)
+
+    @staticmethod
+    def _get_effective_dmg_res(character, opponent, weapon):
+        """Calculates opponent's damage resistance against provided character, lowered by armor penetration of
+        character's weapon.
+
+        :param character: Character derived object attacking the opponent
+        :param opponent: Character derived object to calculate damage resistance for
+        :param weapon: Weapon derived object character attacks with
+        :return: effective damage resistance, never lower than 0
+        """
+        effective_dmg_res = DamageResistanceCalculator.get_damage_resistance(character=opponent, opponent=character)
+        effective_dmg_res -= weapon.armor_pen
+        if effective_dmg_res < 0:
+            effective_dmg_res = 0
+        return effective_dmg_res
+
 
 class APCostCalculator:
     """This class calculates effective action points cost (base weapon action points cost and modified by perks) for
@@ -581,67 +719,109 @@ class APCostCalculator:
     """
 
     @staticmethod
-    def get_ap_cost(character):
+    def get_ap_cost(character, weapon=None):
         """Calculates effective attack action points cost based on equipped weapon and active perks.
 
         :param character: Character derived object to calculate action points cost for
+        :param weapon: Weapon derived object to calculate action points cost for instead of equipped weapon, without
+                       equipping it (defaults to None)
         :raises CombatCalculatorError: when specified character, or their equipped weapons are incorrect
         :return: effective attack action points cost
         """
         if not isinstance(character, Character):
             raise CombatCalculatorError("incorrect object type for character")
-        if character.inventory.equipped_weapon is None:
-            raise CombatCalculatorError("no weapon equipped on character: {}".format(character.name))
-        effective_ap_cost = APCostCalculator._get_base_weapon_ap_cost(character=character)
-        effective_ap_cost += APCostCalculator._get_weapon_type_perk_ap_cost_bonus(character=character)
+        weapon = _get_weapon(character=character, weapon=weapon)
+        effective_ap_cost = APCostCalculator._get_base_weapon_ap_cost(weapon=weapon)
+        effective_ap_cost += APCostCalculator._get_weapon_type_perk_ap_cost_bonus(character=character, weapon=weapon)
         return effective_ap_cost
 
     @staticmethod
-    def _get_base_weapon_ap_cost(character):
-        """Gets equipped weapon's base action points cost unmodified by any perks.
+    def _get_base_weapon_ap_cost(weapon):
+        """Gets weapon's base action points cost unmodified by any perks.
 
-        :param character: Character derived object to get weapon's base action points cost from
-        :return: equipped weapon's base action points cost
+        :param weapon: Weapon derived object to get base action points cost from
+        :return: weapon's base action points cost
         """
-        base_ap_cost = character.inventory.equipped_weapon.ap_cost
+        base_ap_cost = weapon.ap_cost
         return base_ap_cost
 
     @staticmethod
-    def _get_weapon_type_perk_ap_cost_bonus(character):
-        """Calculates bonus action points cost provided by perks based on type of equipped weapon.
+    def _get_weapon_type_perk_ap_cost_bonus(character, weapon):
+        """Calculates bonus action points cost provided by perks based on type of weapon.
 
         :param character: Character derived object to calculate bonus action points cost for
+        :param weapon: Weapon derived object to calculate bonus action points cost for
         :return: bonus action points cost based on weapon type
         """
-        bonus_ap_cost = 0
-        weapon_tags = character.inventory.equipped_weapon.tags
-        for perk in character.perks.perks:
-            if not isinstance(perk, Perk):
-                raise CombatCalculatorError("incorrect object type for perk")
-            if "ap_cost" in perk.tags:
-                bonus_ap_cost += APCostCalculator._get_perk_ap_cost_bonus(perk=perk, tags=weapon_tags)
+        bonus_ap_cost = PerkBonusMatcher.get_bonus(perk_inv=character.perks, stat="ap_cost", tag_mask=weapon.tag_mask)
         return bonus_ap_cost
 
+
+class ExpectedDamageCalculator:
+    """This class calculates expected damage a character does against a specific opponent, without rolling hits or
+    damage, for example to cheaply compare all potential targets when planning NPC actions.
+
+    Expected damage of an attack is chance to hit (see EffectiveAccuracyCalculator) multiplied by expected effective
+    damage of a hit (see EffectiveDamageCalculator). Expected damage per turn assumes character spends all its maximum
+    action points on attacks, limited by ammo currently loaded in equipped ranged weapon.
+
+    The class uses CombatCalculatorError exception, which is raised when specified characters are incorrect.
+    """
+
     @staticmethod
-    def _get_perk_ap_cost_bonus(perk, tags):
-        """Gets bonus action points cost gained by provided perk based on matching weapon tags.
+    def get_expected_damage_per_attack(character, opponent, weapon=None):
+        """Calculates expected damage of provided character's attack against specified opponent.
 
-        Bonus is provided when set of tags from perk's effects are a subset of provided tags (weapon tags).
+        :param character: Character derived object to calculate expected damage for
+        :param opponent: Character derived object to calculate expected damage against
+        :param weapon: Weapon derived object to attack with instead of equipped weapon (defaults to None)
+        :raises CombatCalculatorError: when specified characters are incorrect
+        :return: expected damage of a single attack
+        """
+        hit_chance = EffectiveAccuracyCalculator.get_hit_chance(character=character, opponent=opponent, weapon=weapon)
+        return hit_chance * EffectiveDamageCalculator.get_expected_damage(character=character, opponent=opponent,
+                                                                          weapon=weapon)
+
+    @staticmethod
+    def get_expected_damage_per_ap(character, opponent, weapon=None):
+        """Calculates expected damage of provided character's attack against specified opponent per action point spent.
 
-        :param perk: Perk derived object to get bonus damage from
-        :param tags: tags to compare set of tags from perk effects to
-        :return: bonus action points cost based on perks with qualifying effects
+        :param character: Character derived object to calculate expected damage for
+        :param opponent: Character derived object to calculate expected damage against
+        :param weapon: Weapon derived object to attack with instead of equipped weapon (defaults to None)
+        :raises CombatCalculatorError: when specified characters are incorrect
+        :return: expected damage per action point
         """
-        bonus_ap_cost = 0
-        tags = tags.split(", ")
-        effects = perk.get_effects_list()
-        for effect in effects:
-            if "ap_cost" not in effect:
-                continue
-            effect = effect.split(", ")
-            effect.remove("ap_cost")
-            effect_value = int(effect[-1])
-            effect.pop(-1)
-            if len(effect) > 0 and set(effect) <= set(tags):
-                bonus_ap_cost += effect_value
-        return bonus_ap_cost
+        expected_damage = ExpectedDamageCalculator.get_expected_damage_per_attack(character=character,
+                                                                                  opponent=opponent, weapon=weapon)
+        return expected_damage / max(APCostCalculator.get_ap_cost(character=character, weapon=weapon), 1)
+
+    @staticmethod
+    def get_expected_damage_per_turn(character, opponent):
+        """Calculates expected damage provided character does against specified opponent during a turn, attacking as
+        many times as its maximum action points (and loaded ammo) allow.
+
+        :param character: Character derived object to calculate expected damage for
+        :param opponent: Character derived object to calculate expected damage against
+        :raises CombatCalculatorError: when specified characters are incorrect
+        :return: expected damage per turn
+        """
+        expected_damage = ExpectedDamageCalculator.get_expected_damage_per_attack(character=character,
+                                                                                  opponent=opponent)
+        return expected_damage * ExpectedDamageCalculator.get_attacks_per_turn(character=character)
+
+    @staticmethod
+    def get_attacks_per_turn(character):
+        """Calculates number of attacks provided character can make during a turn with its maximum action points,
+        limited by ammo loaded in equipped ranged weapon.
+
+        :param character: Character derived object to calculate number of attacks for
+        :raises CombatCalculatorError: when specified character is incorrect
+        :return: number of attacks per turn
+        """
+        ap_cost = max(APCostCalculator.get_ap_cost(character=character), 1)
+        attacks = CharacterDerivedStatCalculator.get_max_ap(character=character) // ap_cost
+        weapon = character.inventory.equipped_weapon
+        if isinstance(weapon, RangedWeapon):
+            attacks = min(attacks, weapon.current_ammo)
+        return attacks
@@ -0,0 +1,232 @@
+import app.config.game_config as game_config
+from app.characters.characters import Character
+from app.mechanics.combat_calculators import CombatCalculatorError, DamageFormulaConverter, DamageCalculator
+from app.mechanics.combat_calculators import AccuracyCalculator, EffectiveAccuracyCalculator
+from app.mechanics.combat_calculators import DamageResistanceCalculator, APCostCalculator
+
+
+class CombatContext:
+    """This class represents combat parameters of a character attacking a specific opponent (accuracy, damage, damage
+    resistance, action points cost), memoized for repeated use during combat.
+
+    Parameters are calculated by combat calculators when first requested and reused afterwards, for example for every
+    shot of a burst or every attack during a round. Memoized parameters are invalidated automatically when version of
+    the character or the opponent changes (items are equipped, perks or status effects are added or removed, stats are
+    changed) or game configuration changes, and can also be invalidated manually.
+
+    The class uses CombatCalculatorError exception, which is raised when specified characters are incorrect.
+    """
+
+    def __init__(self, character, opponent):
+        """Initializes instance of the class for specified character attacking specified opponent.
+
+        :param character: Character derived object representing attacking character
+        :param opponent: Character derived object representing attacked opponent
+        :raises CombatCalculatorError: when specified characters are incorrect
+        """
+        if not isinstance(character, Character):
+            raise CombatCalculatorError("incorrect object type for character")
+        if not isinstance(opponent, Character):
+            raise CombatCalculatorError("incorrect object type for opponent")
+        if character is opponent:
+            raise CombatCalculatorError("character and opponent are the same object")
+        self._character = character
+        self._opponent = opponent
+        self._versions = None
+        self._results = dict()
+
+    @property
+    def character(self):
+        """Gets attacking character.
+
+        :return: Character derived object representing attacking character
+        """
+        return self._character
+
+    @property
+    def opponent(self):
+        """Gets attacked opponent.
+
+        :return: Character derived object representing attacked opponent
+        """
+        return self._opponent
+
+    def invalidate(self):
+        """Discards all memoized combat parameters."""
+        self._results.clear()
+        self._versions = None
+
+    def get_weapon_accuracy(self):
+        """Gets character's accuracy with equipped weapon against the opponent.
+
+        :return: accuracy
+        """
+        return self._get_result(name="weapon_accuracy", calculate=lambda: AccuracyCalculator.get_weapon_accuracy(
+            character=self._character, opponent=self._opponent))
+
+    def get_effective_accuracy(self):
+        """Gets character's effective accuracy against the opponent (accuracy against opponent's evasion).
+
+        :return: effective accuracy
+        """
+        return self._get_result(name="effective_accuracy",
+                                calculate=lambda: EffectiveAccuracyCalculator.get_effective_accuracy(
+                                    character=self._character, opponent=self._opponent))
+
+    def get_weapon_damage(self):
+        """Gets character's potential damage with equipped weapon against the opponent.
+
+        :return: potential damage as standard damage formula
+        """
+        return self._get_result(name="weapon_damage", calculate=lambda: DamageCalculator.get_weapon_damage(
+            character=self._character, opponent=self._opponent))
+
+    def get_weapon_damage_tuple(self):
+        """Gets character's potential damage with equipped weapon against the opponent.
+
+        :return: potential damage as tuple of damage formula numbers
+        """
+        return self._get_result(name="weapon_damage_tuple",
+                                calculate=lambda: DamageFormulaConverter.get_damage_tuple(self.get_weapon_damage()))
+
+    def get_damage_resistance(self):
+        """Gets opponent's damage resistance against the character.
+
+        :return: damage resistance
+        """
+        return self._get_result(name="damage_resistance",
+                                calculate=lambda: DamageResistanceCalculator.get_damage_resistance(
+                                    character=self._opponent, opponent=self._character))
+
+    def get_effective_damage_resistance(self):
+        """Gets opponent's damage resistance against the character, lowered by armor penetration of character's
+        equipped weapon.
+
+        :return: effective damage resistance
+        """
+        return self._get_result(name="effective_damage_resistance",
+                                calculate=self._calculate_effective_damage_resistance)
+
+    def get_ap_cost(self):
+        """Gets character's attack action points cost with equipped weapon.
+
+        :return: action points cost of attack
+        """
+        return self._get_result(name="ap_cost", calculate=lambda: APCostCalculator.get_ap_cost(
+            character=self._character))
+
+    def get_effective_damage(self, damage_roll):
+        """Calculates effective damage character does against the opponent for specified damage roll, using memoized
+        combat parameters.
+
+        :param damage_roll: roll part of character's weapon damage formula
+        :return: effective damage against the opponent
+        """
+        effective_damage = self.get_weapon_damage_tuple()[0] + damage_roll - self.get_effective_damage_resistance()
+        if effective_damage < 0:
+            effective_damage = 0
+        return effective_damage
+
+    def get_hit_chance(self):
+        """Gets chance that character's attack hits the opponent.
+
+        :return: chance to hit, between 0 and 1
+        """
+        return EffectiveAccuracyCalculator.get_hit_chance_for_accuracy(
+            effective_accuracy=self.get_effective_accuracy())
+
+    def get_expected_damage(self):
+        """Gets expected effective damage of character's hit against the opponent, without rolling damage.
+
+        :return: expected effective damage against the opponent
+        """
+        return self._get_result(name="expected_damage", calculate=lambda: DamageFormulaConverter.get_expected_damage(
+            damage_tuple=self.get_weapon_damage_tuple(), dmg_res=self.get_effective_damage_resistance()))
+
+    def get_expected_damage_per_ap(self):
+        """Gets expected damage of character's attack against the opponent (chance to hit multiplied by expected
+        damage of a hit) per action point spent.
+
+        :return: expected damage per action point
+        """
+        return self.get_hit_chance() * self.get_expected_damage() / max(self.get_ap_cost(), 1)
+
+    def get_burst_damage(self, damage_rolls):
+        """Calculates effective damage character does against the opponent for every specified damage roll (for
+        example, for every shot of a burst).
+
+        :param damage_rolls: iterable of rolls of character's weapon damage formula
+        :return: list of effective damage values against the opponent
+        """
+        base_damage = self.get_weapon_damage_tuple()[0] - self.get_effective_damage_resistance()
+        return [max(base_damage + damage_roll, 0) for damage_roll in damage_rolls]
+
+    def _calculate_effective_damage_resistance(self):
+        """Calculates opponent's damage resistance lowered by armor penetration of character's equipped weapon.
+
+        :return: effective damage resistance
+        """
+        effective_dmg_res = self.get_damage_resistance() - self._character.inventory.equipped_weapon.armor_pen
+        if effective_dmg_res < 0:
+            effective_dmg_res = 0
+        return effective_dmg_res
+
+    def _get_result(self, name, calculate):
+        """Gets memoized combat parameter, calculating it when it's not memoized or memoized parameters are no longer
+        valid.
+
+        :param name: name of the combat parameter
+        :param calculate: callable calculating the combat parameter
+        :return: combat parameter value
+        """
+        versions = (self._character.version, self._opponent.version, game_config.get_config_version())
+        if versions != self._versions:
+            self._results.clear()
+            self._versions = versions
+        try:
+            return self._results[name]
+        except KeyError:
+            result = calculate()
+            self._results[name] = result
+            return result
+
+
+class CombatContextCache:
+    """This class stores combat contexts of all attacking character and opponent pairs during combat, so that every pair
+    reuses the same CombatContext object (with its memoized combat parameters) for a whole round or encounter.
+    """
+
+    def __init__(self):
+        """Initializes instance of the class with no stored combat contexts."""
+        self._contexts = dict()
+
+    def __len__(self):
+        return len(self._contexts)
+
+    def get_context(self, character, opponent):
+        """Gets combat context of specified character attacking specified opponent, creating it when necessary.
+
+        :param character: Character derived object representing attacking character
+        :param opponent: Character derived object representing attacked opponent
+        :raises CombatCalculatorError: when specified characters are incorrect
+        :return: CombatContext object
+        """
+        key = (id(character), id(opponent))
+        context = self._contexts.get(key)
+        if context is None or context.character is not character or context.opponent is not opponent:
+            context = CombatContext(character=character, opponent=opponent)
+            self._contexts[key] = context
+        return context
+
+    def remove_character(self, character):
+        """Removes all stored combat contexts involving specified character (for example, when it leaves combat).
+
+        :param character: Character derived object to remove combat contexts for
+        """
+        for key, context in list(self._contexts.items()):
+            if context.character is character or context.opponent is character:
+                del self._contexts[key]
+
+    def clear(self):
+        """Removes all stored combat contexts."""
+        self._contexts.clear()
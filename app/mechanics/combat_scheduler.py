@@ -0,0 +1,204 @@
+import heapq
+
+from app.characters.characters import Character
+from app.mechanics.combat_calculators import APCostCalculator
+from app.mechanics.perk_inventory import PerkInventoryStatusEffectDurationLowerer
+from app.mechanics.perk_inventory import PerkInventoryExpiredStatusEffectRemover
+from app.mechanics.stat_calculators import CharacterDerivedStatCalculator
+
+
+class CombatScheduler:
+    """This class schedules turns and actions of characters (combatants) taking part in combat.
+
+    Combatants act in order of their initiative, which is equal to their maximum action points (so faster characters
+    act first), with ties resolved in order in which combatants joined combat. At the start of every turn, combatants'
+    action points are restored to their maximum. Actions cost action points (attack cost of equipped weapon by default)
+    and are queued in priority queue ordered by initiative of acting combatants, so both queueing and resolving actions
+    take logarithmic time. At the end of every turn, status effects of all combatants are lowered and expired ones are
+    removed.
+
+    The class provides CombatSchedulerError exception, which is raised when scheduling actions for incorrect characters
+    or characters without enough action points.
+    """
+
+    class CombatSchedulerError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during combat scheduling."""
+        pass
+
+    def __init__(self, combatants=None):
+        """Initializes instance of the class with provided optional combatants.
+
+        :param combatants: iterable of Character derived objects taking part in combat (defaults to None)
+        :raises CombatSchedulerError: when any of provided combatants is incorrect
+        """
+        self._turn = 1
+        self._sequence = 0
+        self._combatants = dict()
+        self._turn_order = list()
+        self._actions = list()
+        if combatants is not None:
+            for combatant in combatants:
+                self.add_combatant(combatant)
+
+    @property
+    def turn(self):
+        """Gets number of current turn.
+
+        :return: current turn
+        """
+        return self._turn
+
+    @property
+    def combatants(self):
+        """Gets a list of combatants ordered by their initiative.
+
+        :return: list of Character derived objects taking part in combat
+        """
+        entries = sorted(self._combatants.values(), key=lambda entry: (-entry[0], entry[1]))
+        return [entry[2] for entry in entries]
+
+    def is_combatant(self, character):
+        """Checks whether specified character takes part in combat, in constant time.
+
+        :param character: Character derived object to check
+        :return: True if the character takes part in combat, False otherwise
+        """
+        entry = self._combatants.get(id(character))
+        return entry is not None and entry[2] is character
+
+    def get_initiative(self, character):
+        """Gets initiative of specified combatant.
+
+        :param character: Character derived object taking part in combat
+        :raises CombatSchedulerError: when specified character doesn't take part in combat
+        :return: combatant's initiative
+        """
+        return self._get_entry(character)[0]
+
+    def add_combatant(self, character):
+        """Adds specified character to combat, restoring its action points to maximum. Character will act in current
+        turn, after combatants which have already acted, in order of its initiative among the remaining ones.
+
+        :param character: Character derived object to add to combat
+        :raises CombatSchedulerError: when specified character is incorrect or already takes part in combat
+        """
+        if not isinstance(character, Character):
+            raise CombatScheduler.CombatSchedulerError("incorrect object type for combatant")
+        if id(character) in self._combatants:
+            raise CombatScheduler.CombatSchedulerError("combatant: {} already takes part in combat"
+                                                       .format(character.name))
+        max_ap = CharacterDerivedStatCalculator.get_max_ap(character)
+        character.action_points = max_ap
+        entry = (max_ap, self._sequence, character)
+        self._sequence += 1
+        self._combatants[id(character)] = entry
+        heapq.heappush(self._turn_order, (-entry[0], entry[1], character))
+
+    def remove_combatant(self, character):
+        """Removes specified character from combat, discarding its queued actions.
+
+        :param character: Character derived object to remove from combat
+        :raises CombatSchedulerError: when specified character doesn't take part in combat
+        """
+        self._get_entry(character)
+        del self._combatants[id(character)]
+
+    def get_next_combatant(self):
+        """Gets next combatant to act in current turn (the one with the highest initiative, which hasn't acted yet).
+
+        :return: Character derived object, or None when all combatants have already acted in current turn
+        """
+        while len(self._turn_order) > 0:
+            _, sequence, character = heapq.heappop(self._turn_order)
+            if self._is_current_entry(character=character, sequence=sequence):
+                return character
+        return None
+
+    def queue_action(self, character, action, ap_cost=None):
+        """Queues specified action of specified combatant, spending combatant's action points.
+
+        :param character: Character derived object performing the action
+        :param action: action to perform (any object describing the action)
+        :param ap_cost: action points cost of the action (defaults to None, which means attack cost of equipped weapon)
+        :raises CombatSchedulerError: when specified character doesn't take part in combat or doesn't have enough
+                                      action points
+        """
+        initiative, sequence, _ = self._get_entry(character)
+        if ap_cost is None:
+            ap_cost = APCostCalculator.get_ap_cost(character)
+        if ap_cost > character.action_points:
+            raise CombatScheduler.CombatSchedulerError("not enough action points for combatant: {}"
+                                                       .format(character.name))
+        character.action_points -= ap_cost
+        heapq.heappush(self._actions, (-initiative, sequence, self._sequence, character, action))
+        self._sequence += 1
+
+    def get_next_action(self):
+        """Gets next queued action to resolve (action of the combatant with the highest initiative, actions of the same
+        combatant in order they were queued).
+
+        :return: tuple of Character derived object and its action, or None when there are no queued actions
+        """
+        while len(self._actions) > 0:
+            _, sequence, _, character, action = heapq.heappop(self._actions)
+            if self._is_current_entry(character=character, sequence=sequence):
+                return character, action
+        return None
+
+    def has_queued_actions(self):
+        """Checks whether there are any queued actions to resolve. Actions of removed combatants are discarded.
+
+        :return: True if there are queued actions, False otherwise
+        """
+        while len(self._actions) > 0:
+            _, sequence, _, character, _ = self._actions[0]
+            if self._is_current_entry(character=character, sequence=sequence):
+                return True
+            heapq.heappop(self._actions)
+        return False
+
+    def end_turn(self):
+        """Ends current turn and starts next one.
+
+        Duration of status effects of all combatants is lowered and expired status effects are removed. Combatants'
+        action points are restored to their maximum, which also updates their initiative. Remaining queued actions are
+        discarded.
+        """
+        self._actions.clear()
+        combatants = [entry[2] for entry in self._combatants.values()]
+        for character in combatants:
+            PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=character.perks)
+            PerkInventoryExpiredStatusEffectRemover.remove_expired_status_effects(perk_inv=character.perks)
+        turn_order = list()
+        for character in combatants:
+            initiative, sequence, _ = self._combatants[id(character)]
+            initiative = CharacterDerivedStatCalculator.get_max_ap(character)
+            character.action_points = initiative
+            self._combatants[id(character)] = (initiative, sequence, character)
+            turn_order.append((-initiative, sequence, character))
+        heapq.heapify(turn_order)
+        self._turn_order = turn_order
+        self._turn += 1
+
+    def _get_entry(self, character):
+        """Gets scheduling entry (initiative, order of joining combat, combatant) of specified combatant.
+
+        :param character: Character derived object taking part in combat
+        :raises CombatSchedulerError: when specified character doesn't take part in combat
+        :return: tuple of initiative, order of joining combat and combatant
+        """
+        try:
+            return self._combatants[id(character)]
+        except KeyError:
+            raise CombatScheduler.CombatSchedulerError("character doesn't take part in combat")
+
+    def _is_current_entry(self, character, sequence):
+        """Checks whether entry taken from priority queue belongs to combatant still taking part in combat (entries of
+        removed combatants are discarded lazily).
+
+        :param character: Character derived object from the entry
+        :param sequence: order of joining combat from the entry
+        :return: True if the entry is current, False otherwise
+        """
+        entry = self._combatants.get(id(character))
+        return entry is not None and entry[2] is character and entry[1] == sequence
@@ -1,15 +1,23 @@
+import copy
+import heapq
+from collections import deque
+
 import app.config.game_config as game_config
 
 from app.items.items import Item, Armor
 from app.items.factory import ItemFactory
 from app.items.stackables import Stackable, Ammo
 from app.items.weapons import Weapon, RangedWeapon
+from app.mechanics.tracked_list import TrackedList
+from app.tags.tags import TagRegistry
 
 
 class Inventory:
     """This class represents inventory of items carried and equipped by characters in the game.
 
     This class contains list of carried items (Item derived objects) as well as currently equipped armor and weapon.
+    Carried items are additionally indexed by their tags and IDs. Indexes are updated incrementally whenever list of
+    carried items changes, so that searching for items doesn't require scanning the whole list.
 
     The class provides InventoryError exception, which is raised when adding objects that are not instances of Item
     derived classes or accessing nonexistent items.
@@ -36,7 +44,11 @@ class Inventory:
             self._equipped_weapon = weapon
         else:
             raise Inventory.InventoryError("incorrect object type(s) to create inventory with")
-        self._items = list()
+        self._tag_index = dict()
+        self._id_index = dict()
+        self._items = TrackedList(on_add=self._index_item, on_remove=self._unindex_item)
+        self._equipment_version = 0
+        self._hooks = list()
 
     def __str__(self):
         str_print = "Armor: "
@@ -57,6 +69,19 @@ class Inventory:
             str_print += "\nNone"
         return str_print
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_tag_index"]
+        del state["_id_index"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tag_index = dict()
+        self._id_index = dict()
+        for item in self._items:
+            self._index_item(item)
+
     @property
     def equipped_armor(self):
         """Gets equipped armor as Armor object.
@@ -74,6 +99,7 @@ class Inventory:
         """
         if isinstance(armor_to_equip, Armor) or armor_to_equip is None:
             self._equipped_armor = armor_to_equip
+            self._equipment_version += 1
         else:
             raise Inventory.InventoryError("incorrect object type to equip")
 
@@ -94,6 +120,7 @@ class Inventory:
         """
         if isinstance(weapon_to_equip, Weapon) or weapon_to_equip is None:
             self._equipped_weapon = weapon_to_equip
+            self._equipment_version += 1
         else:
             raise Inventory.InventoryError("incorrect object type to equip")
 
@@ -105,6 +132,184 @@ class Inventory:
         """
         return self._items
 
+    @property
+    def version(self):
+        """Gets inventory's version, incremented whenever items are equipped, unequipped, added or removed.
+
+        :return: inventory's version
+        """
+        return self._equipment_version + self._items.version
+
+    def add_hook(self, hook):
+        """Adds hook called whenever inventory is changed by inventory operators (items are added, removed, moved,
+        equipped, unequipped, reloaded or unloaded).
+
+        :param hook: callable taking Inventory object as its only argument
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Removes specified hook.
+
+        :param hook: previously added callable
+        :raises InventoryError: when specified hook wasn't added
+        """
+        try:
+            self._hooks.remove(hook)
+        except ValueError:
+            raise Inventory.InventoryError("no such hook in inventory")
+
+    def notify_hooks(self):
+        """Calls all hooks added to inventory, after inventory was changed."""
+        for hook in self._hooks:
+            hook(self)
+
+    def get_items_with_tag(self, tag):
+        """Gets a list of carried items associated with specified tag, in order they were added to inventory.
+
+        :param tag: tag to get items for
+        :return: list of Item derived objects associated with specified tag
+        """
+        return list(self._tag_index.get(tag, dict()).values())
+
+    def count_items_with_tag(self, tag):
+        """Gets number of carried items associated with specified tag.
+
+        :param tag: tag to count items for
+        :return: number of items associated with specified tag
+        """
+        return len(self._tag_index.get(tag, ()))
+
+    def get_items_with_id(self, item_id):
+        """Gets a list of carried items with specified ID, in order they were added to inventory.
+
+        :param item_id: ID of the items to get
+        :return: list of Item derived objects with specified ID
+        """
+        return list(self._id_index.get(item_id, dict()).values())
+
+    def _index_item(self, item):
+        """Adds provided item to tag and ID indexes.
+
+        :param item: Item derived object added to list of carried items
+        """
+        if not isinstance(item, Item):
+            return
+        for tag in item.tag_set:
+            self._tag_index.setdefault(tag, dict())[id(item)] = item
+        self._id_index.setdefault(item.item_id, dict())[id(item)] = item
+
+    def _unindex_item(self, item):
+        """Removes provided item from tag and ID indexes.
+
+        :param item: Item derived object removed from list of carried items
+        """
+        if not isinstance(item, Item):
+            return
+        for tag in item.tag_set:
+            Inventory._remove_from_index(index=self._tag_index, key=tag, item=item)
+        Inventory._remove_from_index(index=self._id_index, key=item.item_id, item=item)
+
+    @staticmethod
+    def _remove_from_index(index, key, item):
+        """Removes provided item from specified index entry, dropping the entry when it's empty.
+
+        :param index: index to remove item from
+        :param key: key of the index entry
+        :param item: Item derived object to remove
+        """
+        entry = index.get(key)
+        if entry is not None:
+            entry.pop(id(item), None)
+            if len(entry) == 0:
+                del index[key]
+
+
+class InventoryItemQuery:
+    """This class searches specified inventory's list of carried items.
+
+    Items can be filtered by tags (all specified tags must be associated with the item), item type and name, then
+    sorted by any of their parameters (value, weight, name, etc) and limited to specified number of results. Filtering
+    by tags uses inventory's tag index, starting from the least common tag, so only items associated with it are
+    checked.
+
+    The class uses Inventory class' InventoryError exception, which is raised when specified inventory or parameter to
+    sort by is incorrect.
+    """
+
+    @staticmethod
+    def query(inv, tags=None, item_type=None, name=None, sort=None, reverse=False, limit=None):
+        """Searches specified inventory's list of carried items for items matching all specified criteria.
+
+        :param inv: Inventory object to search items in
+        :param tags: tags the items must be associated with, as iterable or comma separated string (defaults to None)
+        :param item_type: Item derived class the items must be instances of (defaults to None)
+        :param name: text the items' names must contain, case insensitive (defaults to None)
+        :param sort: name of the item parameter to sort items by (defaults to None, which leaves items unsorted)
+        :param reverse: whether items should be sorted in descending order (defaults to False)
+        :param limit: maximum number of items to return (defaults to None, which returns all matching items)
+        :raises InventoryError: when specified inventory or parameter to sort by is incorrect
+        :return: list of Item derived objects matching specified criteria
+        """
+        if not isinstance(inv, Inventory):
+            raise Inventory.InventoryError("incorrect object type for inventory")
+        items = InventoryItemQuery._get_items_with_tags(inv=inv, tags=tags)
+        if item_type is not None:
+            items = [item for item in items if isinstance(item, item_type)]
+        if name is not None:
+            name = name.lower()
+            items = [item for item in items if name in item.name.lower()]
+        if sort is not None:
+            return InventoryItemQuery._sort_items(items=items, sort=sort, reverse=reverse, limit=limit)
+        if limit is not None:
+            return items[:limit]
+        return items
+
+    @staticmethod
+    def _get_items_with_tags(inv, tags):
+        """Gets carried items associated with all specified tags.
+
+        :param inv: Inventory object to get items from
+        :param tags: tags the items must be associated with
+        :return: list of Item derived objects associated with all specified tags
+        """
+        if tags is None:
+            return list(inv.items)
+        tags = TagRegistry.get_tag_set(tags)
+        if len(tags) == 0:
+            return list(inv.items)
+        rarest_tag = min(tags, key=inv.count_items_with_tag)
+        items = inv.get_items_with_tag(rarest_tag)
+        if len(tags) > 1:
+            tag_mask = TagRegistry.get_tag_mask(tags)
+            items = [item for item in items if TagRegistry.is_subset(tag_mask, item.tag_mask)]
+        return items
+
+    @staticmethod
+    def _sort_items(items, sort, reverse, limit):
+        """Sorts provided items by specified parameter, keeping only specified number of first items.
+
+        :param items: list of Item derived objects to sort
+        :param sort: name of the item parameter to sort items by
+        :param reverse: whether items should be sorted in descending order
+        :param limit: maximum number of items to return
+        :raises InventoryError: when parameter to sort by is incorrect
+        :return: sorted list of Item derived objects
+        """
+        for item in items:
+            if not hasattr(item, sort):
+                raise Inventory.InventoryError("incorrect parameter to sort by: {}".format(sort))
+
+        def sort_key(item):
+            return getattr(item, sort)
+
+        if limit is None:
+            return sorted(items, key=sort_key, reverse=reverse)
+        elif reverse:
+            return heapq.nlargest(limit, items, key=sort_key)
+        else:
+            return heapq.nsmallest(limit, items, key=sort_key)
+
 
 class InventoryItemAdder:
     """This class adds items to specified inventory.
@@ -129,9 +334,38 @@ class InventoryItemAdder:
                 InventoryItemAdder._add_stackable(inv=inv, stackable_to_add=item_to_add, stackable_id=item_to_add_id)
             else:
                 InventoryItemAdder._add_item(inv=inv, item_to_add=item_to_add)
+            inv.notify_hooks()
         else:
             raise Inventory.InventoryError("incorrect object type to add to inventory")
 
+    @staticmethod
+    def add_items(inv, items_to_add):
+        """Adds provided items to specified inventory's list of carried items in one batch, notifying inventory's hooks
+        once after all items are added (for example, when adding generated loot).
+
+        All provided items are checked before any of them is added. Stackables are merged the same way as by add_item
+        method, but stacks which are not full yet are tracked during the batch, so that adding many stackables of the
+        same type doesn't check already filled stacks again.
+
+        :param inv: Inventory object to add items in
+        :param items_to_add: iterable of Item derived objects to add to inventory
+        :raises InventoryError: when specified inventory or any of the items is incorrect
+        """
+        if not isinstance(inv, Inventory):
+            raise Inventory.InventoryError("incorrect object type for inventory")
+        items_to_add = list(items_to_add)
+        for item_to_add in items_to_add:
+            if not isinstance(item_to_add, Item):
+                raise Inventory.InventoryError("incorrect object type to add to inventory")
+        open_stacks = dict()
+        for item_to_add in items_to_add:
+            if isinstance(item_to_add, Stackable):
+                InventoryItemAdder._add_stackable_to_open_stacks(inv=inv, stackable_to_add=item_to_add,
+                                                                 open_stacks=open_stacks)
+            else:
+                InventoryItemAdder._add_item(inv=inv, item_to_add=item_to_add)
+        inv.notify_hooks()
+
     @staticmethod
     def _add_stackable(inv, stackable_to_add, stackable_id):
         """Adds provided stackable item to specified inventory's list of carried items.
@@ -142,22 +376,53 @@ class InventoryItemAdder:
         example, having 3 / 5 of some item and adding 4 / 5 will result in filling original stack to 5 / 5 and leaving
         the rest 2 / 5 in the other.
 
+        Stacks of the same type are found by inventory's index of item IDs, without scanning all carried items.
+
         :param inv: Inventory object to add stackable item to
         :param stackable_to_add: Stackable derived object to add to inventory
         :param stackable_id: ID of the stackable item
         """
-        for item in inv.items:
-            if item.item_id == stackable_id:
-                available_amount = item.max_stack - item.current_amount
-                if available_amount >= stackable_to_add.current_amount:
-                    item.current_amount += stackable_to_add.current_amount
-                    break
-                else:
-                    item.current_amount = item.max_stack
-                    stackable_to_add.current_amount -= available_amount
+        for item in inv.get_items_with_id(stackable_id):
+            available_amount = item.max_stack - item.current_amount
+            if available_amount >= stackable_to_add.current_amount:
+                item.current_amount += stackable_to_add.current_amount
+                break
+            else:
+                item.current_amount = item.max_stack
+                stackable_to_add.current_amount -= available_amount
         else:
             InventoryItemAdder._add_item(inv=inv, item_to_add=stackable_to_add)
 
+    @staticmethod
+    def _add_stackable_to_open_stacks(inv, stackable_to_add, open_stacks):
+        """Adds provided stackable item to specified inventory's list of carried items, filling stacks of the same type
+        which are not full yet, in order they were added to inventory.
+
+        :param inv: Inventory object to add stackable item to
+        :param stackable_to_add: Stackable derived object to add to inventory
+        :param open_stacks: dictionary of stackable IDs and deques of carried stacks which are not full, updated as
+                            stacks are filled and added
+        """
+        stackable_id = stackable_to_add.item_id
+        stacks = open_stacks.get(stackable_id)
+        if stacks is None:
+            stacks = deque(item for item in inv.get_items_with_id(stackable_id) if item.current_amount < item.max_stack)
+            open_stacks[stackable_id] = stacks
+        while len(stacks) > 0:
+            item = stacks[0]
+            available_amount = item.max_stack - item.current_amount
+            if available_amount >= stackable_to_add.current_amount:
+                item.current_amount += stackable_to_add.current_amount
+                if item.current_amount == item.max_stack:
+                    stacks.popleft()
+                return
+            item.current_amount = item.max_stack
+            stackable_to_add.current_amount -= available_amount
+            stacks.popleft()
+        InventoryItemAdder._add_item(inv=inv, item_to_add=stackable_to_add)
+        if stackable_to_add.current_amount < stackable_to_add.max_stack:
+            stacks.append(stackable_to_add)
+
     @staticmethod
     def _add_item(inv, item_to_add):
         """Adds provided item to specified inventory by appending to list of carried items.
@@ -191,6 +456,7 @@ class InventoryItemRemover:
             inv.items.remove(item_to_remove)
         except ValueError:
             raise Inventory.InventoryError("no such item in inventory")
+        inv.notify_hooks()
 
 
 class InventoryItemEquipper:
@@ -222,6 +488,7 @@ class InventoryItemEquipper:
             InventoryItemEquipper._equip_weapon(inv=inv, weapon_to_equip=item_to_equip)
         else:
             raise Inventory.InventoryError("incorrect object type to equip")
+        inv.notify_hooks()
 
     @staticmethod
     def _equip_armor(inv, armor_to_equip):
@@ -284,6 +551,7 @@ class InventoryItemUnequipper:
             raise Inventory.InventoryError("can't unequip default armor")
         inv.items.append(inv.equipped_armor)
         inv.equipped_armor = None
+        inv.notify_hooks()
 
     @staticmethod
     def unequip_weapon(inv):
@@ -300,6 +568,7 @@ class InventoryItemUnequipper:
             raise Inventory.InventoryError("can't unequip default weapon")
         inv.items.append(inv.equipped_weapon)
         inv.equipped_weapon = None
+        inv.notify_hooks()
 
 
 class InventoryWeaponReloader:
@@ -331,6 +600,7 @@ class InventoryWeaponReloader:
                 raise Inventory.InventoryError("no such weapon in inventory")
             if weapon_to_reload.current_ammo != weapon_to_reload.clip_size:
                 InventoryWeaponReloader._reload_weapon(inv=inv, weapon_to_reload=weapon_to_reload)
+                inv.notify_hooks()
             else:
                 raise Inventory.InventoryError("weapon is already fully loaded")
         else:
@@ -346,11 +616,10 @@ class InventoryWeaponReloader:
         """
         ammo_type_to_reload_with = weapon_to_reload.ammo_type
         amount_of_ammo_before_reloading = weapon_to_reload.current_ammo
-        for item in reversed(inv.items):
-            if item.item_id == ammo_type_to_reload_with:
-                InventoryWeaponReloader._load_ammo(inv=inv, ammo_to_load=item, weapon_to_reload=weapon_to_reload)
-                if weapon_to_reload.current_ammo == weapon_to_reload.clip_size:
-                    break
+        for item in reversed(inv.get_items_with_id(ammo_type_to_reload_with)):
+            InventoryWeaponReloader._load_ammo(inv=inv, ammo_to_load=item, weapon_to_reload=weapon_to_reload)
+            if weapon_to_reload.current_ammo == weapon_to_reload.clip_size:
+                break
         if amount_of_ammo_before_reloading == weapon_to_reload.current_ammo:
             raise Inventory.InventoryError("no available ammo: {} to reload weapon: {}".
                                            format(ammo_type_to_reload_with, weapon_to_reload.name))
@@ -417,7 +686,8 @@ class InventoryWeaponUnloader:
         """Unloads specified weapon in specified inventory and adds ammo to inventory.
 
         When weapon is unloaded, appropriate Ammo object is created in inventory, based on type of ammunition the
-        weapon uses.
+        weapon uses. When weapon's ammunition type is linked to Ammo object (prototype), ammunition is copied from the
+        prototype instead of being created from data.
 
         :param inv: Inventory object to unload weapon in
         :param weapon_to_unload: RangedWeapon object to unload
@@ -427,13 +697,17 @@ class InventoryWeaponUnloader:
         amount_of_ammo_in_clip = weapon_to_unload.current_ammo
         ammo_to_create_id = weapon_to_unload.ammo_type
         try:
-            unloaded_ammo = ItemFactory(data_file).create_item(item_id=ammo_to_create_id)
+            if weapon_to_unload.ammo_prototype is not None:
+                unloaded_ammo = copy.copy(weapon_to_unload.ammo_prototype)
+            else:
+                unloaded_ammo = ItemFactory(data_file).create_item(item_id=ammo_to_create_id)
         except ItemFactory.ItemBuildError:
             raise Inventory.InventoryError("incorrect item ID for ammo: {}".format(ammo_to_create_id))
         else:
             unloaded_ammo.current_amount = amount_of_ammo_in_clip
             InventoryItemAdder.add_item(inv=inv, item_to_add=unloaded_ammo)
             weapon_to_unload.current_ammo = 0
+            inv.notify_hooks()
 
 
 class InventoryItemMover:
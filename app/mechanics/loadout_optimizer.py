@@ -0,0 +1,185 @@
+from collections import namedtuple
+
+import app.config.game_config as game_config
+from app.characters.characters import Character
+from app.items.items import Armor
+from app.items.weapons import Weapon
+from app.mechanics.combat_calculators import DamageResistanceCalculator, ExpectedDamageCalculator
+from app.mechanics.stat_calculators import CharacterAttributeCalculator
+
+
+Loadout = namedtuple("Loadout", ["weapon", "armor", "damage_per_ap", "dmg_res", "weight"])
+
+
+class LoadoutOptimizer:
+    """This class ranks combinations of weapons and armors carried (or equipped) by a character against a set of
+    targets, to find the best loadout to equip.
+
+    Weapons are evaluated by mean expected damage per action point against targets (see ExpectedDamageCalculator).
+    Weapons with strength requirement higher than character's strength are skipped. Armors are evaluated by mean
+    effective damage resistance against targets (lowered by armor penetration of targets' equipped weapons) and their
+    evasion.
+
+    Dominated options are pruned before combining: weapon is dominated when another weapon does at least the same
+    damage per action point and is not heavier, and armor is dominated when another armor has at least the same
+    damage resistance and evasion and is not heavier (with at least one of these strictly better). Items are evaluated
+    without equipping them. Evaluations of every weapon and armor are memoized against each target separately, until
+    character or game configuration changes, or for a single target, until that target changes (see
+    Character.version), so ranking stays cheap for big arsenals and changing targets.
+
+    The class provides LoadoutOptimizerError exception, which is raised when specified characters or ranking criterion
+    are incorrect.
+    """
+
+    class LoadoutOptimizerError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during loadout optimization."""
+        pass
+
+    criteria = ("damage_per_ap", "dmg_res")
+
+    def __init__(self):
+        """Initializes instance of the class with no memoized evaluations."""
+        self._evaluations = dict()
+
+    def rank_loadouts(self, character, targets, criterion="damage_per_ap"):
+        """Ranks non-dominated combinations of character's weapons and armors against specified targets.
+
+        :param character: Character derived object to rank loadouts for
+        :param targets: iterable of Character derived objects to evaluate loadouts against
+        :param criterion: criterion to rank loadouts by, "damage_per_ap" or "dmg_res" (defaults to "damage_per_ap"),
+                          with the other one used to rank loadouts equal by the criterion, and lower weight after that
+        :raises LoadoutOptimizerError: when specified characters or criterion are incorrect
+        :raises CombatCalculatorError: when combat parameters can't be calculated (for example, target has no armor
+                                       equipped)
+        :return: list of Loadout tuples of weapon, armor, expected damage per action point, effective damage resistance
+                 and combined weight, the best one first
+        """
+        if criterion not in LoadoutOptimizer.criteria:
+            raise LoadoutOptimizer.LoadoutOptimizerError("incorrect ranking criterion: {}".format(criterion))
+        weapons, armors = self._evaluate(character=character, targets=targets)
+        weapons = LoadoutOptimizer._prune_dominated(options=weapons, get_scores=lambda option: option[1:2])
+        armors = LoadoutOptimizer._prune_dominated(options=armors, get_scores=lambda option: option[1:3])
+        loadouts = [Loadout(weapon=weapon, armor=armor, damage_per_ap=damage_per_ap, dmg_res=dmg_res,
+                            weight=weapon.weight + armor.weight)
+                    for weapon, damage_per_ap, _ in weapons for armor, dmg_res, _, _ in armors]
+        if criterion == "damage_per_ap":
+            loadouts.sort(key=lambda loadout: (-loadout.damage_per_ap, -loadout.dmg_res, loadout.weight))
+        else:
+            loadouts.sort(key=lambda loadout: (-loadout.dmg_res, -loadout.damage_per_ap, loadout.weight))
+        return loadouts
+
+    def get_best_loadout(self, character, targets, criterion="damage_per_ap"):
+        """Gets the best combination of character's weapons and armors against specified targets.
+
+        :param character: Character derived object to get the best loadout for
+        :param targets: iterable of Character derived objects to evaluate loadouts against
+        :param criterion: criterion to rank loadouts by (see rank_loadouts method)
+        :raises LoadoutOptimizerError: when specified characters or criterion are incorrect
+        :raises CombatCalculatorError: when combat parameters can't be calculated (for example, target has no armor
+                                       equipped)
+        :return: Loadout tuple, or None when character has no usable weapon or no armor
+        """
+        loadouts = self.rank_loadouts(character=character, targets=targets, criterion=criterion)
+        return loadouts[0] if len(loadouts) > 0 else None
+
+    def remove_character(self, character):
+        """Removes memoized evaluations of specified character.
+
+        :param character: Character derived object to remove evaluations for
+        """
+        entry = self._evaluations.get(id(character))
+        if entry is not None and entry[0] is character:
+            del self._evaluations[id(character)]
+
+    def clear(self):
+        """Removes all memoized evaluations."""
+        self._evaluations.clear()
+
+    def _evaluate(self, character, targets):
+        """Evaluates character's weapons and armors against specified targets, reusing memoized evaluations.
+
+        :param character: Character derived object to evaluate items of
+        :param targets: iterable of Character derived objects
+        :raises LoadoutOptimizerError: when specified characters are incorrect
+        :raises CombatCalculatorError: when combat parameters can't be calculated
+        :return: tuple of list of tuples of usable weapon, damage per action point and weight, and list of tuples of
+                 armor, damage resistance, evasion and weight
+        """
+        if not isinstance(character, Character):
+            raise LoadoutOptimizer.LoadoutOptimizerError("incorrect object type for character")
+        targets = list(targets)
+        for target in targets:
+            if not isinstance(target, Character):
+                raise LoadoutOptimizer.LoadoutOptimizerError("incorrect object type for target")
+            if target is character:
+                raise LoadoutOptimizer.LoadoutOptimizerError("character can't be its own target")
+        if len(targets) == 0:
+            raise LoadoutOptimizer.LoadoutOptimizerError("no targets to evaluate loadouts against")
+        inv = character.inventory
+        items = [inv.equipped_weapon, inv.equipped_armor] + list(inv.items)
+        strength = CharacterAttributeCalculator.get_strength(character=character)
+        weapons = [item for item in items if isinstance(item, Weapon) and item.st_requirement <= strength]
+        armors = [item for item in items if isinstance(item, Armor)]
+        versions = (character.version, game_config.get_config_version())
+        entry = self._evaluations.get(id(character))
+        if entry is None or entry[0] is not character or entry[1] != versions:
+            evaluations = dict()
+        else:
+            evaluations = entry[2]
+        scores = dict()
+        for item in weapons + armors:
+            item_entry = evaluations.get(id(item))
+            if item_entry is None or item_entry[0] is not item:
+                item_entry = (item, dict())
+                evaluations[id(item)] = item_entry
+            total_score = 0
+            for target in targets:
+                target_entry = item_entry[1].get(id(target))
+                if target_entry is None or target_entry[0] is not target or target_entry[1] != target.version:
+                    if isinstance(item, Weapon):
+                        score = ExpectedDamageCalculator.get_expected_damage_per_ap(character=character,
+                                                                                    opponent=target, weapon=item)
+                    else:
+                        score = LoadoutOptimizer._get_dmg_res(character=character, target=target, armor=item)
+                    target_entry = (target, target.version, score)
+                    item_entry[1][id(target)] = target_entry
+                total_score += target_entry[2]
+            scores[id(item)] = total_score / len(targets)
+        self._evaluations[id(character)] = (character, versions, evaluations)
+        return ([(weapon, scores[id(weapon)], weapon.weight) for weapon in weapons],
+                [(armor, scores[id(armor)], armor.evasion, armor.weight) for armor in armors])
+
+    @staticmethod
+    def _get_dmg_res(character, target, armor):
+        """Calculates effective damage resistance of character's armor against specified target, lowered by armor
+        penetration of target's equipped weapon.
+
+        :param character: Character derived object to evaluate armor for
+        :param target: Character derived object
+        :param armor: Armor object to evaluate
+        :return: effective damage resistance, never lower than 0
+        """
+        dmg_res = DamageResistanceCalculator.get_damage_resistance(character=character, opponent=target, armor=armor)
+        if target.inventory.equipped_weapon is not None:
+            dmg_res -= target.inventory.equipped_weapon.armor_pen
+        return max(dmg_res, 0)
+
+    @staticmethod
+    def _prune_dominated(options, get_scores):
+        """Removes options dominated by other options: having all scores not higher and weight not lower, with at least
+        one of them strictly worse.
+
+        Options are sorted by their scores first, so that every option can be dominated only by options before it, and
+        is compared only with non-dominated ones.
+
+        :param options: list of tuples of item, its scores and weight (last element)
+        :param get_scores: callable getting tuple of scores (higher is better) from option
+        :return: list of non-dominated options
+        """
+        keyed_options = sorted(((get_scores(option) + (-option[-1],), option) for option in options),
+                               key=lambda keyed_option: keyed_option[0], reverse=True)
+        front = list()
+        for key, option in keyed_options:
+            if not any(other != key and all(o >= k for o, k in zip(other, key)) for other, _ in front):
+                front.append((key, option))
+        return [option for _, option in front]
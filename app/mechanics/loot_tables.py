@@ -0,0 +1,281 @@
+import copy
+import random
+from collections import namedtuple
+
+from app.items.stackables import Stackable
+from app.mechanics.inventory import InventoryItemAdder
+
+
+LootEntry = namedtuple("LootEntry", ["reference", "weight", "min_quantity", "max_quantity"])
+LootEntry.__new__.__defaults__ = (1, 1)
+
+
+class AliasSampler:
+    """This class samples indexes of provided weights with probability proportional to their weights, in constant time
+    per sample.
+
+    Sampling uses alias method (Vose's variant): on instantiation, weights are split into table of equally probable
+    columns, each holding part of one index and, when needed, the rest of another (alias) index. Sampling chooses
+    a column with one random number and its index or alias with another.
+    """
+
+    def __init__(self, weights):
+        """Initializes instance of the class, building alias table for provided weights.
+
+        :param weights: iterable of positive weights
+        :raises ValueError: when there are no weights or any weight is not positive
+        """
+        weights = list(weights)
+        if len(weights) == 0:
+            raise ValueError("there must be at least one weight to sample")
+        for weight in weights:
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight > 0:
+                raise ValueError("weights must be positive numbers")
+        size = len(weights)
+        total_weight = sum(weights)
+        scaled_weights = [weight * size / total_weight for weight in weights]
+        self._probabilities = [1.0] * size
+        self._aliases = list(range(size))
+        small = [idx for idx, weight in enumerate(scaled_weights) if weight < 1]
+        large = [idx for idx, weight in enumerate(scaled_weights) if weight >= 1]
+        while len(small) > 0 and len(large) > 0:
+            small_idx = small.pop()
+            large_idx = large.pop()
+            self._probabilities[small_idx] = scaled_weights[small_idx]
+            self._aliases[small_idx] = large_idx
+            scaled_weights[large_idx] += scaled_weights[small_idx] - 1
+            if scaled_weights[large_idx] < 1:
+                small.append(large_idx)
+            else:
+                large.append(large_idx)
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def sample(self, random_generator=random):
+        """Samples index of one of the weights.
+
+        :param random_generator: random generator (random.Random object or random module) to sample with (defaults to
+                                 random module)
+        :return: sampled index
+        """
+        idx = min(int(random_generator.random() * self._size), self._size - 1)
+        if random_generator.random() < self._probabilities[idx]:
+            return idx
+        return self._aliases[idx]
+
+
+class LootTable:
+    """This class represents weighted loot table, which drops items by their IDs (as used by ItemFactory).
+
+    Table consists of entries, which are LootEntry tuples of reference, weight and range of quantity (both inclusive,
+    defaulting to 1). Reference is either item ID, other (nested) loot table or None (nothing is dropped). Every draw
+    from the table rolls specified number of times: each roll chooses an entry with probability proportional to its
+    weight (using AliasSampler, so in constant time) and rolls its quantity. Chosen item is dropped in rolled quantity,
+    while chosen nested table is drawn rolled number of times.
+
+    The class provides LootTableError exception, which is raised when table entries or number of rolls are incorrect.
+    """
+
+    class LootTableError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during loot table creation."""
+        pass
+
+    def __init__(self, entries, rolls=1):
+        """Initializes instance of the class with provided entries.
+
+        :param entries: iterable of LootEntry tuples (or tuples of reference, weight and optional minimum and maximum
+                        quantity)
+        :param rolls: number of rolls per draw from the table (defaults to 1)
+        :raises LootTableError: when entries or number of rolls are incorrect
+        """
+        if not isinstance(rolls, int) or rolls < 1:
+            raise LootTable.LootTableError("incorrect number of rolls: {}".format(rolls))
+        self._entries = [LootTable._create_entry(entry) for entry in entries]
+        try:
+            self._sampler = AliasSampler(weights=[entry.weight for entry in self._entries])
+        except ValueError as error:
+            raise LootTable.LootTableError(str(error))
+        self._rolls = rolls
+
+    @property
+    def entries(self):
+        """Gets table entries.
+
+        :return: list of LootEntry tuples
+        """
+        return list(self._entries)
+
+    @property
+    def rolls(self):
+        """Gets number of rolls per draw from the table.
+
+        :return: number of rolls
+        """
+        return self._rolls
+
+    def get_item_ids(self):
+        """Gets IDs of all items which can be dropped by the table, including items of nested tables.
+
+        :return: set of item IDs
+        """
+        item_ids = set()
+        for entry in self._entries:
+            if isinstance(entry.reference, LootTable):
+                item_ids.update(entry.reference.get_item_ids())
+            elif entry.reference is not None:
+                item_ids.add(entry.reference)
+        return item_ids
+
+    def draw(self, random_generator=random, drops=None):
+        """Draws loot from the table.
+
+        :param random_generator: random generator (random.Random object or random module) to draw with (defaults to
+                                 random module)
+        :param drops: dictionary of item IDs and quantities to add drawn loot to (defaults to None, which means new
+                      dictionary is created)
+        :return: dictionary of dropped item IDs and their quantities
+        """
+        if drops is None:
+            drops = dict()
+        entries = self._entries
+        sample = self._sampler.sample
+        for _ in range(self._rolls):
+            reference, _, min_quantity, max_quantity = entries[sample(random_generator)]
+            if reference is None:
+                continue
+            if min_quantity == max_quantity:
+                quantity = min_quantity
+            else:
+                quantity = random_generator.randint(min_quantity, max_quantity)
+            if isinstance(reference, LootTable):
+                for _ in range(quantity):
+                    reference.draw(random_generator=random_generator, drops=drops)
+            elif quantity > 0:
+                drops[reference] = drops.get(reference, 0) + quantity
+        return drops
+
+    @staticmethod
+    def _create_entry(entry):
+        """Creates loot table entry from provided tuple, checking its values.
+
+        :param entry: LootEntry tuple, or tuple of reference, weight and optional minimum and maximum quantity
+        :raises LootTableError: when provided entry is incorrect
+        :return: LootEntry tuple
+        """
+        try:
+            entry = LootEntry(*entry)
+        except TypeError:
+            raise LootTable.LootTableError("incorrect loot table entry: {}".format(entry))
+        if not (entry.reference is None or isinstance(entry.reference, (str, LootTable))):
+            raise LootTable.LootTableError("incorrect loot table entry reference: {}".format(entry.reference))
+        for quantity in (entry.min_quantity, entry.max_quantity):
+            if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity < 0:
+                raise LootTable.LootTableError("incorrect loot table entry quantity: {}".format(quantity))
+        if entry.min_quantity > entry.max_quantity:
+            raise LootTable.LootTableError("minimum quantity exceeds maximum quantity: {}".format(entry))
+        return entry
+
+
+class LootGenerator:
+    """This class generates items dropped by loot tables, with items created by provided item source (ItemFactory or
+    DataCatalog object).
+
+    Drops are summed by item ID before items are created, so that stackable items (ammo, consumables) are created as
+    full stacks (and at most one partial stack) instead of one stack per roll, and non-stackable items are created once
+    per dropped quantity. Items are created by copying prototype created by item source once per item ID, so generating
+    loot of a whole map doesn't parse item data for every item. Generated loot can be added to inventory in one batch
+    (see InventoryItemAdder.add_items).
+    """
+
+    def __init__(self, item_source, seed=None):
+        """Initializes instance of the class.
+
+        :param item_source: object creating items by their IDs with create_item method (ItemFactory or DataCatalog)
+        :param seed: seed of the random generator (defaults to None, which means generator is seeded randomly)
+        """
+        self._item_source = item_source
+        self._random = random.Random(seed)
+        self._prototypes = dict()
+
+    def draw(self, table, draws=1):
+        """Draws loot from specified table specified number of times.
+
+        :param table: LootTable object to draw from
+        :param draws: number of draws (defaults to 1)
+        :raises LootTableError: when specified table or number of draws is incorrect
+        :return: dictionary of dropped item IDs and their quantities
+        """
+        if not isinstance(table, LootTable):
+            raise LootTable.LootTableError("incorrect object type for loot table")
+        if not isinstance(draws, int) or draws < 0:
+            raise LootTable.LootTableError("incorrect number of draws: {}".format(draws))
+        drops = dict()
+        for _ in range(draws):
+            table.draw(random_generator=self._random, drops=drops)
+        return drops
+
+    def generate_loot(self, table, draws=1):
+        """Draws loot from specified table specified number of times and creates dropped items.
+
+        :param table: LootTable object to draw from
+        :param draws: number of draws (defaults to 1)
+        :raises LootTableError: when specified table or number of draws is incorrect
+        :return: list of Item derived objects
+        """
+        return self.create_items(drops=self.draw(table=table, draws=draws))
+
+    def add_loot(self, inv, table, draws=1):
+        """Draws loot from specified table specified number of times and adds dropped items to specified inventory in
+        one batch.
+
+        :param inv: Inventory object to add loot to
+        :param table: LootTable object to draw from
+        :param draws: number of draws (defaults to 1)
+        :raises LootTableError: when specified table or number of draws is incorrect
+        :raises InventoryError: when specified inventory is incorrect
+        :return: list of Item derived objects created (stackables may have been merged with stacks already in inventory)
+        """
+        items = self.generate_loot(table=table, draws=draws)
+        InventoryItemAdder.add_items(inv=inv, items_to_add=items)
+        return items
+
+    def create_items(self, drops):
+        """Creates items for specified drops.
+
+        :param drops: dictionary of item IDs and their quantities
+        :raises ItemBuildError: when item ID is incorrect (or DataCatalogError, when item source is DataCatalog object)
+        :return: list of Item derived objects, with stackable items in as few stacks as possible
+        """
+        items = list()
+        for item_id, quantity in drops.items():
+            prototype = self._get_prototype(item_id=item_id)
+            if isinstance(prototype, Stackable):
+                while quantity > 0:
+                    item = copy.copy(prototype)
+                    item.current_amount = min(quantity, prototype.max_stack)
+                    quantity -= item.current_amount
+                    items.append(item)
+            else:
+                items.extend(copy.copy(prototype) for _ in range(quantity))
+        return items
+
+    def clear(self):
+        """Removes created prototypes, so that items are created again by item source (for example, after item data is
+        updated).
+        """
+        self._prototypes.clear()
+
+    def _get_prototype(self, item_id):
+        """Gets prototype of item with specified ID, creating it by item source when necessary.
+
+        :param item_id: ID of the item
+        :return: Item derived object, which must not be modified
+        """
+        try:
+            return self._prototypes[item_id]
+        except KeyError:
+            prototype = self._item_source.create_item(item_id)
+            self._prototypes[item_id] = prototype
+            return prototype
@@ -1,3 +1,5 @@
+from app.mechanics.status_effect_timeline import StatusEffectTimeline
+from app.mechanics.tracked_list import TrackedList
 from app.perks.perks import Perk, PlayerTrait, StatusEffect
 
 
@@ -14,8 +16,12 @@ class PerkInventory:
         pass
 
     def __init__(self):
-        """Initializes instance of the class with empty list of active perks."""
-        self._perks = list()
+        """Initializes instance of the class with empty list of active perks and its own status effect timeline."""
+        self._timeline = StatusEffectTimeline()
+        self._owns_timeline = True
+        self._status_effects = dict()
+        self._perks = TrackedList(on_add=self._status_effect_added, on_remove=self._status_effect_removed)
+        self._hooks = list()
 
     def __str__(self):
         str_print = "Perks:"
@@ -26,6 +32,15 @@ class PerkInventory:
             str_print += "\nNone"
         return str_print
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_status_effects"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._status_effects = {id(perk): perk for perk in self._perks if isinstance(perk, StatusEffect)}
+
     @property
     def perks(self):
         """Gets a list of active perks, as list of Perk derived object.
@@ -34,6 +49,96 @@ class PerkInventory:
         """
         return self._perks
 
+    @property
+    def version(self):
+        """Gets perk inventory's version, incremented whenever perks are added or removed.
+
+        :return: perk inventory's version
+        """
+        return self._perks.version
+
+    @property
+    def status_effects(self):
+        """Gets a list of active status effects.
+
+        :return: list of StatusEffect objects
+        """
+        return list(self._status_effects.values())
+
+    @property
+    def timeline(self):
+        """Gets status effect timeline that active status effects are attached to.
+
+        :return: StatusEffectTimeline object
+        """
+        return self._timeline
+
+    @property
+    def owns_timeline(self):
+        """Checks whether perk inventory uses its own status effect timeline, rather than shared one.
+
+        :return: True if perk inventory uses its own timeline, False otherwise
+        """
+        return self._owns_timeline
+
+    def bind_timeline(self, timeline=None):
+        """Moves active status effects to specified shared timeline (for example, world clock's timeline), keeping their
+        remaining duration. When no timeline is specified, status effects are moved back to perk inventory's own
+        timeline.
+
+        :param timeline: StatusEffectTimeline object to attach status effects to (defaults to None)
+        """
+        if timeline is None:
+            new_timeline = StatusEffectTimeline()
+        else:
+            new_timeline = timeline
+        for status_effect in self._status_effects.values():
+            self._timeline.detach_status_effect(status_effect=status_effect)
+            new_timeline.attach_status_effect(status_effect=status_effect, owner=self)
+        self._timeline = new_timeline
+        self._owns_timeline = timeline is None
+
+    def add_hook(self, hook):
+        """Adds hook called whenever perk inventory is changed by perk inventory operators (perks are added or removed,
+        or duration of status effects is lowered).
+
+        :param hook: callable taking PerkInventory object as its only argument
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Removes specified hook.
+
+        :param hook: previously added callable
+        :raises PerkInventoryError: when specified hook wasn't added
+        """
+        try:
+            self._hooks.remove(hook)
+        except ValueError:
+            raise PerkInventory.PerkInventoryError("no such hook in perk inventory")
+
+    def notify_hooks(self):
+        """Calls all hooks added to perk inventory, after perk inventory was changed."""
+        for hook in self._hooks:
+            hook(self)
+
+    def _status_effect_added(self, perk):
+        """Attaches status effect added to list of active perks to perk inventory's timeline.
+
+        :param perk: Perk derived object added to list of active perks
+        """
+        if isinstance(perk, StatusEffect):
+            self._status_effects[id(perk)] = perk
+            self._timeline.attach_status_effect(status_effect=perk, owner=self)
+
+    def _status_effect_removed(self, perk):
+        """Detaches status effect removed from list of active perks from perk inventory's timeline.
+
+        :param perk: Perk derived object removed from list of active perks
+        """
+        if isinstance(perk, StatusEffect) and self._status_effects.pop(id(perk), None) is not None:
+            self._timeline.detach_status_effect(status_effect=perk)
+
 
 class PerkInventoryPerkAdder:
     """This class adds perks to specified perk inventory.
@@ -54,6 +159,7 @@ class PerkInventoryPerkAdder:
             raise PerkInventory.PerkInventoryError("incorrect object type for perk inventory")
         if isinstance(perk_to_add, Perk):
             PerkInventoryPerkAdder._add_perk(perk_inv=perk_inv, perk_to_add=perk_to_add)
+            perk_inv.notify_hooks()
         else:
             raise PerkInventory.PerkInventoryError("incorrect object type to add to perk inventory")
 
@@ -109,11 +215,16 @@ class PerkInventoryPerkRemover:
             perk_inv.perks.remove(perk_to_remove)
         except ValueError:
             raise PerkInventory.PerkInventoryError("no such perk in perk inventory")
+        perk_inv.notify_hooks()
 
 
 class PerkInventoryStatusEffectDurationLowerer:
     """This class lowers duration of all status effects in specified perk inventory.
 
+    Status effects are attached to perk inventory's timeline, so lowering their duration only advances the timeline by
+    one turn, no matter how many status effects are active. When perk inventory's status effects are attached to shared
+    timeline (for example, world clock's), only duration of perk inventory's own status effects is lowered.
+
     The class uses PerkInventory class' PerkInventoryError exception, which is raised when specified perk inventory is
     incorrect.
     """
@@ -127,14 +238,22 @@ class PerkInventoryStatusEffectDurationLowerer:
         """
         if not isinstance(perk_inv, PerkInventory):
             raise PerkInventory.PerkInventoryError("incorrect object type for perk inventory")
-        for perk in perk_inv.perks:
-            if isinstance(perk, StatusEffect):
-                perk.lower_duration()
+        if perk_inv.owns_timeline:
+            perk_inv.timeline.advance()
+        else:
+            for status_effect in perk_inv.status_effects:
+                status_effect.lower_duration()
+        if len(perk_inv.status_effects) > 0:
+            perk_inv.notify_hooks()
 
 
 class PerkInventoryExpiredStatusEffectRemover:
     """This class removes expired status effects in specified perk inventory.
 
+    Expired status effects are taken from priority queue of perk inventory's timeline and removed from list of active
+    perks in a single pass, so only expiring status effects are checked. When perk inventory's status effects are
+    attached to shared timeline, perk inventory's own status effects are checked instead.
+
     The class uses PerkInventory class' PerkInventoryError exception, which is raised when specified perk inventory is
     incorrect.
     """
@@ -148,7 +267,11 @@ class PerkInventoryExpiredStatusEffectRemover:
         """
         if not isinstance(perk_inv, PerkInventory):
             raise PerkInventory.PerkInventoryError("incorrect object type for perk inventory")
-        for perk in perk_inv.perks:
-            if isinstance(perk, StatusEffect) and perk.duration == 0:
-                PerkInventoryPerkRemover.remove_perk(perk_inv=perk_inv, perk_to_remove=perk)
+        if perk_inv.owns_timeline:
+            expired = [status_effect for status_effect, _ in perk_inv.timeline.pop_expired()]
+        else:
+            expired = [status_effect for status_effect in perk_inv.status_effects if status_effect.duration == 0]
+        if len(expired) > 0:
+            perk_inv.perks.remove_objects(expired)
+            perk_inv.notify_hooks()
 
@@ -1,3 +1,5 @@
+import weakref
+
 import app.config.game_config as game_config
 
 from app.characters.characters import Character
@@ -12,6 +14,9 @@ class StatCalculatorError(Exception):
 class PerkAttributeCalculator:
     """This class calculates bonuses (maluses) to character attributes given by active perks.
 
+    Bonuses (maluses) to known attributes are read from totals aggregated by PerkStatAggregator, while other names are
+    matched by walking all perks.
+
     The class uses StatCalculatorError exception, which is raised when specified perk inventory is incorrect.
     """
 
@@ -23,6 +28,8 @@ class PerkAttributeCalculator:
         :param attribute: name of the attribute to check bonuses (maluses) for
         :raises StatCalculatorError: when specified perk inventory is incorrect
         """
+        if attribute in PerkStatAggregator.attributes:
+            return PerkStatAggregator.get_stat_bonus(perk_inv=perk_inv, stat=attribute)
         if not isinstance(perk_inv, PerkInventory):
             raise StatCalculatorError("incorrect object type for perk inventory")
         attribute_bonus = 0
@@ -48,6 +55,9 @@ class PerkAttributeCalculator:
 class PerkSkillCalculator:
     """This class calculates bonuses (maluses) to character skills given by active perks.
 
+    Bonuses (maluses) to known skills are read from totals aggregated by PerkStatAggregator, while other names are
+    matched by walking all perks.
+
     The class uses StatCalculatorError exception, which is raised when specified perk inventory is incorrect.
     """
 
@@ -59,6 +69,8 @@ class PerkSkillCalculator:
         :param skill: name of the skill to check bonuses (maluses) for
         :raises StatCalculatorError: when specified perk inventory is incorrect
         """
+        if skill in PerkStatAggregator.skills:
+            return PerkStatAggregator.get_stat_bonus(perk_inv=perk_inv, stat=skill)
         if not isinstance(perk_inv, PerkInventory):
             raise StatCalculatorError("incorrect object type for perk inventory")
         skill_bonus = 0
@@ -84,6 +96,9 @@ class PerkSkillCalculator:
 class PerkDerivedStatCalculator:
     """This class calculates bonuses (maluses) to character's derived stats given by active perks.
 
+    Bonuses (maluses) to known derived stats are read from totals aggregated by PerkStatAggregator, while other names
+    are matched by walking all perks.
+
     The class uses StatCalculatorError exception, which is raised when specified perk inventory is incorrect.
     """
 
@@ -95,6 +110,8 @@ class PerkDerivedStatCalculator:
         :param stat: name of the derived stat to check bonuses (maluses) for
         :raises StatCalculatorError: when specified perk inventory is incorrect
         """
+        if stat in PerkStatAggregator.derived_stats:
+            return PerkStatAggregator.get_stat_bonus(perk_inv=perk_inv, stat=stat)
         if not isinstance(perk_inv, PerkInventory):
             raise StatCalculatorError("incorrect object type for perk inventory")
         stat_bonus = 0
@@ -116,6 +133,99 @@ class PerkDerivedStatCalculator:
         return stat_bonus
 
 
+class PerkStatAggregator:
+    """This class calculates bonuses (maluses) to all character attributes, skills and derived stats given by active
+    perks, walking perks in perk inventory only once. Aggregated bonuses are cached until perk inventory's version
+    changes.
+
+    Bonuses are matched the same way as by PerkAttributeCalculator, PerkSkillCalculator and PerkDerivedStatCalculator:
+    attribute bonuses are given only by perks tagged with "attribute", skill bonuses only by perks tagged with "skill",
+    and derived stat bonuses by all perks.
+
+    The class uses StatCalculatorError exception, which is raised when specified perk inventory is incorrect.
+    """
+
+    attributes = ("strength", "endurance", "agility", "perception", "intelligence")
+    skills = ("guns", "energy", "melee", "sneak", "security", "mechanics", "survival", "medicine")
+    derived_stats = ("carry_wg", "melee_bonus", "health_bonus", "rad_res", "evasion", "max_ap", "exp_mult")
+
+    _aggregated_perk_inventories = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def get_stat_bonuses(perk_inv):
+        """Get bonuses (maluses) to all attributes, skills and derived stats given by perks in specified perk
+        inventory.
+
+        :param perk_inv: PerkInventory object to get bonuses (maluses) from
+        :raises StatCalculatorError: when specified perk inventory is incorrect
+        :return: dictionary of stat names and bonuses (maluses)
+        """
+        return dict(PerkStatAggregator._get_aggregated_bonuses(perk_inv=perk_inv))
+
+    @staticmethod
+    def get_stat_bonus(perk_inv, stat):
+        """Get bonuses (maluses) to specified attribute, skill or derived stat given by perks in specified perk
+        inventory.
+
+        :param perk_inv: PerkInventory object to get bonuses (maluses) from
+        :param stat: name of the attribute, skill or derived stat to get bonuses (maluses) for
+        :raises StatCalculatorError: when specified perk inventory is incorrect
+        :return: bonuses (maluses) to the stat, 0 for unknown stat names
+        """
+        return PerkStatAggregator._get_aggregated_bonuses(perk_inv=perk_inv).get(stat, 0)
+
+    @staticmethod
+    def _get_aggregated_bonuses(perk_inv):
+        """Get bonuses (maluses) aggregated for specified perk inventory, aggregating them again only when perk
+        inventory's version changed since they were last aggregated.
+
+        :param perk_inv: PerkInventory object to get bonuses (maluses) from
+        :raises StatCalculatorError: when specified perk inventory is incorrect
+        :return: dictionary of stat names and bonuses (maluses), shared between calls
+        """
+        if not isinstance(perk_inv, PerkInventory):
+            raise StatCalculatorError("incorrect object type for perk inventory")
+        aggregated = PerkStatAggregator._aggregated_perk_inventories.get(perk_inv)
+        if aggregated is None or aggregated[0] != perk_inv.version:
+            aggregated = (perk_inv.version, PerkStatAggregator._aggregate_bonuses(perk_inv=perk_inv))
+            PerkStatAggregator._aggregated_perk_inventories[perk_inv] = aggregated
+        return aggregated[1]
+
+    @staticmethod
+    def _aggregate_bonuses(perk_inv):
+        """Aggregate bonuses (maluses) given by perks in specified perk inventory, walking the perks once.
+
+        :param perk_inv: PerkInventory object to get bonuses (maluses) from
+        :return: dictionary of stat names and bonuses (maluses)
+        """
+        bonuses = dict.fromkeys(PerkStatAggregator.attributes + PerkStatAggregator.skills +
+                                PerkStatAggregator.derived_stats, 0)
+        for perk in perk_inv.perks:
+            stats = PerkStatAggregator.derived_stats
+            if "attribute" in perk.tags:
+                stats = stats + PerkStatAggregator.attributes
+            if "skill" in perk.tags:
+                stats = stats + PerkStatAggregator.skills
+            for effect in perk.get_effects_list():
+                PerkStatAggregator._add_effect_bonuses(bonuses=bonuses, stats=stats, effect=effect)
+        return bonuses
+
+    @staticmethod
+    def _add_effect_bonuses(bonuses, stats, effect):
+        """Add bonus (malus) given by perk's effect to every matching stat.
+
+        :param bonuses: dictionary of stat names and bonuses (maluses) to add to
+        :param stats: names of the stats perk can give bonuses (maluses) to
+        :param effect: perk's effect
+        """
+        effect_value = None
+        for stat in stats:
+            if stat in effect:
+                if effect_value is None:
+                    effect_value = int(effect.split()[-1])
+                bonuses[stat] += effect_value
+
+
 class CharacterAttributeCalculator:
     """This class calculates effective character attributes (base values modified by active perks).
 
@@ -306,9 +416,8 @@ class CharacterDerivedStatCalculator:
         """
         CharacterDerivedStatCalculator._check_valid_character(character)
         strength = CharacterAttributeCalculator.get_strength(character)
-        carry_weight = game_config.get_carry_weight_base() + game_config.get_carry_weight_strength_mult() * strength
-        carry_weight += PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="carry_wg")
-        return carry_weight
+        perk_bonus = PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="carry_wg")
+        return CharacterDerivedStatCalculator._calculate_carry_weight(strength=strength, perk_bonus=perk_bonus)
 
     @staticmethod
     def get_melee_bonus(character):
@@ -319,11 +428,8 @@ class CharacterDerivedStatCalculator:
         """
         CharacterDerivedStatCalculator._check_valid_character(character)
         strength = CharacterAttributeCalculator.get_strength(character)
-        melee_bonus = 0
-        if strength > 5:
-            melee_bonus = strength - 5
-        melee_bonus += PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="melee_bonus")
-        return melee_bonus
+        perk_bonus = PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="melee_bonus")
+        return CharacterDerivedStatCalculator._calculate_melee_bonus(strength=strength, perk_bonus=perk_bonus)
 
     @staticmethod
     def get_max_health(character):
@@ -334,12 +440,9 @@ class CharacterDerivedStatCalculator:
         """
         CharacterDerivedStatCalculator._check_valid_character(character)
         endurance = CharacterAttributeCalculator.get_endurance(character)
-        level = character.level
-        max_health = (game_config.get_health_endurance_mult() * endurance) + (game_config.get_health_level_mult() *
-                                                                              (level - 1))
-        max_health += character.health_bonus
-        max_health += PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="health_bonus")
-        return max_health
+        perk_bonus = PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="health_bonus")
+        return CharacterDerivedStatCalculator._calculate_max_health(character=character, endurance=endurance,
+                                                                    perk_bonus=perk_bonus)
 
     @staticmethod
     def get_rad_res(character):
@@ -350,13 +453,9 @@ class CharacterDerivedStatCalculator:
         """
         CharacterDerivedStatCalculator._check_valid_character(character)
         endurance = CharacterAttributeCalculator.get_endurance(character)
-        rad_res = 0
-        if endurance > 5:
-            rad_res = game_config.get_rad_res_endurance_mult() * (endurance - 5)
-        rad_res += PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="rad_res")
-        if character.inventory.equipped_armor is not None:
-            rad_res += character.inventory.equipped_armor.rad_res
-        return rad_res
+        perk_bonus = PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="rad_res")
+        return CharacterDerivedStatCalculator._calculate_rad_res(character=character, endurance=endurance,
+                                                                 perk_bonus=perk_bonus)
 
     @staticmethod
     def get_evasion(character):
@@ -367,13 +466,9 @@ class CharacterDerivedStatCalculator:
         """
         CharacterDerivedStatCalculator._check_valid_character(character)
         agility = CharacterAttributeCalculator.get_agility(character)
-        evasion = 0
-        if agility > 5:
-            evasion = agility - 5
-        evasion += PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="evasion")
-        if character.inventory.equipped_armor is not None:
-            evasion += character.inventory.equipped_armor.evasion
-        return evasion
+        perk_bonus = PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="evasion")
+        return CharacterDerivedStatCalculator._calculate_evasion(character=character, agility=agility,
+                                                                 perk_bonus=perk_bonus)
 
     @staticmethod
     def get_max_ap(character):
@@ -384,9 +479,8 @@ class CharacterDerivedStatCalculator:
         """
         CharacterDerivedStatCalculator._check_valid_character(character)
         agility = CharacterAttributeCalculator.get_agility(character)
-        action_points = game_config.get_action_points_base() + agility
-        action_points += PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="max_ap")
-        return action_points
+        perk_bonus = PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="max_ap")
+        return CharacterDerivedStatCalculator._calculate_max_ap(agility=agility, perk_bonus=perk_bonus)
 
     @staticmethod
     def get_exp_mult(character):
@@ -398,10 +492,88 @@ class CharacterDerivedStatCalculator:
         """
         CharacterDerivedStatCalculator._check_valid_character(character)
         intelligence = CharacterAttributeCalculator.get_intelligence(character)
-        exp_mult = game_config.get_exp_gain_mult_base()
-        exp_mult += game_config.get_exp_gain_mult_intelligence_bonus() * intelligence
-        exp_mult += PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="exp_mult")
-        return exp_mult
+        perk_bonus = PerkDerivedStatCalculator.get_stat_bonus(perk_inv=character.perks, stat="exp_mult")
+        return CharacterDerivedStatCalculator._calculate_exp_mult(intelligence=intelligence, perk_bonus=perk_bonus)
+
+    @staticmethod
+    def _calculate_carry_weight(strength, perk_bonus):
+        """Calculate maximum carry weight from effective strength and perk bonuses (maluses).
+
+        :param strength: effective strength
+        :param perk_bonus: bonuses (maluses) to carry weight given by active perks
+        :return: maximum carry weight
+        """
+        return game_config.lookup_carry_weight(strength) + perk_bonus
+
+    @staticmethod
+    def _calculate_melee_bonus(strength, perk_bonus):
+        """Calculate melee damage bonus from effective strength and perk bonuses (maluses).
+
+        :param strength: effective strength
+        :param perk_bonus: bonuses (maluses) to melee damage given by active perks
+        :return: melee damage bonus
+        """
+        return game_config.lookup_melee_bonus(strength) + perk_bonus
+
+    @staticmethod
+    def _calculate_max_health(character, endurance, perk_bonus):
+        """Calculate maximum health from character's level and health bonus, effective endurance and perk bonuses
+        (maluses).
+
+        :param character: Character derived object to get level and health bonus from
+        :param endurance: effective endurance
+        :param perk_bonus: bonuses (maluses) to maximum health given by active perks
+        :return: maximum health
+        """
+        return game_config.lookup_max_health(endurance, character.level) + character.health_bonus + perk_bonus
+
+    @staticmethod
+    def _calculate_rad_res(character, endurance, perk_bonus):
+        """Calculate radiation resistance from effective endurance, perk bonuses (maluses) and character's worn armor.
+
+        :param character: Character derived object to get worn armor from
+        :param endurance: effective endurance
+        :param perk_bonus: bonuses (maluses) to radiation resistance given by active perks
+        :return: radiation resistance
+        """
+        rad_res = game_config.lookup_rad_res(endurance) + perk_bonus
+        if character.inventory.equipped_armor is not None:
+            rad_res += character.inventory.equipped_armor.rad_res
+        return rad_res
+
+    @staticmethod
+    def _calculate_evasion(character, agility, perk_bonus):
+        """Calculate evasion from effective agility, perk bonuses (maluses) and character's worn armor.
+
+        :param character: Character derived object to get worn armor from
+        :param agility: effective agility
+        :param perk_bonus: bonuses (maluses) to evasion given by active perks
+        :return: evasion
+        """
+        evasion = game_config.lookup_evasion(agility) + perk_bonus
+        if character.inventory.equipped_armor is not None:
+            evasion += character.inventory.equipped_armor.evasion
+        return evasion
+
+    @staticmethod
+    def _calculate_max_ap(agility, perk_bonus):
+        """Calculate maximum action points from effective agility and perk bonuses (maluses).
+
+        :param agility: effective agility
+        :param perk_bonus: bonuses (maluses) to maximum action points given by active perks
+        :return: maximum action points
+        """
+        return game_config.lookup_max_ap(agility) + perk_bonus
+
+    @staticmethod
+    def _calculate_exp_mult(intelligence, perk_bonus):
+        """Calculate experience gain multiplier from effective intelligence and perk bonuses (maluses).
+
+        :param intelligence: effective intelligence
+        :param perk_bonus: bonuses (maluses) to experience gain multiplier given by active perks
+        :return: experience gain multiplier
+        """
+        return game_config.lookup_exp_mult(intelligence) + perk_bonus
 
     @staticmethod
     def _check_valid_character(character):
@@ -412,3 +584,106 @@ class CharacterDerivedStatCalculator:
         """
         if not isinstance(character, Character):
             raise StatCalculatorError("incorrect object type for character")
+
+
+class CharacterStatSheetCalculator:
+    """This class calculates stat sheets (all effective attributes, skills and derived stats) of multiple characters at
+    once, for example for a whole party or group of critters.
+
+    Every character's active perks are walked only once, instead of once per every stat. Stat sheets can be returned as
+    one dictionary per character, or as columns (one list per stat, with None for skills of characters without skills),
+    optionally converted to NumPy arrays.
+
+    The class uses StatCalculatorError exception, which is raised when provided characters are incorrect or NumPy is
+    not available when requesting arrays.
+    """
+
+    _derived_stats = (("carry_weight", "carry_wg"), ("melee_bonus", "melee_bonus"), ("max_health", "health_bonus"),
+                      ("rad_res", "rad_res"), ("evasion", "evasion"), ("max_ap", "max_ap"), ("exp_mult", "exp_mult"))
+
+    @staticmethod
+    def get_stat_names():
+        """Get names of all stats in stat sheets, in order of stat sheet columns.
+
+        :return: tuple of stat names
+        """
+        derived_stats = tuple(stat for stat, _ in CharacterStatSheetCalculator._derived_stats)
+        return PerkStatAggregator.attributes + PerkStatAggregator.skills + derived_stats
+
+    @staticmethod
+    def compute_stat_sheets(characters, as_columns=False, as_arrays=False):
+        """Compute stat sheets of specified characters.
+
+        :param characters: iterable of Character derived objects to compute stat sheets for
+        :param as_columns: whether to return stat sheets as columns (defaults to False)
+        :param as_arrays: whether to return stat sheets as columns of NumPy arrays (defaults to False)
+        :raises StatCalculatorError: when any of specified characters is incorrect or NumPy is not available
+        :return: list of dictionaries of stat names and values (one per character), or dictionary of stat names and
+                 columns of values (in order of characters)
+        """
+        stat_sheets = [CharacterStatSheetCalculator._compute_stat_sheet(character) for character in characters]
+        if not as_columns and not as_arrays:
+            return stat_sheets
+        columns = dict()
+        for stat in CharacterStatSheetCalculator.get_stat_names():
+            columns[stat] = [stat_sheet.get(stat) for stat_sheet in stat_sheets]
+        if as_arrays:
+            return CharacterStatSheetCalculator._convert_to_arrays(columns)
+        return columns
+
+    @staticmethod
+    def _compute_stat_sheet(character):
+        """Compute stat sheet of specified character, walking character's active perks once.
+
+        :param character: Character derived object to compute stat sheet for
+        :raises StatCalculatorError: when specified character is incorrect
+        :return: dictionary of stat names and values
+        """
+        if not isinstance(character, Character):
+            raise StatCalculatorError("incorrect object type for character")
+        bonuses = PerkStatAggregator.get_stat_bonuses(perk_inv=character.perks)
+        stat_sheet = dict()
+        for attribute in PerkStatAggregator.attributes:
+            stat_sheet[attribute] = getattr(character, attribute) + bonuses[attribute]
+        for skill in PerkStatAggregator.skills:
+            if hasattr(character, skill):
+                stat_sheet[skill] = getattr(character, skill) + bonuses[skill]
+        strength = stat_sheet["strength"]
+        endurance = stat_sheet["endurance"]
+        agility = stat_sheet["agility"]
+        stat_sheet["carry_weight"] = CharacterDerivedStatCalculator._calculate_carry_weight(
+            strength=strength, perk_bonus=bonuses["carry_wg"])
+        stat_sheet["melee_bonus"] = CharacterDerivedStatCalculator._calculate_melee_bonus(
+            strength=strength, perk_bonus=bonuses["melee_bonus"])
+        stat_sheet["max_health"] = CharacterDerivedStatCalculator._calculate_max_health(
+            character=character, endurance=endurance, perk_bonus=bonuses["health_bonus"])
+        stat_sheet["rad_res"] = CharacterDerivedStatCalculator._calculate_rad_res(
+            character=character, endurance=endurance, perk_bonus=bonuses["rad_res"])
+        stat_sheet["evasion"] = CharacterDerivedStatCalculator._calculate_evasion(
+            character=character, agility=agility, perk_bonus=bonuses["evasion"])
+        stat_sheet["max_ap"] = CharacterDerivedStatCalculator._calculate_max_ap(
+            agility=agility, perk_bonus=bonuses["max_ap"])
+        stat_sheet["exp_mult"] = CharacterDerivedStatCalculator._calculate_exp_mult(
+            intelligence=stat_sheet["intelligence"], perk_bonus=bonuses["exp_mult"])
+        return stat_sheet
+
+    @staticmethod
+    def _convert_to_arrays(columns):
+        """Convert columns of stat values to NumPy arrays. Columns with missing values (skills of characters without
+        skills) are converted to float arrays with NaN in place of missing values.
+
+        :param columns: dictionary of stat names and lists of values
+        :raises StatCalculatorError: when NumPy is not available
+        :return: dictionary of stat names and NumPy arrays of values
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise StatCalculatorError("numpy is required to compute stat sheets as arrays")
+        arrays = dict()
+        for stat, column in columns.items():
+            if None in column:
+                arrays[stat] = numpy.array([numpy.nan if value is None else value for value in column], dtype=float)
+            else:
+                arrays[stat] = numpy.array(column)
+        return arrays
@@ -0,0 +1,96 @@
+import heapq
+
+
+class StatusEffectTimeline:
+    """This class represents timeline (turn counter) that timed status effects are attached to.
+
+    Status effects attached to the timeline don't store their remaining duration, but turn in which they expire, so
+    advancing the timeline by any number of turns lowers duration of all attached status effects at once. Expiry turns
+    are kept in priority queue (min-heap), so expired status effects can be collected without checking every attached
+    status effect. Entries of status effects which were detached or whose expiry turn changed are discarded lazily.
+    """
+
+    def __init__(self):
+        """Initializes instance of the class with no attached status effects, starting at turn 0."""
+        self._turn = 0
+        self._sequence = 0
+        self._owners = dict()
+        self._expirations = list()
+
+    def __len__(self):
+        return len(self._owners)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._owners = {id(status_effect): (status_effect, owner) for status_effect, owner in self._owners.values()}
+
+    @property
+    def turn(self):
+        """Gets timeline's current turn.
+
+        :return: current turn
+        """
+        return self._turn
+
+    def attach_status_effect(self, status_effect, owner=None):
+        """Attaches specified status effect to the timeline, scheduling its expiry.
+
+        :param status_effect: StatusEffect object to attach
+        :param owner: object owning the status effect, returned along with it when it expires (defaults to None)
+        """
+        self._owners[id(status_effect)] = (status_effect, owner)
+        status_effect.attach_to_timeline(self)
+        self.reschedule(status_effect)
+
+    def detach_status_effect(self, status_effect):
+        """Detaches specified status effect from the timeline, so that it keeps its current duration.
+
+        :param status_effect: StatusEffect object to detach
+        """
+        entry = self._owners.get(id(status_effect))
+        if entry is not None and entry[0] is status_effect:
+            del self._owners[id(status_effect)]
+            status_effect.detach_from_timeline()
+
+    def reschedule(self, status_effect):
+        """Schedules expiry of specified attached status effect again, after its expiry turn changed. Permanent
+        status effects are not scheduled.
+
+        :param status_effect: StatusEffect object attached to the timeline
+        """
+        if status_effect.expiry_turn is not None and self._is_attached(status_effect):
+            heapq.heappush(self._expirations, (status_effect.expiry_turn, self._sequence, status_effect))
+            self._sequence += 1
+
+    def advance(self, turns=1):
+        """Advances timeline by specified number of turns.
+
+        :param turns: number of turns to advance timeline by (defaults to 1)
+        :raises ValueError: when number of turns is negative
+        """
+        if turns < 0:
+            raise ValueError("can't advance timeline by negative number of turns")
+        self._turn += turns
+
+    def pop_expired(self):
+        """Gets all attached status effects which expired (reached their expiry turn) and aren't collected yet.
+
+        Each expired status effect is returned only once. Status effects remain attached until they are detached.
+
+        :return: list of tuples of expired StatusEffect object and its owner
+        """
+        expired = list()
+        while len(self._expirations) > 0 and self._expirations[0][0] <= self._turn:
+            expiry_turn, _, status_effect = heapq.heappop(self._expirations)
+            if self._is_attached(status_effect) and status_effect.expiry_turn == expiry_turn:
+                expired.append(self._owners[id(status_effect)])
+        return expired
+
+    def _is_attached(self, status_effect):
+        """Checks whether specified status effect is attached to the timeline.
+
+        :param status_effect: StatusEffect object to check
+        :return: True if the status effect is attached, False otherwise
+        """
+        entry = self._owners.get(id(status_effect))
+        return entry is not None and entry[0] is status_effect
@@ -0,0 +1,277 @@
+from collections import namedtuple
+
+import app.config.game_config as game_config
+from app.characters.characters import Character
+from app.items.stackables import Ammo
+from app.items.weapons import Weapon, RangedWeapon
+from app.mechanics.combat_calculators import APCostCalculator, EffectiveAccuracyCalculator, EffectiveDamageCalculator
+
+
+TacticalAction = namedtuple("TacticalAction", ["action", "weapon", "target", "ap_cost", "expected_damage"])
+
+
+class TacticalPlanner:
+    """This class plans turns of NPCs during combat: sequences of actions (attacking a target, reloading equipped
+    weapon, equipping another carried weapon) fitting in NPC's action points, which maximize expected damage done.
+
+    Actions are evaluated without rolling dice: attack's expected damage is chance to hit (see
+    EffectiveAccuracyCalculator) multiplied by expected effective damage of a hit (see EffectiveDamageCalculator), with
+    damage above target's current health wasted. Attacks cost weapon's action points (see APCostCalculator) and, for
+    ranged weapons, one loaded ammo. Reloading follows rules of InventoryWeaponReloader (carried ammo with ID equal to
+    weapon's ammo type is loaded), and reloading and equipping cost fixed numbers of action points.
+
+    Plans are found by depth-limited search over combat states, with transposition table keyed on compact state
+    (remaining action points, equipped weapon, ammo loaded in weapons, carried ammo, damage done to targets and number
+    of actions taken), so that the same state reached by different orders of actions is evaluated once. Only targets
+    with the highest expected damage per action point are considered. Evaluations of character's weapons against
+    targets are memoized until character, target or game configuration changes (see Character.version), so planning
+    next turns of the same combat is cheap.
+
+    The class provides TacticalPlannerError exception, which is raised when planner parameters or planned characters are
+    incorrect.
+    """
+
+    class TacticalPlannerError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during tactical planning."""
+        pass
+
+    def __init__(self, reload_ap_cost=2, equip_ap_cost=1, max_actions=6, max_targets=3):
+        """Initializes instance of the class with specified planning parameters.
+
+        :param reload_ap_cost: action points cost of reloading equipped weapon (defaults to 2)
+        :param equip_ap_cost: action points cost of equipping carried weapon (defaults to 1)
+        :param max_actions: maximum number of actions in planned turn (defaults to 6)
+        :param max_targets: maximum number of targets considered in planned turn (defaults to 3)
+        :raises TacticalPlannerError: when specified parameters are incorrect
+        """
+        for name, value in (("reload_ap_cost", reload_ap_cost), ("equip_ap_cost", equip_ap_cost)):
+            if not isinstance(value, int) or value < 0:
+                raise TacticalPlanner.TacticalPlannerError("incorrect action points cost: {}".format(name))
+        for name, value in (("max_actions", max_actions), ("max_targets", max_targets)):
+            if not isinstance(value, int) or value < 1:
+                raise TacticalPlanner.TacticalPlannerError("incorrect planning limit: {}".format(name))
+        self._reload_ap_cost = reload_ap_cost
+        self._equip_ap_cost = equip_ap_cost
+        self._max_actions = max_actions
+        self._max_targets = max_targets
+        self._evaluations = dict()
+
+    def plan_turn(self, character, opponents, action_points=None):
+        """Plans character's turn against specified opponents.
+
+        :param character: Character derived object to plan turn for
+        :param opponents: iterable of Character derived objects which can be attacked (opponents with no health left
+                          are ignored)
+        :param action_points: action points available in the turn (defaults to None, which means character's current
+                              action points)
+        :raises TacticalPlannerError: when specified characters or action points are incorrect
+        :raises CombatCalculatorError: when opponents have no armor equipped
+        :return: list of TacticalAction tuples of action name ("attack", "reload" or "equip"), weapon, target (None for
+                 reloading and equipping), action points cost and expected damage, in order of execution
+        """
+        if not isinstance(character, Character):
+            raise TacticalPlanner.TacticalPlannerError("incorrect object type for character")
+        if action_points is None:
+            action_points = character.action_points
+        if not isinstance(action_points, int) or action_points < 0:
+            raise TacticalPlanner.TacticalPlannerError("incorrect action points: {}".format(action_points))
+        targets = list()
+        for opponent in opponents:
+            if not isinstance(opponent, Character):
+                raise TacticalPlanner.TacticalPlannerError("incorrect object type for opponent")
+            if opponent is not character and opponent.health > 0:
+                targets.append(opponent)
+        inv = character.inventory
+        weapons = [weapon for weapon in [inv.equipped_weapon] + list(inv.items) if isinstance(weapon, Weapon)]
+        if len(targets) == 0 or len(weapons) == 0 or inv.equipped_weapon is None:
+            return list()
+        evaluations = self._get_evaluations(character=character, weapons=weapons, targets=targets)
+        targets = TacticalPlanner._select_targets(evaluations=evaluations, targets=targets, limit=self._max_targets)
+        return self._search_plan(character=character, weapons=weapons, targets=targets, evaluations=evaluations,
+                                 action_points=action_points)
+
+    def remove_character(self, character):
+        """Removes memoized evaluations of specified character (for example, when it leaves combat).
+
+        :param character: Character derived object to remove evaluations for
+        """
+        entry = self._evaluations.get(id(character))
+        if entry is not None and entry[0] is character:
+            del self._evaluations[id(character)]
+
+    def clear(self):
+        """Removes all memoized evaluations."""
+        self._evaluations.clear()
+
+    def _get_evaluations(self, character, weapons, targets):
+        """Gets character's evaluations of specified weapons against specified targets, evaluating the ones which are
+        not memoized.
+
+        Weapons are evaluated without equipping them, so evaluating doesn't change character's version.
+
+        :param character: Character derived object to get evaluations for
+        :param weapons: list of character's Weapon derived objects
+        :param targets: list of Character derived objects
+        :return: dictionary of weapon IDs and tuples of weapon, action points cost and dictionary of target IDs and
+                 tuples of target, target's version and expected damage per attack
+        """
+        versions = (character.version, game_config.get_config_version())
+        entry = self._evaluations.get(id(character))
+        if entry is None or entry[0] is not character or entry[1] != versions:
+            evaluations = dict()
+        else:
+            evaluations = entry[2]
+        missing = [weapon for weapon in weapons
+                   if not TacticalPlanner._is_evaluated(evaluations=evaluations, weapon=weapon, targets=targets)]
+        for weapon in missing:
+            weapon_entry = evaluations.get(id(weapon))
+            if weapon_entry is None or weapon_entry[0] is not weapon:
+                weapon_entry = (weapon, APCostCalculator.get_ap_cost(character=character, weapon=weapon), dict())
+                evaluations[id(weapon)] = weapon_entry
+            for target in targets:
+                hit_chance = EffectiveAccuracyCalculator.get_hit_chance(character=character, opponent=target,
+                                                                        weapon=weapon)
+                expected_damage = EffectiveDamageCalculator.get_expected_damage(character=character, opponent=target,
+                                                                                weapon=weapon)
+                weapon_entry[2][id(target)] = (target, target.version, hit_chance * expected_damage)
+        self._evaluations[id(character)] = (character, versions, evaluations)
+        return evaluations
+
+    @staticmethod
+    def _is_evaluated(evaluations, weapon, targets):
+        """Checks whether specified weapon has memoized evaluations against all specified targets.
+
+        :param evaluations: dictionary of memoized evaluations
+        :param weapon: Weapon derived object
+        :param targets: list of Character derived objects
+        :return: True if all evaluations are memoized, False otherwise
+        """
+        weapon_entry = evaluations.get(id(weapon))
+        if weapon_entry is None or weapon_entry[0] is not weapon:
+            return False
+        for target in targets:
+            target_entry = weapon_entry[2].get(id(target))
+            if target_entry is None or target_entry[0] is not target or target_entry[1] != target.version:
+                return False
+        return True
+
+    @staticmethod
+    def _select_targets(evaluations, targets, limit):
+        """Selects specified number of targets with the highest expected damage per action point of any weapon.
+
+        :param evaluations: dictionary of memoized evaluations
+        :param targets: list of Character derived objects
+        :param limit: maximum number of targets
+        :return: list of selected Character derived objects
+        """
+        if len(targets) <= limit:
+            return targets
+
+        def damage_per_ap(target):
+            return max(weapon_entry[2][id(target)][2] / max(weapon_entry[1], 1)
+                       for weapon_entry in evaluations.values() if id(target) in weapon_entry[2])
+
+        return sorted(targets, key=damage_per_ap, reverse=True)[:limit]
+
+    def _search_plan(self, character, weapons, targets, evaluations, action_points):
+        """Searches for the sequence of actions with the highest expected damage.
+
+        :param character: Character derived object to plan turn for
+        :param weapons: list of character's Weapon derived objects, equipped weapon first
+        :param targets: list of Character derived objects to consider
+        :param evaluations: dictionary of memoized evaluations
+        :param action_points: action points available in the turn
+        :return: list of TacticalAction tuples
+        """
+        inv = character.inventory
+        ammo_types = sorted(set(weapon.ammo_type for weapon in weapons if isinstance(weapon, RangedWeapon)))
+        reserves = tuple(sum(ammo.current_amount for ammo in inv.get_items_with_id(ammo_type)
+                             if isinstance(ammo, Ammo)) for ammo_type in ammo_types)
+        weapon_params = list()
+        for weapon in weapons:
+            _, ap_cost, target_entries = evaluations[id(weapon)]
+            if isinstance(weapon, RangedWeapon):
+                ranged_params = (weapon.clip_size, ammo_types.index(weapon.ammo_type))
+            else:
+                ranged_params = None
+            weapon_params.append((ap_cost, ranged_params,
+                                  tuple(target_entries[id(target)][2] for target in targets)))
+        loaded = tuple(weapon.current_ammo if isinstance(weapon, RangedWeapon) else 0 for weapon in weapons)
+        health = tuple(target.health for target in targets)
+        state = (action_points, 0, loaded, reserves, (0,) * len(targets), False)
+        table = dict()
+        self._search(state=state, depth=0, weapon_params=weapon_params, health=health, table=table)
+        plan = list()
+        while table[(state, len(plan))][1] is not None:
+            _, action, state = table[(state, len(plan))]
+            name, weapon_idx, target_idx, ap_cost, expected_damage = action
+            plan.append(TacticalAction(action=name, weapon=weapons[weapon_idx],
+                                       target=targets[target_idx] if target_idx is not None else None,
+                                       ap_cost=ap_cost, expected_damage=expected_damage))
+        return plan
+
+    def _search(self, state, depth, weapon_params, health, table):
+        """Finds the highest expected damage reachable from specified state, storing it in transposition table along
+        with the best action and the state it leads to.
+
+        :param state: tuple of remaining action points, index of equipped weapon, ammo loaded in weapons, carried ammo
+                      of every ammo type, damage done to targets and whether last action was equipping
+        :param depth: number of actions taken so far
+        :param weapon_params: list of tuples of weapons' action points cost, clip size and ammo type index (None for
+                              melee weapons) and expected damage per attack against targets
+        :param health: tuple of targets' current health
+        :param table: transposition table of states with numbers of actions taken and tuples of expected damage, action
+                      and next state
+        :return: the highest expected damage reachable from specified state
+        """
+        entry = table.get((state, depth))
+        if entry is not None:
+            return entry[0]
+        best = (0, None, None)
+        if depth < self._max_actions:
+            for action, next_state, gain in self._get_actions(state=state, weapon_params=weapon_params,
+                                                              health=health):
+                value = gain + self._search(state=next_state, depth=depth + 1, weapon_params=weapon_params,
+                                            health=health, table=table)
+                if value > best[0] + 1e-9:
+                    best = (value, action, next_state)
+        table[(state, depth)] = best
+        return best[0]
+
+    def _get_actions(self, state, weapon_params, health):
+        """Gets actions possible in specified state.
+
+        :param state: tuple describing combat state (see _search method)
+        :param weapon_params: list of tuples describing weapons (see _search method)
+        :param health: tuple of targets' current health
+        :return: generator of tuples of action, state it leads to and expected damage it does
+        """
+        action_points, weapon_idx, loaded, reserves, damage_done, last_equipped = state
+        ap_cost, ranged_params, expected_damages = weapon_params[weapon_idx]
+        if ap_cost <= action_points and (ranged_params is None or loaded[weapon_idx] > 0):
+            next_loaded = loaded
+            if ranged_params is not None:
+                next_loaded = loaded[:weapon_idx] + (loaded[weapon_idx] - 1,) + loaded[weapon_idx + 1:]
+            for target_idx, expected_damage in enumerate(expected_damages):
+                gain = min(expected_damage, health[target_idx] - damage_done[target_idx])
+                if gain <= 0:
+                    continue
+                next_damage_done = damage_done[:target_idx] + (round(damage_done[target_idx] + gain, 6),) + \
+                    damage_done[target_idx + 1:]
+                yield (("attack", weapon_idx, target_idx, ap_cost, gain),
+                       (action_points - ap_cost, weapon_idx, next_loaded, reserves, next_damage_done, False), gain)
+        if ranged_params is not None and self._reload_ap_cost <= action_points:
+            clip_size, ammo_idx = ranged_params
+            amount = min(clip_size - loaded[weapon_idx], reserves[ammo_idx])
+            if amount > 0:
+                next_loaded = loaded[:weapon_idx] + (loaded[weapon_idx] + amount,) + loaded[weapon_idx + 1:]
+                next_reserves = reserves[:ammo_idx] + (reserves[ammo_idx] - amount,) + reserves[ammo_idx + 1:]
+                yield (("reload", weapon_idx, None, self._reload_ap_cost, 0),
+                       (action_points - self._reload_ap_cost, weapon_idx, next_loaded, next_reserves, damage_done,
+                        False), 0)
+        if not last_equipped and self._equip_ap_cost <= action_points:
+            for next_weapon_idx in range(len(weapon_params)):
+                if next_weapon_idx != weapon_idx:
+                    yield (("equip", next_weapon_idx, None, self._equip_ap_cost, 0),
+                           (action_points - self._equip_ap_cost, next_weapon_idx, loaded, reserves, damage_done, True),
+                           0)
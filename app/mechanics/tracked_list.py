@@ -0,0 +1,145 @@
+def _restore_tracked_list(cls, objects, state):
+    """Restores tracked list from its contents and state, without notifying its owner about restored objects. Used when
+    tracked list is unpickled or copied, as its owner may not be fully restored yet.
+
+    :param cls: TrackedList class (or its subclass) to restore
+    :param objects: list of objects contained in the list
+    :param state: dictionary of list's attributes
+    :return: restored TrackedList object
+    """
+    tracked_list = cls.__new__(cls)
+    list.extend(tracked_list, objects)
+    tracked_list.__dict__.update(state)
+    return tracked_list
+
+
+class TrackedList(list):
+    """This class derives from built-in list. It represents list of objects, which notifies its owner whenever objects
+    are added to or removed from the list.
+
+    The class is used by containers (inventories, perk inventories) exposing their contents as plain lists, so that
+    indexes and caches built on top of those contents can be maintained incrementally, no matter which operator mutates
+    the list. Every mutation also increments list's version, which can be used to cheaply check whether cached results
+    based on list's contents are still valid.
+    """
+
+    def __init__(self, on_add=None, on_remove=None):
+        """Initializes empty list with provided optional callbacks.
+
+        :param on_add: callable called with every object added to the list (defaults to None)
+        :param on_remove: callable called with every object removed from the list (defaults to None)
+        """
+        super().__init__()
+        self._on_add = on_add
+        self._on_remove = on_remove
+        self._version = 0
+
+    @property
+    def version(self):
+        """Gets list's version, incremented on every mutation.
+
+        :return: list's version
+        """
+        return self._version
+
+    def append(self, obj):
+        super().append(obj)
+        self._added(obj)
+
+    def extend(self, objects):
+        objects = list(objects)
+        super().extend(objects)
+        for obj in objects:
+            self._added(obj)
+
+    def __iadd__(self, objects):
+        self.extend(objects)
+        return self
+
+    def __imul__(self, count):
+        objects = list(self)
+        super().__imul__(count)
+        if len(self) == 0:
+            for obj in objects:
+                self._removed(obj)
+        else:
+            for obj in objects * (count - 1):
+                self._added(obj)
+        return self
+
+    def __reduce_ex__(self, protocol):
+        return _restore_tracked_list, (self.__class__, list(self), self.__dict__)
+
+    def insert(self, idx, obj):
+        super().insert(idx, obj)
+        self._added(obj)
+
+    def remove(self, obj):
+        idx = self.index(obj)
+        self.pop(idx)
+
+    def pop(self, idx=-1):
+        obj = super().pop(idx)
+        self._removed(obj)
+        return obj
+
+    def clear(self):
+        objects = list(self)
+        super().clear()
+        for obj in objects:
+            self._removed(obj)
+
+    def remove_objects(self, objects):
+        """Removes all specified objects (compared by identity) from the list in a single pass.
+
+        :param objects: iterable of objects to remove
+        """
+        ids_to_remove = {id(obj) for obj in objects}
+        if len(ids_to_remove) == 0:
+            return
+        removed_objects = [obj for obj in self if id(obj) in ids_to_remove]
+        super().__setitem__(slice(None), [obj for obj in self if id(obj) not in ids_to_remove])
+        for obj in removed_objects:
+            self._removed(obj)
+
+    def __setitem__(self, idx, obj):
+        if isinstance(idx, slice):
+            old_objects = self[idx]
+            obj = list(obj)
+            super().__setitem__(idx, obj)
+            for old_obj in old_objects:
+                self._removed(old_obj)
+            for new_obj in obj:
+                self._added(new_obj)
+        else:
+            old_obj = self[idx]
+            super().__setitem__(idx, obj)
+            self._removed(old_obj)
+            self._added(obj)
+
+    def __delitem__(self, idx):
+        if isinstance(idx, slice):
+            old_objects = self[idx]
+        else:
+            old_objects = [self[idx]]
+        super().__delitem__(idx)
+        for old_obj in old_objects:
+            self._removed(old_obj)
+
+    def _added(self, obj):
+        """Notifies owner about object added to the list and increments list's version.
+
+        :param obj: object added to the list
+        """
+        self._version += 1
+        if self._on_add is not None and obj is not None:
+            self._on_add(obj)
+
+    def _removed(self, obj):
+        """Notifies owner about object removed from the list and increments list's version.
+
+        :param obj: object removed from the list
+        """
+        self._version += 1
+        if self._on_remove is not None and obj is not None:
+            self._on_remove(obj)
@@ -0,0 +1,115 @@
+from app.characters.characters import Character
+from app.mechanics.status_effect_timeline import StatusEffectTimeline
+
+
+class WorldClock:
+    """This class represents world-level clock, which keeps track of status effects of all registered characters.
+
+    Status effects of every registered character are attached to one shared timeline, so advancing the clock by any
+    number of turns (for example, when characters rest for several hours) lowers duration of all status effects at once
+    and removes all expired status effects in a single batch, instead of ticking every character every turn. Hooks
+    (callables) added to the clock are called with every character whose status effects expired, so that results cached
+    for the character can be invalidated. Durations lowered by advancing the clock are not reported, as they're
+    determined by the clock's turn (see WorldJournal, which saves the turn instead of every character with timed status
+    effects).
+
+    The class provides WorldClockError exception, which is raised when registering incorrect characters or advancing
+    the clock by incorrect number of turns.
+    """
+
+    class WorldClockError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during world clock manipulation."""
+        pass
+
+    def __init__(self):
+        """Initializes instance of the class with no registered characters and no hooks, starting at turn 0."""
+        self._timeline = StatusEffectTimeline()
+        self._characters = dict()
+        self._hooks = list()
+
+    def __len__(self):
+        return len(self._characters)
+
+    @property
+    def turn(self):
+        """Gets clock's current turn.
+
+        :return: current turn
+        """
+        return self._timeline.turn
+
+    @property
+    def characters(self):
+        """Gets a list of registered characters.
+
+        :return: list of Character derived objects
+        """
+        return list(self._characters.values())
+
+    def add_character(self, character):
+        """Registers specified character, attaching its status effects to the clock's timeline.
+
+        :param character: Character derived object to register
+        :raises WorldClockError: when specified character is incorrect or already registered
+        """
+        if not isinstance(character, Character):
+            raise WorldClock.WorldClockError("incorrect object type for character")
+        if id(character.perks) in self._characters:
+            raise WorldClock.WorldClockError("character: {} is already registered".format(character.name))
+        character.perks.bind_timeline(timeline=self._timeline)
+        self._characters[id(character.perks)] = character
+
+    def remove_character(self, character):
+        """Unregisters specified character, moving its status effects back to its own timeline.
+
+        :param character: Character derived object to unregister
+        :raises WorldClockError: when specified character is not registered
+        """
+        if not isinstance(character, Character) or self._characters.get(id(character.perks)) is not character:
+            raise WorldClock.WorldClockError("character is not registered")
+        del self._characters[id(character.perks)]
+        character.perks.bind_timeline()
+
+    def add_hook(self, hook):
+        """Adds hook called with every character whose status effects expired when advancing the clock.
+
+        :param hook: callable taking Character derived object as its only argument
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Removes specified hook.
+
+        :param hook: previously added callable
+        :raises WorldClockError: when specified hook wasn't added
+        """
+        try:
+            self._hooks.remove(hook)
+        except ValueError:
+            raise WorldClock.WorldClockError("no such hook in world clock")
+
+    def advance(self, turns=1):
+        """Advances the clock by specified number of turns, removing all status effects which expired in that time from
+        registered characters and calling hooks for every affected character.
+
+        :param turns: number of turns to advance the clock by (defaults to 1)
+        :raises WorldClockError: when number of turns is incorrect
+        :return: list of Character derived objects whose status effects expired
+        """
+        if not isinstance(turns, int) or turns < 0:
+            raise WorldClock.WorldClockError("incorrect number of turns to advance world clock by: {}".format(turns))
+        self._timeline.advance(turns=turns)
+        expired = dict()
+        for status_effect, perk_inv in self._timeline.pop_expired():
+            expired.setdefault(id(perk_inv), (perk_inv, list()))[1].append(status_effect)
+        affected_characters = list()
+        for perk_inv_id, (perk_inv, status_effects) in expired.items():
+            perk_inv.perks.remove_objects(status_effects)
+            perk_inv.notify_hooks()
+            character = self._characters.get(perk_inv_id)
+            if character is not None:
+                affected_characters.append(character)
+        for character in affected_characters:
+            for hook in self._hooks:
+                hook(character)
+        return affected_characters
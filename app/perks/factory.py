@@ -1,4 +1,5 @@
 from app.files.file_handler import FileHandler
+from app.files.file_watcher import DataFileWatcher
 from app.perks.perks import CharacterPerk, PlayerTrait, StatusEffect
 
 
@@ -32,10 +33,36 @@ class PerkFactory:
         except FileNotFoundError:
             raise PerkFactory.PerkBuildError("perk data is unavailable")
         else:
+            self._id_index = self._create_id_index()
+            self._watcher = DataFileWatcher(data_file=data_file, data=self._data)
             self._line_number_containing_perk_id = None
             self._line_number_containing_last_data = None
             self._perk_id_to_find = None
 
+    def update_data(self):
+        """Checks whether data file was modified since data was obtained and, if so, obtains data again, updating index
+        of perk IDs.
+
+        :raises PerkBuildError: when data file is no longer available
+        :return: set of IDs of perks which were added, changed or removed (empty set when data file wasn't modified)
+        """
+        try:
+            update = self._watcher.poll()
+        except FileNotFoundError:
+            raise PerkFactory.PerkBuildError("perk data is unavailable")
+        if update is None:
+            return set()
+        self._data, changed_ids = update
+        self._id_index = self._create_id_index()
+        return changed_ids
+
+    def get_perk_ids(self):
+        """Gets IDs of all perks existing in obtained data.
+
+        :return: list of perk IDs, in order of appearance in obtained data
+        """
+        return list(self._id_index.keys())
+
     def create_perk(self, perk_id):
         """Searches for specified perk based on its ID and returns instance of Perk derived class with parameters
         extracted from previously obtained data.
@@ -44,13 +71,25 @@ class PerkFactory:
         :raises PerkBuildError: when specified perk ID is not found
         :return: Perk derived object
         """
-        for idx, line in enumerate(self._data):
-            if "id:" in line and line.split()[-1] == perk_id:
-                self._line_number_containing_perk_id = idx
-                self._perk_id_to_find = perk_id
-                return self._create_found_perk()
-        else:
+        try:
+            self._line_number_containing_perk_id = self._id_index[perk_id]
+        except KeyError:
             raise PerkFactory.PerkBuildError("incorrect perk ID")
+        else:
+            self._perk_id_to_find = perk_id
+            return self._create_found_perk()
+
+    def _create_id_index(self):
+        """Creates index of perk IDs and numbers of lines containing them, so that perks can be found without searching
+        whole obtained data. When ID is repeated, its first occurrence is indexed.
+
+        :return: dictionary of perk IDs and line numbers
+        """
+        id_index = dict()
+        for idx, line in enumerate(self._data):
+            if line.startswith("id:"):
+                id_index.setdefault(line.split()[-1], idx)
+        return id_index
 
     def _create_found_perk(self):
         """Extracts previously found perk's tags in order to call appropriate method to create instance of respective
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
 
+from app.tags.tags import TagRegistry
+
 
 class Perk(ABC):
     """This is abstract base class representing perks existing in the game and contains necessary and common parameters
@@ -18,9 +20,12 @@ class Perk(ABC):
         """
         self._perk_id = perk_id
         self._tags = tags
+        self._tag_set = TagRegistry.get_tag_set(tags)
+        self._tag_mask = TagRegistry.get_tag_mask(tags)
         self._name = name
         self._desc = desc
         self._effects = effects
+        self._tagged_effects = dict()
 
     @property
     def perk_id(self):
@@ -38,6 +43,22 @@ class Perk(ABC):
         """
         return self._tags
 
+    @property
+    def tag_set(self):
+        """Gets perk's tags as frozen set of interned tags.
+
+        :return: perk's tag set
+        """
+        return self._tag_set
+
+    @property
+    def tag_mask(self):
+        """Gets perk's tags as bit mask of interned tags.
+
+        :return: perk's tag mask
+        """
+        return self._tag_mask
+
     @property
     def name(self):
         """Gets perk's name.
@@ -72,6 +93,32 @@ class Perk(ABC):
             effects_list.append(effect)
         return effects_list
 
+    def get_tagged_effects(self, stat):
+        """Gets perk's effects modifying specified stat only when specific tags are matched (for example, damage bonus
+        with certain weapon types or against certain opponents).
+
+        Such effects are formatted as comma separated tags followed by name of the stat and value, e.g. "weapon, short,
+        damage, 2". Effects are parsed once per stat and cached, with their tags converted to bit masks of interned
+        tags.
+
+        :param stat: name of the stat to get tagged effects for
+        :return: list of tuples of tag mask and value
+        """
+        try:
+            return self._tagged_effects[stat]
+        except KeyError:
+            tagged_effects = list()
+            for effect in self.get_effects_list():
+                effect = effect.split(", ")
+                if stat not in effect:
+                    continue
+                effect.remove(stat)
+                effect_value = int(effect.pop(-1))
+                if len(effect) > 0:
+                    tagged_effects.append((TagRegistry.get_tag_mask(effect), effect_value))
+            self._tagged_effects[stat] = tagged_effects
+            return tagged_effects
+
 
 class CharacterPerk(Perk):
     """This class derives from Perk abstract base class. It represents character perks existing in the game and contains
@@ -190,6 +237,8 @@ class StatusEffect(Perk):
         """
         super().__init__(perk_id, tags, name, desc, effects)
         self._duration = duration
+        self._timeline = None
+        self._expiry_turn = None
 
     def __str__(self):
         str_print = "ID: {}, tags: {}, name: {}, description: {},\n".format(self._perk_id, self._tags, self._name,
@@ -198,25 +247,73 @@ class StatusEffect(Perk):
             str_print += "effect: {}, ".format(self._effects)
         else:
             str_print += "effects: {}, ".format(self._effects)
-        if self._duration < 0:
+        duration = self.duration
+        if duration < 0:
             str_print += "duration: permanent"
-        elif self._duration == 1:
-            str_print += "duration: {} turn".format(self._duration)
+        elif duration == 1:
+            str_print += "duration: {} turn".format(duration)
         else:
-            str_print += "duration: {} turns".format(self._duration)
+            str_print += "duration: {} turns".format(duration)
         return str_print
 
     @property
     def duration(self):
         """Gets status effect's duration.
 
-        Negative value means permanent duration.
+        Negative value means permanent duration. When status effect is attached to a timeline, its duration is the
+        number of turns left until its expiry turn.
 
         :return: status effect's duration
         """
-        return self._duration
+        if self._expiry_turn is None:
+            return self._duration
+        remaining_duration = self._expiry_turn - self._timeline.turn
+        if remaining_duration < 0:
+            return 0
+        return remaining_duration
+
+    @duration.setter
+    def duration(self, value):
+        """Sets status effect's remaining duration to provided value, rescheduling its expiry when status effect is
+        attached to a timeline.
+
+        :param value: value to set status effect's duration to (negative value means permanent)
+        """
+        self._duration = value
+        if self._timeline is not None:
+            self._expiry_turn = self._timeline.turn + value if value >= 0 else None
+            self._timeline.reschedule(self)
+
+    @property
+    def expiry_turn(self):
+        """Gets turn of the timeline status effect is attached to, in which status effect expires.
+
+        :return: expiry turn, or None when status effect is permanent or not attached to a timeline
+        """
+        return self._expiry_turn
+
+    def attach_to_timeline(self, timeline):
+        """Attaches status effect to specified timeline, so that its duration lowers as the timeline advances.
+
+        :param timeline: timeline object (providing current turn and rescheduling of status effects) to attach to
+        """
+        if self._timeline is not None:
+            self.detach_from_timeline()
+        self._timeline = timeline
+        if self._duration >= 0:
+            self._expiry_turn = timeline.turn + self._duration
+
+    def detach_from_timeline(self):
+        """Detaches status effect from its timeline, keeping its current duration."""
+        self._duration = self.duration
+        self._timeline = None
+        self._expiry_turn = None
 
     def lower_duration(self):
         """Lowers current status effect duration by 1, unless duration is already 0 or lower."""
-        if self._duration > 0:
-            self._duration -= 1
+        if self._expiry_turn is None:
+            if self._duration > 0:
+                self._duration -= 1
+        elif self.duration > 0:
+            self._expiry_turn -= 1
+            self._timeline.reschedule(self)
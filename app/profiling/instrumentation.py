@@ -0,0 +1,260 @@
+import inspect
+import json
+import time
+
+from app.characters.factory import CritterFactory
+from app.files.file_handler import FileHandler
+from app.items.factory import ItemFactory
+from app.mechanics import combat_calculators, inventory, stat_calculators
+from app.mechanics.combat_calculators import DamageFormulaConverter, PerkBonusMatcher
+from app.mechanics.stat_calculators import PerkStatAggregator
+from app.perks.factory import PerkFactory
+
+
+class Instrumentation:
+    """This class represents opt-in instrumentation of hot paths (factories, calculators, inventory operators and
+    caches), recording number of calls and cumulative time spent in instrumented methods, and numbers of cache hits and
+    misses.
+
+    Instrumentation is implemented by replacing instrumented methods of their classes with timing wrappers when it's
+    enabled, and restoring original methods when it's disabled, so disabled instrumentation costs nothing. Cache hits
+    and misses are counted by probes, which count calls of a cache lookup method and of a method called by it only when
+    the lookup misses. As methods are replaced on their classes, only one instrumentation should be enabled at a time.
+
+    By default, item, perk and critter factories (with data file reading), public methods of all calculators, damage
+    formula converter, perk bonus matcher and all inventory operators are instrumented, and compiled perk effects and
+    aggregated perk bonuses caches are probed.
+
+    The class provides InstrumentationError exception, which is raised when instrumentation is enabled or disabled
+    twice, or when instrumented methods are incorrect.
+    """
+
+    class InstrumentationError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during instrumentation."""
+        pass
+
+    def __init__(self, targets=None, cache_probes=None):
+        """Initializes instance of the class. Instrumentation is disabled until it's enabled.
+
+        :param targets: list of tuples of classes and names of their methods to instrument (defaults to None, which
+                        means default targets are instrumented)
+        :param cache_probes: list of tuples of cache names, classes and names of their lookup and miss methods (defaults
+                             to None, which means default caches are probed)
+        """
+        self._targets = Instrumentation.get_default_targets() if targets is None else list(targets)
+        self._cache_probes = Instrumentation.get_default_cache_probes() if cache_probes is None else list(cache_probes)
+        self._calls = dict()
+        self._cache_lookups = dict()
+        self._patched_methods = list()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disable()
+
+    @property
+    def enabled(self):
+        """Checks whether instrumentation is enabled.
+
+        :return: True if instrumented methods are replaced, False otherwise
+        """
+        return len(self._patched_methods) > 0
+
+    @staticmethod
+    def get_default_targets():
+        """Gets default instrumentation targets: factories with data file reading, public methods of calculators, damage
+        formula converter and perk bonus matcher, and inventory operators.
+
+        :return: list of tuples of classes and names of their methods
+        """
+        targets = [(ItemFactory, "create_item"), (PerkFactory, "create_perk"), (CritterFactory, "create_critter"),
+                   (FileHandler, "get_file_contents_as_list"), (DamageFormulaConverter, "get_damage_tuple"),
+                   (DamageFormulaConverter, "get_damage_range"), (PerkBonusMatcher, "get_bonus")]
+        for module in (stat_calculators, combat_calculators):
+            targets.extend(Instrumentation._get_public_static_methods(
+                module=module, class_filter=lambda name: name.endswith("Calculator")))
+        targets.extend(Instrumentation._get_public_static_methods(
+            module=inventory, class_filter=lambda name: name.startswith("Inventory") and name != "Inventory"))
+        return targets
+
+    @staticmethod
+    def get_default_cache_probes():
+        """Gets default cache probes: compiled perk effects (used by combat calculators) and aggregated perk bonuses
+        (used by stat calculators).
+
+        :return: list of tuples of cache names, classes and names of their lookup and miss methods
+        """
+        return [("compiled perk effects", PerkBonusMatcher, "_get_compiled_stat", "_compile_stat"),
+                ("aggregated perk bonuses", PerkStatAggregator, "_get_aggregated_bonuses", "_aggregate_bonuses")]
+
+    def enable(self):
+        """Enables instrumentation, replacing instrumented methods with timing wrappers.
+
+        :raises InstrumentationError: when instrumentation is already enabled or instrumented method doesn't exist
+        """
+        if self.enabled:
+            raise Instrumentation.InstrumentationError("instrumentation is already enabled")
+        try:
+            for cls, method_name in self._targets:
+                name = "{}.{}".format(cls.__name__, method_name)
+                self._patch_method(cls=cls, method_name=method_name,
+                                   counters=self._calls.setdefault(name, [0, 0.0]), timed=True)
+            for cache_name, cls, lookup_method_name, miss_method_name in self._cache_probes:
+                counters = self._cache_lookups.setdefault(cache_name, [0, 0])
+                self._patch_method(cls=cls, method_name=lookup_method_name, counters=counters, counter_idx=0)
+                self._patch_method(cls=cls, method_name=miss_method_name, counters=counters, counter_idx=1)
+        except Instrumentation.InstrumentationError:
+            if len(self._patched_methods) > 0:
+                self.disable()
+            raise
+
+    def disable(self):
+        """Disables instrumentation, restoring original methods. Recorded statistics are kept.
+
+        :raises InstrumentationError: when instrumentation is not enabled
+        """
+        if not self.enabled:
+            raise Instrumentation.InstrumentationError("instrumentation is not enabled")
+        for cls, method_name, original_method in reversed(self._patched_methods):
+            if original_method is None:
+                delattr(cls, method_name)
+            else:
+                setattr(cls, method_name, original_method)
+        self._patched_methods.clear()
+
+    def reset(self):
+        """Resets all recorded statistics."""
+        for counters in self._calls.values():
+            counters[:] = [0, 0.0]
+        for counters in self._cache_lookups.values():
+            counters[:] = [0, 0]
+
+    def get_call_stats(self):
+        """Gets statistics of instrumented methods which were called, sorted by cumulative time.
+
+        :return: list of dictionaries of method name, number of calls, cumulative time and mean time (in seconds)
+        """
+        call_stats = [{"name": name, "calls": calls, "total_time": total_time, "mean_time": total_time / calls}
+                      for name, (calls, total_time) in self._calls.items() if calls > 0]
+        return sorted(call_stats, key=lambda call_stat: call_stat["total_time"], reverse=True)
+
+    def get_cache_stats(self):
+        """Gets statistics of probed caches.
+
+        :return: list of dictionaries of cache name, number of hits and misses and hit rate (None when cache wasn't
+                 used)
+        """
+        cache_stats = list()
+        for name, (lookups, misses) in self._cache_lookups.items():
+            hit_rate = (lookups - misses) / lookups if lookups > 0 else None
+            cache_stats.append({"name": name, "hits": lookups - misses, "misses": misses, "hit_rate": hit_rate})
+        return cache_stats
+
+    def to_json(self):
+        """Exports recorded statistics as JSON.
+
+        :return: JSON string of object with "calls" and "caches" lists
+        """
+        return json.dumps({"calls": self.get_call_stats(), "caches": self.get_cache_stats()}, indent=2)
+
+    def to_table(self):
+        """Exports recorded statistics as text table.
+
+        :return: string of table of method statistics followed by table of cache statistics
+        """
+        lines = ["{:<60} {:>10} {:>12} {:>12}".format("method", "calls", "total [ms]", "mean [us]")]
+        for call_stat in self.get_call_stats():
+            lines.append("{:<60} {:>10} {:>12.3f} {:>12.3f}".format(call_stat["name"], call_stat["calls"],
+                                                                    call_stat["total_time"] * 1e3,
+                                                                    call_stat["mean_time"] * 1e6))
+        lines.append("")
+        lines.append("{:<60} {:>10} {:>12} {:>12}".format("cache", "hits", "misses", "hit rate"))
+        for cache_stat in self.get_cache_stats():
+            hit_rate = "-" if cache_stat["hit_rate"] is None else "{:.1%}".format(cache_stat["hit_rate"])
+            lines.append("{:<60} {:>10} {:>12} {:>12}".format(cache_stat["name"], cache_stat["hits"],
+                                                              cache_stat["misses"], hit_rate))
+        return "\n".join(lines)
+
+    def _patch_method(self, cls, method_name, counters, timed=False, counter_idx=0):
+        """Replaces method of specified class with wrapper updating specified counters.
+
+        :param cls: class of the method
+        :param method_name: name of the method
+        :param counters: list of counters to update
+        :param timed: whether wrapper counts calls and cumulative time (defaults to False, which means wrapper only
+                      counts calls)
+        :param counter_idx: index of the counter of calls to update when wrapper is not timed (defaults to 0)
+        :raises InstrumentationError: when specified method doesn't exist
+        """
+        name = "{}.{}".format(cls.__name__, method_name)
+        try:
+            method = inspect.getattr_static(cls, method_name)
+        except AttributeError:
+            raise Instrumentation.InstrumentationError("no such method to instrument: {}".format(name))
+        is_static = isinstance(method, staticmethod)
+        function = method.__func__ if is_static else method
+        if not callable(function):
+            raise Instrumentation.InstrumentationError("incorrect method to instrument: {}".format(name))
+        if timed:
+            wrapper = Instrumentation._create_timed_wrapper(function=function, counters=counters)
+        else:
+            wrapper = Instrumentation._create_counting_wrapper(function=function, counters=counters,
+                                                               counter_idx=counter_idx)
+        self._patched_methods.append((cls, method_name, cls.__dict__.get(method_name)))
+        setattr(cls, method_name, staticmethod(wrapper) if is_static else wrapper)
+
+    @staticmethod
+    def _create_timed_wrapper(function, counters):
+        """Creates wrapper of specified function, counting its calls and cumulative time.
+
+        :param function: function to wrap
+        :param counters: list of number of calls and cumulative time to update
+        :return: wrapper function
+        """
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                counters[1] += perf_counter() - start
+                counters[0] += 1
+
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    @staticmethod
+    def _create_counting_wrapper(function, counters, counter_idx):
+        """Creates wrapper of specified function, counting its calls.
+
+        :param function: function to wrap
+        :param counters: list of counters to update
+        :param counter_idx: index of the counter of calls
+        :return: wrapper function
+        """
+        def wrapper(*args, **kwargs):
+            counters[counter_idx] += 1
+            return function(*args, **kwargs)
+
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    @staticmethod
+    def _get_public_static_methods(module, class_filter):
+        """Gets public static methods of classes defined in specified module.
+
+        :param module: module to get classes from
+        :param class_filter: callable checking whether class with given name should be included
+        :return: list of tuples of classes and names of their methods
+        """
+        methods = list()
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__ or not class_filter(class_name):
+                continue
+            for method_name, method in cls.__dict__.items():
+                if not method_name.startswith("_") and isinstance(method, staticmethod):
+                    methods.append((cls, method_name))
+        return methods
@@ -0,0 +1,396 @@
+import asyncio
+import inspect
+import json
+
+from app.files.data_catalog import DataCatalog
+from app.items.weapons import RangedWeapon
+from app.mechanics.combat_calculators import CombatCalculatorError, DamageFormulaConverter
+from app.mechanics.combat_context import CombatContextCache
+from app.mechanics.combat_scheduler import CombatScheduler
+from app.mechanics.inventory import Inventory, InventoryItemEquipper, InventoryWeaponReloader
+from app.mechanics.perk_inventory import PerkInventory, PerkInventoryStatusEffectDurationLowerer
+from app.mechanics.perk_inventory import PerkInventoryExpiredStatusEffectRemover
+from app.mechanics.random_roll import RandomRoll
+from app.mechanics.stat_calculators import CharacterDerivedStatCalculator
+
+
+class GameSession:
+    """This class represents single game session (table), with its own characters and combat, using shared data catalog.
+
+    Characters are spawned by copying prototypes from data catalog, so sessions never modify shared definitions and
+    don't parse data again. Commands (spawning, joining combat, attacking, reloading, equipping, ticking turns, checking
+    status) are executed by name with dictionary of arguments, and map onto combat calculators, combat scheduler and
+    inventory operators.
+
+    Hits are adjudicated by the game master: attack applies damage of a single hit, reporting attacker's effective
+    accuracy against the target, with damage rolled from attacker's weapon damage formula unless damage roll is
+    specified. Attacks with ranged weapons require loaded ammunition and use up one round.
+
+    The class provides GameSessionError exception, which is raised when executing incorrect commands or commands with
+    incorrect arguments.
+    """
+
+    class GameSessionError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during game session commands
+        execution.
+        """
+        pass
+
+    def __init__(self, session_id, catalog):
+        """Initializes instance of the class with no characters and no combat.
+
+        :param session_id: ID of the session
+        :param catalog: DataCatalog object shared by all sessions
+        """
+        self._session_id = session_id
+        self._catalog = catalog
+        self._characters = dict()
+        self._scheduler = CombatScheduler()
+        self._contexts = CombatContextCache()
+        self._commands = {"spawn": self.spawn, "join_combat": self.join_combat, "leave_combat": self.leave_combat,
+                          "attack": self.attack, "reload": self.reload, "equip": self.equip, "tick": self.tick,
+                          "status": self.status, "characters": self.get_character_names}
+        self._signatures = {command: inspect.signature(method) for command, method in self._commands.items()}
+
+    @property
+    def session_id(self):
+        """Gets ID of the session.
+
+        :return: session ID
+        """
+        return self._session_id
+
+    @property
+    def characters(self):
+        """Gets dictionary of session's characters.
+
+        :return: dictionary of character names and Character derived objects
+        """
+        return dict(self._characters)
+
+    def execute(self, command, arguments=None):
+        """Executes specified command with specified arguments.
+
+        :param command: name of the command
+        :param arguments: dictionary of command's arguments (defaults to None, which means no arguments)
+        :raises GameSessionError: when command or its arguments are incorrect, or the command can't be executed
+        :return: command's result (JSON serializable)
+        """
+        try:
+            method = self._commands[command]
+        except KeyError:
+            raise GameSession.GameSessionError("incorrect command: {}".format(command))
+        arguments = arguments or dict()
+        try:
+            self._signatures[command].bind(**arguments)
+        except TypeError:
+            raise GameSession.GameSessionError("incorrect arguments for command: {}".format(command))
+        try:
+            return method(**arguments)
+        except (CombatCalculatorError, CombatScheduler.CombatSchedulerError, DataCatalog.DataCatalogError,
+                Inventory.InventoryError, PerkInventory.PerkInventoryError) as error:
+            raise GameSession.GameSessionError(str(error))
+
+    def spawn(self, critter_id, name=None):
+        """Spawns critter with specified ID, with its health restored to maximum.
+
+        :param critter_id: ID of the critter in data catalog
+        :param name: unique name of the critter in the session (defaults to None, which means critter's name followed
+                     by its number)
+        :raises GameSessionError: when specified name is already used
+        :return: name of the spawned critter
+        """
+        critter = self._catalog.create_critter(critter_id=critter_id)
+        if name is None:
+            number = 1
+            name = critter.name
+            while name in self._characters:
+                number += 1
+                name = "{} {}".format(critter.name, number)
+        elif name in self._characters:
+            raise GameSession.GameSessionError("character name is already used: {}".format(name))
+        critter.health = CharacterDerivedStatCalculator.get_max_health(character=critter)
+        self._characters[name] = critter
+        return name
+
+    def add_character(self, name, character):
+        """Adds specified character (for example, player's character) to the session.
+
+        :param name: unique name of the character in the session
+        :param character: Character derived object to add
+        :raises GameSessionError: when specified name is already used
+        """
+        if name in self._characters:
+            raise GameSession.GameSessionError("character name is already used: {}".format(name))
+        self._characters[name] = character
+
+    def join_combat(self, names):
+        """Adds specified characters to combat.
+
+        :param names: list of names of the characters
+        :raises GameSessionError: when any character doesn't exist or already takes part in combat
+        :return: list of names of all combatants, ordered by initiative
+        """
+        for name in names:
+            self._scheduler.add_combatant(self._get_character(name))
+        return self._get_names(self._scheduler.combatants)
+
+    def leave_combat(self, name):
+        """Removes specified character from combat.
+
+        :param name: name of the character
+        :raises GameSessionError: when character doesn't exist or doesn't take part in combat
+        """
+        character = self._get_character(name)
+        self._scheduler.remove_combatant(character)
+        self._contexts.remove_character(character)
+
+    def attack(self, attacker, target, damage_roll=None):
+        """Applies damage of attacker's hit to the target, spending attacker's action points when it takes part in
+        combat. Nothing is changed when the attack can't be made.
+
+        :param attacker: name of the attacking character
+        :param target: name of the attacked character
+        :param damage_roll: roll part of attacker's weapon damage, integer within range of weapon's damage rolls
+                            (defaults to None, which means damage is rolled)
+        :raises GameSessionError: when characters don't exist, damage roll is incorrect, or attacker doesn't have
+                                  enough action points or loaded ammunition
+        :return: dictionary of attacker's effective accuracy, damage done and target's remaining health
+        """
+        attacking_character = self._get_character(attacker)
+        target_character = self._get_character(target)
+        context = self._contexts.get_context(character=attacking_character, opponent=target_character)
+        accuracy = context.get_effective_accuracy()
+        weapon = attacking_character.inventory.equipped_weapon
+        is_ranged = isinstance(weapon, RangedWeapon)
+        if is_ranged and weapon.current_ammo == 0:
+            raise GameSession.GameSessionError("no ammo loaded in weapon of character: {}".format(attacker))
+        is_combatant = self._scheduler.is_combatant(attacking_character)
+        if is_combatant:
+            ap_cost = context.get_ap_cost()
+            if ap_cost > attacking_character.action_points:
+                raise GameSession.GameSessionError("not enough action points for character: {}".format(attacker))
+        _, number_of_rolls, roll = DamageFormulaConverter.get_damage_tuple(context.get_weapon_damage())
+        if damage_roll is None:
+            damage_roll = RandomRoll.roll_dice(1, roll, number_of_rolls=number_of_rolls)
+        elif not isinstance(damage_roll, int) or isinstance(damage_roll, bool) or \
+                not number_of_rolls <= damage_roll <= number_of_rolls * roll:
+            raise GameSession.GameSessionError("incorrect damage roll: {}".format(damage_roll))
+        damage = context.get_effective_damage(damage_roll=damage_roll)
+        if is_combatant:
+            attacking_character.action_points -= ap_cost
+        if is_ranged:
+            weapon.current_ammo -= 1
+        target_character.health -= damage
+        return {"accuracy": accuracy, "damage": damage, "health": target_character.health}
+
+    def reload(self, name):
+        """Reloads character's equipped weapon.
+
+        :param name: name of the character
+        :raises GameSessionError: when character doesn't exist or its weapon can't be reloaded
+        :return: current ammo of the weapon
+        """
+        inv = self._get_character(name).inventory
+        weapon = inv.equipped_weapon
+        InventoryWeaponReloader.reload_weapon(inv=inv, weapon_to_reload=weapon)
+        return weapon.current_ammo
+
+    def equip(self, name, item_id):
+        """Equips first carried item with specified ID.
+
+        :param name: name of the character
+        :param item_id: ID of the item to equip
+        :raises GameSessionError: when character doesn't exist or doesn't carry specified item
+        """
+        inv = self._get_character(name).inventory
+        items = inv.get_items_with_id(item_id)
+        if len(items) == 0:
+            raise GameSession.GameSessionError("no such item in inventory: {}".format(item_id))
+        InventoryItemEquipper.equip_item(inv=inv, item_to_equip=items[0])
+
+    def tick(self, turns=1):
+        """Advances the session by specified number of turns. During combat, turns of combat are ended (restoring
+        combatants' action points). Duration of status effects of all characters is lowered and expired ones are
+        removed.
+
+        :param turns: number of turns to advance the session by (defaults to 1)
+        :raises GameSessionError: when number of turns is incorrect
+        :return: current combat turn
+        """
+        if not isinstance(turns, int) or turns < 0:
+            raise GameSession.GameSessionError("incorrect number of turns: {}".format(turns))
+        combatants = set(id(character) for character in self._scheduler.combatants)
+        for _ in range(turns):
+            if len(combatants) > 0:
+                self._scheduler.end_turn()
+            for character in self._characters.values():
+                if id(character) not in combatants:
+                    PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=character.perks)
+                    PerkInventoryExpiredStatusEffectRemover.remove_expired_status_effects(perk_inv=character.perks)
+        return self._scheduler.turn
+
+    def status(self, name):
+        """Gets status of specified character.
+
+        :param name: name of the character
+        :raises GameSessionError: when character doesn't exist
+        :return: dictionary of character's health, action points, equipped items' IDs and active perks' IDs
+        """
+        character = self._get_character(name)
+        inv = character.inventory
+        return {"health": character.health, "action_points": character.action_points,
+                "armor": inv.equipped_armor.item_id if inv.equipped_armor is not None else None,
+                "weapon": inv.equipped_weapon.item_id if inv.equipped_weapon is not None else None,
+                "perks": [perk.perk_id for perk in character.perks.perks]}
+
+    def get_character_names(self):
+        """Gets names of session's characters.
+
+        :return: list of character names
+        """
+        return list(self._characters.keys())
+
+    def _get_character(self, name):
+        """Gets character with specified name.
+
+        :param name: name of the character
+        :raises GameSessionError: when character doesn't exist
+        :return: Character derived object
+        """
+        try:
+            return self._characters[name]
+        except KeyError:
+            raise GameSession.GameSessionError("no such character in session: {}".format(name))
+
+    def _get_names(self, characters):
+        """Gets names of specified characters.
+
+        :param characters: iterable of Character derived objects from the session
+        :return: list of character names
+        """
+        names = {id(character): name for name, character in self._characters.items()}
+        return [names[id(character)] for character in characters]
+
+
+class GameMasterServer:
+    """This class represents asyncio based game master service, hosting many independent game sessions in one process.
+
+    All sessions share one data catalog, so items, perks and critters are parsed once, no matter how many sessions are
+    hosted. Clients connect over TCP and send commands as JSON objects, one per line, containing "command" and
+    optionally "session" and "arguments", and receive JSON responses, one per line, containing "result" or "error".
+    Commands "create_session" and "close_session" manage sessions, while all other commands are executed by specified
+    session. Commands don't wait for any I/O, so every command is executed atomically while many connections are served
+    concurrently. Commands failing unexpectedly are responded to with error, without closing the connection.
+
+    The class provides GameMasterServerError exception, which is raised when accessing nonexistent sessions.
+    """
+
+    class GameMasterServerError(Exception):
+        """This exception class exist to unify all errors and exceptions occurring during game master server usage."""
+        pass
+
+    def __init__(self, catalog):
+        """Initializes instance of the class with no sessions.
+
+        :param catalog: DataCatalog object shared by all sessions
+        """
+        self._catalog = catalog
+        self._sessions = dict()
+        self._next_session_id = 1
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @property
+    def catalog(self):
+        """Gets data catalog shared by all sessions.
+
+        :return: DataCatalog object
+        """
+        return self._catalog
+
+    def create_session(self):
+        """Creates new session.
+
+        :return: ID of the session
+        """
+        session_id = self._next_session_id
+        self._next_session_id += 1
+        self._sessions[session_id] = GameSession(session_id=session_id, catalog=self._catalog)
+        return session_id
+
+    def close_session(self, session_id):
+        """Closes specified session, discarding its characters.
+
+        :param session_id: ID of the session
+        :raises GameMasterServerError: when specified session doesn't exist
+        """
+        self.get_session(session_id=session_id)
+        del self._sessions[session_id]
+
+    def get_session(self, session_id):
+        """Gets specified session.
+
+        :param session_id: ID of the session
+        :raises GameMasterServerError: when specified session doesn't exist
+        :return: GameSession object
+        """
+        try:
+            return self._sessions[session_id]
+        except KeyError:
+            raise GameMasterServer.GameMasterServerError("no such session: {}".format(session_id))
+
+    def handle_request(self, request):
+        """Executes command described by specified request.
+
+        :param request: dictionary of "command", "session" (for session commands) and "arguments"
+        :return: dictionary of "result", or "error" when the command can't be executed
+        """
+        if not isinstance(request, dict) or "command" not in request or \
+                not isinstance(request.get("arguments", dict()), dict):
+            return {"error": "incorrect request"}
+        try:
+            if request["command"] == "create_session":
+                return {"result": self.create_session()}
+            session = self.get_session(session_id=request.get("session"))
+            if request["command"] == "close_session":
+                self.close_session(session_id=session.session_id)
+                return {"result": None}
+            return {"result": session.execute(command=request["command"], arguments=request.get("arguments"))}
+        except (GameMasterServer.GameMasterServerError, GameSession.GameSessionError) as error:
+            return {"error": str(error)}
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Starts listening for client connections.
+
+        :param host: host to listen on (defaults to 127.0.0.1)
+        :param port: port to listen on (defaults to 0, which means any free port)
+        :return: asyncio.AbstractServer object
+        """
+        return await asyncio.start_server(self._handle_connection, host=host, port=port)
+
+    async def _handle_connection(self, reader, writer):
+        """Serves single client connection, responding to every request line until the client disconnects.
+
+        :param reader: asyncio.StreamReader object of the connection
+        :param writer: asyncio.StreamWriter object of the connection
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if line == b"":
+                    break
+                try:
+                    request = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    response = {"error": "incorrect request"}
+                else:
+                    try:
+                        response = self.handle_request(request)
+                    except Exception as error:
+                        response = {"error": "can't execute request: {}".format(error)}
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
@@ -0,0 +1,102 @@
+import sys
+
+
+class TagRegistry:
+    """This class contains global table of interned tags, shared by all items, perks and characters existing in the
+    game.
+
+    Every tag gets its own bit when it's first registered, so any set of tags can be represented as an integer bit mask,
+    and checking whether one set of tags is a subset of another is a single bitwise operation. Tags are provided as
+    comma separated strings (as stored in data files, for example "weapon, melee, sharp") or iterables of tags. Results
+    for tag strings are cached, so objects sharing the same tags share the same frozen set and mask.
+    """
+
+    _tag_bits = dict()
+    _tag_sets = dict()
+    _tag_masks = dict()
+
+    @staticmethod
+    def get_tag_bit(tag):
+        """Gets bit assigned to specified tag, registering the tag if it's not registered yet.
+
+        :param tag: tag to get bit for
+        :return: integer with single bit set, representing the tag
+        """
+        try:
+            return TagRegistry._tag_bits[tag]
+        except KeyError:
+            tag_bit = 1 << len(TagRegistry._tag_bits)
+            TagRegistry._tag_bits[sys.intern(tag)] = tag_bit
+            return tag_bit
+
+    @staticmethod
+    def get_tag_set(tags):
+        """Gets frozen set of interned tags.
+
+        :param tags: tags as comma separated string or iterable of tags
+        :return: frozen set of tags
+        """
+        if isinstance(tags, str):
+            try:
+                return TagRegistry._tag_sets[tags]
+            except KeyError:
+                tag_set = TagRegistry._create_tag_set(tags=TagRegistry._split_tags(tags))
+                TagRegistry._tag_sets[tags] = tag_set
+                return tag_set
+        return TagRegistry._create_tag_set(tags=tags)
+
+    @staticmethod
+    def get_tag_mask(tags):
+        """Gets bit mask representing provided tags.
+
+        :param tags: tags as comma separated string or iterable of tags
+        :return: integer bit mask of tags
+        """
+        if isinstance(tags, str):
+            try:
+                return TagRegistry._tag_masks[tags]
+            except KeyError:
+                tag_mask = TagRegistry._create_tag_mask(tags=TagRegistry.get_tag_set(tags))
+                TagRegistry._tag_masks[tags] = tag_mask
+                return tag_mask
+        return TagRegistry._create_tag_mask(tags=tags)
+
+    @staticmethod
+    def is_subset(tag_mask, other_tag_mask):
+        """Checks whether tags represented by one bit mask are a subset of tags represented by other bit mask.
+
+        :param tag_mask: bit mask of tags to check
+        :param other_tag_mask: bit mask of tags to check against
+        :return: True if all tags from first mask are in other mask, False otherwise
+        """
+        return tag_mask & other_tag_mask == tag_mask
+
+    @staticmethod
+    def _split_tags(tags):
+        """Splits comma separated string of tags into list of tags.
+
+        :param tags: comma separated string of tags
+        :return: list of tags
+        """
+        return [tag for tag in tags.split(", ") if tag != ""]
+
+    @staticmethod
+    def _create_tag_set(tags):
+        """Creates frozen set of interned tags from iterable of tags.
+
+        :param tags: iterable of tags
+        :return: frozen set of tags
+        """
+        return frozenset(sys.intern(tag) for tag in tags)
+
+    @staticmethod
+    def _create_tag_mask(tags):
+        """Creates bit mask from iterable of tags.
+
+        :param tags: iterable of tags
+        :return: integer bit mask of tags
+        """
+        tag_mask = 0
+        for tag in tags:
+            tag_mask |= TagRegistry.get_tag_bit(tag)
+        return tag_mask
@@ -0,0 +1,262 @@
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+from app.characters.factory import CritterFactory
+from app.files.content_generator import ContentGenerator
+from app.items.factory import ItemFactory
+from app.items.stackables import Ammo
+from app.items.weapons import RangedWeapon
+from app.mechanics.combat_calculators import APCostCalculator, EffectiveAccuracyCalculator, EffectiveDamageCalculator
+from app.mechanics.inventory import Inventory, InventoryItemAdder, InventoryWeaponReloader
+from app.mechanics.loot_tables import LootGenerator, LootTable
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder, PerkInventoryPerkRemover
+from app.mechanics.stat_calculators import CharacterAttributeCalculator, CharacterStatSheetCalculator
+from app.mechanics.tactical_planner import TacticalPlanner
+from app.perks.factory import PerkFactory
+from benchmarks.synthetic_data import SyntheticData
+
+
+_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+class BenchmarkSuite:
+    """This class runs benchmarks of core hot paths (factories, stacking, reloading, stat calculation, effective combat
+    parameters, NPC turn planning and loot generation) on synthetic data, compares their results with recorded baseline
+    and reports regressions.
+
+    Every benchmark is a function, which prepares its data and returns a callable timed by timeit. Result of each
+    benchmark is the best (minimum) time per call of the callable, out of specified number of repeats, which is the
+    least noisy estimate for comparisons between runs.
+    """
+
+    def __init__(self, data_directory, records_per_type=200, seed=0):
+        """Initializes instance of the class, writing synthetic data files to specified directory.
+
+        :param data_directory: name of the directory to write data files to
+        :param records_per_type: number of records of every item, perk and critter type in data files (defaults to 200)
+        :param seed: seed of synthetic data random generators (defaults to 0)
+        """
+        self._data = SyntheticData(seed=seed)
+        self._item_file = os.path.join(data_directory, "items.txt")
+        self._perk_file = os.path.join(data_directory, "perks.txt")
+        self._critter_file = os.path.join(data_directory, "critters.txt")
+        content = ContentGenerator(seed=seed).write_data_files(item_data_file=self._item_file,
+                                                               perk_data_file=self._perk_file,
+                                                               critter_data_file=self._critter_file,
+                                                               records_per_type=records_per_type)
+        self._content = content
+        self._item_ids = content.armors + content.melee_weapons + content.ranged_weapons + content.ammo + \
+            content.consumables
+        self._perk_ids = content.perks + content.traits + content.status_effects
+        self._critter_ids = content.critters
+        # benchmarks and fractions of requested number of calls they make, so that slow ones don't dominate the run
+        self._benchmarks = {"item_factory_create": (self._bench_item_factory_create, 1.0),
+                            "perk_factory_create": (self._bench_perk_factory_create, 1.0),
+                            "critter_factory_create": (self._bench_critter_factory_create, 0.02),
+                            "inventory_stacking": (self._bench_inventory_stacking, 1.0),
+                            "weapon_reload": (self._bench_weapon_reload, 1.0),
+                            "stat_sheets": (self._bench_stat_sheets, 1.0),
+                            "attributes_after_perk_change": (self._bench_attributes_after_perk_change, 1.0),
+                            "effective_damage": (self._bench_effective_damage, 1.0),
+                            "effective_accuracy": (self._bench_effective_accuracy, 1.0),
+                            "ap_cost": (self._bench_ap_cost, 1.0),
+                            "npc_turn_planning": (self._bench_npc_turn_planning, 0.02),
+                            "loot_generation": (self._bench_loot_generation, 0.1)}
+
+    @property
+    def benchmark_names(self):
+        """Gets names of all benchmarks.
+
+        :return: list of benchmark names
+        """
+        return list(self._benchmarks.keys())
+
+    def run(self, names=None, number=100, repeat=5):
+        """Runs specified benchmarks.
+
+        :param names: list of names of benchmarks to run (defaults to None, which means all benchmarks are run)
+        :param number: number of calls per repeat, reduced for slow benchmarks (defaults to 100)
+        :param repeat: number of repeats (defaults to 5)
+        :return: dictionary of benchmark names and best times per call (in seconds)
+        """
+        results = dict()
+        for name in self.benchmark_names if names is None else names:
+            setup, number_fraction = self._benchmarks[name]
+            benchmark_number = max(1, int(number * number_fraction))
+            timer = timeit.Timer(setup())
+            results[name] = min(timer.repeat(repeat=repeat, number=benchmark_number)) / benchmark_number
+        return results
+
+    @staticmethod
+    def compare(results, baseline, threshold):
+        """Compares benchmark results with baseline.
+
+        :param results: dictionary of benchmark names and times per call
+        :param baseline: dictionary of benchmark names and baseline times per call
+        :param threshold: relative slowdown above which benchmark is reported as regression (e.g. 0.2 for 20%)
+        :return: list of tuples of benchmark name, time per call, baseline time per call (None when there's no
+                 baseline) and whether benchmark regressed
+        """
+        comparison = list()
+        for name, time_per_call in results.items():
+            baseline_time = baseline.get(name)
+            regressed = baseline_time is not None and time_per_call > baseline_time * (1 + threshold)
+            comparison.append((name, time_per_call, baseline_time, regressed))
+        return comparison
+
+    @staticmethod
+    def format_comparison(comparison):
+        """Formats comparison of benchmark results with baseline as text table.
+
+        :param comparison: list of tuples returned by compare method
+        :return: string of the table
+        """
+        lines = ["{:<32} {:>14} {:>14} {:>9}".format("benchmark", "time [us]", "baseline [us]", "change")]
+        for name, time_per_call, baseline_time, regressed in comparison:
+            if baseline_time is None:
+                baseline, change = "-", "-"
+            else:
+                baseline = "{:.3f}".format(baseline_time * 1e6)
+                change = "{:+.1%}".format(time_per_call / baseline_time - 1)
+            lines.append("{:<32} {:>14.3f} {:>14} {:>9}{}".format(name, time_per_call * 1e6, baseline, change,
+                                                                  "  REGRESSION" if regressed else ""))
+        return "\n".join(lines)
+
+    def _bench_item_factory_create(self):
+        factory = ItemFactory(data_file=self._item_file)
+        item_ids = self._item_ids[::len(self._item_ids) // 100 or 1]
+        return lambda: [factory.create_item(item_id=item_id) for item_id in item_ids]
+
+    def _bench_perk_factory_create(self):
+        factory = PerkFactory(data_file=self._perk_file)
+        perk_ids = self._perk_ids[::len(self._perk_ids) // 100 or 1]
+        return lambda: [factory.create_perk(perk_id=perk_id) for perk_id in perk_ids]
+
+    def _bench_critter_factory_create(self):
+        factory = CritterFactory(data_file=self._critter_file, item_data_file=self._item_file,
+                                 perk_data_file=self._perk_file)
+        # critter factory reads item and perk data files for every critter, so fewer critters are created
+        critter_ids = self._critter_ids[::len(self._critter_ids) // 10 or 1]
+        return lambda: [factory.create_critter(critter_id=critter_id) for critter_id in critter_ids]
+
+    def _bench_inventory_stacking(self):
+        inv = Inventory()
+        self._data.fill_inventory(inv=inv, number_of_items=1000)
+        ammo = Ammo("ammo_19", "ammo, stackable", "Ammo", "Ammo.", 50, 1, 1, 0.0)
+        return lambda: InventoryItemAdder.add_item(inv=inv, item_to_add=copy.copy(ammo))
+
+    def _bench_weapon_reload(self):
+        inv = Inventory()
+        self._data.fill_inventory(inv=inv, number_of_items=1000)
+        gun = RangedWeapon("gun", "weapon, gun", "Gun", "Gun.", "2 + 3d6", "ammo", 10, 0, 0, 4, 1, 10, 2.0)
+        InventoryItemAdder.add_item(inv=inv, item_to_add=gun)
+        ammo = Ammo("ammo", "ammo, stackable", "Ammo", "Ammo.", 50, 1, 1, 0.0)
+        ammo.current_amount = gun.clip_size
+
+        def reload_weapon():
+            gun.current_ammo = 0
+            InventoryItemAdder.add_item(inv=inv, item_to_add=copy.copy(ammo))
+            InventoryWeaponReloader.reload_weapon(inv=inv, weapon_to_reload=gun)
+
+        return reload_weapon
+
+    def _bench_stat_sheets(self):
+        characters = [self._data.create_character(number_of_perks=20) for _ in range(100)]
+        return lambda: CharacterStatSheetCalculator.compute_stat_sheets(characters=characters)
+
+    def _bench_attributes_after_perk_change(self):
+        character = self._data.create_character(number_of_perks=50)
+        perk = character.perks.perks[-1]
+
+        def change_perks():
+            PerkInventoryPerkRemover.remove_perk(perk_inv=character.perks, perk_to_remove=perk)
+            PerkInventoryPerkAdder.add_perk(perk_inv=character.perks, perk_to_add=perk)
+            return CharacterAttributeCalculator.get_strength(character=character)
+
+        return change_perks
+
+    def _bench_effective_damage(self):
+        character = self._data.create_character(number_of_perks=50, name="Attacker")
+        opponent = self._data.create_character(number_of_perks=50, name="Defender")
+        return lambda: EffectiveDamageCalculator.get_effective_damage(character=character, opponent=opponent,
+                                                                      damage_roll=10)
+
+    def _bench_effective_accuracy(self):
+        character = self._data.create_character(number_of_perks=50, name="Attacker")
+        opponent = self._data.create_character(number_of_perks=50, name="Defender")
+        return lambda: EffectiveAccuracyCalculator.get_effective_accuracy(character=character, opponent=opponent)
+
+    def _bench_ap_cost(self):
+        character = self._data.create_character(number_of_perks=50)
+        return lambda: APCostCalculator.get_ap_cost(character=character)
+
+    def _bench_npc_turn_planning(self):
+        planner = TacticalPlanner()
+        npcs = [self._data.create_character(number_of_perks=5, name="NPC") for _ in range(100)]
+        for npc in npcs:
+            npc.inventory.equipped_weapon.current_ammo = 3
+            InventoryItemAdder.add_item(inv=npc.inventory,
+                                        item_to_add=Ammo("ammo", "ammo, stackable", "Ammo", "Ammo.", 50, 20, 1, 0.0))
+        opponents = [self._data.create_character(number_of_perks=5, name="Opponent") for _ in range(4)]
+        for opponent in opponents:
+            opponent.health = 50
+        return lambda: [planner.plan_turn(character=npc, opponents=opponents, action_points=15) for npc in npcs]
+
+    def _bench_loot_generation(self):
+        generator = LootGenerator(item_source=ItemFactory(data_file=self._item_file), seed=0)
+        stackables = LootTable(entries=[(item_id, idx + 1, 1, 20) for idx, item_id in
+                                        enumerate(self._content.ammo + self._content.consumables)])
+        equipment = LootTable(entries=[(item_id, 1) for item_id in
+                                       self._content.armors + self._content.melee_weapons +
+                                       self._content.ranged_weapons])
+        table = LootTable(entries=[(stackables, 8, 1, 3), (equipment, 2), (None, 5)], rolls=3)
+
+        def generate_loot():
+            generator.add_loot(inv=Inventory(), table=table, draws=1000)
+
+        return generate_loot
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Run benchmarks of core hot paths and compare them with baseline.")
+    parser.add_argument("names", nargs="*", help="names of benchmarks to run (defaults to all benchmarks)")
+    parser.add_argument("--records", type=int, default=200, help="number of records of every type in data files")
+    parser.add_argument("--number", type=int, default=100, help="number of calls per repeat")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repeats")
+    parser.add_argument("--baseline", default=_BASELINE_FILE, help="baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown reported as regression")
+    parser.add_argument("--save-baseline", action="store_true", help="save results as new baseline")
+    parser.add_argument("--output", help="file to write report to, in addition to standard output")
+    arguments = parser.parse_args(arguments)
+    with tempfile.TemporaryDirectory() as data_directory:
+        suite = BenchmarkSuite(data_directory=data_directory, records_per_type=arguments.records)
+        unknown_names = set(arguments.names) - set(suite.benchmark_names)
+        if unknown_names:
+            parser.error("unknown benchmarks: {}".format(", ".join(sorted(unknown_names))))
+        results = suite.run(names=arguments.names or None, number=arguments.number, repeat=arguments.repeat)
+    baseline = dict()
+    if os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+    comparison = BenchmarkSuite.compare(results=results, baseline=baseline, threshold=arguments.threshold)
+    report = BenchmarkSuite.format_comparison(comparison=comparison)
+    print(report)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            file.write(report + "\n")
+    if arguments.save_baseline:
+        baseline.update(results)
+        with open(arguments.baseline, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+            file.write("\n")
+        return 0
+    return 1 if any(regressed for _, _, _, regressed in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
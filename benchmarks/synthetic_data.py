@@ -0,0 +1,68 @@
+import random
+
+from app.characters.characters import Human
+from app.items.items import Armor
+from app.items.stackables import Ammo, Consumable
+from app.items.weapons import MeleeWeapon, RangedWeapon
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder
+from app.perks.perks import CharacterPerk
+
+
+class SyntheticData:
+    """This class generates synthetic data used by benchmarks, besides data files written by ContentGenerator: big
+    inventories and characters with many active perks.
+
+    Data is generated from seeded random generator, so every benchmark run uses the same data.
+    """
+
+    def __init__(self, seed=0):
+        """Initializes instance of the class.
+
+        :param seed: seed of the random generator (defaults to 0)
+        """
+        self._random = random.Random(seed)
+
+    def create_character(self, number_of_perks=0, name="Human"):
+        """Creates human character with equipped armor and gun, and with specified number of perks giving damage,
+        accuracy, damage resistance, action points cost, attribute and derived stat bonuses.
+
+        :param number_of_perks: number of perks to add (defaults to 0)
+        :param name: name of the character (defaults to "Human")
+        :return: Human object
+        """
+        character = Human(name, "human", 5, 6, 6, 6, 6, 6)
+        armor = Armor("armor", "armor", "Armor", "Armor.", 5, 10, 2, 10, 2.5)
+        gun = RangedWeapon("gun", "weapon, gun, short", "Gun", "Gun.", "2 + 3d6", "ammo", 10, 2, 5, 4, 1, 10, 2.0)
+        for item in (armor, gun):
+            InventoryItemAdder.add_item(inv=character.inventory, item_to_add=item)
+            InventoryItemEquipper.equip_item(inv=character.inventory, item_to_equip=item)
+        for idx in range(number_of_perks):
+            effects = "weapon, gun, damage, 1; weapon, short, accuracy, 2; human, dmg_res, 1; weapon, ap_cost, -1; " \
+                      "attribute, strength, 1; evasion, 1"
+            perk = CharacterPerk("perk_{}".format(idx), "perk, attribute, damage, accuracy, dmg_res, ap_cost",
+                                 "Perk", "Perk.", effects, "none")
+            PerkInventoryPerkAdder.add_perk(perk_inv=character.perks, perk_to_add=perk)
+        return character
+
+    def fill_inventory(self, inv, number_of_items):
+        """Adds specified number of items (non-stackable armors and weapons, and partial stacks of ammo and
+        consumables of several types) to specified inventory.
+
+        :param inv: Inventory object to fill
+        :param number_of_items: number of items to add
+        """
+        for idx in range(number_of_items):
+            item_type = idx % 4
+            if item_type == 0:
+                item = Armor("armor_{}".format(idx), "armor", "Armor", "Armor.", 1, 1, 1, 1, 0.0)
+            elif item_type == 1:
+                item = MeleeWeapon("melee_{}".format(idx), "weapon, melee", "Melee", "Melee.", "1 + d4", "none",
+                                   "d10", 0, 0, 3, 1, 1, 0.0)
+            elif item_type == 2:
+                item = Ammo("ammo_{}".format(idx % 20), "ammo, stackable", "Ammo", "Ammo.", 50, 1, 1, 0.0)
+                item.current_amount = self._random.randint(1, 50)
+            else:
+                item = Consumable("consumable_{}".format(idx % 20), "consumable, stackable", "Consumable",
+                                  "Consumable.", "none", 5, 1, 1, 0.0)
+            InventoryItemAdder.add_item(inv=inv, item_to_add=item)
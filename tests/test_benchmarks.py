@@ -0,0 +1,33 @@
+import tempfile
+import unittest
+
+from benchmarks.run_benchmarks import BenchmarkSuite
+
+
+class BenchmarkSuiteTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.suite = BenchmarkSuite(data_directory=self.directory.name, records_per_type=4)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_run_all_benchmarks(self):
+        results = self.suite.run(number=1, repeat=1)
+        self.assertListEqual(self.suite.benchmark_names, list(results.keys()))
+        for time_per_call in results.values():
+            self.assertGreater(time_per_call, 0)
+
+    def test_compare_with_baseline(self):
+        comparison = BenchmarkSuite.compare(results={"fast": 1.0, "slow": 1.3, "new": 1.0},
+                                            baseline={"fast": 1.0, "slow": 1.0}, threshold=0.2)
+        self.assertListEqual([("fast", 1.0, 1.0, False), ("slow", 1.3, 1.0, True), ("new", 1.0, None, False)],
+                             comparison)
+        report = BenchmarkSuite.format_comparison(comparison=comparison)
+        self.assertIn("+30.0%  REGRESSION", report)
+        self.assertNotIn("REGRESSION", report.splitlines()[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
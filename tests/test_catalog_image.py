@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from app.characters.characters import Critter
+from app.files.catalog_image import CatalogImage
+from app.files.data_catalog import DataCatalog
+from app.items.weapons import MeleeWeapon, RangedWeapon
+from app.perks.perks import StatusEffect
+
+
+def _spawn_critter_name(image_file):
+    image = CatalogImage(image_file=image_file)
+    try:
+        return image.create_critter(critter_id="critter").name
+    finally:
+        image.close()
+
+
+class CatalogImageTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.image_file = os.path.join(self.directory.name, "catalog.img")
+        self.catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                                   critter_data_file="test_critters_correct.txt")
+        CatalogImage.export(catalog=self.catalog, image_file=self.image_file)
+        self.image = CatalogImage(image_file=self.image_file)
+
+    def tearDown(self):
+        self.image.close()
+        self.directory.cleanup()
+
+    def test_property_values(self):
+        self.assertListEqual(sorted(self.catalog.item_ids), self.image.item_ids)
+        self.assertListEqual(sorted(self.catalog.perk_ids), self.image.perk_ids)
+        self.assertListEqual(sorted(self.catalog.critter_ids), self.image.critter_ids)
+
+    def test_prototypes_match_catalog(self):
+        for item_id in self.catalog.item_ids:
+            item = self.image.get_item_prototype(item_id=item_id)
+            self.assertIs(type(self.catalog.get_item_prototype(item_id=item_id)), type(item))
+            self.assertEqual(str(self.catalog.get_item_prototype(item_id=item_id)), str(item))
+        for perk_id in self.catalog.perk_ids:
+            perk = self.image.get_perk_prototype(perk_id=perk_id)
+            self.assertIs(type(self.catalog.get_perk_prototype(perk_id=perk_id)), type(perk))
+            self.assertEqual(str(self.catalog.get_perk_prototype(perk_id=perk_id)), str(perk))
+        self.assertIsInstance(self.image.get_item_prototype(item_id="melee"), MeleeWeapon)
+        self.assertEqual(1, self.image.get_perk_prototype(perk_id="status_effect").duration)
+
+    def test_prototypes_are_cached_and_linked(self):
+        gun = self.image.get_item_prototype(item_id="gun")
+        self.assertIsInstance(gun, RangedWeapon)
+        self.assertIs(gun, self.image.get_item_prototype(item_id="gun"))
+        self.assertIs(self.image.get_item_prototype(item_id="ammo"), gun.ammo_prototype)
+        definition = self.image.get_critter_definition(critter_id="critter")
+        self.assertTupleEqual(self.catalog.get_critter_definition(critter_id="critter").parameters,
+                              definition.parameters)
+        self.assertIs(self.image.get_item_prototype(item_id="armor"), definition.armor)
+        self.assertTupleEqual(("perk", "trait", "status_effect"), tuple(perk.perk_id for perk in definition.perks))
+        self.assertTupleEqual((), self.image.get_critter_definition(critter_id="another_critter").perks)
+
+    def test_create_records(self):
+        ammo = self.image.create_item(item_id="ammo")
+        ammo.current_amount = 10
+        self.assertEqual(1, self.image.get_item_prototype(item_id="ammo").current_amount)
+        status_effect = self.image.create_perk(perk_id="status_effect")
+        self.assertIsInstance(status_effect, StatusEffect)
+        self.assertIsNot(self.image.get_perk_prototype(perk_id="status_effect"), status_effect)
+        critter = self.image.create_critter(critter_id="critter")
+        self.assertIsInstance(critter, Critter)
+        self.assertEqual("armor", critter.inventory.equipped_armor.item_id)
+        self.assertEqual("melee", critter.inventory.equipped_weapon.item_id)
+        self.assertEqual(3, len(critter.perks.perks))
+
+    def test_image_is_shared_by_worker_processes(self):
+        with multiprocessing.Pool(processes=2) as pool:
+            names = pool.map(_spawn_critter_name, [self.image_file] * 2)
+        self.assertListEqual(["Critter", "Critter"], names)
+
+    def test_incorrect_ids(self):
+        with self.assertRaises(CatalogImage.CatalogImageError):
+            self.image.get_item_prototype(item_id="nonexistent")
+        with self.assertRaises(CatalogImage.CatalogImageError):
+            self.image.create_perk(perk_id="nonexistent")
+        with self.assertRaises(CatalogImage.CatalogImageError):
+            self.image.create_critter(critter_id="armor")
+
+    def test_incorrect_image_files(self):
+        with self.assertRaises(CatalogImage.CatalogImageError):
+            CatalogImage(image_file=os.path.join(self.directory.name, "nonexistent.img"))
+        incorrect_file = os.path.join(self.directory.name, "incorrect.img")
+        with open(incorrect_file, "wb") as file:
+            file.write(b"incorrect catalog image")
+        with self.assertRaises(CatalogImage.CatalogImageError):
+            CatalogImage(image_file=incorrect_file)
+        with open(self.image_file, "rb") as file:
+            data = file.read()
+        with open(incorrect_file, "wb") as file:
+            file.write(data[:len(data) // 2])
+        with self.assertRaises(CatalogImage.CatalogImageError):
+            CatalogImage(image_file=incorrect_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -161,6 +161,16 @@ class CritterTests(unittest.TestCase):
         self.assertEqual(10, self.critter.health)
         self.assertEqual(15, self.critter.action_points)
 
+    def test_hooks_are_called_by_health_and_action_points_setters(self):
+        changed = list()
+        self.critter.add_hook(changed.append)
+        self.critter.health = 10
+        self.critter.action_points = 15
+        self.assertListEqual([self.critter, self.critter], changed)
+        self.critter.remove_hook(changed.append)
+        with self.assertRaisesRegex(ValueError, "no such hook in character"):
+            self.critter.remove_hook(changed.append)
+
     def test_obj_as_str_representation(self):
         correct_str_print = ("name: Critter, tags: critter, level: 1,\nstrength: 5, endurance: 5, agility: 5, "
                              "perception: 5, intelligence: 5,\nexperience award: 10")
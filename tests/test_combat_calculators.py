@@ -1,3 +1,4 @@
+import itertools
 import unittest
 
 from app.characters.characters import Human, Critter
@@ -6,13 +7,71 @@ from app.items.weapons import RangedWeapon, MeleeWeapon
 from app.mechanics.combat_calculators import CombatCalculatorError, DamageCalculator, DamageFormulaConverter
 from app.mechanics.combat_calculators import AccuracyCalculator, EffectiveAccuracyCalculator
 from app.mechanics.combat_calculators import DamageResistanceCalculator, EffectiveDamageCalculator, APCostCalculator
+from app.mechanics.combat_calculators import ExpectedDamageCalculator, PerkBonusMatcher
 from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper, InventoryItemUnequipper
-from app.mechanics.perk_inventory import PerkInventoryPerkAdder
-from app.perks.perks import CharacterPerk
+from app.mechanics.perk_inventory import PerkInventory, PerkInventoryPerkAdder, PerkInventoryPerkRemover
+from app.mechanics.stat_calculators import CharacterDerivedStatCalculator
+from app.perks.perks import CharacterPerk, StatusEffect
+from app.tags.tags import TagRegistry
+
+
+class PerkBonusMatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.perk_inventory = PerkInventory()
+        self.perk = CharacterPerk(perk_id="perk", tags="perk, damage", name="Perk", desc="Test perk.",
+                                  effects="weapon, short, damage, 2; critter, dog, damage, 4",
+                                  requirements="agility, 5")
+        self.status_effect = StatusEffect(perk_id="status_effect", tags="status effect, damage, accuracy",
+                                          name="Status Effect", desc="Test status effect.",
+                                          effects="weapon, short, damage, 1; weapon, accuracy, -2", duration=2)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.perk_inventory, perk_to_add=self.perk)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.perk_inventory, perk_to_add=self.status_effect)
+        self.weapon_tag_mask = TagRegistry.get_tag_mask("weapon, gun, short")
+
+    def test_get_bonus_sums_matching_effects(self):
+        self.assertEqual(3, PerkBonusMatcher.get_bonus(perk_inv=self.perk_inventory, stat="damage",
+                                                       tag_mask=self.weapon_tag_mask))
+        self.assertEqual(4, PerkBonusMatcher.get_bonus(perk_inv=self.perk_inventory, stat="damage",
+                                                       tag_mask=TagRegistry.get_tag_mask("critter, dog")))
+        self.assertEqual(-2, PerkBonusMatcher.get_bonus(perk_inv=self.perk_inventory, stat="accuracy",
+                                                        tag_mask=self.weapon_tag_mask))
+        self.assertEqual(0, PerkBonusMatcher.get_bonus(perk_inv=self.perk_inventory, stat="ap_cost",
+                                                       tag_mask=self.weapon_tag_mask))
+
+    def test_get_bonus_ignores_effects_of_perks_not_tagged_with_stat(self):
+        perk = CharacterPerk(perk_id="another_perk", tags="perk", name="Perk", desc="Test perk.",
+                             effects="weapon, short, damage, 10", requirements="agility, 5")
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.perk_inventory, perk_to_add=perk)
+        self.assertEqual(3, PerkBonusMatcher.get_bonus(perk_inv=self.perk_inventory, stat="damage",
+                                                       tag_mask=self.weapon_tag_mask))
+
+    def test_get_bonus_follows_perk_inventory_changes(self):
+        self.assertEqual(3, PerkBonusMatcher.get_bonus(perk_inv=self.perk_inventory, stat="damage",
+                                                       tag_mask=self.weapon_tag_mask))
+        PerkInventoryPerkRemover.remove_perk(perk_inv=self.perk_inventory, perk_to_remove=self.status_effect)
+        self.assertEqual(2, PerkBonusMatcher.get_bonus(perk_inv=self.perk_inventory, stat="damage",
+                                                       tag_mask=self.weapon_tag_mask))
+
+    def test_incorrect_obj_as_perk_inventory_raises_exception(self):
+        with self.assertRaisesRegex(CombatCalculatorError, "incorrect object type for perk inventory"):
+            PerkBonusMatcher.get_bonus(perk_inv="not PerkInventory object", stat="damage", tag_mask=0)
 
 
 class DamageFormulaConverterTests(unittest.TestCase):
 
+    def test_get_expected_damage_without_clipping(self):
+        self.assertEqual(16, DamageFormulaConverter.get_expected_damage(damage_tuple=(2, 4, 6)))
+        self.assertEqual(13, DamageFormulaConverter.get_expected_damage(damage_tuple=(2, 4, 6), dmg_res=3))
+
+    def test_get_expected_damage_clipped_at_zero(self):
+        self.assertAlmostEqual(1.0, DamageFormulaConverter.get_expected_damage(damage_tuple=(0, 1, 6), dmg_res=3))
+        rolls = [sum(roll) for roll in itertools.product(range(1, 7), repeat=2)]
+        expected_damage = sum(max(0, 1 + roll - 9) for roll in rolls) / len(rolls)
+        self.assertAlmostEqual(expected_damage,
+                               DamageFormulaConverter.get_expected_damage(damage_tuple=(1, 2, 6), dmg_res=9))
+        self.assertEqual(0, DamageFormulaConverter.get_expected_damage(damage_tuple=(0, 2, 6), dmg_res=12))
+
     def test_get_damage_tuple_with_full_damage_formula_multiple_rolls(self):
         damage_formula = "2 + 4d6"
         correct_damage_tuple = (2, 4, 6)
@@ -109,6 +168,21 @@ class DamageCalculatorTests(unittest.TestCase):
         damage = DamageCalculator.get_weapon_damage(character=self.character, opponent=self.critter)
         self.assertEqual("2 + 4d6", damage)
 
+    def test_weapon_damage_of_not_equipped_weapon(self):
+        perk = CharacterPerk(perk_id="perk", tags="perk, damage", name="Perk", desc="Test perk.",
+                             effects="weapon, melee, damage, 2", requirements="agility, 5")
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.character.perks, perk_to_add=perk)
+        weapon = MeleeWeapon(item_id="melee", tags="weapon, melee", name="Knife", desc="Test melee.", damage="1 + 2d4",
+                             effect="none", eff_chance="0", armor_pen=0, accuracy=0, ap_cost=3, st_requirement=1,
+                             value=5, weight=1.0)
+        version = self.character.version
+        damage = DamageCalculator.get_weapon_damage(character=self.character, weapon=weapon)
+        self.assertEqual("3 + 2d4", damage)
+        self.assertEqual(3, APCostCalculator.get_ap_cost(character=self.character, weapon=weapon))
+        self.assertEqual(version, self.character.version)
+        with self.assertRaisesRegex(CombatCalculatorError, "incorrect object type for weapon for character: .*"):
+            DamageCalculator.get_weapon_damage(character=self.character, weapon="not Weapon derived object")
+
     def test_no_weapon_equipped_raises_exception(self):
         InventoryItemUnequipper.unequip_weapon(inv=self.character.inventory)
         with self.assertRaisesRegex(CombatCalculatorError, "no weapon equipped on character: .*"):
@@ -287,6 +361,14 @@ class EffectiveAccuracyCalculatorTests(unittest.TestCase):
         accuracy = EffectiveAccuracyCalculator.get_effective_accuracy(character=self.character, opponent=self.opponent)
         self.assertEqual(12, accuracy)
 
+    def test_hit_chance_against_opponent(self):
+        hit_chance = EffectiveAccuracyCalculator.get_hit_chance(character=self.character, opponent=self.opponent)
+        self.assertAlmostEqual(0.6, hit_chance)
+
+    def test_hit_chance_is_limited(self):
+        self.assertEqual(0.05, EffectiveAccuracyCalculator.get_hit_chance_for_accuracy(effective_accuracy=1))
+        self.assertEqual(1.0, EffectiveAccuracyCalculator.get_hit_chance_for_accuracy(effective_accuracy=25))
+
     def test_accuracy_with_weapon_type_accuracy_perk_against_opponent(self):
         perk = CharacterPerk(perk_id="perk", tags="perk, accuracy", name="Perk", desc="Test perk.",
                              effects="weapon, gun, short, accuracy, 1", requirements="agility, 5")
@@ -400,6 +482,16 @@ class DamageResistanceCalculatorTests(unittest.TestCase):
         dmg_res = DamageResistanceCalculator.get_damage_resistance(character=self.character, opponent=self.critter)
         self.assertEqual(0, dmg_res)
 
+    def test_damage_resistance_of_not_equipped_armor(self):
+        armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=5, rad_res=10,
+                      evasion=2, value=10, weight=2.5)
+        version = self.character.version
+        dmg_res = DamageResistanceCalculator.get_damage_resistance(character=self.character, armor=armor)
+        self.assertEqual(5, dmg_res)
+        self.assertEqual(version, self.character.version)
+        with self.assertRaisesRegex(CombatCalculatorError, "incorrect object type for armor for character: .*"):
+            DamageResistanceCalculator.get_damage_resistance(character=self.character, armor="not Armor object")
+
     def test_no_armor_equipped_raises_exception(self):
         InventoryItemUnequipper.unequip_armor(inv=self.character.inventory)
         with self.assertRaisesRegex(CombatCalculatorError, "no armor equipped on character: .*"):
@@ -440,6 +532,19 @@ class EffectiveDamageCalculatorTests(unittest.TestCase):
                                                                 damage_roll=damage_roll)
         self.assertEqual(12, damage)
 
+    def test_expected_damage_matches_mean_of_all_damage_rolls(self):
+        armor = Armor(item_id="heavy_armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=12, rad_res=10,
+                      evasion=0, value=10, weight=2.5)
+        InventoryItemAdder.add_item(inv=self.opponent.inventory, item_to_add=armor)
+        InventoryItemEquipper.equip_item(inv=self.opponent.inventory, item_to_equip=armor)
+        rolls = [sum(roll) for roll in itertools.product(range(1, 7), repeat=4)]
+        mean_damage = sum(EffectiveDamageCalculator.get_effective_damage(character=self.character,
+                                                                         opponent=self.opponent, damage_roll=roll)
+                          for roll in rolls) / len(rolls)
+        expected_damage = EffectiveDamageCalculator.get_expected_damage(character=self.character,
+                                                                        opponent=self.opponent)
+        self.assertAlmostEqual(mean_damage, expected_damage)
+
     def test_damage_with_weapon_type_damage_perk_against_opponent(self):
         perk = CharacterPerk(perk_id="perk", tags="perk, damage", name="Perk", desc="Test perk.",
                              effects="weapon, short, damage, 2", requirements="agility, 5")
@@ -620,5 +725,52 @@ class APCostCalculatorTests(unittest.TestCase):
             APCostCalculator.get_ap_cost(character="not Character derived object")
 
 
+class ExpectedDamageCalculatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.character = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5)
+        self.opponent = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5,
+                              perception=5, intelligence=5)
+        self.weapon = RangedWeapon(item_id="gun", tags="weapon, gun, short", name="Gun", desc="Test gun.",
+                                   damage="2 + 4d6", ammo_type="ammo", clip_size=10, armor_pen=0, accuracy=2, ap_cost=4,
+                                   st_requirement=1, value=10, weight=2.0)
+        armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=2, rad_res=10,
+                      evasion=0, value=10, weight=2.5)
+        InventoryItemAdder.add_item(inv=self.character.inventory, item_to_add=self.weapon)
+        InventoryItemEquipper.equip_item(inv=self.character.inventory, item_to_equip=self.weapon)
+        InventoryItemAdder.add_item(inv=self.opponent.inventory, item_to_add=armor)
+        InventoryItemEquipper.equip_item(inv=self.opponent.inventory, item_to_equip=armor)
+        self.character.guns = 5
+        self.weapon.current_ammo = 10
+
+    def test_expected_damage_per_attack_and_ap(self):
+        damage = ExpectedDamageCalculator.get_expected_damage_per_attack(character=self.character,
+                                                                         opponent=self.opponent)
+        self.assertAlmostEqual(0.6 * 14, damage)
+        damage_per_ap = ExpectedDamageCalculator.get_expected_damage_per_ap(character=self.character,
+                                                                            opponent=self.opponent)
+        self.assertAlmostEqual(0.6 * 14 / 4, damage_per_ap)
+
+    def test_expected_damage_per_turn(self):
+        attacks = CharacterDerivedStatCalculator.get_max_ap(character=self.character) // 4
+        self.assertEqual(attacks, ExpectedDamageCalculator.get_attacks_per_turn(character=self.character))
+        damage = ExpectedDamageCalculator.get_expected_damage_per_turn(character=self.character,
+                                                                       opponent=self.opponent)
+        self.assertAlmostEqual(attacks * 0.6 * 14, damage)
+
+    def test_attacks_per_turn_are_limited_by_loaded_ammo(self):
+        self.weapon.current_ammo = 1
+        self.assertEqual(1, ExpectedDamageCalculator.get_attacks_per_turn(character=self.character))
+        self.weapon.current_ammo = 0
+        self.assertEqual(0, ExpectedDamageCalculator.get_expected_damage_per_turn(character=self.character,
+                                                                                  opponent=self.opponent))
+
+    def test_incorrect_obj_as_opponent_raises_exception(self):
+        with self.assertRaisesRegex(CombatCalculatorError, "incorrect object type for opponent"):
+            ExpectedDamageCalculator.get_expected_damage_per_ap(character=self.character,
+                                                                opponent="not Character derived object")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+
+import app.config.game_config as game_config
+from app.characters.characters import Human, Critter
+from app.items.items import Armor
+from app.items.weapons import RangedWeapon, MeleeWeapon
+from app.mechanics.combat_calculators import CombatCalculatorError, EffectiveDamageCalculator
+from app.mechanics.combat_calculators import EffectiveAccuracyCalculator, APCostCalculator, ExpectedDamageCalculator
+from app.mechanics.combat_context import CombatContext, CombatContextCache
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder, PerkInventoryPerkRemover
+from app.perks.perks import CharacterPerk, StatusEffect
+
+
+class CombatContextTests(unittest.TestCase):
+
+    def setUp(self):
+        self.character = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5)
+        self.critter = Critter(name="Critter", tags="critter, dog", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5, health_bonus=10, exp_award=10)
+        weapon = RangedWeapon(item_id="gun", tags="weapon, gun, short", name="Gun", desc="Test gun.", damage="2 + 4d6",
+                              ammo_type="ammo", clip_size=10, armor_pen=1, accuracy=0, ap_cost=10, st_requirement=1,
+                              value=10, weight=2.0)
+        armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=3, rad_res=10, evasion=2,
+                      value=10, weight=2.5)
+        critter_weapon = MeleeWeapon(item_id="melee", tags="weapon, melee, sharp", name="Melee", desc="Test melee.",
+                                     damage="2 + 4d6", effect="bleed_minor", eff_chance="-6 + d10", armor_pen=0,
+                                     accuracy=0, ap_cost=10, st_requirement=1, value=5, weight=1.0)
+        InventoryItemAdder.add_item(inv=self.character.inventory, item_to_add=weapon)
+        InventoryItemEquipper.equip_item(inv=self.character.inventory, item_to_equip=weapon)
+        InventoryItemAdder.add_item(inv=self.critter.inventory, item_to_add=armor)
+        InventoryItemEquipper.equip_item(inv=self.critter.inventory, item_to_equip=armor)
+        InventoryItemAdder.add_item(inv=self.critter.inventory, item_to_add=critter_weapon)
+        InventoryItemEquipper.equip_item(inv=self.critter.inventory, item_to_equip=critter_weapon)
+        self.context = CombatContext(character=self.character, opponent=self.critter)
+
+    def test_combat_parameters_match_calculators(self):
+        for damage_roll in (4, 10, 24):
+            self.assertEqual(EffectiveDamageCalculator.get_effective_damage(character=self.character,
+                                                                            opponent=self.critter,
+                                                                            damage_roll=damage_roll),
+                             self.context.get_effective_damage(damage_roll=damage_roll))
+        self.assertEqual(EffectiveAccuracyCalculator.get_effective_accuracy(character=self.character,
+                                                                            opponent=self.critter),
+                         self.context.get_effective_accuracy())
+        self.assertEqual(APCostCalculator.get_ap_cost(character=self.character), self.context.get_ap_cost())
+        self.assertEqual("2 + 4d6", self.context.get_weapon_damage())
+        self.assertEqual(3, self.context.get_damage_resistance())
+        self.assertEqual(2, self.context.get_effective_damage_resistance())
+
+    def test_expected_values_match_calculators(self):
+        self.assertEqual(EffectiveAccuracyCalculator.get_hit_chance(character=self.character, opponent=self.critter),
+                         self.context.get_hit_chance())
+        self.assertEqual(EffectiveDamageCalculator.get_expected_damage(character=self.character, opponent=self.critter),
+                         self.context.get_expected_damage())
+        self.assertAlmostEqual(ExpectedDamageCalculator.get_expected_damage_per_ap(character=self.character,
+                                                                                   opponent=self.critter),
+                               self.context.get_expected_damage_per_ap())
+
+    def test_game_config_change_invalidates_memoized_parameters(self):
+        self.addCleanup(game_config.reset_config)
+        self.context.get_ap_cost()
+        self.assertEqual(10, self.context._get_result(name="ap_cost", calculate=lambda: "recalculated"))
+        game_config.update_config(action_points_base=12)
+        self.assertEqual("recalculated", self.context._get_result(name="ap_cost", calculate=lambda: "recalculated"))
+
+    def test_burst_damage(self):
+        self.assertListEqual([0, 1, 10], self.context.get_burst_damage(damage_rolls=[-1, 1, 10]))
+
+    def test_perk_changes_invalidate_memoized_parameters(self):
+        self.assertEqual("2 + 4d6", self.context.get_weapon_damage())
+        perk = CharacterPerk(perk_id="perk", tags="perk, damage", name="Perk", desc="Test perk.",
+                             effects="critter, dog, damage, 4", requirements="agility, 5")
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.character.perks, perk_to_add=perk)
+        self.assertEqual("6 + 4d6", self.context.get_weapon_damage())
+        PerkInventoryPerkRemover.remove_perk(perk_inv=self.character.perks, perk_to_remove=perk)
+        self.assertEqual("2 + 4d6", self.context.get_weapon_damage())
+
+    def test_status_effect_and_equipment_changes_invalidate_memoized_parameters(self):
+        self.assertEqual(2, self.context.get_effective_damage_resistance())
+        status_effect = StatusEffect(perk_id="status_effect", tags="status effect, dmg_res", name="Status Effect",
+                                     desc="Test status effect.", effects="armor, dmg_res, 2", duration=1)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.critter.perks, perk_to_add=status_effect)
+        self.assertEqual(4, self.context.get_effective_damage_resistance())
+        better_armor = Armor(item_id="better_armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=6,
+                             rad_res=10, evasion=2, value=10, weight=2.5)
+        InventoryItemAdder.add_item(inv=self.critter.inventory, item_to_add=better_armor)
+        InventoryItemEquipper.equip_item(inv=self.critter.inventory, item_to_equip=better_armor)
+        self.assertEqual(7, self.context.get_effective_damage_resistance())
+
+    def test_skill_changes_invalidate_memoized_parameters(self):
+        accuracy = self.context.get_weapon_accuracy()
+        self.character.guns += 2
+        self.assertEqual(accuracy + 2, self.context.get_weapon_accuracy())
+
+    def test_incorrect_characters_raise_exception(self):
+        with self.assertRaisesRegex(CombatCalculatorError, "incorrect object type for character"):
+            CombatContext(character="not Character object", opponent=self.critter)
+        with self.assertRaisesRegex(CombatCalculatorError, "incorrect object type for opponent"):
+            CombatContext(character=self.character, opponent="not Character object")
+        with self.assertRaisesRegex(CombatCalculatorError, "character and opponent are the same object"):
+            CombatContext(character=self.character, opponent=self.character)
+
+
+class CombatContextCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.character = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5)
+        self.critter = Critter(name="Critter", tags="critter, dog", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5, health_bonus=10, exp_award=10)
+        self.cache = CombatContextCache()
+
+    def test_get_context_reuses_contexts_per_pair(self):
+        context = self.cache.get_context(character=self.character, opponent=self.critter)
+        self.assertIs(context, self.cache.get_context(character=self.character, opponent=self.critter))
+        self.assertIsNot(context, self.cache.get_context(character=self.critter, opponent=self.character))
+        self.assertEqual(2, len(self.cache))
+
+    def test_remove_character_and_clear(self):
+        self.cache.get_context(character=self.character, opponent=self.critter)
+        self.cache.get_context(character=self.critter, opponent=self.character)
+        self.cache.remove_character(self.critter)
+        self.assertEqual(0, len(self.cache))
+        self.cache.get_context(character=self.character, opponent=self.critter)
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+from app.characters.characters import Human, Critter
+from app.items.weapons import MeleeWeapon
+from app.mechanics.combat_scheduler import CombatScheduler
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder
+from app.perks.perks import StatusEffect
+
+
+class CombatSchedulerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.slow = Human(name="Slow", tags="human", level=1, strength=5, endurance=5, agility=3, perception=5,
+                          intelligence=5)
+        self.fast = Human(name="Fast", tags="human", level=1, strength=5, endurance=5, agility=8, perception=5,
+                          intelligence=5)
+        self.critter = Critter(name="Critter", tags="critter, dog", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5, health_bonus=10, exp_award=10)
+        for character in (self.slow, self.fast, self.critter):
+            weapon = MeleeWeapon(item_id="melee", tags="weapon, melee, sharp", name="Melee", desc="Test melee.",
+                                 damage="2 + 4d6", effect="bleed_minor", eff_chance="-6 + d10", armor_pen=0,
+                                 accuracy=0, ap_cost=5, st_requirement=1, value=5, weight=1.0)
+            InventoryItemAdder.add_item(inv=character.inventory, item_to_add=weapon)
+            InventoryItemEquipper.equip_item(inv=character.inventory, item_to_equip=weapon)
+        self.scheduler = CombatScheduler(combatants=[self.slow, self.fast, self.critter])
+
+    def test_combatants_are_ordered_by_initiative(self):
+        self.assertListEqual([self.fast, self.critter, self.slow], self.scheduler.combatants)
+        self.assertEqual(18, self.scheduler.get_initiative(self.fast))
+        self.assertEqual(18, self.fast.action_points)
+
+    def test_get_next_combatant_returns_every_combatant_once_per_turn(self):
+        order = list()
+        combatant = self.scheduler.get_next_combatant()
+        while combatant is not None:
+            order.append(combatant)
+            combatant = self.scheduler.get_next_combatant()
+        self.assertListEqual([self.fast, self.critter, self.slow], order)
+        self.scheduler.end_turn()
+        self.assertEqual(2, self.scheduler.turn)
+        self.assertIs(self.fast, self.scheduler.get_next_combatant())
+
+    def test_queued_actions_are_resolved_by_initiative_and_spend_action_points(self):
+        self.scheduler.queue_action(character=self.slow, action="attack")
+        self.scheduler.queue_action(character=self.fast, action="attack")
+        self.scheduler.queue_action(character=self.fast, action="reload", ap_cost=2)
+        self.assertEqual(11, self.fast.action_points)
+        self.assertEqual(8, self.slow.action_points)
+        self.assertTupleEqual((self.fast, "attack"), self.scheduler.get_next_action())
+        self.assertTupleEqual((self.fast, "reload"), self.scheduler.get_next_action())
+        self.assertTupleEqual((self.slow, "attack"), self.scheduler.get_next_action())
+        self.assertIsNone(self.scheduler.get_next_action())
+
+    def test_end_turn_restores_action_points_and_ticks_status_effects(self):
+        status_effect = StatusEffect(perk_id="status_effect", tags="status effect, max_ap", name="Status Effect",
+                                     desc="Test status effect.", effects="max_ap, 4", duration=1)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.slow.perks, perk_to_add=status_effect)
+        self.scheduler.queue_action(character=self.slow, action="attack")
+        self.scheduler.end_turn()
+        self.assertFalse(self.scheduler.has_queued_actions())
+        self.assertEqual(0, len(self.slow.perks.perks))
+        self.assertEqual(13, self.slow.action_points)
+
+    def test_removed_combatant_doesnt_act(self):
+        self.scheduler.queue_action(character=self.fast, action="attack")
+        self.scheduler.remove_combatant(self.fast)
+        self.assertIsNone(self.scheduler.get_next_action())
+        self.assertIs(self.critter, self.scheduler.get_next_combatant())
+        self.assertListEqual([self.critter, self.slow], self.scheduler.combatants)
+
+    def test_removed_combatant_actions_are_not_queued_actions(self):
+        self.scheduler.queue_action(character=self.fast, action="attack")
+        self.scheduler.queue_action(character=self.slow, action="attack")
+        self.scheduler.remove_combatant(self.fast)
+        self.assertFalse(self.scheduler.is_combatant(self.fast))
+        self.assertTrue(self.scheduler.has_queued_actions())
+        self.scheduler.remove_combatant(self.slow)
+        self.assertFalse(self.scheduler.has_queued_actions())
+        self.assertIsNone(self.scheduler.get_next_action())
+
+    def test_combatant_added_during_turn_acts_in_current_turn(self):
+        self.assertIs(self.fast, self.scheduler.get_next_combatant())
+        self.assertIs(self.critter, self.scheduler.get_next_combatant())
+        late = Human(name="Late", tags="human", level=1, strength=5, endurance=5, agility=10, perception=5,
+                     intelligence=5)
+        self.scheduler.add_combatant(late)
+        self.assertTrue(self.scheduler.is_combatant(late))
+        self.assertIs(late, self.scheduler.get_next_combatant())
+        self.assertIs(self.slow, self.scheduler.get_next_combatant())
+        self.assertIsNone(self.scheduler.get_next_combatant())
+
+    def test_not_enough_action_points_raises_exception(self):
+        self.scheduler.queue_action(character=self.slow, action="attack", ap_cost=10)
+        with self.assertRaisesRegex(CombatScheduler.CombatSchedulerError, "not enough action points for combatant: .*"):
+            self.scheduler.queue_action(character=self.slow, action="attack")
+
+    def test_incorrect_combatants_raise_exception(self):
+        with self.assertRaisesRegex(CombatScheduler.CombatSchedulerError, "incorrect object type for combatant"):
+            self.scheduler.add_combatant("not Character object")
+        with self.assertRaisesRegex(CombatScheduler.CombatSchedulerError, "combatant: .* already takes part in combat"):
+            self.scheduler.add_combatant(self.slow)
+        other = Human(name="Other", tags="human", level=1, strength=5, endurance=5, agility=5, perception=5,
+                      intelligence=5)
+        with self.assertRaisesRegex(CombatScheduler.CombatSchedulerError, "character doesn't take part in combat"):
+            self.scheduler.queue_action(character=other, action="attack")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+from app.characters.characters import Critter, Human
+from app.files.content_generator import ContentGenerator
+from app.files.data_catalog import DataCatalog
+from app.files.data_validator import DataValidator
+from app.items.weapons import RangedWeapon
+
+
+class ContentGeneratorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.item_file = os.path.join(self.directory.name, "items.txt")
+        self.perk_file = os.path.join(self.directory.name, "perks.txt")
+        self.critter_file = os.path.join(self.directory.name, "critters.txt")
+        self.generator = ContentGenerator(seed=1)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_data_files(self, records_per_type=10):
+        return self.generator.write_data_files(item_data_file=self.item_file, perk_data_file=self.perk_file,
+                                               critter_data_file=self.critter_file, records_per_type=records_per_type)
+
+    def test_generated_data_files_are_valid(self):
+        content = self.write_data_files()
+        self.assertEqual(10, len(content.ranged_weapons))
+        self.assertEqual(10, len(content.critters))
+        validator = DataValidator(item_data_file=self.item_file, perk_data_file=self.perk_file,
+                                  critter_data_file=self.critter_file)
+        self.assertListEqual([], validator.validate(parallel=False))
+
+    def test_generated_records_are_created_by_factories(self):
+        content = self.write_data_files()
+        catalog = DataCatalog(item_data_file=self.item_file, perk_data_file=self.perk_file,
+                              critter_data_file=self.critter_file)
+        self.assertEqual(50, len(catalog.item_ids))
+        self.assertEqual(30, len(catalog.perk_ids))
+        ranged_weapon = catalog.get_item_prototype(item_id=content.ranged_weapons[0])
+        self.assertIsInstance(ranged_weapon, RangedWeapon)
+        self.assertIn(ranged_weapon.ammo_prototype.item_id, content.ammo)
+        for critter_id in content.critters:
+            self.assertIsInstance(catalog.create_critter(critter_id=critter_id), Critter)
+
+    def test_same_seed_generates_same_data(self):
+        self.write_data_files()
+        with open(self.critter_file) as file:
+            critter_data = file.read()
+        ContentGenerator(seed=1).write_data_files(item_data_file=self.item_file, perk_data_file=self.perk_file,
+                                                  critter_data_file=self.critter_file, records_per_type=10)
+        with open(self.critter_file) as file:
+            self.assertEqual(critter_data, file.read())
+
+    def test_traits_conflict_in_pairs(self):
+        content = self.generator.write_perk_data(data_file=self.perk_file, traits=3)
+        self.assertListEqual(["trait_0", "trait_1", "trait_2"], content.traits)
+        with open(self.perk_file) as file:
+            conflicts = [line.split()[-1] for line in file if line.startswith("conflicts:")]
+        self.assertListEqual(["trait_1", "trait_0", "none"], conflicts)
+
+    def test_create_world(self):
+        self.write_data_files()
+        catalog = DataCatalog(item_data_file=self.item_file, perk_data_file=self.perk_file,
+                              critter_data_file=self.critter_file)
+        characters = self.generator.create_world(catalog=catalog, humans=5, critters=3, items_per_human=4,
+                                                 perks_per_human=2)
+        self.assertEqual(8, len(characters))
+        human = characters[0]
+        self.assertIsInstance(human, Human)
+        self.assertIsNotNone(human.inventory.equipped_armor)
+        self.assertIsNotNone(human.inventory.equipped_weapon)
+        self.assertEqual(2, len(human.perks.perks))
+        self.assertIsInstance(characters[-1], Critter)
+
+    def test_inconsistent_content_raises_exception(self):
+        with self.assertRaises(ContentGenerator.ContentGeneratorError):
+            self.generator.write_item_data(data_file=self.item_file, ranged_weapons=1)
+        items = self.generator.write_item_data(data_file=self.item_file, armors=1)
+        perks = self.generator.write_perk_data(data_file=self.perk_file, perks=1)
+        with self.assertRaises(ContentGenerator.ContentGeneratorError):
+            self.generator.write_critter_data(data_file=self.critter_file, critters=1, item_content=items,
+                                              perk_content=perks)
+        self.generator.write_critter_data(data_file=self.critter_file, critters=0, item_content=items,
+                                          perk_content=perks)
+        catalog = DataCatalog(item_data_file=self.item_file, perk_data_file=self.perk_file,
+                              critter_data_file=self.critter_file)
+        with self.assertRaises(ContentGenerator.ContentGeneratorError):
+            self.generator.create_world(catalog=catalog, humans=1)
+        with self.assertRaises(ContentGenerator.ContentGeneratorError):
+            self.generator.create_world(catalog=catalog, critters=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
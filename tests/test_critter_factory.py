@@ -29,6 +29,19 @@ class CritterFactoryTests(unittest.TestCase):
         self.assertIsInstance(critter.inventory.equipped_armor, Armor)
         self.assertIsInstance(critter.inventory.equipped_weapon, MeleeWeapon)
 
+    def test_created_critters_share_item_and_perk_factories(self):
+        factory = CritterFactory(data_file="test_critters_correct.txt", item_data_file="test_items_correct.txt",
+                                 perk_data_file="test_perks_correct.txt")
+        critter = factory.create_critter(critter_id="critter")
+        item_factory, perk_factory = factory._item_factory, factory._perk_factory
+        another_critter = factory.create_critter(critter_id="critter")
+        self.assertIs(item_factory, factory._item_factory)
+        self.assertIs(perk_factory, factory._perk_factory)
+        self.assertEqual(set(), factory.update_data())
+        self.assertIs(item_factory, factory._item_factory)
+        self.assertIsNot(critter.inventory.equipped_weapon, another_critter.inventory.equipped_weapon)
+        self.assertIsNot(critter.perks.perks[0], another_critter.perks.perks[0])
+
     def test_create_critter_without_perks(self):
         critter = CritterFactory(data_file="test_critters_correct.txt", item_data_file="test_items_correct.txt",
                                  perk_data_file="test_perks_correct.txt").create_critter(critter_id="another_critter")
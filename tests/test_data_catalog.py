@@ -0,0 +1,173 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from app.characters.characters import Critter
+from app.files.data_catalog import DataCatalog
+from app.items.items import Armor
+from app.items.stackables import Ammo
+from app.items.weapons import RangedWeapon
+from app.mechanics.inventory import Inventory, InventoryItemAdder, InventoryWeaponReloader, InventoryWeaponUnloader
+
+
+class DataCatalogTests(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                                   critter_data_file="test_critters_correct.txt")
+
+    def test_property_values(self):
+        self.assertIn("armor", self.catalog.item_ids)
+        self.assertIn("status_effect", self.catalog.perk_ids)
+        self.assertListEqual(["critter", "another_critter"], self.catalog.critter_ids)
+
+    def test_create_item_copies_prototype(self):
+        armor = self.catalog.create_item(item_id="armor")
+        self.assertIsInstance(armor, Armor)
+        self.assertIsNot(self.catalog.get_item_prototype(item_id="armor"), armor)
+        ammo = self.catalog.create_item(item_id="ammo")
+        ammo.current_amount = 10
+        self.assertEqual(1, self.catalog.get_item_prototype(item_id="ammo").current_amount)
+
+    def test_ranged_weapons_are_linked_to_ammo(self):
+        gun = self.catalog.get_item_prototype(item_id="gun")
+        self.assertIsInstance(gun, RangedWeapon)
+        self.assertIs(self.catalog.get_item_prototype(item_id="ammo"), gun.ammo_prototype)
+
+    def test_critter_definitions_are_linked(self):
+        definition = self.catalog.get_critter_definition(critter_id="critter")
+        self.assertIs(self.catalog.get_item_prototype(item_id="armor"), definition.armor)
+        self.assertIs(self.catalog.get_item_prototype(item_id="melee"), definition.weapon)
+        self.assertTupleEqual((self.catalog.get_perk_prototype(perk_id="perk"),
+                               self.catalog.get_perk_prototype(perk_id="trait"),
+                               self.catalog.get_perk_prototype(perk_id="status_effect")), definition.perks)
+
+    def test_create_critter(self):
+        critter = self.catalog.create_critter(critter_id="critter")
+        self.assertIsInstance(critter, Critter)
+        self.assertEqual("armor", critter.inventory.equipped_armor.item_id)
+        self.assertEqual("melee", critter.inventory.equipped_weapon.item_id)
+        self.assertEqual(3, len(critter.perks.perks))
+        another_critter = self.catalog.create_critter(critter_id="critter")
+        self.assertIsNot(critter.inventory.equipped_weapon, another_critter.inventory.equipped_weapon)
+        self.assertIsNot(critter.perks.perks[2], another_critter.perks.perks[2])
+
+    def test_reload_and_unload_weapon_created_from_catalog(self):
+        inventory = Inventory()
+        gun = self.catalog.create_item(item_id="gun")
+        ammo = self.catalog.create_item(item_id="ammo")
+        ammo.current_amount = 5
+        InventoryItemAdder.add_item(inv=inventory, item_to_add=gun)
+        InventoryItemAdder.add_item(inv=inventory, item_to_add=ammo)
+        InventoryWeaponReloader.reload_weapon(inv=inventory, weapon_to_reload=gun)
+        self.assertEqual(5, gun.current_ammo)
+        InventoryWeaponUnloader.unload_weapon(inv=inventory, weapon_to_unload=gun, data_file="invalid_file.txt")
+        self.assertEqual(0, gun.current_ammo)
+        self.assertIsInstance(inventory.items[-1], Ammo)
+        self.assertEqual(5, inventory.items[-1].current_amount)
+
+    def test_incorrect_ids_raise_exception(self):
+        with self.assertRaisesRegex(DataCatalog.DataCatalogError, "incorrect item ID: .*"):
+            self.catalog.create_item(item_id="incorrect_item")
+        with self.assertRaisesRegex(DataCatalog.DataCatalogError, "incorrect perk ID: .*"):
+            self.catalog.create_perk(perk_id="incorrect_perk")
+        with self.assertRaisesRegex(DataCatalog.DataCatalogError, "incorrect critter ID: .*"):
+            self.catalog.create_critter(critter_id="incorrect_critter")
+
+    def test_incorrect_data_raises_exception(self):
+        with self.assertRaisesRegex(DataCatalog.DataCatalogError, "can't load items: .*"):
+            DataCatalog(item_data_file="test_items_incorrect.txt", perk_data_file="test_perks_correct.txt",
+                        critter_data_file="test_critters_correct.txt")
+        with self.assertRaisesRegex(DataCatalog.DataCatalogError, "incorrect item: incorrect_armor for critter: .*"):
+            DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                        critter_data_file="test_critters_incorrect.txt")
+
+
+class DataCatalogRefreshTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_files = dict()
+        for data_type in ("items", "perks", "critters"):
+            self.data_files[data_type] = os.path.join(self.directory.name, "{}.txt".format(data_type))
+            shutil.copyfile("test_{}_correct.txt".format(data_type), self.data_files[data_type])
+            os.utime(self.data_files[data_type], (0, 0))
+        self.catalog = DataCatalog(item_data_file=self.data_files["items"], perk_data_file=self.data_files["perks"],
+                                   critter_data_file=self.data_files["critters"])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def replace_data(self, data_type, old, new, mtime=1):
+        with open(self.data_files[data_type]) as file:
+            data = file.read()
+        with open(self.data_files[data_type], "w") as file:
+            file.write(data.replace(old, new, 1))
+        os.utime(self.data_files[data_type], (mtime, mtime))
+
+    def test_refresh_without_modification(self):
+        armor = self.catalog.get_item_prototype(item_id="armor")
+        self.assertSetEqual(set(), self.catalog.refresh())
+        self.assertIs(armor, self.catalog.get_item_prototype(item_id="armor"))
+
+    def test_refresh_reloads_only_changed_records_and_relinks_references(self):
+        melee = self.catalog.get_item_prototype(item_id="melee")
+        gun = self.catalog.get_item_prototype(item_id="gun")
+        self.replace_data(data_type="items", old="Test armor.", new="Changed armor.")
+        self.assertSetEqual({"armor"}, self.catalog.refresh())
+        armor = self.catalog.get_item_prototype(item_id="armor")
+        self.assertEqual("Changed armor.", armor.desc)
+        self.assertIs(melee, self.catalog.get_item_prototype(item_id="melee"))
+        self.assertIs(gun, self.catalog.get_item_prototype(item_id="gun"))
+        self.assertIs(armor, self.catalog.get_critter_definition(critter_id="critter").armor)
+
+    def test_refresh_relinks_weapons_to_changed_ammo(self):
+        self.replace_data(data_type="items", old="Test ammo.", new="Changed ammo.")
+        self.assertSetEqual({"ammo"}, self.catalog.refresh())
+        ammo = self.catalog.get_item_prototype(item_id="ammo")
+        self.assertIs(ammo, self.catalog.get_item_prototype(item_id="gun").ammo_prototype)
+
+    def test_refresh_ignores_ids_inside_descriptions(self):
+        self.replace_data(data_type="items", old="Test gun.", new="Test gun, rapid: very.")
+        self.assertSetEqual({"gun"}, self.catalog.refresh())
+        self.assertEqual("Test gun, rapid: very.", self.catalog.get_item_prototype(item_id="gun").desc)
+        self.assertNotIn("very.", self.catalog.item_ids)
+
+    def test_refresh_with_incorrect_changes_raises_exception_and_keeps_catalog(self):
+        armor = self.catalog.get_item_prototype(item_id="armor")
+        self.replace_data(data_type="items", old="id:                    armor", new="id:                    armour")
+        with self.assertRaisesRegex(DataCatalog.DataCatalogError, "incorrect item: armor for critter: critter"):
+            self.catalog.refresh()
+        self.assertIs(armor, self.catalog.get_item_prototype(item_id="armor"))
+        self.assertNotIn("armour", self.catalog.item_ids)
+
+    def test_refresh_after_failed_refresh_loads_all_pending_changes(self):
+        gun = self.catalog.get_item_prototype(item_id="gun")
+        ammo = self.catalog.get_item_prototype(item_id="ammo")
+        self.replace_data(data_type="items", old="radiation_resistance:  10", new="radiation_resistance:  99")
+        self.replace_data(data_type="items", old="Test ammo.", new="Changed ammo.")
+        self.replace_data(data_type="items", old="accuracy:              0", new="accuracy:              zero")
+        with self.assertRaisesRegex(DataCatalog.DataCatalogError, "can't load items"):
+            self.catalog.refresh()
+        self.assertEqual(10, self.catalog.get_item_prototype(item_id="armor").rad_res)
+        self.assertIs(gun, self.catalog.get_item_prototype(item_id="gun"))
+        self.assertIs(ammo, gun.ammo_prototype)
+        self.replace_data(data_type="items", old="accuracy:              zero", new="accuracy:              0",
+                          mtime=2)
+        self.assertSetEqual({"armor", "ammo", "melee"}, self.catalog.refresh())
+        self.assertEqual(99, self.catalog.get_item_prototype(item_id="armor").rad_res)
+        self.assertIs(self.catalog.get_item_prototype(item_id="armor"),
+                      self.catalog.get_critter_definition(critter_id="critter").armor)
+        self.assertIs(self.catalog.get_item_prototype(item_id="ammo"),
+                      self.catalog.get_item_prototype(item_id="gun").ammo_prototype)
+        self.assertIs(ammo, gun.ammo_prototype)
+
+    def test_refresh_with_removed_data_raises_exception(self):
+        os.remove(self.data_files["perks"])
+        with self.assertRaisesRegex(DataCatalog.DataCatalogError, "perk data is unavailable"):
+            self.catalog.refresh()
+
+
+if __name__ == "__main__":
+    unittest.main()
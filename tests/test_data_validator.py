@@ -0,0 +1,55 @@
+import unittest
+
+from app.files.data_validator import DataError, DataValidator
+
+
+class DataValidatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.correct_validator = DataValidator(item_data_file="test_items_correct.txt",
+                                               perk_data_file="test_perks_correct.txt",
+                                               critter_data_file="test_critters_correct.txt")
+        self.incorrect_validator = DataValidator(item_data_file="test_items_incorrect.txt",
+                                                 perk_data_file="test_perks_incorrect.txt",
+                                                 critter_data_file="test_critters_incorrect.txt")
+
+    def test_validate_correct_data(self):
+        errors = self.correct_validator.validate()
+        self.assertListEqual([DataError("test_perks_correct.txt", 17, "trait",
+                                        "incorrect conflicting trait: conflicting_trait")], errors)
+
+    def test_validate_reports_every_malformed_record(self):
+        errors = self.incorrect_validator.validate(parallel=False)
+        self.assertIn(DataError("test_items_incorrect.txt", 4, "incorrect_armor", "incorrect item type"), errors)
+        self.assertIn(DataError("test_items_incorrect.txt", 22, "incorrect_melee",
+                                "incorrect value for parameter: armor_penetration"), errors)
+        self.assertIn(DataError("test_items_incorrect.txt", 38, "incorrect_gun",
+                                "incorrect parameter name, expected: armor_penetration"), errors)
+        self.assertIn(DataError("test_items_incorrect.txt", 51, "incorrect_laser", "missing parameter: ammo_type"),
+                      errors)
+        self.assertIn(DataError("test_perks_incorrect.txt", 25, "incorrect_status_effect",
+                                "incorrect value for parameter: duration"), errors)
+        self.assertIn(DataError("test_critters_incorrect.txt", 51, "incorrect_critter",
+                                "incorrect value for parameter: level"), errors)
+
+    def test_validate_checks_references(self):
+        errors = self.incorrect_validator.validate(parallel=False)
+        self.assertIn(DataError("test_items_incorrect.txt", 36, "incorrect_gun", "incorrect ammo type: ammo"), errors)
+        self.assertIn(DataError("test_critters_incorrect.txt", 14, "critter_with_incorrect_armor",
+                                "incorrect armor: incorrect_armor"), errors)
+        self.assertIn(DataError("test_critters_incorrect.txt", 46, "critter_with_incorrect_perk",
+                                "incorrect perk: incorrect_perk"), errors)
+
+    def test_parallel_and_serial_validation_give_the_same_errors(self):
+        self.assertListEqual(self.incorrect_validator.validate(parallel=False),
+                             self.incorrect_validator.validate(parallel=True, max_workers=2))
+
+    def test_unavailable_data_is_reported(self):
+        errors = DataValidator(item_data_file="invalid_file.txt", perk_data_file="test_perks_correct.txt",
+                               critter_data_file="test_critters_correct.txt").validate(parallel=False)
+        self.assertIn(DataError("invalid_file.txt", 0, None, "item data is unavailable"), errors)
+        self.assertIn(DataError("test_critters_correct.txt", 14, "critter", "incorrect armor: armor"), errors)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from app.files.file_watcher import DataFileWatcher
+
+
+class DataFileWatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.directory.name, "data.txt")
+        self.write_data("# records #\n\nid: first\nname: First\n\nid: second\nname: Second\n", mtime=0)
+        with open(self.data_file) as file:
+            self.watcher = DataFileWatcher(data_file=self.data_file, data=file.read().splitlines())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_data(self, data, mtime):
+        with open(self.data_file, "w") as file:
+            file.write(data)
+        os.utime(self.data_file, (mtime, mtime))
+
+    def test_poll_without_modification_returns_none(self):
+        self.assertIsNone(self.watcher.poll())
+
+    def test_poll_returns_only_changed_records(self):
+        self.write_data("# records #\n\nid: first\nname: First\n\nid: second\nname: Changed\n", mtime=1)
+        data, changed_ids = self.watcher.poll()
+        self.assertIn("name: Changed", data)
+        self.assertSetEqual({"second"}, changed_ids)
+        self.assertIsNone(self.watcher.poll())
+
+    def test_poll_returns_added_and_removed_records(self):
+        self.write_data("# records #\n\nid: first\nname: First\n\nid: third\nname: Third\n", mtime=1)
+        _, changed_ids = self.watcher.poll()
+        self.assertSetEqual({"second", "third"}, changed_ids)
+
+    def test_poll_ignores_changes_outside_records(self):
+        self.write_data("# changed comment #\n\nid: first\nname: First\n\n\nid: second\nname: Second\n", mtime=1)
+        _, changed_ids = self.watcher.poll()
+        self.assertSetEqual(set(), changed_ids)
+
+    def test_poll_splits_records_only_by_lines_starting_with_id(self):
+        self.write_data("# records #\n\nid: first\nname: First\ndesc: rapid: very\n\nid: second\nname: Second\n",
+                        mtime=1)
+        _, changed_ids = self.watcher.poll()
+        self.assertSetEqual({"first"}, changed_ids)
+
+    def test_poll_of_removed_file_raises_exception(self):
+        os.remove(self.data_file)
+        with self.assertRaises(FileNotFoundError):
+            self.watcher.poll()
+
+
+if __name__ == "__main__":
+    unittest.main()
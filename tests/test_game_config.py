@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+import app.config.game_config as game_config
+
+
+class GameConfigLookupTableTests(unittest.TestCase):
+
+    def setUp(self):
+        self.rebuilds = list()
+        self.hook = lambda: self.rebuilds.append(True)
+        game_config.add_rebuild_hook(self.hook)
+
+    def tearDown(self):
+        game_config.remove_rebuild_hook(self.hook)
+        game_config.reset_config()
+
+    def test_lookup_values(self):
+        self.assertEqual(25, game_config.lookup_carry_weight(5))
+        self.assertEqual(2, game_config.lookup_melee_bonus(7))
+        self.assertEqual(0, game_config.lookup_melee_bonus(3))
+        self.assertEqual(24, game_config.lookup_max_health(5, 3))
+        self.assertEqual(10, game_config.lookup_rad_res(7))
+        self.assertEqual(3, game_config.lookup_evasion(8))
+        self.assertEqual(15, game_config.lookup_max_ap(5))
+        self.assertEqual(100, game_config.lookup_exp_mult(5))
+
+    def test_lookup_values_out_of_table_range_use_formula(self):
+        self.assertEqual(7, game_config.lookup_carry_weight(-1))
+        self.assertEqual(20, game_config.lookup_melee_bonus(25))
+        self.assertEqual(20 + 2 * 99, game_config.lookup_max_health(5, 100))
+        self.assertEqual(35, game_config.lookup_max_ap(25))
+
+    def test_update_config_rebuilds_lookup_tables_and_calls_hooks(self):
+        game_config.update_config(carry_weight_base=20, action_points_base=5)
+        self.assertEqual(20, game_config.get_carry_weight_base())
+        self.assertEqual(35, game_config.lookup_carry_weight(5))
+        self.assertEqual(10, game_config.lookup_max_ap(5))
+        self.assertEqual(1, len(self.rebuilds))
+
+    def test_update_config_with_incorrect_name_raises_exception(self):
+        with self.assertRaisesRegex(game_config.GameConfigError, "incorrect configuration value name: .*"):
+            game_config.update_config(not_a_config_value=1)
+        with self.assertRaisesRegex(game_config.GameConfigError, "incorrect configuration value for: .*"):
+            game_config.update_config(carry_weight_base="20")
+        self.assertEqual(0, len(self.rebuilds))
+
+    def test_update_config_with_incorrect_value_raises_exception_and_keeps_config(self):
+        with self.assertRaisesRegex(game_config.GameConfigError, "incorrect configuration value for: carry_weight"):
+            game_config.update_config(carry_weight_base=True)
+        with self.assertRaisesRegex(game_config.GameConfigError,
+                                    "incorrect configuration value for: lookup_table_attribute_max"):
+            game_config.update_config(action_points_base=12, lookup_table_attribute_max=-1)
+        with self.assertRaisesRegex(game_config.GameConfigError, "incorrect configuration value for: default_weapon"):
+            game_config.update_config(default_weapon="")
+        self.assertEqual(10, game_config.get_action_points_base())
+        self.assertEqual(0, len(self.rebuilds))
+
+    def test_remove_not_added_rebuild_hook_raises_exception(self):
+        with self.assertRaisesRegex(game_config.GameConfigError, "no such rebuild hook"):
+            game_config.remove_rebuild_hook(lambda: None)
+
+
+class GameConfigLoadingTests(unittest.TestCase):
+
+    def tearDown(self):
+        game_config.reset_config()
+
+    def test_load_config(self):
+        version = game_config.get_config_version()
+        game_config.load_config(config_file="test_config_correct.txt")
+        self.assertNotEqual(version, game_config.get_config_version())
+        self.assertEqual("fists", game_config.get_default_weapon())
+        self.assertEqual(20, game_config.get_config().carry_weight_base)
+        self.assertEqual(8, game_config.get_action_points_base())
+        self.assertEqual(5, game_config.get_rad_res_endurance_mult())
+        self.assertEqual(40, game_config.lookup_carry_weight(5))
+
+    def test_config_is_immutable(self):
+        with self.assertRaises(AttributeError):
+            game_config.get_config().carry_weight_base = 20
+
+    def test_invalid_config_data_raises_exception(self):
+        with self.assertRaisesRegex(game_config.GameConfigError, "config data is unavailable"):
+            game_config.load_config(config_file="invalid_file.txt")
+
+    def test_incorrect_config_value_raises_exception_and_keeps_config(self):
+        with self.assertRaisesRegex(game_config.GameConfigError,
+                                    "incorrect configuration value for: action_points_base in line: 4"):
+            game_config.load_config(config_file="test_config_incorrect.txt")
+        self.assertEqual(10, game_config.get_carry_weight_base())
+
+    def test_reload_modified_config(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_file = os.path.join(directory, "config.txt")
+            with open(config_file, "w") as file:
+                file.write("action_points_base: 8\n")
+            game_config.load_config(config_file=config_file)
+            self.assertFalse(game_config.reload_config())
+            with open(config_file, "w") as file:
+                file.write("action_points_base: 12\nunknown_value: 1\n")
+            os.utime(config_file, (0, 0))
+            with self.assertRaisesRegex(game_config.GameConfigError, "incorrect configuration line: 2"):
+                game_config.reload_config()
+            self.assertEqual(8, game_config.get_action_points_base())
+            with open(config_file, "w") as file:
+                file.write("action_points_base: 12\n")
+            os.utime(config_file, (1, 1))
+            self.assertTrue(game_config.reload_config())
+            self.assertEqual(12, game_config.get_action_points_base())
+
+
+if __name__ == "__main__":
+    unittest.main()
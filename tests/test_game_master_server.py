@@ -0,0 +1,161 @@
+import asyncio
+import json
+import unittest
+
+from app.characters.characters import Human
+from app.files.data_catalog import DataCatalog
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.server.game_master_server import GameMasterServer, GameSession
+
+
+class GameSessionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                                   critter_data_file="test_critters_correct.txt")
+        self.session = GameSession(session_id=1, catalog=self.catalog)
+        self.session.execute("spawn", {"critter_id": "critter"})
+        self.session.execute("spawn", {"critter_id": "another_critter", "name": "Dog"})
+
+    def test_spawn_creates_uniquely_named_critters(self):
+        self.assertEqual("Critter 2", self.session.execute("spawn", {"critter_id": "critter"}))
+        self.assertListEqual(["Critter", "Dog", "Critter 2"], self.session.execute("characters"))
+        self.assertIsNot(self.session.characters["Critter"].inventory.equipped_weapon,
+                         self.session.characters["Critter 2"].inventory.equipped_weapon)
+        with self.assertRaisesRegex(GameSession.GameSessionError, "character name is already used: Dog"):
+            self.session.execute("spawn", {"critter_id": "critter", "name": "Dog"})
+
+    def test_attack_applies_damage_and_spends_action_points_in_combat(self):
+        health = self.session.execute("status", {"name": "Dog"})["health"]
+        result = self.session.execute("attack", {"attacker": "Critter", "target": "Dog", "damage_roll": 10})
+        self.assertEqual(health - result["damage"], result["health"])
+        self.assertGreater(result["damage"], 0)
+        self.session.execute("join_combat", {"names": ["Critter", "Dog"]})
+        action_points = self.session.execute("status", {"name": "Critter"})["action_points"]
+        self.session.execute("attack", {"attacker": "Critter", "target": "Dog"})
+        self.assertEqual(action_points - 10, self.session.execute("status", {"name": "Critter"})["action_points"])
+        self.session.execute("tick")
+        self.assertEqual(action_points, self.session.execute("status", {"name": "Critter"})["action_points"])
+
+    def test_attack_with_ranged_weapon_requires_and_uses_up_loaded_ammo(self):
+        shooter = Human(name="Shooter", tags="human", level=1, strength=5, endurance=5, agility=5, perception=5,
+                        intelligence=5)
+        gun = self.catalog.create_item(item_id="gun")
+        ammo = self.catalog.create_item(item_id="ammo")
+        ammo.current_amount = 2
+        for item in (gun, ammo):
+            InventoryItemAdder.add_item(inv=shooter.inventory, item_to_add=item)
+        InventoryItemEquipper.equip_item(inv=shooter.inventory, item_to_equip=gun)
+        self.session.add_character(name="Shooter", character=shooter)
+        with self.assertRaisesRegex(GameSession.GameSessionError, "no ammo loaded in weapon of character: Shooter"):
+            self.session.execute("attack", {"attacker": "Shooter", "target": "Dog", "damage_roll": 4})
+        self.assertEqual(2, self.session.execute("reload", {"name": "Shooter"}))
+        self.session.execute("attack", {"attacker": "Shooter", "target": "Dog", "damage_roll": 4})
+        self.assertEqual(1, gun.current_ammo)
+        self.session.execute("join_combat", {"names": ["Shooter"]})
+        shooter.action_points = 0
+        with self.assertRaisesRegex(GameSession.GameSessionError, "not enough action points for character: Shooter"):
+            self.session.execute("attack", {"attacker": "Shooter", "target": "Dog", "damage_roll": 4})
+        self.assertEqual(1, gun.current_ammo)
+
+    def test_attack_with_incorrect_damage_roll_changes_nothing(self):
+        self.session.execute("join_combat", {"names": ["Critter", "Dog"]})
+        status = self.session.execute("status", {"name": "Critter"})
+        health = self.session.execute("status", {"name": "Dog"})["health"]
+        for damage_roll in ("x", 1.5, True, 3, 25):
+            with self.assertRaisesRegex(GameSession.GameSessionError, "incorrect damage roll: .*"):
+                self.session.execute("attack", {"attacker": "Critter", "target": "Dog", "damage_roll": damage_roll})
+        self.assertEqual(status, self.session.execute("status", {"name": "Critter"}))
+        self.assertEqual(health, self.session.execute("status", {"name": "Dog"})["health"])
+        result = self.session.execute("attack", {"attacker": "Critter", "target": "Dog", "damage_roll": 24})
+        self.assertIsInstance(result["health"], int)
+
+    def test_tick_removes_expired_status_effects(self):
+        self.assertIn("status_effect", self.session.execute("status", {"name": "Critter"})["perks"])
+        self.session.execute("tick", {"turns": 2})
+        self.assertNotIn("status_effect", self.session.execute("status", {"name": "Critter"})["perks"])
+
+    def test_incorrect_commands_raise_exception(self):
+        with self.assertRaisesRegex(GameSession.GameSessionError, "incorrect command: fly"):
+            self.session.execute("fly")
+        with self.assertRaisesRegex(GameSession.GameSessionError, "incorrect arguments for command: spawn"):
+            self.session.execute("spawn", {"id": "critter"})
+        with self.assertRaisesRegex(GameSession.GameSessionError, "incorrect arguments for command: tick"):
+            self.session.execute("tick", {"turns": 1, "extra": True})
+        with self.assertRaisesRegex(GameSession.GameSessionError, "no such character in session: Cat"):
+            self.session.execute("status", {"name": "Cat"})
+        with self.assertRaisesRegex(GameSession.GameSessionError, "incorrect object type to reload"):
+            self.session.execute("reload", {"name": "Dog"})
+        with self.assertRaisesRegex(GameSession.GameSessionError, "no such item in inventory: gun"):
+            self.session.execute("equip", {"name": "Dog", "item_id": "gun"})
+
+
+class GameMasterServerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                                   critter_data_file="test_critters_correct.txt")
+        self.server = GameMasterServer(catalog=self.catalog)
+
+    def test_sessions_are_independent_and_share_catalog(self):
+        first_session = self.server.handle_request({"command": "create_session"})["result"]
+        second_session = self.server.handle_request({"command": "create_session"})["result"]
+        self.server.handle_request({"command": "spawn", "session": first_session,
+                                    "arguments": {"critter_id": "critter"}})
+        self.assertListEqual(["Critter"], self.server.handle_request({"command": "characters",
+                                                                      "session": first_session})["result"])
+        self.assertListEqual([], self.server.handle_request({"command": "characters",
+                                                             "session": second_session})["result"])
+        self.assertIs(self.server.catalog, self.server.get_session(session_id=second_session)._catalog)
+        self.assertEqual({"result": None}, self.server.handle_request({"command": "close_session",
+                                                                       "session": first_session}))
+        self.assertEqual(1, len(self.server))
+
+    def test_incorrect_requests_return_errors(self):
+        self.assertDictEqual({"error": "incorrect request"}, self.server.handle_request(["command"]))
+        self.assertDictEqual({"error": "no such session: 5"},
+                             self.server.handle_request({"command": "characters", "session": 5}))
+        session = self.server.create_session()
+        self.assertDictEqual({"error": "incorrect command: fly"},
+                             self.server.handle_request({"command": "fly", "session": session}))
+
+    def test_concurrent_connections(self):
+        async def send_request(reader, writer, request):
+            writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            await writer.drain()
+            return json.loads((await reader.readline()).decode("utf-8"))
+
+        async def run_client(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            session = (await send_request(reader, writer, {"command": "create_session"}))["result"]
+            await send_request(reader, writer, {"command": "spawn", "session": session,
+                                                "arguments": {"critter_id": "critter"}})
+            error = await send_request(reader, writer, {"command": "spawn", "session": session,
+                                                        "arguments": {"critter_id": ["critter"]}})
+            self.assertRegex(error["error"], "can't execute request: .*")
+            response = await send_request(reader, writer, {"command": "characters", "session": session})
+            writer.close()
+            return session, response
+
+        async def run_clients():
+            server = await self.server.start()
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return await asyncio.gather(*(run_client(port) for _ in range(5)))
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        loop = asyncio.new_event_loop()
+        try:
+            results = loop.run_until_complete(run_clients())
+        finally:
+            loop.close()
+        self.assertEqual(5, len(self.server))
+        self.assertListEqual(list(range(1, 6)), sorted(session for session, _ in results))
+        for _, response in results:
+            self.assertDictEqual({"result": ["Critter"]}, response)
+
+
+if __name__ == "__main__":
+    unittest.main()
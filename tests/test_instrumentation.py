@@ -0,0 +1,116 @@
+import json
+import unittest
+
+from app.characters.characters import Human
+from app.items.factory import ItemFactory
+from app.mechanics.combat_calculators import DamageCalculator, DamageFormulaConverter, PerkBonusMatcher
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.stat_calculators import CharacterAttributeCalculator
+from app.profiling.instrumentation import Instrumentation
+
+
+class InstrumentationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = Instrumentation()
+        self.character = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5)
+        self.factory = ItemFactory(data_file="test_items_correct.txt")
+
+    def tearDown(self):
+        if self.instrumentation.enabled:
+            self.instrumentation.disable()
+
+    def get_call_stat(self, name):
+        for call_stat in self.instrumentation.get_call_stats():
+            if call_stat["name"] == name:
+                return call_stat
+        return None
+
+    def test_default_targets(self):
+        targets = Instrumentation.get_default_targets()
+        self.assertIn((ItemFactory, "create_item"), targets)
+        self.assertIn((DamageCalculator, "get_weapon_damage"), targets)
+        self.assertIn((CharacterAttributeCalculator, "get_strength"), targets)
+        self.assertIn((InventoryItemAdder, "add_item"), targets)
+        self.assertNotIn((DamageCalculator, "_get_base_weapon_damage"), targets)
+
+    def test_disabled_instrumentation_leaves_methods_unchanged(self):
+        original_method = ItemFactory.create_item
+        original_static_method = DamageCalculator.__dict__["get_weapon_damage"]
+        self.instrumentation.enable()
+        self.assertIsNot(original_method, ItemFactory.create_item)
+        self.instrumentation.disable()
+        self.assertIs(original_method, ItemFactory.create_item)
+        self.assertIs(original_static_method, DamageCalculator.__dict__["get_weapon_damage"])
+        self.factory.create_item(item_id="armor")
+        self.assertListEqual([], self.instrumentation.get_call_stats())
+
+    def test_records_calls_and_time(self):
+        with self.instrumentation:
+            for _ in range(3):
+                self.factory.create_item(item_id="armor")
+            melee = self.factory.create_item(item_id="melee")
+            InventoryItemAdder.add_item(inv=self.character.inventory, item_to_add=melee)
+            InventoryItemEquipper.equip_item(inv=self.character.inventory, item_to_equip=melee)
+            DamageCalculator.get_weapon_damage(character=self.character)
+        self.assertEqual(4, self.get_call_stat("ItemFactory.create_item")["calls"])
+        self.assertEqual(1, self.get_call_stat("InventoryItemAdder.add_item")["calls"])
+        damage_stat = self.get_call_stat("DamageCalculator.get_weapon_damage")
+        self.assertEqual(1, damage_stat["calls"])
+        self.assertGreater(damage_stat["total_time"], 0)
+        self.assertEqual(damage_stat["total_time"], damage_stat["mean_time"])
+        self.assertEqual(1, self.get_call_stat("PerkBonusMatcher.get_bonus")["calls"])
+
+    def test_records_cache_hits_and_misses(self):
+        with self.instrumentation:
+            for _ in range(4):
+                PerkBonusMatcher.get_bonus(perk_inv=self.character.perks, stat="damage", tag_mask=0)
+        cache_stat = self.instrumentation.get_cache_stats()[0]
+        self.assertEqual("compiled perk effects", cache_stat["name"])
+        self.assertEqual(3, cache_stat["hits"])
+        self.assertEqual(1, cache_stat["misses"])
+        self.assertEqual(0.75, cache_stat["hit_rate"])
+        self.assertIsNone(self.instrumentation.get_cache_stats()[1]["hit_rate"])
+
+    def test_exceptions_are_counted_and_propagated(self):
+        with self.instrumentation:
+            with self.assertRaises(ItemFactory.ItemBuildError):
+                self.factory.create_item(item_id="nonexistent")
+        self.assertEqual(1, self.get_call_stat("ItemFactory.create_item")["calls"])
+
+    def test_reset_and_export(self):
+        instrumentation = Instrumentation(targets=[(DamageFormulaConverter, "get_damage_range")], cache_probes=[])
+        with instrumentation:
+            DamageFormulaConverter.get_damage_range(damage_formula="2 + 3d6")
+        exported = json.loads(instrumentation.to_json())
+        self.assertEqual("DamageFormulaConverter.get_damage_range", exported["calls"][0]["name"])
+        self.assertListEqual([], exported["caches"])
+        self.assertIn("DamageFormulaConverter.get_damage_range", instrumentation.to_table())
+        instrumentation.reset()
+        self.assertListEqual([], instrumentation.get_call_stats())
+
+    def test_incorrect_usage_raises_exception(self):
+        with self.assertRaises(Instrumentation.InstrumentationError):
+            self.instrumentation.disable()
+        self.instrumentation.enable()
+        with self.assertRaises(Instrumentation.InstrumentationError):
+            self.instrumentation.enable()
+        self.instrumentation.disable()
+        original_method = ItemFactory.create_item
+        instrumentation = Instrumentation(targets=[(ItemFactory, "create_item"), (ItemFactory, "nonexistent")])
+        with self.assertRaises(Instrumentation.InstrumentationError):
+            instrumentation.enable()
+        self.assertFalse(instrumentation.enabled)
+        self.assertIs(original_method, ItemFactory.create_item)
+
+    def test_failing_first_target_raises_original_exception(self):
+        instrumentation = Instrumentation(targets=[(int, "nonexistent")])
+        with self.assertRaisesRegex(Instrumentation.InstrumentationError, "no such method to instrument: "
+                                                                          "int.nonexistent"):
+            instrumentation.enable()
+        self.assertFalse(instrumentation.enabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 
 from app.items.items import Armor
@@ -6,7 +8,7 @@ from app.items.weapons import MeleeWeapon, RangedWeapon
 from app.mechanics.inventory import Inventory, InventoryItemAdder, InventoryItemRemover
 from app.mechanics.inventory import InventoryItemEquipper, InventoryItemUnequipper
 from app.mechanics.inventory import InventoryWeaponReloader, InventoryWeaponUnloader
-from app.mechanics.inventory import InventoryItemMover
+from app.mechanics.inventory import InventoryItemMover, InventoryItemQuery
 
 
 class InventoryTests(unittest.TestCase):
@@ -55,6 +57,18 @@ class InventoryTests(unittest.TestCase):
         correct_str_print = "Armor: Armor\nWeapon: Gun\nItems:\nNone"
         self.assertEqual(correct_str_print, inventory.__str__())
 
+    def test_hooks_are_called_by_operators(self):
+        changed = list()
+        self.inventory.add_hook(changed.append)
+        armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=0, rad_res=10, evasion=2,
+                      value=10, weight=2.5)
+        InventoryItemAdder.add_item(inv=self.inventory, item_to_add=armor)
+        InventoryItemEquipper.equip_item(inv=self.inventory, item_to_equip=armor)
+        self.assertListEqual([self.inventory, self.inventory], changed)
+        self.inventory.remove_hook(changed.append)
+        with self.assertRaisesRegex(Inventory.InventoryError, "no such hook in inventory"):
+            self.inventory.remove_hook(changed.append)
+
 
 class InventoryItemAdderTests(unittest.TestCase):
 
@@ -113,6 +127,25 @@ class InventoryItemAdderTests(unittest.TestCase):
         self.assertEqual(30, self.inventory.items[0].current_amount)
         self.assertEqual(10, self.inventory.items[1].current_amount)
 
+    def test_add_items_in_one_batch(self):
+        notifications = list()
+        self.inventory.add_hook(notifications.append)
+        items_to_add = [Ammo(item_id="ammo", tags="ammo, stackable", name="Ammo", desc="Test ammo.", max_stack=50,
+                             current_amount=amount, value=1, weight=0.01) for amount in (30, 40)]
+        items_to_add.append(Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=0,
+                                  rad_res=10, evasion=2, value=10, weight=2.5))
+        InventoryItemAdder.add_items(inv=self.inventory, items_to_add=items_to_add)
+        self.assertEqual(1, len(notifications))
+        self.assertListEqual([50, 20], [item.current_amount for item in self.inventory.get_items_with_id("ammo")])
+        self.assertEqual(3, len(self.inventory.items))
+
+    def test_add_items_with_incorrect_obj_adds_nothing(self):
+        ammo = Ammo(item_id="ammo", tags="ammo, stackable", name="Ammo", desc="Test ammo.", max_stack=50,
+                    current_amount=30, value=1, weight=0.01)
+        with self.assertRaisesRegex(Inventory.InventoryError, "incorrect object type to add to inventory"):
+            InventoryItemAdder.add_items(inv=self.inventory, items_to_add=[ammo, "not Item derived object"])
+        self.assertEqual(0, len(self.inventory.items))
+
     def test_add_incorrect_obj_as_item_raises_exception(self):
         with self.assertRaisesRegex(Inventory.InventoryError, "incorrect object type to add to inventory"):
             InventoryItemAdder.add_item(inv=self.inventory, item_to_add="not Item derived object")
@@ -602,5 +635,86 @@ class InventoryItemMoverTests(unittest.TestCase):
                                          inv_to_move_from="not Inventory object", item_to_move="item to move")
 
 
+class InventoryItemQueryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.inventory = Inventory()
+        self.melee = MeleeWeapon(item_id="melee", tags="weapon, melee, sharp", name="Knife", desc="Test melee.",
+                                 damage="2 + 4d6", effect="bleed_minor", eff_chance="-6 + d10", armor_pen=0,
+                                 accuracy=0, ap_cost=10, st_requirement=1, value=5, weight=1.0)
+        self.blunt = MeleeWeapon(item_id="blunt", tags="weapon, melee, blunt", name="Club", desc="Test melee.",
+                                 damage="2 + 4d6", effect="none", eff_chance="0", armor_pen=0, accuracy=0, ap_cost=10,
+                                 st_requirement=1, value=3, weight=3.0)
+        self.gun = RangedWeapon(item_id="gun", tags="weapon, gun, short", name="Gun", desc="Test gun.",
+                                damage="2 + 4d6", ammo_type="ammo", clip_size=10, armor_pen=0, accuracy=0, ap_cost=10,
+                                st_requirement=1, value=10, weight=2.0)
+        self.armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=0, rad_res=10,
+                           evasion=2, value=10, weight=2.5)
+        for item in (self.melee, self.blunt, self.gun, self.armor):
+            InventoryItemAdder.add_item(inv=self.inventory, item_to_add=item)
+
+    def test_query_without_criteria_returns_all_items(self):
+        items = InventoryItemQuery.query(inv=self.inventory)
+        self.assertListEqual([self.melee, self.blunt, self.gun, self.armor], items)
+
+    def test_query_by_tags(self):
+        self.assertListEqual([self.melee, self.blunt, self.gun],
+                             InventoryItemQuery.query(inv=self.inventory, tags={"weapon"}))
+        self.assertListEqual([self.melee], InventoryItemQuery.query(inv=self.inventory, tags={"weapon", "sharp"}))
+        self.assertListEqual([self.blunt], InventoryItemQuery.query(inv=self.inventory, tags="melee, blunt"))
+        self.assertListEqual([], InventoryItemQuery.query(inv=self.inventory, tags={"weapon", "energy"}))
+
+    def test_query_by_item_type_and_name(self):
+        self.assertListEqual([self.melee, self.blunt],
+                             InventoryItemQuery.query(inv=self.inventory, item_type=MeleeWeapon))
+        self.assertListEqual([self.blunt], InventoryItemQuery.query(inv=self.inventory, name="cLuB"))
+
+    def test_query_sorted_and_limited(self):
+        items = InventoryItemQuery.query(inv=self.inventory, tags={"weapon"}, sort="value")
+        self.assertListEqual([self.blunt, self.melee, self.gun], items)
+        items = InventoryItemQuery.query(inv=self.inventory, sort="weight", reverse=True, limit=2)
+        self.assertListEqual([self.blunt, self.armor], items)
+        items = InventoryItemQuery.query(inv=self.inventory, tags={"melee"}, limit=1)
+        self.assertListEqual([self.melee], items)
+
+    def test_query_index_follows_inventory_changes(self):
+        InventoryItemRemover.remove_item(inv=self.inventory, item_to_remove=self.melee)
+        self.assertListEqual([self.blunt], InventoryItemQuery.query(inv=self.inventory, tags={"melee"}))
+        InventoryItemEquipper.equip_item(inv=self.inventory, item_to_equip=self.gun)
+        self.assertListEqual([self.blunt], InventoryItemQuery.query(inv=self.inventory, tags={"weapon"}))
+        InventoryItemUnequipper.unequip_weapon(inv=self.inventory)
+        self.assertListEqual([self.blunt, self.gun], InventoryItemQuery.query(inv=self.inventory, tags={"weapon"}))
+        self.assertListEqual([self.gun], self.inventory.get_items_with_id("gun"))
+        self.assertEqual(0, self.inventory.count_items_with_tag("sharp"))
+
+    def test_query_index_follows_items_list_multiplied_in_place(self):
+        items = self.inventory.items
+        items *= 1
+        self.assertListEqual([self.melee, self.blunt], InventoryItemQuery.query(inv=self.inventory, tags={"melee"}))
+        version = self.inventory.version
+        items *= 0
+        self.assertListEqual([], InventoryItemQuery.query(inv=self.inventory, tags={"weapon"}))
+        self.assertEqual(0, self.inventory.count_items_with_tag("melee"))
+        self.assertGreater(self.inventory.version, version)
+
+    def test_query_copied_and_unpickled_inventory(self):
+        for inventory in (copy.deepcopy(self.inventory), pickle.loads(pickle.dumps(self.inventory))):
+            melee, blunt, gun, armor = inventory.items
+            self.assertEqual("Knife", melee.name)
+            self.assertListEqual([melee, blunt, gun], InventoryItemQuery.query(inv=inventory, tags={"weapon"}))
+            self.assertListEqual([gun], inventory.get_items_with_id("gun"))
+            InventoryItemRemover.remove_item(inv=inventory, item_to_remove=melee)
+            self.assertListEqual([blunt], InventoryItemQuery.query(inv=inventory, tags={"melee"}))
+        self.assertListEqual([self.melee, self.blunt], InventoryItemQuery.query(inv=self.inventory, tags={"melee"}))
+
+    def test_query_by_incorrect_sort_parameter_raises_exception(self):
+        with self.assertRaisesRegex(Inventory.InventoryError, "incorrect parameter to sort by: .*"):
+            InventoryItemQuery.query(inv=self.inventory, sort="not a parameter")
+
+    def test_incorrect_obj_as_inventory_raises_exception(self):
+        with self.assertRaisesRegex(Inventory.InventoryError, "incorrect object type for inventory"):
+            InventoryItemQuery.query(inv="not Inventory object")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+
+import app.config.game_config as game_config
+from app.characters.characters import Human
+from app.items.items import Armor
+from app.items.weapons import RangedWeapon, MeleeWeapon
+from app.mechanics.combat_calculators import CombatCalculatorError, ExpectedDamageCalculator
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.loadout_optimizer import LoadoutOptimizer
+
+
+class LoadoutOptimizerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.optimizer = LoadoutOptimizer()
+        self.character = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5)
+        self.character.guns = 5
+        self.pistol = RangedWeapon(item_id="pistol", tags="weapon, gun, short", name="Pistol", desc="Test pistol.",
+                                   damage="2 + 3d6", ammo_type="ammo", clip_size=6, armor_pen=0, accuracy=2, ap_cost=4,
+                                   st_requirement=1, value=10, weight=2.0)
+        self.rifle = RangedWeapon(item_id="rifle", tags="weapon, gun, long", name="Rifle", desc="Test rifle.",
+                                  damage="4 + 4d6", ammo_type="ammo", clip_size=6, armor_pen=2, accuracy=4, ap_cost=4,
+                                  st_requirement=4, value=30, weight=5.0)
+        self.cannon = RangedWeapon(item_id="cannon", tags="weapon, gun, long", name="Cannon", desc="Test cannon.",
+                                   damage="20 + 4d10", ammo_type="ammo", clip_size=1, armor_pen=5, accuracy=4,
+                                   ap_cost=4, st_requirement=9, value=100, weight=20.0)
+        self.club = MeleeWeapon(item_id="club", tags="weapon, melee", name="Club", desc="Test club.", damage="d4",
+                                effect="none", eff_chance="d10", armor_pen=0, accuracy=0, ap_cost=4, st_requirement=1,
+                                value=1, weight=3.0)
+        self.leather = Armor(item_id="leather", tags="armor", name="Leather", desc="Test armor.", dmg_res=2,
+                             rad_res=0, evasion=1, value=10, weight=2.0)
+        self.metal = Armor(item_id="metal", tags="armor", name="Metal", desc="Test armor.", dmg_res=6, rad_res=0,
+                           evasion=0, value=50, weight=10.0)
+        self.rags = Armor(item_id="rags", tags="armor", name="Rags", desc="Test armor.", dmg_res=1, rad_res=0,
+                          evasion=1, value=1, weight=3.0)
+        for item in (self.pistol, self.rifle, self.cannon, self.club, self.leather, self.metal, self.rags):
+            InventoryItemAdder.add_item(inv=self.character.inventory, item_to_add=item)
+        InventoryItemEquipper.equip_item(inv=self.character.inventory, item_to_equip=self.pistol)
+        InventoryItemEquipper.equip_item(inv=self.character.inventory, item_to_equip=self.leather)
+        self.target = Human(name="Target", tags="human", level=1, strength=5, endurance=5, agility=5, perception=5,
+                            intelligence=5)
+        target_armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=3, rad_res=0,
+                             evasion=0, value=10, weight=2.5)
+        target_weapon = RangedWeapon(item_id="gun", tags="weapon, gun", name="Gun", desc="Test gun.", damage="2d6",
+                                     ammo_type="ammo", clip_size=6, armor_pen=1, accuracy=0, ap_cost=4,
+                                     st_requirement=1, value=10, weight=2.0)
+        for item in (target_armor, target_weapon):
+            InventoryItemAdder.add_item(inv=self.target.inventory, item_to_add=item)
+            InventoryItemEquipper.equip_item(inv=self.target.inventory, item_to_equip=item)
+
+    def test_rank_by_damage_per_ap(self):
+        loadouts = self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        self.assertIs(self.rifle, loadouts[0].weapon)
+        self.assertIs(self.metal, loadouts[0].armor)
+        self.assertEqual(15.0, loadouts[0].weight)
+        damage_per_ap = [loadout.damage_per_ap for loadout in loadouts]
+        self.assertListEqual(sorted(damage_per_ap, reverse=True), damage_per_ap)
+
+    def test_rank_by_dmg_res(self):
+        loadouts = self.optimizer.rank_loadouts(character=self.character, targets=[self.target], criterion="dmg_res")
+        self.assertIs(self.metal, loadouts[0].armor)
+        self.assertEqual(5, loadouts[0].dmg_res)
+        self.assertIs(self.rifle, loadouts[0].weapon)
+        self.assertEqual(1, loadouts[-1].dmg_res)
+
+    def test_damage_per_ap_matches_expected_damage_calculator(self):
+        loadouts = self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        pistol_loadout = [loadout for loadout in loadouts if loadout.weapon is self.pistol][0]
+        damage_per_ap = ExpectedDamageCalculator.get_expected_damage_per_ap(character=self.character,
+                                                                            opponent=self.target)
+        self.assertAlmostEqual(damage_per_ap, pistol_loadout.damage_per_ap)
+
+    def test_dominated_and_too_heavy_items_are_pruned(self):
+        loadouts = self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        self.assertCountEqual([self.pistol, self.rifle], set(loadout.weapon for loadout in loadouts))
+        self.assertCountEqual([self.leather, self.metal], set(loadout.armor for loadout in loadouts))
+        self.assertEqual(4, len(loadouts))
+
+    def test_get_best_loadout(self):
+        loadout = self.optimizer.get_best_loadout(character=self.character, targets=[self.target],
+                                                  criterion="dmg_res")
+        self.assertIs(self.metal, loadout.armor)
+
+    def test_ranking_does_not_change_character(self):
+        self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        self.assertIs(self.pistol, self.character.inventory.equipped_weapon)
+        self.assertIs(self.leather, self.character.inventory.equipped_armor)
+        version = self.character.version
+        loadouts = self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        self.assertEqual(version, self.character.version)
+        self.assertIs(self.rifle, loadouts[0].weapon)
+
+    def test_evaluations_follow_target_changes(self):
+        self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        armor = Armor(item_id="heavy_armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=100, rad_res=0,
+                      evasion=0, value=10, weight=2.5)
+        InventoryItemAdder.add_item(inv=self.target.inventory, item_to_add=armor)
+        InventoryItemEquipper.equip_item(inv=self.target.inventory, item_to_equip=armor)
+        loadouts = self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        self.assertTrue(all(loadout.damage_per_ap == 0 for loadout in loadouts))
+
+    def test_evaluations_against_unchanged_targets_are_reused(self):
+        other_target = Human(name="Other", tags="human", level=1, strength=5, endurance=5, agility=5, perception=5,
+                             intelligence=5)
+        other_target.inventory.equipped_armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.",
+                                                      dmg_res=0, rad_res=0, evasion=0, value=10, weight=2.5)
+        targets = [self.target, other_target]
+        self.optimizer.rank_loadouts(character=self.character, targets=targets)
+        evaluations = self.optimizer._evaluations[id(self.character)][2]
+        other_target_entries = [item_entry[1][id(other_target)] for item_entry in evaluations.values()]
+        self.target.inventory.equipped_armor = self.target.inventory.equipped_armor
+        loadouts = self.optimizer.rank_loadouts(character=self.character, targets=targets)
+        self.assertIs(evaluations, self.optimizer._evaluations[id(self.character)][2])
+        for item_entry, other_target_entry in zip(evaluations.values(), other_target_entries):
+            self.assertIs(other_target_entry, item_entry[1][id(other_target)])
+            self.assertEqual(self.target.version, item_entry[1][id(self.target)][1])
+        self.assertIs(self.rifle, loadouts[0].weapon)
+
+    def test_target_without_armor_raises_exception(self):
+        self.target.inventory.equipped_armor = None
+        with self.assertRaisesRegex(CombatCalculatorError, "no armor equipped on character: Target"):
+            self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+
+    def test_evaluations_against_stale_targets_are_evicted(self):
+        for _ in range(5):
+            self.target.inventory.equipped_armor = self.target.inventory.equipped_armor
+            self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+            evaluations = self.optimizer._evaluations[id(self.character)][2]
+            self.assertEqual(6, len(evaluations))
+            self.assertTrue(all(len(item_entry[1]) == 1 for item_entry in evaluations.values()))
+
+    def test_evaluations_follow_game_config_changes(self):
+        self.addCleanup(game_config.reset_config)
+        self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        evaluations = self.optimizer._evaluations[id(self.character)][2]
+        game_config.update_config(action_points_base=12)
+        self.optimizer.rank_loadouts(character=self.character, targets=[self.target])
+        self.assertIsNot(evaluations, self.optimizer._evaluations[id(self.character)][2])
+
+    def test_incorrect_criterion_raises_exception(self):
+        with self.assertRaisesRegex(LoadoutOptimizer.LoadoutOptimizerError, "incorrect ranking criterion: weight"):
+            self.optimizer.rank_loadouts(character=self.character, targets=[self.target], criterion="weight")
+
+    def test_incorrect_characters_raise_exception(self):
+        with self.assertRaisesRegex(LoadoutOptimizer.LoadoutOptimizerError, "incorrect object type for character"):
+            self.optimizer.rank_loadouts(character="not Character derived object", targets=[self.target])
+        with self.assertRaisesRegex(LoadoutOptimizer.LoadoutOptimizerError, "incorrect object type for target"):
+            self.optimizer.rank_loadouts(character=self.character, targets=["not Character derived object"])
+        with self.assertRaisesRegex(LoadoutOptimizer.LoadoutOptimizerError, "character can't be its own target"):
+            self.optimizer.rank_loadouts(character=self.character, targets=[self.character])
+        with self.assertRaisesRegex(LoadoutOptimizer.LoadoutOptimizerError, "no targets"):
+            self.optimizer.rank_loadouts(character=self.character, targets=[])
+
+
+if __name__ == "__main__":
+    unittest.main()
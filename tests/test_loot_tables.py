@@ -0,0 +1,141 @@
+import random
+import unittest
+
+from app.files.data_catalog import DataCatalog
+from app.items.factory import ItemFactory
+from app.items.items import Armor
+from app.items.stackables import Ammo, Consumable
+from app.mechanics.inventory import Inventory, InventoryItemAdder
+from app.mechanics.loot_tables import AliasSampler, LootEntry, LootGenerator, LootTable
+
+
+class AliasSamplerTests(unittest.TestCase):
+
+    def test_samples_follow_weights(self):
+        sampler = AliasSampler(weights=[1, 2, 7])
+        random_generator = random.Random(0)
+        counts = [0, 0, 0]
+        for _ in range(20000):
+            counts[sampler.sample(random_generator=random_generator)] += 1
+        for count, probability in zip(counts, (0.1, 0.2, 0.7)):
+            self.assertAlmostEqual(probability, count / 20000, delta=0.02)
+
+    def test_single_weight_is_always_sampled(self):
+        sampler = AliasSampler(weights=[3])
+        self.assertEqual(1, len(sampler))
+        self.assertEqual(0, sampler.sample())
+
+    def test_incorrect_weights_raise_exception(self):
+        with self.assertRaisesRegex(ValueError, "at least one weight"):
+            AliasSampler(weights=[])
+        with self.assertRaisesRegex(ValueError, "weights must be positive numbers"):
+            AliasSampler(weights=[1, 0])
+        with self.assertRaisesRegex(ValueError, "weights must be positive numbers"):
+            AliasSampler(weights=[1, "2"])
+
+
+class LootTableTests(unittest.TestCase):
+
+    def test_draw_with_quantity_ranges(self):
+        table = LootTable(entries=[("ammo", 1, 5, 10)], rolls=3)
+        drops = table.draw(random_generator=random.Random(0))
+        self.assertListEqual(["ammo"], list(drops.keys()))
+        self.assertTrue(15 <= drops["ammo"] <= 30)
+
+    def test_draw_nested_tables(self):
+        weapons = LootTable(entries=[("gun", 1), ("laser", 1)])
+        table = LootTable(entries=[LootEntry(reference=weapons, weight=1, min_quantity=2, max_quantity=2),
+                                   LootEntry(reference="consumable", weight=1)])
+        self.assertSetEqual({"gun", "laser", "consumable"}, table.get_item_ids())
+        drops = table.draw(random_generator=random.Random(1))
+        self.assertIn(sum(drops.values()), (1, 2))
+        if sum(drops.values()) == 2:
+            self.assertTrue(set(drops.keys()) <= {"gun", "laser"})
+
+    def test_empty_entries_drop_nothing(self):
+        table = LootTable(entries=[(None, 1)], rolls=5)
+        self.assertDictEqual(dict(), table.draw())
+
+    def test_draw_adds_to_provided_drops(self):
+        table = LootTable(entries=[("armor", 1)])
+        self.assertDictEqual({"armor": 2}, table.draw(drops={"armor": 1}))
+
+    def test_incorrect_entries_raise_exception(self):
+        with self.assertRaisesRegex(LootTable.LootTableError, "incorrect loot table entry"):
+            LootTable(entries=[("ammo",)])
+        with self.assertRaisesRegex(LootTable.LootTableError, "incorrect loot table entry reference"):
+            LootTable(entries=[(1, 1)])
+        with self.assertRaisesRegex(LootTable.LootTableError, "incorrect loot table entry quantity"):
+            LootTable(entries=[("ammo", 1, -1, 1)])
+        with self.assertRaisesRegex(LootTable.LootTableError, "minimum quantity exceeds maximum quantity"):
+            LootTable(entries=[("ammo", 1, 3, 2)])
+        with self.assertRaisesRegex(LootTable.LootTableError, "weights must be positive numbers"):
+            LootTable(entries=[("ammo", 0)])
+        with self.assertRaisesRegex(LootTable.LootTableError, "incorrect number of rolls"):
+            LootTable(entries=[("ammo", 1)], rolls=0)
+
+
+class LootGeneratorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = LootGenerator(item_source=ItemFactory(data_file="test_items_correct.txt"), seed=0)
+
+    def test_stackables_are_created_in_full_stacks(self):
+        items = self.generator.create_items(drops={"ammo": 120, "consumable": 7})
+        ammo = [item for item in items if isinstance(item, Ammo)]
+        consumables = [item for item in items if isinstance(item, Consumable)]
+        self.assertListEqual([50, 50, 20], [item.current_amount for item in ammo])
+        self.assertListEqual([5, 2], [item.current_amount for item in consumables])
+
+    def test_non_stackables_are_created_per_quantity(self):
+        items = self.generator.create_items(drops={"armor": 3})
+        self.assertEqual(3, len(items))
+        self.assertTrue(all(isinstance(item, Armor) for item in items))
+        self.assertEqual(3, len(set(id(item) for item in items)))
+
+    def test_generate_loot_sums_drops_of_all_draws(self):
+        table = LootTable(entries=[("ammo", 1, 10, 10)])
+        items = self.generator.generate_loot(table=table, draws=12)
+        self.assertListEqual([50, 50, 20], [item.current_amount for item in items])
+
+    def test_add_loot_to_inventory_in_one_batch(self):
+        inv = Inventory()
+        ammo = Ammo(item_id="ammo", tags="ammo, stackable", name="Ammo", desc="Test ammo.", max_stack=50,
+                    current_amount=45, value=1, weight=0.0)
+        InventoryItemAdder.add_item(inv=inv, item_to_add=ammo)
+        notifications = list()
+        inv.add_hook(notifications.append)
+        table = LootTable(entries=[("ammo", 1, 10, 10), ("armor", 1)], rolls=2)
+        self.generator.add_loot(inv=inv, table=table, draws=5)
+        self.assertEqual(1, len(notifications))
+        amounts = [item.current_amount for item in inv.get_items_with_id("ammo")]
+        self.assertEqual(50, amounts[0])
+        self.assertTrue(all(amount <= 50 for amount in amounts))
+        self.assertEqual(45 + 10 * (10 - inv.count_items_with_tag("armor")), sum(amounts))
+
+    def test_generate_loot_with_data_catalog(self):
+        catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                              critter_data_file="test_critters_correct.txt")
+        generator = LootGenerator(item_source=catalog, seed=0)
+        items = generator.generate_loot(table=LootTable(entries=[("consumable", 1, 3, 3)]), draws=2)
+        self.assertListEqual([5, 1], [item.current_amount for item in items])
+
+    def test_same_seed_generates_same_loot(self):
+        table = LootTable(entries=[("ammo", 3, 1, 20), ("consumable", 2, 1, 5), ("armor", 1), (None, 4)], rolls=4)
+        drops = self.generator.draw(table=table, draws=50)
+        other_generator = LootGenerator(item_source=ItemFactory(data_file="test_items_correct.txt"), seed=0)
+        self.assertDictEqual(drops, other_generator.draw(table=table, draws=50))
+
+    def test_incorrect_item_id_raises_exception(self):
+        with self.assertRaises(ItemFactory.ItemBuildError):
+            self.generator.generate_loot(table=LootTable(entries=[("no_such_item", 1)]))
+
+    def test_incorrect_table_or_draws_raise_exception(self):
+        with self.assertRaisesRegex(LootTable.LootTableError, "incorrect object type for loot table"):
+            self.generator.draw(table="not LootTable object")
+        with self.assertRaisesRegex(LootTable.LootTableError, "incorrect number of draws"):
+            self.generator.draw(table=LootTable(entries=[("ammo", 1)]), draws=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
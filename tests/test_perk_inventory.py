@@ -1,3 +1,5 @@
+import copy
+import pickle
 import unittest
 
 from app.mechanics.perk_inventory import PerkInventory, PerkInventoryPerkAdder, PerkInventoryPerkRemover
@@ -19,6 +21,28 @@ class PerkInventoryTests(unittest.TestCase):
         correct_str_print = "Perks:\nNone"
         self.assertEqual(correct_str_print, self.perk_inventory.__str__())
 
+    def test_version_changes_when_perks_are_added_or_removed(self):
+        perk = CharacterPerk(perk_id="perk", tags="perk, ap_cost", name="Perk", desc="Test perk.",
+                             effects="weapon, short, ap_cost, -1", requirements="attribute, agility, 6")
+        version = self.perk_inventory.version
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.perk_inventory, perk_to_add=perk)
+        self.assertNotEqual(version, self.perk_inventory.version)
+        version = self.perk_inventory.version
+        PerkInventoryPerkRemover.remove_perk(perk_inv=self.perk_inventory, perk_to_remove=perk)
+        self.assertNotEqual(version, self.perk_inventory.version)
+
+    def test_hooks_are_called_by_operators(self):
+        changed = list()
+        self.perk_inventory.add_hook(changed.append)
+        perk = CharacterPerk(perk_id="perk", tags="perk, ap_cost", name="Perk", desc="Test perk.",
+                             effects="weapon, short, ap_cost, -1", requirements="attribute, agility, 6")
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.perk_inventory, perk_to_add=perk)
+        PerkInventoryPerkRemover.remove_perk(perk_inv=self.perk_inventory, perk_to_remove=perk)
+        self.assertListEqual([self.perk_inventory, self.perk_inventory], changed)
+        self.perk_inventory.remove_hook(changed.append)
+        with self.assertRaisesRegex(PerkInventory.PerkInventoryError, "no such hook in perk inventory"):
+            self.perk_inventory.remove_hook(changed.append)
+
 
 class PerkInventoryPerkAdderTests(unittest.TestCase):
 
@@ -154,6 +178,36 @@ class PerkInventoryExpiredStatusEffectRemoverTests(unittest.TestCase):
         PerkInventoryExpiredStatusEffectRemover.remove_expired_status_effects(perk_inv=self.perk_inventory)
         self.assertEqual(2, len(self.perk_inventory.perks))
 
+    def test_adjacent_expired_status_effects_are_removed(self):
+        PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=self.perk_inventory)
+        PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=self.perk_inventory)
+        self.assertEqual(0, self.perk_inventory.perks[0].duration)
+        self.assertEqual(0, self.perk_inventory.perks[1].duration)
+        PerkInventoryExpiredStatusEffectRemover.remove_expired_status_effects(perk_inv=self.perk_inventory)
+        self.assertEqual(0, len(self.perk_inventory.perks))
+        self.assertEqual(0, len(self.perk_inventory.status_effects))
+
+    def test_status_effects_of_copied_and_unpickled_perk_inventory_are_removed(self):
+        for perk_inventory in (copy.deepcopy(self.perk_inventory), pickle.loads(pickle.dumps(self.perk_inventory))):
+            status_effect, another_status_effect = perk_inventory.perks
+            self.assertListEqual([status_effect, another_status_effect], perk_inventory.status_effects)
+            PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=perk_inventory)
+            self.assertEqual(0, status_effect.duration)
+            self.assertEqual(1, another_status_effect.duration)
+            PerkInventoryExpiredStatusEffectRemover.remove_expired_status_effects(perk_inv=perk_inventory)
+            self.assertListEqual([another_status_effect], perk_inventory.perks)
+            self.assertListEqual([another_status_effect], perk_inventory.status_effects)
+        self.assertEqual(1, self.perk_inventory.perks[0].duration)
+        self.assertEqual(2, len(self.perk_inventory.perks))
+
+    def test_removed_status_effect_keeps_remaining_duration(self):
+        status_effect = self.perk_inventory.perks[1]
+        PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=self.perk_inventory)
+        PerkInventoryPerkRemover.remove_perk(perk_inv=self.perk_inventory, perk_to_remove=status_effect)
+        PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=self.perk_inventory)
+        self.assertEqual(1, status_effect.duration)
+        self.assertIsNone(status_effect.expiry_turn)
+
     def test_incorrect_obj_as_perk_inventory_raises_exception(self):
         with self.assertRaisesRegex(PerkInventory.PerkInventoryError, "incorrect object type for perk inventory"):
             PerkInventoryExpiredStatusEffectRemover.remove_expired_status_effects(perk_inv="not PerkInventory object")
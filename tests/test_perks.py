@@ -1,6 +1,7 @@
 import unittest
 
 from app.perks.perks import Perk, CharacterPerk, PlayerTrait, StatusEffect
+from app.tags.tags import TagRegistry
 
 
 class PerkTests(unittest.TestCase):
@@ -38,6 +39,15 @@ class CharacterPerkTests(unittest.TestCase):
         effects_list = self.perk.get_effects_list()
         self.assertListEqual(correct_effects_list, effects_list)
 
+    def test_tagged_effects(self):
+        perk = CharacterPerk(perk_id="perk", tags="perk, ap_cost", name="Perk", desc="Test perk.",
+                             effects="weapon, short, ap_cost, -1; weapon, shotgun, ap_cost, -2; evasion, 1",
+                             requirements="attribute, agility, 6")
+        correct_tagged_effects = [(TagRegistry.get_tag_mask("weapon, short"), -1),
+                                  (TagRegistry.get_tag_mask("weapon, shotgun"), -2)]
+        self.assertListEqual(correct_tagged_effects, perk.get_tagged_effects(stat="ap_cost"))
+        self.assertListEqual([], perk.get_tagged_effects(stat="evasion"))
+
     def test_requirements_list_with_multiple_requirements(self):
         perk = CharacterPerk(perk_id="perk", tags="perk, ap_cost", name="Perk", desc="Test perk.",
                              effects="weapon, short, ap_cost, -1", requirements="level, 2; attribute, agility, 6")
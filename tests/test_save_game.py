@@ -0,0 +1,142 @@
+import io
+import os
+import tempfile
+import unittest
+
+from app.characters.characters import Human, Player, Critter
+from app.files.data_catalog import DataCatalog
+from app.files.save_game import SaveGameError, SaveGameReader, SaveGameWriter, load_characters, save_characters
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder, PerkInventoryStatusEffectDurationLowerer
+
+
+class SaveGameTests(unittest.TestCase):
+
+    def setUp(self):
+        self.catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                                   critter_data_file="test_critters_correct.txt")
+        self.player = Player("Player", "human, player", 2, 5, 6, 7, 8, 9, experience=150)
+        self.player.guns = 40
+        self.player.health = 17
+        self.player.action_points = 3
+        gun = self.catalog.create_item(item_id="gun")
+        gun.current_ammo = 4
+        ammo = self.catalog.create_item(item_id="ammo")
+        ammo.current_amount = 7
+        armor = self.catalog.create_item(item_id="armor")
+        for item in (gun, ammo, armor, self.catalog.create_item(item_id="melee")):
+            InventoryItemAdder.add_item(inv=self.player.inventory, item_to_add=item)
+        InventoryItemEquipper.equip_item(inv=self.player.inventory, item_to_equip=gun)
+        InventoryItemEquipper.equip_item(inv=self.player.inventory, item_to_equip=armor)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.player.perks, perk_to_add=self.catalog.create_perk("perk"))
+        self.critter = self.catalog.create_critter(critter_id="critter")
+        self.critter.health = 5
+
+    def save_and_load(self, characters):
+        stream = io.BytesIO()
+        writer = SaveGameWriter(stream=stream, catalog=self.catalog)
+        writer.write_characters(characters=characters)
+        writer.finish()
+        stream.seek(0)
+        return list(SaveGameReader(stream=stream, catalog=self.catalog))
+
+    def test_save_and_load_restores_characters(self):
+        human = Human("Human", "human", 1, 5, 5, 5, 5, 5)
+        player, critter, loaded_human = self.save_and_load([self.player, self.critter, human])
+        self.assertIsInstance(player, Player)
+        self.assertIsInstance(critter, Critter)
+        self.assertIsInstance(loaded_human, Human)
+        self.assertEqual(str(self.player), str(player))
+        self.assertEqual(str(self.critter), str(critter))
+        self.assertEqual(str(human), str(loaded_human))
+        self.assertEqual(17, player.health)
+        self.assertEqual(3, player.action_points)
+        self.assertEqual(5, critter.health)
+        self.assertEqual(self.critter.health_bonus, critter.health_bonus)
+
+    def test_save_and_load_restores_inventory_deltas(self):
+        player = self.save_and_load([self.player])[0]
+        self.assertEqual("armor", player.inventory.equipped_armor.item_id)
+        self.assertEqual(4, player.inventory.equipped_weapon.current_ammo)
+        self.assertIs(self.catalog.get_item_prototype(item_id="ammo"),
+                      player.inventory.equipped_weapon.ammo_prototype)
+        self.assertListEqual(["ammo", "melee"], [item.item_id for item in player.inventory.items])
+        self.assertEqual(7, player.inventory.get_items_with_id(item_id="ammo")[0].current_amount)
+
+    def test_save_and_load_restores_status_effect_duration(self):
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.player.perks,
+                                        perk_to_add=self.catalog.create_perk(perk_id="status_effect"))
+        self.player.perks.perks[-1].duration = 3
+        PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=self.player.perks)
+        player = self.save_and_load([self.player])[0]
+        self.assertListEqual(["perk", "status_effect"], [perk.perk_id for perk in player.perks.perks])
+        self.assertEqual(2, player.perks.status_effects[0].duration)
+        self.assertEqual(1, len(player.perks.timeline))
+
+    def test_ids_are_interned(self):
+        one_critter_stream = io.BytesIO()
+        writer = SaveGameWriter(stream=one_critter_stream, catalog=self.catalog)
+        writer.write_character(character=self.critter)
+        two_critters_stream = io.BytesIO()
+        writer = SaveGameWriter(stream=two_critters_stream, catalog=self.catalog)
+        writer.write_characters(characters=[self.critter, self.catalog.create_critter(critter_id="critter")])
+        record_size = len(one_critter_stream.getvalue())
+        self.assertLess(len(two_critters_stream.getvalue()) - record_size, record_size - 8)
+        self.assertNotIn(b"melee", two_critters_stream.getvalue()[record_size:])
+
+    def test_save_and_load_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            save_file = os.path.join(directory, "save.bin")
+            save_characters(save_file=save_file, characters=[self.player, self.critter], catalog=self.catalog)
+            characters = load_characters(save_file=save_file, catalog=self.catalog)
+        self.assertListEqual(["Player", self.critter.name], [character.name for character in characters])
+
+    def test_unavailable_save_file_raises_exception(self):
+        with self.assertRaisesRegex(SaveGameError, "save data is unavailable"):
+            load_characters(save_file="invalid_file.bin", catalog=self.catalog)
+
+    def test_incorrect_save_data_raises_exception(self):
+        with self.assertRaisesRegex(SaveGameError, "incorrect save data"):
+            SaveGameReader(stream=io.BytesIO(b"INVALID_SAVE"), catalog=self.catalog)
+        stream = io.BytesIO()
+        SaveGameWriter(stream=stream, catalog=self.catalog).write_character(character=self.player)
+        with self.assertRaisesRegex(SaveGameError, "save data is truncated"):
+            list(SaveGameReader(stream=io.BytesIO(stream.getvalue()[:-3]), catalog=self.catalog))
+
+    def test_incorrect_character_raises_exception(self):
+        writer = SaveGameWriter(stream=io.BytesIO(), catalog=self.catalog)
+        with self.assertRaisesRegex(SaveGameError, "incorrect object type for character"):
+            writer.write_character(character="character")
+
+    def test_items_missing_from_catalog_raise_exception(self):
+        stream = io.BytesIO()
+        writer = SaveGameWriter(stream=stream, catalog=self.catalog)
+        writer.write_character(character=self.player)
+        writer.finish()
+        other_catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                                    critter_data_file="test_critters_correct.txt")
+        other_catalog._items.pop("melee")
+        stream.seek(0)
+        with self.assertRaisesRegex(SaveGameError, "can't load item missing from data catalog: melee"):
+            list(SaveGameReader(stream=stream, catalog=other_catalog))
+        with self.assertRaisesRegex(SaveGameError, "can't save item missing from data catalog: melee"):
+            SaveGameWriter(stream=io.BytesIO(), catalog=other_catalog).write_character(character=self.player)
+
+    def test_failed_character_does_not_break_later_characters(self):
+        other_catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                                    critter_data_file="test_critters_correct.txt")
+        other_catalog._items.pop("melee")
+        stream = io.BytesIO()
+        writer = SaveGameWriter(stream=stream, catalog=other_catalog)
+        with self.assertRaisesRegex(SaveGameError, "can't save item missing from data catalog: melee"):
+            writer.write_character(character=self.player)
+        human = Human("Player", "human, player", 1, 5, 5, 5, 5, 5)
+        writer.write_character(character=human)
+        writer.finish()
+        stream.seek(0)
+        loaded_human = list(SaveGameReader(stream=stream, catalog=other_catalog))[0]
+        self.assertEqual(str(human), str(loaded_human))
+
+
+if __name__ == "__main__":
+    unittest.main()
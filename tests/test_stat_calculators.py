@@ -1,14 +1,20 @@
+import importlib.util
 import unittest
 
-from app.characters.characters import Human
+from app.characters.characters import Human, Critter
 from app.mechanics.perk_inventory import PerkInventoryPerkAdder
 from app.mechanics.stat_calculators import PerkAttributeCalculator, PerkSkillCalculator, PerkDerivedStatCalculator
 from app.mechanics.stat_calculators import CharacterAttributeCalculator, CharacterSkillCalculator
-from app.mechanics.stat_calculators import CharacterDerivedStatCalculator
+from app.mechanics.stat_calculators import CharacterDerivedStatCalculator, CharacterStatSheetCalculator
+from app.mechanics.stat_calculators import PerkStatAggregator
 from app.mechanics.stat_calculators import StatCalculatorError
 from app.perks.perks import PlayerTrait, StatusEffect
 
 
+def _numpy_available():
+    return importlib.util.find_spec("numpy") is not None
+
+
 class PerkAttributeCalculatorTests(unittest.TestCase):
 
     def setUp(self):
@@ -203,5 +209,100 @@ class CharacterDerivedStatCalculatorTests(unittest.TestCase):
             CharacterDerivedStatCalculator.get_carry_weight(character="not Character derived object")
 
 
+class PerkStatAggregatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.human = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5, perception=5,
+                           intelligence=5)
+        trait = PlayerTrait(perk_id="trait", tags="trait, attribute", name="Trait", desc="Test trait.",
+                            effects="attribute, strength, 1; attribute, agility, -1", conflicts="")
+        skill_trait = PlayerTrait(perk_id="skill_trait", tags="trait, skill", name="Trait", desc="Test trait.",
+                                  effects="skill, guns, 10; skill, melee, -5", conflicts="")
+        status_effect = StatusEffect(perk_id="status_effect", tags="status effect, evasion", name="Status Effect",
+                                     desc="Test status effect.", effects="evasion, 2; max_ap, -1", duration=1)
+        for perk in (trait, skill_trait, status_effect):
+            PerkInventoryPerkAdder.add_perk(perk_inv=self.human.perks, perk_to_add=perk)
+
+    def test_get_stat_bonuses_matches_separate_calculators(self):
+        bonuses = PerkStatAggregator.get_stat_bonuses(perk_inv=self.human.perks)
+        for attribute in PerkStatAggregator.attributes:
+            self.assertEqual(PerkAttributeCalculator.get_attribute_bonus(perk_inv=self.human.perks,
+                                                                         attribute=attribute), bonuses[attribute])
+        for skill in PerkStatAggregator.skills:
+            self.assertEqual(PerkSkillCalculator.get_skill_bonus(perk_inv=self.human.perks, skill=skill),
+                             bonuses[skill])
+        for stat in PerkStatAggregator.derived_stats:
+            self.assertEqual(PerkDerivedStatCalculator.get_stat_bonus(perk_inv=self.human.perks, stat=stat),
+                             bonuses[stat])
+        self.assertEqual(1, bonuses["strength"])
+        self.assertEqual(10, bonuses["guns"])
+        self.assertEqual(2, bonuses["evasion"])
+
+    def test_aggregated_bonuses_are_updated_when_perks_change(self):
+        self.assertEqual(-1, PerkStatAggregator.get_stat_bonus(perk_inv=self.human.perks, stat="max_ap"))
+        status_effect = StatusEffect(perk_id="another_status_effect", tags="status effect, max_ap",
+                                     name="Status Effect", desc="Test status effect.", effects="max_ap, 3", duration=1)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.human.perks, perk_to_add=status_effect)
+        self.assertEqual(2, PerkStatAggregator.get_stat_bonus(perk_inv=self.human.perks, stat="max_ap"))
+        self.assertEqual(2, PerkDerivedStatCalculator.get_stat_bonus(perk_inv=self.human.perks, stat="max_ap"))
+
+    def test_get_stat_bonuses_returns_copy(self):
+        bonuses = PerkStatAggregator.get_stat_bonuses(perk_inv=self.human.perks)
+        bonuses["strength"] = 100
+        self.assertEqual(1, PerkStatAggregator.get_stat_bonus(perk_inv=self.human.perks, stat="strength"))
+
+    def test_unknown_stat_name_is_matched_by_walking_perks(self):
+        self.assertEqual(0, PerkStatAggregator.get_stat_bonus(perk_inv=self.human.perks, stat="skill"))
+        self.assertEqual(5, PerkSkillCalculator.get_skill_bonus(perk_inv=self.human.perks, skill="skill"))
+
+    def test_incorrect_obj_as_perk_inventory_raises_exception(self):
+        with self.assertRaisesRegex(StatCalculatorError, "incorrect object type for perk inventory"):
+            PerkStatAggregator.get_stat_bonuses(perk_inv="not PerkInventory object")
+
+
+class CharacterStatSheetCalculatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.human = Human(name="Human", tags="human", level=3, strength=7, endurance=6, agility=8, perception=5,
+                           intelligence=4)
+        self.critter = Critter(name="Critter", tags="critter, dog", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5, health_bonus=10, exp_award=10)
+        status_effect = StatusEffect(perk_id="status_effect", tags="status effect, evasion", name="Status Effect",
+                                     desc="Test status effect.", effects="evasion, 1; max_ap, -1", duration=1)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.human.perks, perk_to_add=status_effect)
+
+    def test_compute_stat_sheets_matches_separate_calculators(self):
+        human_sheet, critter_sheet = CharacterStatSheetCalculator.compute_stat_sheets(
+            characters=[self.human, self.critter])
+        self.assertEqual(CharacterAttributeCalculator.get_strength(self.human), human_sheet["strength"])
+        self.assertEqual(CharacterSkillCalculator.get_guns(self.human), human_sheet["guns"])
+        self.assertEqual(CharacterDerivedStatCalculator.get_carry_weight(self.human), human_sheet["carry_weight"])
+        self.assertEqual(CharacterDerivedStatCalculator.get_melee_bonus(self.human), human_sheet["melee_bonus"])
+        self.assertEqual(CharacterDerivedStatCalculator.get_max_health(self.human), human_sheet["max_health"])
+        self.assertEqual(CharacterDerivedStatCalculator.get_rad_res(self.human), human_sheet["rad_res"])
+        self.assertEqual(CharacterDerivedStatCalculator.get_evasion(self.human), human_sheet["evasion"])
+        self.assertEqual(CharacterDerivedStatCalculator.get_max_ap(self.human), human_sheet["max_ap"])
+        self.assertEqual(CharacterDerivedStatCalculator.get_exp_mult(self.human), human_sheet["exp_mult"])
+        self.assertEqual(CharacterDerivedStatCalculator.get_max_health(self.critter), critter_sheet["max_health"])
+        self.assertNotIn("guns", critter_sheet)
+
+    def test_compute_stat_sheets_as_columns(self):
+        columns = CharacterStatSheetCalculator.compute_stat_sheets(characters=[self.human, self.critter],
+                                                                   as_columns=True)
+        self.assertListEqual(list(CharacterStatSheetCalculator.get_stat_names()), list(columns.keys()))
+        self.assertListEqual([7, 5], columns["strength"])
+        self.assertListEqual([1, None], columns["guns"])
+        self.assertListEqual([17, 15], columns["max_ap"])
+
+    @unittest.skipIf(_numpy_available(), "numpy is available")
+    def test_compute_stat_sheets_as_arrays_without_numpy_raises_exception(self):
+        with self.assertRaisesRegex(StatCalculatorError, "numpy is required to compute stat sheets as arrays"):
+            CharacterStatSheetCalculator.compute_stat_sheets(characters=[self.human], as_arrays=True)
+
+    def test_incorrect_obj_as_character_raises_exception(self):
+        with self.assertRaisesRegex(StatCalculatorError, "incorrect object type for character"):
+            CharacterStatSheetCalculator.compute_stat_sheets(characters=[self.human, "not Character derived object"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from app.mechanics.status_effect_timeline import StatusEffectTimeline
+from app.perks.perks import StatusEffect
+
+
+class StatusEffectTimelineTests(unittest.TestCase):
+
+    def setUp(self):
+        self.timeline = StatusEffectTimeline()
+        self.status_effect = StatusEffect(perk_id="status_effect", tags="status effect, evasion",
+                                          name="Status Effect", desc="Test status effect.", effects="evasion, 1",
+                                          duration=2)
+        self.permanent_status_effect = StatusEffect(perk_id="permanent_status_effect", tags="status effect, evasion",
+                                                    name="Status Effect", desc="Test status effect.",
+                                                    effects="evasion, 1", duration=-1)
+        self.timeline.attach_status_effect(status_effect=self.status_effect, owner="owner")
+        self.timeline.attach_status_effect(status_effect=self.permanent_status_effect, owner="owner")
+
+    def test_property_values(self):
+        self.assertEqual(0, self.timeline.turn)
+        self.assertEqual(2, len(self.timeline))
+        self.assertEqual(2, self.status_effect.expiry_turn)
+        self.assertIsNone(self.permanent_status_effect.expiry_turn)
+
+    def test_advance_lowers_duration(self):
+        self.timeline.advance()
+        self.assertEqual(1, self.status_effect.duration)
+        self.timeline.advance(turns=5)
+        self.assertEqual(0, self.status_effect.duration)
+        self.assertEqual(-1, self.permanent_status_effect.duration)
+
+    def test_advance_by_negative_number_of_turns_raises_exception(self):
+        with self.assertRaisesRegex(ValueError, "can't advance timeline by negative number of turns"):
+            self.timeline.advance(turns=-1)
+
+    def test_pop_expired(self):
+        self.timeline.advance()
+        self.assertEqual([], self.timeline.pop_expired())
+        self.timeline.advance()
+        self.assertEqual([(self.status_effect, "owner")], self.timeline.pop_expired())
+        self.assertEqual([], self.timeline.pop_expired())
+
+    def test_lower_duration_of_attached_status_effect_reschedules_expiry(self):
+        self.status_effect.lower_duration()
+        self.assertEqual(1, self.status_effect.duration)
+        self.timeline.advance()
+        self.assertEqual([(self.status_effect, "owner")], self.timeline.pop_expired())
+
+    def test_set_duration_of_attached_status_effect_reschedules_expiry(self):
+        self.status_effect.duration = 5
+        self.permanent_status_effect.duration = 1
+        self.timeline.advance()
+        self.assertEqual(4, self.status_effect.duration)
+        self.assertEqual([(self.permanent_status_effect, "owner")], self.timeline.pop_expired())
+
+    def test_detached_status_effect_keeps_duration_and_does_not_expire(self):
+        self.timeline.advance()
+        self.timeline.detach_status_effect(status_effect=self.status_effect)
+        self.timeline.advance(turns=2)
+        self.assertEqual(1, self.status_effect.duration)
+        self.assertEqual([], self.timeline.pop_expired())
+        self.assertEqual(1, len(self.timeline))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,17 +3,36 @@ import unittest
 loader = unittest.TestLoader()
 
 suite = unittest.TestSuite()
+suite.addTests(loader.loadTestsFromName("tests.test_benchmarks"))
+suite.addTests(loader.loadTestsFromName("tests.test_catalog_image"))
 suite.addTests(loader.loadTestsFromName("tests.test_characters"))
 suite.addTests(loader.loadTestsFromName("tests.test_combat_calculators"))
+suite.addTests(loader.loadTestsFromName("tests.test_combat_context"))
+suite.addTests(loader.loadTestsFromName("tests.test_combat_scheduler"))
+suite.addTests(loader.loadTestsFromName("tests.test_content_generator"))
 suite.addTests(loader.loadTestsFromName("tests.test_critter_factory"))
+suite.addTests(loader.loadTestsFromName("tests.test_data_catalog"))
+suite.addTests(loader.loadTestsFromName("tests.test_data_validator"))
 suite.addTests(loader.loadTestsFromName("tests.test_file_handler"))
+suite.addTests(loader.loadTestsFromName("tests.test_file_watcher"))
+suite.addTests(loader.loadTestsFromName("tests.test_game_config"))
+suite.addTests(loader.loadTestsFromName("tests.test_game_master_server"))
+suite.addTests(loader.loadTestsFromName("tests.test_instrumentation"))
 suite.addTests(loader.loadTestsFromName("tests.test_inventory"))
 suite.addTests(loader.loadTestsFromName("tests.test_item_factory"))
 suite.addTests(loader.loadTestsFromName("tests.test_items"))
+suite.addTests(loader.loadTestsFromName("tests.test_loadout_optimizer"))
+suite.addTests(loader.loadTestsFromName("tests.test_loot_tables"))
 suite.addTests(loader.loadTestsFromName("tests.test_perk_factory"))
 suite.addTests(loader.loadTestsFromName("tests.test_perk_inventory"))
 suite.addTests(loader.loadTestsFromName("tests.test_perks"))
+suite.addTests(loader.loadTestsFromName("tests.test_save_game"))
 suite.addTests(loader.loadTestsFromName("tests.test_stat_calculators"))
+suite.addTests(loader.loadTestsFromName("tests.test_status_effect_timeline"))
+suite.addTests(loader.loadTestsFromName("tests.test_tactical_planner"))
+suite.addTests(loader.loadTestsFromName("tests.test_tags"))
+suite.addTests(loader.loadTestsFromName("tests.test_world_clock"))
+suite.addTests(loader.loadTestsFromName("tests.test_world_journal"))
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner()
@@ -0,0 +1,163 @@
+import unittest
+
+import app.config.game_config as game_config
+from app.characters.characters import Human
+from app.items.items import Armor
+from app.items.stackables import Ammo
+from app.items.weapons import RangedWeapon, MeleeWeapon
+from app.mechanics.combat_calculators import ExpectedDamageCalculator
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemEquipper
+from app.mechanics.tactical_planner import TacticalPlanner
+
+
+class TacticalPlannerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = TacticalPlanner(reload_ap_cost=2, equip_ap_cost=1)
+        self.character = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5)
+        self.character.guns = 5
+        self.character.melee = 5
+        self.gun = RangedWeapon(item_id="gun", tags="weapon, gun, short", name="Gun", desc="Test gun.",
+                                damage="2 + 3d6", ammo_type="ammo", clip_size=6, armor_pen=0, accuracy=2, ap_cost=4,
+                                st_requirement=1, value=10, weight=2.0)
+        self.knife = MeleeWeapon(item_id="knife", tags="weapon, melee", name="Knife", desc="Test knife.",
+                                 damage="1 + d6", effect="none", eff_chance="d10", armor_pen=0, accuracy=2,
+                                 ap_cost=3, st_requirement=1, value=1, weight=0.5)
+        InventoryItemAdder.add_item(inv=self.character.inventory, item_to_add=self.gun)
+        InventoryItemAdder.add_item(inv=self.character.inventory, item_to_add=self.knife)
+        InventoryItemEquipper.equip_item(inv=self.character.inventory, item_to_equip=self.gun)
+        self.gun.current_ammo = 6
+        self.opponents = [self._create_opponent(name="First", health=100),
+                          self._create_opponent(name="Second", health=100)]
+
+    @staticmethod
+    def _create_opponent(name, health, dmg_res=0):
+        opponent = Human(name=name, tags="human", level=1, strength=5, endurance=5, agility=5, perception=5,
+                         intelligence=5)
+        armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=dmg_res, rad_res=10,
+                      evasion=0, value=10, weight=2.5)
+        InventoryItemAdder.add_item(inv=opponent.inventory, item_to_add=armor)
+        InventoryItemEquipper.equip_item(inv=opponent.inventory, item_to_equip=armor)
+        opponent.health = health
+        return opponent
+
+    def _add_ammo(self, amount):
+        ammo = Ammo(item_id="ammo", tags="ammo, stackable", name="Ammo", desc="Test ammo.", max_stack=50,
+                    current_amount=amount, value=1, weight=0.0)
+        InventoryItemAdder.add_item(inv=self.character.inventory, item_to_add=ammo)
+
+    def test_attacks_fill_action_points(self):
+        plan = self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=12)
+        self.assertEqual(["attack"] * 3, [action.action for action in plan])
+        self.assertTrue(all(action.weapon is self.gun for action in plan))
+        expected_damage = ExpectedDamageCalculator.get_expected_damage_per_attack(character=self.character,
+                                                                                  opponent=self.opponents[0])
+        self.assertAlmostEqual(3 * expected_damage, sum(action.expected_damage for action in plan))
+
+    def test_plan_uses_current_action_points_by_default(self):
+        self.character.action_points = 8
+        plan = self.planner.plan_turn(character=self.character, opponents=self.opponents)
+        self.assertEqual(8, sum(action.ap_cost for action in plan))
+
+    def test_empty_weapon_is_reloaded_with_carried_ammo(self):
+        self.gun.current_ammo = 0
+        self._add_ammo(amount=10)
+        plan = self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=10)
+        self.assertEqual(["reload", "attack", "attack"], [action.action for action in plan])
+
+    def test_weapon_is_swapped_when_there_is_no_ammo(self):
+        self.gun.current_ammo = 1
+        plan = self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=10)
+        self.assertEqual(["attack", "equip", "attack"], [action.action for action in plan])
+        self.assertIs(self.knife, plan[1].weapon)
+        self.assertIs(self.knife, plan[2].weapon)
+
+    def test_damage_above_target_health_is_not_counted(self):
+        self.opponents[0].health = 1
+        self.opponents[1].health = 2
+        plan = self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=12)
+        self.assertCountEqual(self.opponents, [action.target for action in plan])
+        self.assertEqual(3, sum(action.expected_damage for action in plan))
+
+    def test_plan_is_limited_by_max_actions(self):
+        planner = TacticalPlanner(max_actions=2)
+        plan = planner.plan_turn(character=self.character, opponents=self.opponents, action_points=20)
+        self.assertEqual(2, len(plan))
+
+    def test_no_plan_without_targets(self):
+        for opponent in self.opponents:
+            opponent.health = 0
+        self.assertEqual([], self.planner.plan_turn(character=self.character, opponents=self.opponents,
+                                                    action_points=12))
+        self.assertEqual([], self.planner.plan_turn(character=self.character, opponents=[self.character],
+                                                    action_points=12))
+
+    def test_planning_does_not_change_character(self):
+        self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=12)
+        self.assertIs(self.gun, self.character.inventory.equipped_weapon)
+        version = self.character.version
+        plan = self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=12)
+        self.assertEqual(version, self.character.version)
+        self.assertEqual(3, len(plan))
+
+    def test_characters_planning_against_each_other_reuse_evaluations(self):
+        opponent = self.opponents[0]
+        knife = MeleeWeapon(item_id="knife", tags="weapon, melee", name="Knife", desc="Test knife.", damage="1 + d6",
+                            effect="none", eff_chance="d10", armor_pen=0, accuracy=2, ap_cost=3, st_requirement=1,
+                            value=1, weight=0.5)
+        InventoryItemAdder.add_item(inv=opponent.inventory, item_to_add=knife)
+        InventoryItemEquipper.equip_item(inv=opponent.inventory, item_to_equip=knife)
+        armor = Armor(item_id="armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=0, rad_res=10,
+                      evasion=0, value=10, weight=2.5)
+        InventoryItemAdder.add_item(inv=self.character.inventory, item_to_add=armor)
+        InventoryItemEquipper.equip_item(inv=self.character.inventory, item_to_equip=armor)
+        self.character.health = 100
+        rounds = list()
+        for _ in range(2):
+            self.planner.plan_turn(character=self.character, opponents=[opponent], action_points=12)
+            self.planner.plan_turn(character=opponent, opponents=[self.character], action_points=12)
+            rounds.append([target_entry for character in (self.character, opponent)
+                           for weapon_entry in self.planner._evaluations[id(character)][2].values()
+                           for target_entry in weapon_entry[2].values()])
+        self.assertEqual(3, len(rounds[1]))
+        for first_round_entry, second_round_entry in zip(*rounds):
+            self.assertIs(first_round_entry, second_round_entry)
+
+    def test_evaluations_follow_target_changes(self):
+        plan = self.planner.plan_turn(character=self.character, opponents=self.opponents[:1], action_points=4)
+        armor = Armor(item_id="heavy_armor", tags="armor", name="Armor", desc="Test armor.", dmg_res=100, rad_res=10,
+                      evasion=0, value=10, weight=2.5)
+        InventoryItemAdder.add_item(inv=self.opponents[0].inventory, item_to_add=armor)
+        InventoryItemEquipper.equip_item(inv=self.opponents[0].inventory, item_to_equip=armor)
+        self.assertEqual(1, len(plan))
+        self.assertEqual([], self.planner.plan_turn(character=self.character, opponents=self.opponents[:1],
+                                                    action_points=4))
+
+    def test_evaluations_follow_game_config_changes(self):
+        self.addCleanup(game_config.reset_config)
+        self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=12)
+        evaluations = self.planner._evaluations[id(self.character)][2]
+        game_config.update_config(action_points_base=12)
+        self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=12)
+        self.assertIsNot(evaluations, self.planner._evaluations[id(self.character)][2])
+
+    def test_incorrect_obj_as_character_raises_exception(self):
+        with self.assertRaisesRegex(TacticalPlanner.TacticalPlannerError, "incorrect object type for character"):
+            self.planner.plan_turn(character="not Character derived object", opponents=self.opponents)
+        with self.assertRaisesRegex(TacticalPlanner.TacticalPlannerError, "incorrect object type for opponent"):
+            self.planner.plan_turn(character=self.character, opponents=["not Character derived object"])
+
+    def test_incorrect_action_points_raise_exception(self):
+        with self.assertRaisesRegex(TacticalPlanner.TacticalPlannerError, "incorrect action points: -1"):
+            self.planner.plan_turn(character=self.character, opponents=self.opponents, action_points=-1)
+
+    def test_incorrect_parameters_raise_exception(self):
+        with self.assertRaisesRegex(TacticalPlanner.TacticalPlannerError, "incorrect action points cost"):
+            TacticalPlanner(reload_ap_cost=-1)
+        with self.assertRaisesRegex(TacticalPlanner.TacticalPlannerError, "incorrect planning limit"):
+            TacticalPlanner(max_actions=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from app.characters.characters import Human
+from app.items.weapons import MeleeWeapon
+from app.perks.perks import CharacterPerk
+from app.tags.tags import TagRegistry
+
+
+class TagRegistryTests(unittest.TestCase):
+
+    def test_tag_bits_are_unique_and_stable(self):
+        weapon_bit = TagRegistry.get_tag_bit("weapon")
+        melee_bit = TagRegistry.get_tag_bit("melee")
+        self.assertNotEqual(weapon_bit, melee_bit)
+        self.assertEqual(1, bin(weapon_bit).count("1"))
+        self.assertEqual(weapon_bit, TagRegistry.get_tag_bit("weapon"))
+
+    def test_tag_set_from_str_and_iterable(self):
+        tag_set = TagRegistry.get_tag_set("weapon, melee, sharp")
+        self.assertIsInstance(tag_set, frozenset)
+        self.assertSetEqual({"weapon", "melee", "sharp"}, tag_set)
+        self.assertIs(tag_set, TagRegistry.get_tag_set("weapon, melee, sharp"))
+        self.assertSetEqual(tag_set, TagRegistry.get_tag_set(["sharp", "melee", "weapon"]))
+
+    def test_tag_mask_from_str_and_iterable(self):
+        tag_mask = TagRegistry.get_tag_mask("weapon, melee")
+        correct_tag_mask = TagRegistry.get_tag_bit("weapon") | TagRegistry.get_tag_bit("melee")
+        self.assertEqual(correct_tag_mask, tag_mask)
+        self.assertEqual(correct_tag_mask, TagRegistry.get_tag_mask({"melee", "weapon"}))
+        self.assertEqual(0, TagRegistry.get_tag_mask(""))
+
+    def test_is_subset(self):
+        weapon_tag_mask = TagRegistry.get_tag_mask("weapon, melee, sharp")
+        self.assertTrue(TagRegistry.is_subset(TagRegistry.get_tag_mask("melee, sharp"), weapon_tag_mask))
+        self.assertFalse(TagRegistry.is_subset(TagRegistry.get_tag_mask("melee, blunt"), weapon_tag_mask))
+
+    def test_objects_share_interned_tags(self):
+        weapon = MeleeWeapon(item_id="melee", tags="weapon, melee, sharp", name="Melee", desc="Test melee.",
+                             damage="2 + 4d6", effect="bleed_minor", eff_chance="-6 + d10", armor_pen=0, accuracy=0,
+                             ap_cost=10, st_requirement=1, value=5, weight=1.0)
+        another_weapon = MeleeWeapon(item_id="melee", tags="weapon, melee, sharp", name="Melee", desc="Test melee.",
+                                     damage="2 + 4d6", effect="bleed_minor", eff_chance="-6 + d10", armor_pen=0,
+                                     accuracy=0, ap_cost=10, st_requirement=1, value=5, weight=1.0)
+        perk = CharacterPerk(perk_id="perk", tags="perk, damage", name="Perk", desc="Test perk.",
+                             effects="weapon, short, damage, 2", requirements="agility, 5")
+        character = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5, perception=5,
+                          intelligence=5)
+        self.assertIs(weapon.tag_set, another_weapon.tag_set)
+        self.assertEqual(TagRegistry.get_tag_mask("weapon, melee, sharp"), weapon.tag_mask)
+        self.assertSetEqual({"perk", "damage"}, perk.tag_set)
+        self.assertEqual(TagRegistry.get_tag_bit("human"), character.tag_mask)
+
+
+if __name__ == "__main__":
+    unittest.main()
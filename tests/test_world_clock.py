@@ -0,0 +1,99 @@
+import unittest
+
+from app.characters.characters import Human, Critter
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder, PerkInventoryStatusEffectDurationLowerer
+from app.mechanics.perk_inventory import PerkInventoryExpiredStatusEffectRemover
+from app.mechanics.world_clock import WorldClock
+from app.perks.perks import StatusEffect
+
+
+class WorldClockTests(unittest.TestCase):
+
+    def setUp(self):
+        self.human = Human(name="Human", tags="human", level=1, strength=5, endurance=5, agility=5, perception=5,
+                           intelligence=5)
+        self.critter = Critter(name="Critter", tags="critter, dog", level=1, strength=5, endurance=5, agility=5,
+                               perception=5, intelligence=5, health_bonus=10, exp_award=10)
+        self.short_effect = self._create_status_effect(perk_id="short", duration=2)
+        self.long_effect = self._create_status_effect(perk_id="long", duration=10)
+        self.permanent_effect = self._create_status_effect(perk_id="permanent", duration=-1)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.human.perks, perk_to_add=self.short_effect)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.human.perks, perk_to_add=self.permanent_effect)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.critter.perks, perk_to_add=self.long_effect)
+        self.clock = WorldClock()
+        self.clock.add_character(self.human)
+        self.clock.add_character(self.critter)
+
+    @staticmethod
+    def _create_status_effect(perk_id, duration):
+        return StatusEffect(perk_id=perk_id, tags="status effect, evasion", name="Status Effect",
+                            desc="Test status effect.", effects="evasion, 1", duration=duration)
+
+    def test_property_values(self):
+        self.assertEqual(0, self.clock.turn)
+        self.assertEqual(2, len(self.clock))
+        self.assertListEqual([self.human, self.critter], self.clock.characters)
+        self.assertFalse(self.human.perks.owns_timeline)
+
+    def test_advance_expires_status_effects_in_single_batch(self):
+        affected_characters = self.clock.advance(turns=8)
+        self.assertEqual(8, self.clock.turn)
+        self.assertListEqual([self.human], affected_characters)
+        self.assertListEqual([self.permanent_effect], self.human.perks.perks)
+        self.assertEqual(2, self.long_effect.duration)
+        self.assertListEqual([self.critter], self.clock.advance(turns=2))
+        self.assertEqual(0, len(self.critter.perks.perks))
+
+    def test_hooks_are_called_with_affected_characters(self):
+        affected_characters = list()
+        self.clock.add_hook(affected_characters.append)
+        version = self.human.version
+        self.clock.advance(turns=2)
+        self.assertListEqual([self.human], affected_characters)
+        self.assertNotEqual(version, self.human.version)
+        self.clock.remove_hook(affected_characters.append)
+        self.clock.advance(turns=8)
+        self.assertListEqual([self.human], affected_characters)
+
+    def test_status_effect_added_after_registering_uses_world_clock(self):
+        self.clock.advance(turns=3)
+        status_effect = self._create_status_effect(perk_id="new", duration=1)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.critter.perks, perk_to_add=status_effect)
+        self.assertEqual(4, status_effect.expiry_turn)
+        self.clock.advance()
+        self.assertNotIn(status_effect, self.critter.perks.perks)
+
+    def test_perk_inventory_of_registered_character_can_still_be_ticked(self):
+        PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=self.human.perks)
+        PerkInventoryStatusEffectDurationLowerer.lower_status_effects_duration(perk_inv=self.human.perks)
+        PerkInventoryExpiredStatusEffectRemover.remove_expired_status_effects(perk_inv=self.human.perks)
+        self.assertListEqual([self.permanent_effect], self.human.perks.perks)
+        self.assertEqual(10, self.long_effect.duration)
+
+    def test_removed_character_keeps_remaining_duration(self):
+        self.clock.advance(turns=4)
+        self.clock.remove_character(self.critter)
+        self.clock.advance(turns=4)
+        self.assertTrue(self.critter.perks.owns_timeline)
+        self.assertEqual(6, self.long_effect.duration)
+
+    def test_add_already_registered_character_raises_exception(self):
+        with self.assertRaisesRegex(WorldClock.WorldClockError, "character: .* is already registered"):
+            self.clock.add_character(self.human)
+
+    def test_add_incorrect_obj_as_character_raises_exception(self):
+        with self.assertRaisesRegex(WorldClock.WorldClockError, "incorrect object type for character"):
+            self.clock.add_character("not Character derived object")
+
+    def test_remove_not_registered_character_raises_exception(self):
+        self.clock.remove_character(self.human)
+        with self.assertRaisesRegex(WorldClock.WorldClockError, "character is not registered"):
+            self.clock.remove_character(self.human)
+
+    def test_advance_by_incorrect_number_of_turns_raises_exception(self):
+        with self.assertRaisesRegex(WorldClock.WorldClockError, "incorrect number of turns to advance world clock by"):
+            self.clock.advance(turns=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
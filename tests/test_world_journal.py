@@ -0,0 +1,186 @@
+import os
+import tempfile
+import unittest
+
+from app.characters.characters import Human
+from app.files.data_catalog import DataCatalog
+from app.files.world_journal import WorldJournal
+from app.mechanics.inventory import InventoryItemAdder, InventoryItemMover, InventoryWeaponReloader
+from app.mechanics.perk_inventory import PerkInventoryPerkAdder
+from app.mechanics.world_clock import WorldClock
+
+
+class WorldJournalTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal_file = os.path.join(self.directory.name, "journal.bin")
+        self.catalog = DataCatalog(item_data_file="test_items_correct.txt", perk_data_file="test_perks_correct.txt",
+                                   critter_data_file="test_critters_correct.txt")
+        self.journal = WorldJournal(journal_file=self.journal_file, catalog=self.catalog)
+        self.human = Human("Human", "human", 1, 5, 5, 5, 5, 5)
+        self.critter = self.catalog.create_critter(critter_id="critter")
+        self.human_key = self.journal.add_character(character=self.human)
+        self.critter_key = self.journal.add_character(character=self.critter)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def replay(self):
+        return WorldJournal(journal_file=self.journal_file, catalog=self.catalog).characters
+
+    def test_property_values(self):
+        self.assertEqual(2, len(self.journal))
+        self.assertDictEqual({0: self.human, 1: self.critter}, self.journal.characters)
+        self.assertEqual(2, self.journal.pending_changes)
+        self.assertEqual(1, self.journal.get_key(character=self.critter))
+
+    def test_flush_appends_only_changed_characters(self):
+        self.assertEqual(2, self.journal.flush())
+        self.assertEqual(0, self.journal.flush())
+        size = os.path.getsize(self.journal_file)
+        self.human.health = 12
+        self.assertEqual(1, self.journal.pending_changes)
+        self.assertEqual(1, self.journal.flush())
+        self.assertLess(os.path.getsize(self.journal_file) - size, size)
+        characters = self.replay()
+        self.assertEqual(12, characters[self.human_key].health)
+        self.assertEqual(self.critter.name, characters[self.critter_key].name)
+
+    def test_operators_mark_characters_as_changed(self):
+        self.journal.flush()
+        gun = self.catalog.create_item(item_id="gun")
+        ammo = self.catalog.create_item(item_id="ammo")
+        ammo.current_amount = 5
+        InventoryItemAdder.add_item(inv=self.human.inventory, item_to_add=gun)
+        InventoryItemAdder.add_item(inv=self.human.inventory, item_to_add=ammo)
+        InventoryWeaponReloader.reload_weapon(inv=self.human.inventory, weapon_to_reload=gun)
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.human.perks, perk_to_add=self.catalog.create_perk("perk"))
+        self.assertEqual(1, self.journal.flush())
+        InventoryItemMover.move_item(inv_to_move_to=self.critter.inventory, inv_to_move_from=self.human.inventory,
+                                     item_to_move=gun)
+        self.assertEqual(2, self.journal.flush())
+        human, critter = self.replay().values()
+        self.assertListEqual([], human.inventory.items)
+        self.assertListEqual(["perk"], [perk.perk_id for perk in human.perks.perks])
+        self.assertEqual(5, critter.inventory.get_items_with_id(item_id="gun")[0].current_ammo)
+
+    def test_skill_changes_mark_characters_as_changed(self):
+        self.journal.flush()
+        self.human.guns = 50
+        self.assertEqual(1, self.journal.flush())
+        self.assertEqual(50, self.replay()[self.human_key].guns)
+
+    def test_status_effect_durations_lowered_by_world_clock_are_replayed(self):
+        clock = WorldClock()
+        journal_file = os.path.join(self.directory.name, "clock_journal.bin")
+        journal = WorldJournal(journal_file=journal_file, catalog=self.catalog, clock=clock)
+        status_effect = self.catalog.create_perk(perk_id="status_effect")
+        status_effect.duration = 5
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.human.perks, perk_to_add=status_effect)
+        human_key = journal.add_character(character=self.human)
+        clock.add_character(self.human)
+        journal.flush()
+        size = os.path.getsize(journal_file)
+        self.assertListEqual([], clock.advance(turns=3))
+        self.assertEqual(1, journal.pending_changes)
+        self.assertEqual(1, journal.flush())
+        self.assertLess(os.path.getsize(journal_file) - size, size)
+        replayed_clock = WorldClock()
+        replayed_journal = WorldJournal(journal_file=journal_file, catalog=self.catalog, clock=replayed_clock)
+        human = replayed_journal.characters[human_key]
+        self.assertEqual(3, replayed_clock.turn)
+        self.assertEqual(2, human.perks.perks[0].duration)
+        replayed_clock.add_character(human)
+        self.assertListEqual([human], replayed_clock.advance(turns=2))
+
+    def test_status_effects_expired_since_saved_are_removed_on_replay(self):
+        clock = WorldClock()
+        journal_file = os.path.join(self.directory.name, "clock_journal.bin")
+        journal = WorldJournal(journal_file=journal_file, catalog=self.catalog, clock=clock)
+        human_key = journal.add_character(character=self.human)
+        journal.flush()
+        status_effect = self.catalog.create_perk(perk_id="status_effect")
+        status_effect.duration = 5
+        PerkInventoryPerkAdder.add_perk(perk_inv=self.human.perks, perk_to_add=status_effect)
+        journal.flush()
+        clock.advance(turns=5)
+        journal.flush()
+        self.assertListEqual([], WorldJournal(journal_file=journal_file, catalog=self.catalog).characters[human_key]
+                             .perks.perks)
+        clock.advance(turns=1)
+        with self.assertRaisesRegex(WorldJournal.WorldJournalError, "world clock is ahead of journal: 6"):
+            WorldJournal(journal_file=journal_file, catalog=self.catalog, clock=clock)
+        with self.assertRaisesRegex(WorldJournal.WorldJournalError, "incorrect object type for world clock"):
+            WorldJournal(journal_file=journal_file, catalog=self.catalog, clock="not WorldClock object")
+
+    def test_removed_character_is_removed_on_replay(self):
+        self.journal.flush()
+        self.journal.remove_character(character=self.human)
+        self.human.health = 5
+        self.assertEqual(1, self.journal.pending_changes)
+        self.journal.flush()
+        self.assertListEqual([self.critter_key], list(self.replay().keys()))
+
+    def test_replayed_journal_continues_keys_and_observes_characters(self):
+        self.journal.flush()
+        journal = WorldJournal(journal_file=self.journal_file, catalog=self.catalog)
+        self.assertEqual(0, journal.pending_changes)
+        self.assertEqual(2, journal.add_character(character=Human("Other", "human", 1, 5, 5, 5, 5, 5)))
+        journal.characters[self.critter_key].action_points = 4
+        journal.flush()
+        self.assertEqual(4, self.replay()[self.critter_key].action_points)
+
+    def test_compact_rewrites_journal_as_snapshot(self):
+        for health in range(10):
+            self.human.health = health
+            self.journal.flush()
+        size = os.path.getsize(self.journal_file)
+        self.journal.compact()
+        self.assertLess(os.path.getsize(self.journal_file), size)
+        self.assertEqual(9, self.replay()[self.human_key].health)
+
+    def test_flush_compacts_journal_after_limit(self):
+        journal_file = os.path.join(self.directory.name, "compacted.bin")
+        journal = WorldJournal(journal_file=journal_file, catalog=self.catalog, compact_after=2)
+        journal.add_character(character=self.human)
+        journal.flush()
+        snapshot_size = os.path.getsize(journal_file)
+        for health in range(1, 4):
+            self.human.health = health
+            journal.flush()
+        self.assertEqual(snapshot_size, os.path.getsize(journal_file))
+        self.human.health = 4
+        journal.flush()
+        self.assertEqual(2 * snapshot_size, os.path.getsize(journal_file))
+
+    def test_torn_segment_is_discarded_on_replay(self):
+        self.journal.flush()
+        self.human.health = 7
+        self.journal.flush()
+        with open(self.journal_file, "r+b") as file:
+            file.truncate(os.path.getsize(self.journal_file) - 3)
+        self.assertEqual(0, self.replay()[self.human_key].health)
+
+    def test_segments_flushed_after_torn_segment_are_replayed(self):
+        self.journal.flush()
+        with open(self.journal_file, "r+b") as file:
+            file.truncate(os.path.getsize(self.journal_file) - 5)
+        journal = WorldJournal(journal_file=self.journal_file, catalog=self.catalog)
+        key = journal.add_character(character=Human("Other", "human", 1, 5, 5, 5, 5, 5))
+        journal.flush()
+        characters = self.replay()
+        self.assertListEqual([key], list(characters.keys()))
+        self.assertEqual("Other", characters[key].name)
+
+    def test_incorrect_characters_raise_exception(self):
+        with self.assertRaisesRegex(WorldJournal.WorldJournalError, "incorrect object type for character"):
+            self.journal.add_character(character="character")
+        with self.assertRaisesRegex(WorldJournal.WorldJournalError, "character: Human is already registered"):
+            self.journal.add_character(character=self.human)
+        with self.assertRaisesRegex(WorldJournal.WorldJournalError, "character is not registered"):
+            self.journal.mark_changed(character=Human("Other", "human", 1, 5, 5, 5, 5, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()